@@ -5,6 +5,7 @@ Main AI class - Unified interface for all providers
 import asyncio
 import mimetypes
 import os
+import threading
 from pathlib import Path
 from typing import List, Optional, Union, Dict, Any, AsyncGenerator, Callable
 
@@ -104,8 +105,17 @@ class AI:
         # Available tools
         self._tools: Dict[str, Tool] = {}
 
-        # Internal tracking for attachment preparation
-        self._pending_model_name: Optional[str] = None
+        # Internal tracking for attachment preparation (per thread, so concurrent
+        # chat() calls on a shared instance do not see each other's model)
+        self._local = threading.local()
+
+    @property
+    def _pending_model_name(self) -> Optional[str]:
+        return getattr(self._local, "pending_model_name", None)
+
+    @_pending_model_name.setter
+    def _pending_model_name(self, value: Optional[str]) -> None:
+        self._local.pending_model_name = value
         
     def chat(
         self,
@@ -219,7 +229,10 @@ class AI:
     
     async def async_chat(self, message: str, **kwargs) -> AIResponse:
         """Async version of chat()"""
-        return await self.async_handler.chat(message, **kwargs)
+        response = await self.async_handler.chat(message, **kwargs)
+        # Usage records are written to SQLite; keep that off the event loop
+        await asyncio.to_thread(self._update_usage, response)
+        return response
     
     async def batch_chat(
         self, 
@@ -32,6 +32,7 @@ class Config:
     # Features
     enable_cache: bool = True
     enable_web_search: bool = True
+    prompt_cache_ttl: int = 3600  # seconds an explicit provider-side prompt cache (Gemini) is kept
     debug: bool = False
     
     # Cost optimization
@@ -60,6 +61,9 @@ class Config:
         if os.getenv("AI_MONTHLY_BUDGET_LIMIT"):
             self.monthly_budget_limit = float(os.getenv("AI_MONTHLY_BUDGET_LIMIT"))
         
+        if os.getenv("AI_PROMPT_CACHE_TTL"):
+            self.prompt_cache_ttl = int(os.getenv("AI_PROMPT_CACHE_TTL"))
+        
         # Debug mode
         if os.getenv("AI_DEBUG"):
             self.debug = os.getenv("AI_DEBUG").lower() in ["true", "1", "yes"]
@@ -91,6 +95,7 @@ class Config:
             "monthly_budget_limit": self.monthly_budget_limit,
             "enable_cache": self.enable_cache,
             "enable_web_search": self.enable_web_search,
+            "prompt_cache_ttl": self.prompt_cache_ttl,
             "debug": self.debug,
             "cost_optimization": self.cost_optimization
         }
@@ -10,13 +10,37 @@ from pathlib import Path
 
 @dataclass
 class Usage:
-    """Token and cost usage information"""
+    """Token and cost usage information
+
+    ``prompt_tokens`` counts every input token. ``cached_tokens`` and
+    ``cache_write_tokens`` are the parts of it that were read from or written
+    to the provider-side prompt cache.
+    """
     prompt_tokens: int = 0
     completion_tokens: int = 0
     reasoning_tokens: int = 0
     image_tokens: int = 0
     audio_tokens: int = 0
     total_tokens: int = 0
+    cached_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    @property
+    def uncached_prompt_tokens(self) -> int:
+        """Input tokens billed at the regular rate"""
+        return max(0, self.prompt_tokens - self.cached_tokens - self.cache_write_tokens)
+
+
+def usage_count(source: Any, *path: str) -> int:
+    """Read an integer counter from an SDK usage object (missing or non-int -> 0)"""
+    value = source
+    for name in path:
+        value = getattr(value, name, None)
+        if value is None:
+            return 0
+    if isinstance(value, bool) or not isinstance(value, int):
+        return 0
+    return value
 
 
 @dataclass
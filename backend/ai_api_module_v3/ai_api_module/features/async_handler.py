@@ -21,7 +21,9 @@ class AsyncHandler:
     async def chat(self, message: str, **kwargs) -> AIResponse:
         """Single async chat request"""
         try:
-            request_data = self._build_request_data(message, **kwargs)
+            # Building the request reads attachments (extract_document); do it in a worker
+            # thread so concurrent coroutines on this loop are not blocked by file parsing
+            request_data = await asyncio.to_thread(self._build_request_data, message, **kwargs)
             provider = self.provider_router._select_provider(request_data)
             response = await provider.async_chat(request_data)
             return response
@@ -3,9 +3,9 @@
 Streaming response handler
 """
 import asyncio
-from typing import AsyncGenerator, Callable, Optional, Dict, Any
+from typing import AsyncGenerator, Callable, Optional, Dict, Any, List
 
-from ..core.response import AIResponse
+from ..core.response import AIResponse, Usage
 
 
 class StreamingHandler:
@@ -16,15 +16,49 @@ class StreamingHandler:
         self.ai = ai_instance
 
     async def stream(self, request_data: Dict[str, Any]) -> AsyncGenerator[str, None]:
-        """Stream chat response"""
+        """Stream chat response
+
+        When the stream finishes without error, the complete response is stored
+        in ``request_data["stream_response"]`` and recorded in usage tracking.
+        """
+        parts: List[str] = []
         try:
             provider = self.provider_router._select_provider(request_data)
 
             async for chunk in provider.stream_chat(request_data):
+                parts.append(chunk)
                 yield chunk
 
         except Exception as e:
             yield f"Error: {str(e)}"
+            return
+
+        # Providers end a failed stream with an "Error: ..." chunk instead of raising
+        if parts and parts[-1].startswith("Error: "):
+            return
+        response = self._final_response(provider, request_data, "".join(parts))
+        request_data["stream_response"] = response
+        # Usage records go to SQLite; keep that write off the event loop too
+        await asyncio.to_thread(self.ai._update_usage, response)
+
+    def _final_response(self, provider, request_data: Dict[str, Any], text: str) -> AIResponse:
+        """Build the complete response with the usage the provider reported at the end of the stream"""
+        usage = request_data.get("stream_usage")
+        if usage is None:
+            # Provider did not report usage: rough estimate (4 chars = 1 token)
+            prompt_chars = len(request_data.get("message") or "") + len(request_data.get("system") or "")
+            usage = Usage(prompt_tokens=prompt_chars // 4, completion_tokens=len(text) // 4)
+            usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+
+        calculate_cost = getattr(provider, "_calculate_cost", None)
+        cost = calculate_cost(request_data.get("model", ""), usage) if calculate_cost else 0.0
+        return AIResponse(
+            text=text,
+            model=request_data.get("model", ""),
+            provider=request_data.get("provider", ""),
+            usage=usage,
+            cost=cost,
+        )
 
     async def stream_with_callbacks(
         self,
@@ -35,6 +69,39 @@ class StreamingHandler:
     ) -> AsyncGenerator[str, None]:
         """Stream with callback functions"""
 
+        # Attachment extraction and the budget query block, so keep them off the event
+        # loop: other streams sharing the loop keep flowing while this request is prepared
+        request_data = await asyncio.to_thread(self._prepare_request, message, **kwargs)
+        request_data["stream"] = True
+
+        full_response = ""
+
+        try:
+            async for chunk in self.stream(request_data):
+                full_response += chunk
+
+                if on_chunk:
+                    on_chunk(chunk)
+
+                yield chunk
+
+            if on_complete:
+                final_response = request_data.get("stream_response") or AIResponse(
+                    text=full_response,
+                    model=request_data.get("model", ""),
+                    provider=request_data.get("provider", ""),
+                    cost=0.0
+                )
+                on_complete(final_response)
+
+        except Exception as e:
+            error_chunk = f"Error: {str(e)}"
+            if on_chunk:
+                on_chunk(error_chunk)
+            yield error_chunk
+
+    def _prepare_request(self, message: str, **kwargs) -> Dict[str, Any]:
+        """Build the request (reads attachments) and check the budget; runs in a worker thread"""
         final_model = kwargs.get("model") or self.ai.config.default_model
         resolved_model, resolved_provider = self.ai.model_registry.resolve(final_model, kwargs.get("provider"))
 
@@ -72,30 +139,6 @@ class StreamingHandler:
         finally:
             self.ai._pending_model_name = None
 
-        request_data["stream"] = True
-
-        full_response = ""
-
-        try:
-            async for chunk in self.stream(request_data):
-                full_response += chunk
-
-                if on_chunk:
-                    on_chunk(chunk)
-
-                yield chunk
-
-            if on_complete:
-                final_response = AIResponse(
-                    text=full_response,
-                    model=request_data.get("model", ""),
-                    provider=request_data.get("provider", ""),
-                    cost=0.0
-                )
-                on_complete(final_response)
-
-        except Exception as e:
-            error_chunk = f"Error: {str(e)}"
-            if on_chunk:
-                on_chunk(error_chunk)
-            yield error_chunk
\ No newline at end of file
+        # Same budget gate as chat(); raises BudgetExceededError before anything is sent
+        self.ai._check_budget(request_data)
+        return request_data
\ No newline at end of file
@@ -8,7 +8,7 @@ from typing import Dict, Any, List, Optional, AsyncGenerator
 from pathlib import Path
 
 from .base import BaseProvider
-from ..core.response import AIResponse, Usage, Image, ToolCall
+from ..core.response import AIResponse, Usage, Image, ToolCall, usage_count
 from ..core.exceptions import ProviderError, AuthenticationError, RateLimitError
 
 # Optional module import for patching in tests
@@ -97,6 +97,8 @@ class AnthropicProvider(BaseProvider):
             async with self.async_client.messages.stream(**params) as stream:
                 async for text in stream.text_stream:
                     yield text
+                final_message = await stream.get_final_message()
+                self._record_stream_usage(request_data, self._parse_usage(final_message.usage))
                     
         except Exception as e:
             yield f"Error: {str(e)}"
@@ -179,8 +181,27 @@ class AnthropicProvider(BaseProvider):
             params.setdefault("system", "")
             params["system"] = (params["system"] + "\n" + extra_context).strip()
 
+        if request_data.get("cache_system") and system:
+            self._apply_prompt_cache(params, system)
+
         return params
 
+    def _apply_prompt_cache(self, params: Dict[str, Any], prefix: str) -> None:
+        """Mark the stable system prefix with cache_control; request-specific context stays uncached."""
+        full_system = params.get("system") or ""
+        prefix = prefix.strip()
+        if not prefix or not full_system.startswith(prefix):
+            return
+        blocks: List[Dict[str, Any]] = [{
+            "type": "text",
+            "text": prefix,
+            "cache_control": {"type": "ephemeral"},
+        }]
+        remainder = full_system[len(prefix):].strip()
+        if remainder:
+            blocks.append({"type": "text", "text": remainder})
+        params["system"] = blocks
+
     def _apply_json_constraints(self, params: Dict[str, Any], request_data: Dict[str, Any]) -> None:
         """Inject instructions so Claude reliably returns JSON."""
         format_hint = request_data.get("format")
@@ -278,11 +299,7 @@ class AnthropicProvider(BaseProvider):
                 ))
         
         # Calculate usage and cost
-        usage = Usage(
-            prompt_tokens=response.usage.input_tokens,
-            completion_tokens=response.usage.output_tokens,
-            total_tokens=response.usage.input_tokens + response.usage.output_tokens
-        )
+        usage = self._parse_usage(response.usage)
         
         cost = self._calculate_cost(request_data["model"], usage)
         structured_data = None
@@ -363,6 +380,19 @@ class AnthropicProvider(BaseProvider):
             }
         }
     
+    def _parse_usage(self, usage) -> Usage:
+        """Convert an Anthropic usage object (input_tokens excludes cache reads/writes)"""
+        cache_read = usage_count(usage, "cache_read_input_tokens")
+        cache_write = usage_count(usage, "cache_creation_input_tokens")
+        prompt_tokens = usage.input_tokens + cache_read + cache_write
+        return Usage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=usage.output_tokens,
+            total_tokens=prompt_tokens + usage.output_tokens,
+            cached_tokens=cache_read,
+            cache_write_tokens=cache_write,
+        )
+
     def _calculate_cost(self, model: str, usage: Usage) -> float:
         """Calculate cost based on model and usage"""
         # Anthropic pricing (per 1M tokens)
@@ -386,7 +416,13 @@ class AnthropicProvider(BaseProvider):
         if not model_key:
             return 0.0
         
-        input_cost = (usage.prompt_tokens / 1000000) * pricing[model_key]["input"]
+        # Cache reads bill at 10% of the input rate, 5-minute cache writes at 125%
+        input_rate = pricing[model_key]["input"]
+        input_cost = (
+            usage.uncached_prompt_tokens * input_rate
+            + usage.cached_tokens * input_rate * 0.1
+            + usage.cache_write_tokens * input_rate * 1.25
+        ) / 1000000
         output_cost = (usage.completion_tokens / 1000000) * pricing[model_key]["output"]
         
         return input_cost + output_cost
@@ -4,7 +4,7 @@ Base provider interface
 """
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional, AsyncGenerator
-from ..core.response import AIResponse
+from ..core.response import AIResponse, Usage
 
 
 class BaseProvider(ABC):
@@ -27,8 +27,16 @@ class BaseProvider(ABC):
     
     @abstractmethod
     def stream_chat(self, request_data: Dict[str, Any]) -> AsyncGenerator[str, None]:
-        """Stream chat completion"""
+        """Stream chat completion
+
+        Providers that receive token usage at the end of a stream report it
+        with ``_record_stream_usage`` so the caller can track cost.
+        """
         pass
+
+    def _record_stream_usage(self, request_data: Dict[str, Any], usage: Usage) -> None:
+        """Attach usage reported by a finished stream to its request"""
+        request_data["stream_usage"] = usage
     
     def generate_image(self, request_data: Dict[str, Any]) -> AIResponse:
         """Generate image (override if supported)"""
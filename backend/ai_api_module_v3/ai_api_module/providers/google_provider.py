@@ -4,20 +4,35 @@ Google Gemini provider implementation
 """
 import base64
 import asyncio
+import hashlib
+import threading
+import time
 from typing import Dict, Any, List, Optional, AsyncGenerator
 from pathlib import Path
 
 from .base import BaseProvider
-from ..core.response import AIResponse, Usage, Image, ToolCall
+from ..core.response import AIResponse, Usage, Image, ToolCall, usage_count
 from ..core.exceptions import ProviderError, AuthenticationError, RateLimitError
 
 
 class GoogleProvider(BaseProvider):
     """Google Gemini provider implementation"""
     
+    # Re-create an explicit cache this long before it expires
+    CACHE_REFRESH_MARGIN = 60.0
+    # Don't retry a prefix the API refused to cache (e.g. below the minimum token count) for this long
+    CACHE_FAILURE_BACKOFF = 600.0
+    # How long a request waits for another thread creating the same cache before going uncached
+    CACHE_CREATE_WAIT = 30.0
+
     def __init__(self, api_key: str, config: Dict[str, Any]):
         super().__init__(api_key, config)
         self._client = None
+        # (model, sha256(system)) -> (cached content name or None on failure, expires_at)
+        self._prompt_caches: Dict[tuple, tuple] = {}
+        self._prompt_cache_lock = threading.Lock()
+        # Keys whose cache is being created; the lock is not held across the network call
+        self._prompt_cache_inflight: Dict[tuple, threading.Event] = {}
     
     @property
     def client(self):
@@ -39,7 +54,8 @@ class GoogleProvider(BaseProvider):
             from google.genai import types
 
             contents = self._build_contents(request_data)
-            config = self._build_config(request_data)
+            cached_content = self._get_cached_content(request_data)
+            config = self._build_config(request_data, cached_content=cached_content)
 
             native_files = request_data.get("native_files") or []
             request_kwargs = {
@@ -82,17 +98,28 @@ class GoogleProvider(BaseProvider):
             from google.genai import types
             
             contents = self._build_contents(request_data)
-            config = self._build_config(request_data)
+            # Same explicit prompt cache as chat() (cache creation is a blocking SDK call)
+            cached_content = await asyncio.to_thread(self._get_cached_content, request_data)
+            config = self._build_config(request_data, cached_content=cached_content)
             
-            stream = self.client.models.generate_content_stream(
+            # Async client so a long generation does not block the caller's event loop
+            stream = await self.client.aio.models.generate_content_stream(
                 model=request_data["model"],
                 contents=contents,
                 config=config
             )
             
-            for chunk in stream:
+            # usage_metadata is cumulative; the last chunk has the final counts
+            metadata = None
+            text_parts: List[str] = []
+            async for chunk in stream:
+                metadata = getattr(chunk, "usage_metadata", None) or metadata
                 if hasattr(chunk, 'text') and chunk.text:
+                    text_parts.append(chunk.text)
                     yield chunk.text
+            self._record_stream_usage(
+                request_data, self._parse_usage(metadata, request_data, "".join(text_parts))
+            )
                     
         except Exception as e:
             yield f"Error: {str(e)}"
@@ -204,12 +231,72 @@ class GoogleProvider(BaseProvider):
         
         return contents
     
-    def _build_config(self, request_data: Dict[str, Any]) -> Any:
+    def _get_cached_content(self, request_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Explicit context cache holding the stable system prompt (request_data["cache_system"])
+
+        Returns the cached content name, or None when caching is not requested or not possible.
+        A cached content request cannot also set system_instruction/tools, so requests with
+        tools or web search keep the plain system instruction.
+        """
+        system = request_data.get("system")
+        if not (request_data.get("cache_system") and system):
+            return None
+        if request_data.get("tools") or request_data.get("web_search"):
+            return None
+
+        model = request_data["model"]
+        key = (model, hashlib.sha256(system.encode("utf-8")).hexdigest())
+        while True:
+            now = time.time()
+            with self._prompt_cache_lock:
+                entry = self._prompt_caches.get(key)
+                if entry and entry[1] - self.CACHE_REFRESH_MARGIN > now:
+                    return entry[0]
+                creating = self._prompt_cache_inflight.get(key)
+                if creating is None:
+                    creating = self._prompt_cache_inflight[key] = threading.Event()
+                    break
+                if entry and entry[0] and entry[1] > now:
+                    # Another thread is refreshing; the current cache is still valid
+                    return entry[0]
+            if not creating.wait(self.CACHE_CREATE_WAIT):
+                return None
+
+        from google.genai import types
+
+        ttl = int(self.config.get("prompt_cache_ttl") or 3600)
+        entry = (None, now + self.CACHE_FAILURE_BACKOFF)
+        try:
+            cache = self.client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=system,
+                    ttl=f"{ttl}s",
+                    display_name=f"ai-api-module-{key[1][:16]}",
+                ),
+            )
+            entry = (cache.name, now + ttl)
+        except Exception:
+            # Too short to cache or unsupported model: fall back to a plain system instruction
+            pass
+        finally:
+            with self._prompt_cache_lock:
+                self._prompt_caches[key] = entry
+                del self._prompt_cache_inflight[key]
+            creating.set()
+        return entry[0]
+
+    def _build_config(self, request_data: Dict[str, Any], cached_content: Optional[str] = None) -> Any:
         """Build Google config"""
         from google.genai import types
         
         config_kwargs = {}
 
+        if cached_content:
+            # The system prompt lives in the cache; context and documents are already in contents
+            config_kwargs["cached_content"] = cached_content
+
         system_instructions: List[str] = []
         if request_data.get("system"):
             system_instructions.append(request_data["system"])
@@ -222,7 +309,7 @@ class GoogleProvider(BaseProvider):
             system_instructions.append("\n".join(memo_lines))
         for doc in request_data.get("documents") or []:
             system_instructions.append(f"[파일: {doc.get('name')}]\n{doc.get('text', '')}")
-        if system_instructions:
+        if system_instructions and not cached_content:
             config_kwargs["system_instruction"] = "\n\n".join(system_instructions)
 
         # Parameters
@@ -326,14 +413,7 @@ class GoogleProvider(BaseProvider):
                     arguments=dict(getattr(fc.function_call, 'args', {}) or {})
                 ))
         
-        # Usage (approximate)
-        prompt_tokens = len(request_data["message"]) // 4  # Rough estimate
-        completion_tokens = len(text) // 4
-        usage = Usage(
-            prompt_tokens=prompt_tokens,
-            completion_tokens=completion_tokens,
-            total_tokens=prompt_tokens + completion_tokens,
-        )
+        usage = self._parse_usage(getattr(response, "usage_metadata", None), request_data, text)
         
         cost = self._calculate_cost(request_data["model"], usage)
         
@@ -358,6 +438,21 @@ class GoogleProvider(BaseProvider):
             structured_data=structured_data
         )
     
+    def _parse_usage(self, metadata, request_data: Dict[str, Any], text: str) -> Usage:
+        """Usage from usage_metadata when the SDK reports it, otherwise approximate"""
+        prompt_tokens = usage_count(metadata, "prompt_token_count")
+        completion_tokens = usage_count(metadata, "candidates_token_count")
+        if not prompt_tokens:
+            prompt_tokens = len(request_data["message"]) // 4  # Rough estimate
+            completion_tokens = len(text) // 4
+        return Usage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            reasoning_tokens=usage_count(metadata, "thoughts_token_count"),
+            total_tokens=prompt_tokens + completion_tokens,
+            cached_tokens=usage_count(metadata, "cached_content_token_count"),
+        )
+
     def _calculate_cost(self, model: str, usage: Usage) -> float:
         """Calculate cost based on model and usage"""
         # Google pricing (per 1M tokens)
@@ -378,7 +473,9 @@ class GoogleProvider(BaseProvider):
         if not model_key:
             return 0.0
         
-        input_cost = (usage.prompt_tokens / 1000000) * pricing[model_key]["input"]
+        # Cached content tokens bill at 25% of the input rate (storage billed separately)
+        input_rate = pricing[model_key]["input"]
+        input_cost = (usage.uncached_prompt_tokens * input_rate + usage.cached_tokens * input_rate * 0.25) / 1000000
         output_cost = (usage.completion_tokens / 1000000) * pricing[model_key]["output"]
         
         return input_cost + output_cost
@@ -8,7 +8,7 @@ from typing import Dict, Any, List, Optional, AsyncGenerator
 from pathlib import Path
 
 from .base import BaseProvider
-from ..core.response import AIResponse, Usage, Image, Audio, ToolCall
+from ..core.response import AIResponse, Usage, Image, Audio, ToolCall, usage_count
 from ..core.exceptions import ProviderError, AuthenticationError, RateLimitError
 from ..utils.file_utils import load_file, get_file_type
 from ..utils.image_utils import process_image
@@ -95,11 +95,15 @@ class OpenAIProvider(BaseProvider):
             messages = self._build_messages(request_data)
             params = self._build_chat_params(request_data, messages)
             params["stream"] = True
+            # The last chunk then carries usage (with an empty choices list)
+            params["stream_options"] = {"include_usage": True}
             
             stream = await self.async_client.chat.completions.create(**params)
             
             async for chunk in stream:
-                if chunk.choices[0].delta.content:
+                if getattr(chunk, "usage", None):
+                    self._record_stream_usage(request_data, self._parse_usage(chunk.usage))
+                if chunk.choices and chunk.choices[0].delta.content:
                     yield chunk.choices[0].delta.content
                     
         except Exception as e:
@@ -201,7 +205,7 @@ class OpenAIProvider(BaseProvider):
         """Build OpenAI messages format"""
         messages = []
         
-        # System message
+        # System message (always first so repeated system prompts hit OpenAI's automatic prefix cache)
         if request_data.get("system"):
             messages.append({
                 "role": "system",
@@ -340,11 +344,7 @@ class OpenAIProvider(BaseProvider):
                 ))
         
         # Calculate usage and cost
-        usage = Usage(
-            prompt_tokens=response.usage.prompt_tokens,
-            completion_tokens=response.usage.completion_tokens,
-            total_tokens=response.usage.total_tokens
-        )
+        usage = self._parse_usage(response.usage)
         
         cost = self._calculate_cost(request_data["model"], usage)
         structured_data = None
@@ -366,6 +366,15 @@ class OpenAIProvider(BaseProvider):
             structured_data=structured_data
         )
     
+    def _parse_usage(self, usage) -> Usage:
+        """Convert an OpenAI usage object (chat response or final stream chunk)"""
+        return Usage(
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            total_tokens=usage.total_tokens,
+            cached_tokens=usage_count(usage, "prompt_tokens_details", "cached_tokens"),
+        )
+    
     def _process_image(self, image_input) -> str:
         """Process image input to data URL or URL"""
         if isinstance(image_input, (str, Path)):
@@ -386,18 +395,21 @@ class OpenAIProvider(BaseProvider):
         """Calculate cost based on model and usage"""
         # OpenAI pricing (per 1M tokens)
         pricing = {
-            "gpt-5": {"input": 1.25, "output": 10.00},
-            "gpt-5-mini": {"input": 0.25, "output": 2.00},
-            "gpt-4.1": {"input": 2.00, "output": 8.00},
-            "gpt-4.1-mini": {"input": 0.40, "output": 1.60},
-            "gpt-4o": {"input": 5.00, "output": 15.00},
-            "gpt-4o-mini": {"input": 0.15, "output": 0.60},
+            "gpt-5": {"input": 1.25, "cached_input": 0.125, "output": 10.00},
+            "gpt-5-mini": {"input": 0.25, "cached_input": 0.025, "output": 2.00},
+            "gpt-4.1": {"input": 2.00, "cached_input": 0.50, "output": 8.00},
+            "gpt-4.1-mini": {"input": 0.40, "cached_input": 0.10, "output": 1.60},
+            "gpt-4o": {"input": 5.00, "cached_input": 2.50, "output": 15.00},
+            "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
         }
         
         if model not in pricing:
             return 0.0
         
-        input_cost = (usage.prompt_tokens / 1000000) * pricing[model]["input"]
+        input_cost = (
+            usage.uncached_prompt_tokens * pricing[model]["input"]
+            + usage.cached_tokens * pricing[model]["cached_input"]
+        ) / 1000000
         output_cost = (usage.completion_tokens / 1000000) * pricing[model]["output"]
         
         return input_cost + output_cost
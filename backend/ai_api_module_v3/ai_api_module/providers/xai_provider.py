@@ -9,7 +9,7 @@ from typing import Dict, Any, List, Optional, AsyncGenerator
 from pathlib import Path
 
 from .base import BaseProvider
-from ..core.response import AIResponse, Usage, Image
+from ..core.response import AIResponse, Usage, Image, usage_count
 from ..core.exceptions import ProviderError, AuthenticationError, RateLimitError
 
 
@@ -194,7 +194,8 @@ class XAIProvider(BaseProvider):
         usage = Usage(
             prompt_tokens=getattr(response.usage, 'prompt_tokens', 0),
             completion_tokens=getattr(response.usage, 'completion_tokens', 0),
-            reasoning_tokens=getattr(response.usage, 'reasoning_tokens', 0)
+            reasoning_tokens=getattr(response.usage, 'reasoning_tokens', 0),
+            cached_tokens=usage_count(response.usage, 'cached_prompt_text_tokens'),
         )
         
         cost = self._calculate_cost(request_data["model"], usage)
@@ -290,7 +291,9 @@ class XAIProvider(BaseProvider):
         if not model_key:
             return 0.0
         
-        input_cost = (usage.prompt_tokens / 1000000) * pricing[model_key]["input"]
+        # Cached prompt tokens bill at 25% of the input rate
+        input_rate = pricing[model_key]["input"]
+        input_cost = (usage.uncached_prompt_tokens * input_rate + usage.cached_tokens * input_rate * 0.25) / 1000000
         output_cost = ((usage.completion_tokens + usage.reasoning_tokens) / 1000000) * pricing[model_key]["output"]
         
         return input_cost + output_cost
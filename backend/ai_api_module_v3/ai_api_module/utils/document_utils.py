@@ -4,16 +4,24 @@ Utilities for extracting textual content from user-provided documents.
 The goal is not to provide perfect fidelity but to offer a unified way to
 inline file contents when forwarding them to providers that do not natively
 support binary uploads.
+
+Extraction is lazy: readers yield text page by page (PDF), paragraph by
+paragraph (DOCX) or in fixed-size blocks (plain text), and ``take_text``
+stops pulling from them as soon as the caller's budget is filled, so a
+300-page PDF is not parsed in full only to keep its first few thousand
+characters.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterable, Iterator, Optional
 
 
 MAX_EXTRACTED_CHARS = 6000
+CHARS_PER_TOKEN = 4  # Same rough estimate as Conversation._estimate_tokens
+TEXT_READ_CHUNK = 16 * 1024
 
 
 @dataclass
@@ -35,45 +43,150 @@ class ExtractedDocument:
         return f"{header}\n{body.strip()}"
 
 
-def _truncate_text(text: str) -> tuple[str, bool]:
-    if len(text) <= MAX_EXTRACTED_CHARS:
-        return text, False
-    return text[:MAX_EXTRACTED_CHARS], True
+def budget_chars(max_chars: Optional[int] = None, max_tokens: Optional[int] = None) -> int:
+    """Resolve a character and/or token budget to a character limit."""
 
+    limit = MAX_EXTRACTED_CHARS if max_chars is None else max_chars
+    if max_tokens is not None:
+        limit = min(limit, max_tokens * CHARS_PER_TOKEN)
+    return max(0, limit)
+
+
+def take_text(chunks: Iterable[str], max_chars: int) -> tuple[str, bool]:
+    """Concatenate chunks until ``max_chars`` is reached.
+
+    The iterator is closed as soon as the budget is exceeded, so lazy readers
+    stop parsing the rest of the document. Returns ``(text, truncated)``.
+    """
+
+    pieces = []
+    used = 0
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            room = max_chars - used
+            if len(chunk) > room:
+                pieces.append(chunk[:room])
+                return "".join(pieces), True
+            pieces.append(chunk)
+            used += len(chunk)
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+    return "".join(pieces), False
 
-def _read_text_file(path: Path) -> ExtractedDocument:
-    text = path.read_text(encoding="utf-8", errors="ignore")
-    truncated_text, truncated = _truncate_text(text)
-    return ExtractedDocument(
-        name=path.name,
-        mime_type="text/plain" if path.suffix.lower() != ".md" else "text/markdown",
-        text=truncated_text,
-        truncated=truncated,
-    )
 
+def _truncate_text(text: str, max_chars: int = MAX_EXTRACTED_CHARS) -> tuple[str, bool]:
+    return take_text([text], max_chars)
 
-def _read_markdown_file(path: Path) -> ExtractedDocument:
-    return _read_text_file(path)
 
+def _joined(parts: Iterable[str], separator: str = "\n") -> Iterator[str]:
+    first = True
+    for part in parts:
+        if not first:
+            yield separator
+        first = False
+        yield part
 
-def _read_pdf(path: Path) -> ExtractedDocument:
+
+def iter_text_file(path: Path) -> Iterator[str]:
+    """Yield a text file in fixed-size blocks."""
+
+    with path.open("r", encoding="utf-8", errors="ignore") as handle:
+        while True:
+            block = handle.read(TEXT_READ_CHUNK)
+            if not block:
+                return
+            yield block
+
+
+def _load_pdf_reader():
     try:
+        from pypdf import PdfReader  # type: ignore
+    except ImportError:
         from PyPDF2 import PdfReader  # type: ignore
+    return PdfReader
 
-        reader = PdfReader(str(path))
-        pages_text = []
+
+def iter_pdf_pages(path: Path) -> Iterator[str]:
+    """Yield the text of each PDF page; pages are only parsed when reached.
+
+    Raises ImportError when neither pypdf nor PyPDF2 is installed.
+    """
+
+    reader = _load_pdf_reader()(str(path))
+
+    def pages() -> Iterator[str]:
         for page in reader.pages:
             try:
-                pages_text.append(page.extract_text() or "")
+                yield page.extract_text() or ""
             except Exception:
                 continue
-        raw_text = "\n".join(pages_text)
-        if not raw_text.strip():
-            raw_text = "(PDF에서 텍스트를 추출하지 못했습니다. 요약이 필요하면 원문을 참조하세요.)"
+
+    return _joined(pages())
+
+
+def iter_docx_paragraphs(path: Path) -> Iterator[str]:
+    """Yield DOCX paragraphs in document order.
+
+    python-docx loads the document XML up front; laziness here saves the
+    per-paragraph text assembly and everything downstream of it.
+    """
+
+    import docx  # type: ignore
+
+    document = docx.Document(str(path))
+    return _joined(para.text for para in document.paragraphs)
+
+
+_TEXT_READERS: Dict[str, Callable[[Path], Iterator[str]]] = {
+    ".txt": iter_text_file,
+    ".md": iter_text_file,
+    ".pdf": iter_pdf_pages,
+    ".docx": iter_docx_paragraphs,
+}
+
+
+def iter_document_text(path: Path) -> Optional[Iterator[str]]:
+    """Return a lazy text iterator for ``path``, or ``None`` if unsupported.
+
+    Missing optional parsers (pypdf/PyPDF2, python-docx) and unreadable files
+    raise before any text is produced, so callers can fall back to another
+    extractor.
+    """
+
+    reader = _TEXT_READERS.get(path.suffix.lower())
+    return reader(path) if reader else None
+
+
+def _read_text_file(path: Path, max_chars: int = MAX_EXTRACTED_CHARS) -> ExtractedDocument:
+    truncated_text, truncated = take_text(iter_text_file(path), max_chars)
+    return ExtractedDocument(
+        name=path.name,
+        mime_type="text/plain" if path.suffix.lower() != ".md" else "text/markdown",
+        text=truncated_text,
+        truncated=truncated,
+    )
+
+
+def _read_markdown_file(path: Path, max_chars: int = MAX_EXTRACTED_CHARS) -> ExtractedDocument:
+    return _read_text_file(path, max_chars)
+
+
+def _read_pdf(path: Path, max_chars: int = MAX_EXTRACTED_CHARS) -> ExtractedDocument:
+    try:
+        truncated_text, truncated = take_text(iter_pdf_pages(path), max_chars)
+        if not truncated_text.strip():
+            truncated_text, truncated = _truncate_text(
+                "(PDF에서 텍스트를 추출하지 못했습니다. 요약이 필요하면 원문을 참조하세요.)", max_chars
+            )
     except Exception:
-        raw_text = "(PyPDF2가 설치되어 있지 않거나 PDF 파싱에 실패했습니다. 문서를 직접 확인해주세요.)"
+        truncated_text, truncated = _truncate_text(
+            "(PyPDF2가 설치되어 있지 않거나 PDF 파싱에 실패했습니다. 문서를 직접 확인해주세요.)", max_chars
+        )
 
-    truncated_text, truncated = _truncate_text(raw_text)
     return ExtractedDocument(
         name=path.name,
         mime_type="application/pdf",
@@ -82,19 +195,18 @@ def _read_pdf(path: Path) -> ExtractedDocument:
     )
 
 
-def _read_docx(path: Path) -> ExtractedDocument:
+def _read_docx(path: Path, max_chars: int = MAX_EXTRACTED_CHARS) -> ExtractedDocument:
     try:
-        import docx  # type: ignore
-
-        document = docx.Document(str(path))
-        paragraphs = [para.text for para in document.paragraphs]
-        raw_text = "\n".join(paragraphs)
-        if not raw_text.strip():
-            raw_text = "(DOCX 파일에서 텍스트를 찾을 수 없습니다. 문서를 확인해주세요.)"
+        truncated_text, truncated = take_text(iter_docx_paragraphs(path), max_chars)
+        if not truncated_text.strip():
+            truncated_text, truncated = _truncate_text(
+                "(DOCX 파일에서 텍스트를 찾을 수 없습니다. 문서를 확인해주세요.)", max_chars
+            )
     except Exception:
-        raw_text = "(python-docx가 설치되어 있지 않거나 DOCX 파싱에 실패했습니다. 문서를 직접 확인해주세요.)"
+        truncated_text, truncated = _truncate_text(
+            "(python-docx가 설치되어 있지 않거나 DOCX 파싱에 실패했습니다. 문서를 직접 확인해주세요.)", max_chars
+        )
 
-    truncated_text, truncated = _truncate_text(raw_text)
     return ExtractedDocument(
         name=path.name,
         mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
@@ -103,25 +215,32 @@ def _read_docx(path: Path) -> ExtractedDocument:
     )
 
 
-def extract_document(path: Path) -> Optional[ExtractedDocument]:
+def extract_document(
+    path: Path,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> Optional[ExtractedDocument]:
     """Extract readable text from a supported document.
 
+    Reading stops once ``max_chars`` (default ``MAX_EXTRACTED_CHARS``) or
+    ``max_tokens`` (estimated at ``CHARS_PER_TOKEN`` chars per token) is met.
     Returns ``None`` when the file type is not currently supported.
     """
 
+    limit = budget_chars(max_chars, max_tokens)
     suffix = path.suffix.lower()
     if suffix in {".txt"}:
-        return _read_text_file(path)
+        return _read_text_file(path, limit)
     if suffix in {".md"}:
-        return _read_markdown_file(path)
+        return _read_markdown_file(path, limit)
     if suffix in {".pdf"}:
-        return _read_pdf(path)
+        return _read_pdf(path, limit)
     if suffix in {".docx"}:
-        return _read_docx(path)
+        return _read_docx(path, limit)
     # Legacy .doc files are not well supported without extra dependencies.
     if suffix == ".doc":
         placeholder = "(구형 DOC 형식은 직접 텍스트로 변환해 주세요. 현재 모듈은 DOCX를 우선 지원합니다.)"
-        truncated_text, truncated = _truncate_text(placeholder)
+        truncated_text, truncated = _truncate_text(placeholder, limit)
         return ExtractedDocument(
             name=path.name,
             mime_type="application/msword",
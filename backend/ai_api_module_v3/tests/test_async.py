@@ -50,3 +50,33 @@ class TestAsyncHandler:
         assert len(responses) == 3
         for i, response in enumerate(responses):
             assert f"Message {i+1}" in response.text
+
+
+class TestAsyncRequestBuilding:
+    """Test that request preparation stays off the event loop"""
+
+    def test_request_built_in_worker_thread(self):
+        import threading
+
+        mock_router = Mock()
+        mock_provider = Mock()
+        mock_provider.async_chat = AsyncMock(return_value=AIResponse(text="ok"))
+        mock_router._select_provider.return_value = mock_provider
+        mock_ai = Mock()
+        mock_ai.model_registry.resolve.return_value = ("gpt-4.1", "openai")
+        threads = []
+
+        def build_request(**kwargs):
+            threads.append(threading.get_ident())
+            return {"message": kwargs["message"], "model": kwargs["model"]}
+
+        mock_ai._build_request.side_effect = build_request
+        handler = AsyncHandler(mock_router, mock_ai)
+
+        async def run():
+            return threading.get_ident(), await handler.chat("학습지")
+
+        loop_thread, response = asyncio.run(run())
+
+        assert response.text == "ok"
+        assert threads and threads[0] != loop_thread
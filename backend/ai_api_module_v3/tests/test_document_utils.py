@@ -0,0 +1,101 @@
+# tests/test_document_utils.py
+"""
+Budget-aware document extraction tests
+"""
+import sys
+import pytest
+from unittest.mock import MagicMock, patch
+from ai_api_module.utils.document_utils import (
+    MAX_EXTRACTED_CHARS,
+    budget_chars,
+    extract_document,
+    iter_document_text,
+    take_text,
+)
+
+
+class FakePage:
+    def __init__(self, number, parsed):
+        self.number = number
+        self.parsed = parsed
+
+    def extract_text(self):
+        self.parsed.append(self.number)
+        return f"page {self.number} " + "가" * 990
+
+
+@pytest.fixture
+def fake_pdf():
+    """Stand-in pypdf package recording which pages were parsed"""
+    parsed = []
+    pypdf = MagicMock()
+    pypdf.PdfReader.return_value.pages = [FakePage(n, parsed) for n in range(300)]
+    with patch.dict(sys.modules, {"pypdf": pypdf}):
+        yield parsed
+
+
+class TestTakeText:
+    """Test budget accounting"""
+
+    def test_stops_pulling_after_budget(self):
+        pulled = []
+
+        def chunks():
+            for n in range(100):
+                pulled.append(n)
+                yield "x" * 10
+
+        text, truncated = take_text(chunks(), 25)
+
+        assert text == "x" * 25
+        assert truncated is True
+        assert pulled == [0, 1, 2]
+
+    def test_exact_fit_is_not_truncated(self):
+        assert take_text(["ab", "", "cd"], 4) == ("abcd", False)
+
+    def test_token_budget(self):
+        assert budget_chars() == MAX_EXTRACTED_CHARS
+        assert budget_chars(max_tokens=100) == 400
+        assert budget_chars(max_chars=200, max_tokens=100) == 200
+
+
+class TestExtractDocument:
+    """Test lazy readers behind extract_document"""
+
+    def test_pdf_parses_only_pages_needed(self, tmp_path, fake_pdf):
+        path = tmp_path / "textbook.pdf"
+        path.write_bytes(b"%PDF-1.4")
+
+        doc = extract_document(path, max_chars=2500)
+
+        assert doc.truncated is True
+        assert len(doc.text) == 2500
+        assert doc.text.startswith("page 0 ")
+        assert fake_pdf == [0, 1, 2]
+
+    def test_text_file_budget(self, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_text("한글 문장. " * 10000, encoding="utf-8")
+
+        doc = extract_document(path, max_tokens=50)
+
+        assert doc.truncated is True
+        assert len(doc.text) == 200
+
+    def test_small_file_unchanged(self, tmp_path):
+        path = tmp_path / "short.md"
+        path.write_text("# 제목\n본문", encoding="utf-8")
+
+        doc = extract_document(path)
+
+        assert doc.text == "# 제목\n본문"
+        assert doc.truncated is False
+        assert doc.mime_type == "text/markdown"
+
+    def test_unsupported_suffix(self, tmp_path):
+        path = tmp_path / "sheet.xlsx"
+        path.write_bytes(b"")
+
+        assert extract_document(path) is None
+        assert iter_document_text(path) is None
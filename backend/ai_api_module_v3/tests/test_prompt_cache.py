@@ -0,0 +1,232 @@
+# tests/test_prompt_cache.py
+"""
+Provider-side prompt caching tests
+"""
+import sys
+import asyncio
+import threading
+import pytest
+from unittest.mock import Mock, MagicMock, AsyncMock, patch
+from ai_api_module.core.response import Usage, usage_count
+from ai_api_module.providers.anthropic_provider import AnthropicProvider
+from ai_api_module.providers.openai_provider import OpenAIProvider
+from ai_api_module.providers.google_provider import GoogleProvider
+
+
+STATIC_PREFIX = "guideline " * 200
+
+
+class TestUsage:
+    """Test cached token accounting"""
+
+    def test_uncached_prompt_tokens(self):
+        usage = Usage(prompt_tokens=1000, cached_tokens=700, cache_write_tokens=100)
+        assert usage.uncached_prompt_tokens == 200
+
+    def test_usage_count_ignores_missing_and_non_int(self):
+        details = Mock(spec=["cached_tokens"])
+        details.cached_tokens = 42
+        assert usage_count(Mock(prompt_tokens_details=details), "prompt_tokens_details", "cached_tokens") == 42
+        assert usage_count(Mock(), "cache_read_input_tokens") == 0
+        assert usage_count(None, "prompt_token_count") == 0
+
+
+class TestAnthropicPromptCache:
+    """Test Anthropic cache_control blocks"""
+
+    def test_static_prefix_marked_with_cache_control(self):
+        provider = AnthropicProvider("test-key", {})
+        request_data = {
+            "message": "사용자 요청: 분수 학습지",
+            "model": "claude-sonnet-4",
+            "system": STATIC_PREFIX,
+            "cache_system": True,
+            "documents": [{"name": "worksheet.docx", "text": "문서 내용"}],
+        }
+
+        params = provider._build_chat_params(request_data, [], STATIC_PREFIX)
+
+        blocks = params["system"]
+        assert blocks[0]["text"] == STATIC_PREFIX.strip()
+        assert blocks[0]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in blocks[1]
+        assert "문서 내용" in blocks[1]["text"]
+
+    def test_plain_system_without_cache_flag(self):
+        provider = AnthropicProvider("test-key", {})
+        request_data = {"message": "Hello", "model": "claude-sonnet-4", "system": STATIC_PREFIX}
+
+        params = provider._build_chat_params(request_data, [], STATIC_PREFIX)
+
+        assert params["system"] == STATIC_PREFIX
+
+    def test_cache_usage_recorded_and_discounted(self):
+        provider = AnthropicProvider("test-key", {})
+        response = Mock()
+        response.content = [Mock(type="text", text="<html></html>")]
+        response.usage.input_tokens = 100
+        response.usage.output_tokens = 50
+        response.usage.cache_read_input_tokens = 9000
+        response.usage.cache_creation_input_tokens = 0
+
+        result = provider._parse_chat_response(response, {"model": "claude-sonnet-4"})
+
+        assert result.usage.prompt_tokens == 9100
+        assert result.usage.cached_tokens == 9000
+        uncached_cost = provider._calculate_cost(
+            "claude-sonnet-4", Usage(prompt_tokens=9100, completion_tokens=50)
+        )
+        assert result.cost < uncached_cost
+
+
+class TestOpenAIPromptCache:
+    """Test OpenAI automatic prefix caching support"""
+
+    def test_system_message_first(self):
+        provider = OpenAIProvider("test-key", {})
+        messages = provider._build_messages({
+            "message": "사용자 요청",
+            "system": STATIC_PREFIX,
+            "documents": [{"text": "문서"}],
+        })
+        assert messages[0] == {"role": "system", "content": STATIC_PREFIX}
+
+    def test_cached_tokens_from_prompt_details(self, mock_openai_client):
+        provider = OpenAIProvider("test-key", {})
+        response = mock_openai_client.chat.completions.create.return_value
+        response.usage.prompt_tokens = 2000
+        details = Mock(spec=["cached_tokens"])
+        details.cached_tokens = 1536
+        response.usage.prompt_tokens_details = details
+
+        result = provider._parse_chat_response(response, {"model": "gpt-4.1"})
+
+        assert result.usage.cached_tokens == 1536
+        assert result.cost < provider._calculate_cost(
+            "gpt-4.1", Usage(prompt_tokens=2000, completion_tokens=20)
+        )
+
+
+@pytest.fixture
+def fake_genai():
+    """Stand-in google.genai package"""
+    google = MagicMock()
+    modules = {
+        "google": google,
+        "google.genai": google.genai,
+        "google.genai.types": google.genai.types,
+    }
+    with patch.dict(sys.modules, modules):
+        yield google.genai
+
+
+class TestGooglePromptCache:
+    """Test Gemini explicit context caching"""
+
+    def _request(self, **extra):
+        request_data = {
+            "message": "사용자 요청",
+            "model": "gemini-2.5-pro",
+            "system": STATIC_PREFIX,
+            "cache_system": True,
+        }
+        request_data.update(extra)
+        return request_data
+
+    def test_cache_created_once_and_reused(self, fake_genai):
+        provider = GoogleProvider("test-key", {"prompt_cache_ttl": 600})
+        cache = Mock()
+        cache.name = "cachedContents/abc"
+        provider.client.caches.create.return_value = cache
+
+        first = provider._get_cached_content(self._request())
+        second = provider._get_cached_content(self._request())
+
+        assert first == second == "cachedContents/abc"
+        provider.client.caches.create.assert_called_once()
+
+    def test_config_uses_cached_content_instead_of_system(self, fake_genai):
+        provider = GoogleProvider("test-key", {})
+
+        provider._build_config(self._request(), cached_content="cachedContents/abc")
+
+        kwargs = fake_genai.types.GenerateContentConfig.call_args.kwargs
+        assert kwargs["cached_content"] == "cachedContents/abc"
+        assert "system_instruction" not in kwargs
+
+    def test_cache_failure_falls_back_to_system_instruction(self, fake_genai):
+        provider = GoogleProvider("test-key", {})
+        provider.client.caches.create.side_effect = Exception("content too small")
+
+        assert provider._get_cached_content(self._request()) is None
+        assert provider._get_cached_content(self._request()) is None
+        provider.client.caches.create.assert_called_once()
+
+    def test_tools_disable_caching(self, fake_genai):
+        provider = GoogleProvider("test-key", {})
+
+        assert provider._get_cached_content(self._request(web_search=True)) is None
+        provider.client.caches.create.assert_not_called()
+
+    def test_create_runs_outside_lock_once_per_key(self, fake_genai):
+        provider = GoogleProvider("test-key", {})
+        started, release, finished = threading.Event(), threading.Event(), threading.Event()
+        overlapped = []
+
+        def create(model, config):
+            cache = Mock()
+            cache.name = f"cachedContents/{model}"
+            if model == "gemini-2.5-pro":
+                started.set()
+                release.wait(5)
+                finished.set()
+            else:
+                overlapped.append(not finished.is_set())
+            return cache
+
+        provider.client.caches.create.side_effect = create
+        results = []
+        waiters = [
+            threading.Thread(target=lambda: results.append(provider._get_cached_content(self._request())))
+            for _ in range(3)
+        ]
+        for thread in waiters:
+            thread.start()
+        assert started.wait(5)
+
+        # A different model is cached while the first create is still in flight
+        other = provider._get_cached_content(self._request(model="gemini-2.5-flash"))
+        assert other == "cachedContents/gemini-2.5-flash"
+        assert overlapped == [True]
+
+        release.set()
+        for thread in waiters:
+            thread.join(5)
+        assert results == ["cachedContents/gemini-2.5-pro"] * 3
+        assert provider.client.caches.create.call_count == 2
+
+    def test_stream_uses_cached_content(self, fake_genai):
+        provider = GoogleProvider("test-key", {})
+        cache = Mock()
+        cache.name = "cachedContents/abc"
+        provider.client.caches.create.return_value = cache
+        last = Mock(text="</html>")
+        last.usage_metadata.prompt_token_count = 5000
+        last.usage_metadata.candidates_token_count = 100
+        last.usage_metadata.thoughts_token_count = 0
+        last.usage_metadata.cached_content_token_count = 4800
+
+        async def stream():
+            for chunk in (Mock(text="<html>", usage_metadata=None), last):
+                yield chunk
+
+        provider.client.aio.models.generate_content_stream = AsyncMock(return_value=stream())
+        request_data = self._request()
+
+        async def collect():
+            return [chunk async for chunk in provider.stream_chat(request_data)]
+
+        assert asyncio.run(collect()) == ["<html>", "</html>"]
+        kwargs = fake_genai.types.GenerateContentConfig.call_args.kwargs
+        assert kwargs["cached_content"] == "cachedContents/abc"
+        assert request_data["stream_usage"].cached_tokens == 4800
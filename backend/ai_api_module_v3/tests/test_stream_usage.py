@@ -0,0 +1,154 @@
+# tests/test_stream_usage.py
+"""
+Streaming budget and usage accounting tests
+"""
+import asyncio
+import threading
+import pytest
+from unittest.mock import Mock, MagicMock, AsyncMock
+from ai_api_module.core.exceptions import BudgetExceededError
+from ai_api_module.core.response import Usage
+from ai_api_module.features.streaming import StreamingHandler
+from ai_api_module.providers.anthropic_provider import AnthropicProvider
+from ai_api_module.providers.openai_provider import OpenAIProvider
+
+
+async def _async_iter(items):
+    for item in items:
+        yield item
+
+
+def _collect(agen):
+    async def run():
+        return [chunk async for chunk in agen]
+    return asyncio.run(run())
+
+
+def _openai_chunk(content=None, usage=None):
+    chunk = Mock()
+    chunk.choices = [Mock(delta=Mock(content=content))] if content is not None else []
+    chunk.usage = usage
+    return chunk
+
+
+def _openai_provider():
+    provider = OpenAIProvider("test-key", {})
+    usage = Mock(prompt_tokens=1000, completion_tokens=200, total_tokens=1200)
+    details = Mock(spec=["cached_tokens"])
+    details.cached_tokens = 800
+    usage.prompt_tokens_details = details
+    stream = _async_iter([
+        _openai_chunk("<html>"),
+        _openai_chunk("</html>"),
+        _openai_chunk(usage=usage),
+    ])
+    provider._async_client = MagicMock()
+    provider._async_client.chat.completions.create = AsyncMock(return_value=stream)
+    return provider
+
+
+def _handler(provider):
+    router = Mock()
+    router._select_provider.return_value = provider
+    ai = Mock()
+    ai.model_registry.resolve.return_value = ("gpt-4.1", "openai")
+    ai._build_request.side_effect = lambda **kwargs: {
+        "message": kwargs["message"], "model": kwargs["model"], "provider": kwargs["provider"],
+    }
+    return StreamingHandler(router, ai), ai
+
+
+class TestProviderStreamUsage:
+    """Test usage reported at the end of provider streams"""
+
+    def test_openai_requests_and_records_usage(self):
+        provider = _openai_provider()
+        request_data = {"message": "학습지", "model": "gpt-4.1"}
+
+        chunks = _collect(provider.stream_chat(request_data))
+
+        assert chunks == ["<html>", "</html>"]
+        params = provider._async_client.chat.completions.create.call_args.kwargs
+        assert params["stream_options"] == {"include_usage": True}
+        assert request_data["stream_usage"].prompt_tokens == 1000
+        assert request_data["stream_usage"].cached_tokens == 800
+
+    def test_anthropic_final_message_usage(self):
+        provider = AnthropicProvider("test-key", {})
+        final = Mock()
+        final.usage = Mock(input_tokens=100, output_tokens=50,
+                           cache_read_input_tokens=9000, cache_creation_input_tokens=0)
+        stream = MagicMock()
+        stream.text_stream = _async_iter(["<html>", "</html>"])
+        stream.get_final_message = AsyncMock(return_value=final)
+        provider._async_client = MagicMock()
+        provider._async_client.messages.stream.return_value.__aenter__.return_value = stream
+        request_data = {"message": "학습지", "model": "claude-sonnet-4"}
+
+        chunks = _collect(provider.stream_chat(request_data))
+
+        assert chunks == ["<html>", "</html>"]
+        assert request_data["stream_usage"].prompt_tokens == 9100
+        assert request_data["stream_usage"].cached_tokens == 9000
+
+
+class TestStreamingHandlerUsage:
+    """Test budget gate and usage tracking around streams"""
+
+    def test_stream_records_cost(self):
+        handler, ai = _handler(_openai_provider())
+        completed = []
+
+        _collect(handler.stream_with_callbacks("학습지", on_complete=completed.append, model="gpt-4.1"))
+
+        ai._check_budget.assert_called_once()
+        ai._update_usage.assert_called_once()
+        response = completed[0]
+        assert response.text == "<html></html>"
+        assert response.usage.total_tokens == 1200
+        assert response.cost > 0
+        assert response.cost < OpenAIProvider("k", {})._calculate_cost(
+            "gpt-4.1", Usage(prompt_tokens=1000, completion_tokens=200)
+        )
+
+    def test_budget_exceeded_before_request(self):
+        provider = _openai_provider()
+        handler, ai = _handler(provider)
+        ai._check_budget.side_effect = BudgetExceededError("over", current_cost=2.0, budget_limit=1.0)
+
+        with pytest.raises(BudgetExceededError):
+            _collect(handler.stream_with_callbacks("학습지", model="gpt-4.1"))
+
+        provider._async_client.chat.completions.create.assert_not_called()
+        ai._update_usage.assert_not_called()
+
+    def test_request_prepared_off_the_event_loop(self):
+        handler, ai = _handler(_openai_provider())
+        build_request = ai._build_request.side_effect
+        threads = []
+
+        def record_thread(**kwargs):
+            threads.append(threading.get_ident())
+            return build_request(**kwargs)
+
+        ai._build_request.side_effect = record_thread
+
+        async def run():
+            loop_thread = threading.get_ident()
+            chunks = [chunk async for chunk in handler.stream_with_callbacks("학습지", model="gpt-4.1")]
+            return loop_thread, chunks
+
+        loop_thread, chunks = asyncio.run(run())
+
+        assert chunks == ["<html>", "</html>"]
+        assert threads and threads[0] != loop_thread
+
+    def test_error_stream_not_recorded(self):
+        provider = Mock()
+        provider.stream_chat = lambda request_data: _async_iter(["partial", "Error: boom"])
+        handler, ai = _handler(provider)
+        request_data = {"message": "m", "model": "gpt-4.1"}
+
+        assert _collect(handler.stream(request_data)) == ["partial", "Error: boom"]
+        assert "stream_response" not in request_data
+        ai._update_usage.assert_not_called()
@@ -5,57 +5,27 @@ AI 기반 HTML 교재 생성기 - Flask 웹 애플리케이션
 Render 배포용 웹 서비스
 """
 
-import copy
+import asyncio
+import dataclasses
 import os
 import sys
 import json
 import uuid
 import logging
 import tempfile
+import threading
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
 import hashlib
 import mimetypes
-import shutil
 
-from flask import Flask, request, jsonify, send_file, send_from_directory, abort
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory, stream_with_context, abort
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 
-# PDF 변환 라이브러리 임포트
-# 우선순위: Chrome (Selenium) > weasyprint > pdfkit
-PDF_BACKEND = None
-PDF_BACKENDS_AVAILABLE = []
-
-# Chrome (Selenium) 체크
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    PDF_BACKENDS_AVAILABLE.append('chrome')
-except ImportError:
-    pass
-
-# WeasyPrint 체크
-try:
-    from weasyprint import HTML as WeasyHTML
-    PDF_BACKEND = 'weasyprint'
-    PDF_BACKENDS_AVAILABLE.append('weasyprint')
-except ImportError:
-    pass
-
-# pdfkit 체크
-try:
-    import pdfkit
-    if not PDF_BACKEND:
-        PDF_BACKEND = 'pdfkit'
-    PDF_BACKENDS_AVAILABLE.append('pdfkit')
-except ImportError:
-    pass
-
 # AI API 모듈 가져오기
 ai_module_paths = [
     Path(__file__).parent / "ai_api_module_v3",
@@ -87,7 +57,7 @@ except ImportError as e:
 src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 try:
-    from basic_html_designer import HTMLDesigner
+    from basic_html_designer import HTMLDesigner, GenerationOptions, get_prompt_file_cache_stats
     print("✅ HTMLDesigner 클래스 로드 성공")
 except ImportError as e:
     print(f"❌ HTMLDesigner 클래스를 찾을 수 없습니다: {e}")
@@ -101,11 +71,52 @@ except ImportError as e:
         sys.exit(1)
     else:
         # AI가 있으면 일단 계속 진행
-        HTMLDesigner = None
+        HTMLDesigner = GenerationOptions = None
+        get_prompt_file_cache_stats = dict
         print("⚠️ HTMLDesigner 없이 AI API만으로 실행합니다.")
 
+# PDF 변환 백엔드 (렌더링 서비스 워커와 공유)
+# 우선순위: Chrome (CDP 직접 연결) > Chrome (Selenium) > weasyprint > pdfkit
+from pdf_backends import (
+    PDF_BACKEND, PDF_BACKENDS_AVAILABLE, CHROME_PRINT_OPTIONS, PDFKIT_OPTIONS, WKHTMLTOPDF_PATH,
+    render_with_backends,
+)
+from chrome_pool import get_chrome_pool_stats
+from page_readiness import get_readiness_stats
+from cdp_renderer import get_cdp_stats
+# 오프라인 폰트 번들 (fonts.googleapis.com 대신 로컬 WOFF2 사용)
+from font_bundle import get_font_bundle
+from font_subset import get_font_subset_stats
+# 최종 HTML 기준 내용 주소 PDF 캐시 (프롬프트가 달라도 같은 HTML이면 재사용)
+from render_cache import get_render_cache, get_render_cache_stats
+# 별도 프로세스 풀에서 렌더링 (Flask는 작업만 넣고 결과를 읽음)
+from render_service import (
+    RENDER_JOB_TIMEOUT, RenderQueueFull, RenderServiceUnavailable, get_render_client, get_render_service_stats,
+)
+# 단계별 렌더링 데드라인 + 고아 브라우저 정리
+from render_watchdog import get_watchdog_stats, start_reaper
+# WeasyPrint 프로세스 풀 (Chrome이 없을 때의 폴백 렌더링)
+from weasy_pool import get_weasy_pool_stats
+# 변환 결과(PDF) 영구 저장소
+from artifact_store import get_artifact_store, get_artifact_store_stats
+# 백그라운드 정리 스레드
+from janitor import get_janitor_stats, start_janitor
+# 첨부 파일 Markdown 전처리 (공유 MarkItDown)
+from file_preprocessor import get_preprocessor_stats
+# 첨부 파일 변환 결과 캐시 (파일 SHA-256 + 변환기 버전)
+from conversion_cache import get_conversion_cache_stats
+# 긴 첨부 자료에서 요청과 관련된 구간 발췌 (BM25)
+from chunk_ranker import get_chunk_ranker_stats, select_relevant
+# 비동기 변환 작업 (/api/jobs)
+from convert_jobs import JobQueueFull, ProgressCallback, PreviewCallback, get_job_manager, get_job_stats
+# 업로드 파일을 요청 단위 디렉토리로 스트리밍 저장
+from upload_stream import (
+    StreamingUploadRequest, UploadTooLarge, get_upload_stats, release_uploads,
+)
+
 # Flask 앱 초기화
 app = Flask(__name__)
+app.request_class = StreamingUploadRequest
 app.config['MAX_CONTENT_LENGTH'] = 20 * 1024 * 1024  # 20MB 제한
 app.url_map.strict_slashes = False  # /api/convert 와 /api/convert/ 모두 허용
 
@@ -130,6 +141,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # PDF 백엔드 로깅
+if 'cdp' in PDF_BACKENDS_AVAILABLE:
+    logger.info("✅ Chrome (CDP 직접 연결) 사용 가능 (최우선, chromedriver 없이 스트리밍 PDF 저장)")
 if 'chrome' in PDF_BACKENDS_AVAILABLE:
     logger.info("✅ Chrome (Selenium) 사용 가능 (최우선, 가장 정확한 PDF 변환)")
 if PDF_BACKEND == 'weasyprint':
@@ -145,13 +158,64 @@ else:
 # 전역 변수
 TEMP_DIR = Path(tempfile.gettempdir()) / "html_designer"
 TEMP_DIR.mkdir(exist_ok=True)
+StreamingUploadRequest.upload_base_dir = TEMP_DIR
+
+
+def start_background_services() -> None:
+    """
+    서버 프로세스의 백그라운드 스레드 시작 (여러 번 호출해도 한 번만 시작)
+
+    - 고아 브라우저 정리(reaper)
+    - 만료 PDF, 남은 임시 파일/브라우저 프로필 정리(janitor)
+
+    모듈 import 시점에 시작하면 spawn으로 뜨는 변환/WeasyPrint 프로세스가 `python app.py`의
+    __main__(app.py)을 다시 import할 때마다 reaper/janitor가 하나씩 더 생기므로,
+    아래 __main__ 블록과 gunicorn post_worker_init 훅(gunicorn_config.py)에서만 호출합니다.
+    """
+    start_reaper()
+    start_janitor(TEMP_DIR)
+
 
 # 프런트엔드 정적 파일 디렉토리 (존재 시 사용)
 FRONT_DIR = (Path(__file__).parent.parent / "frontend").resolve()
 
-# PDF 파일 저장 및 캐시
-PDF_CACHE = {}  # {hash: {"path": str, "created": datetime}}
-PDF_CACHE_DURATION = timedelta(hours=24)
+# PDF 결과는 artifact_store(디스크 + SQLite 인덱스)에 보관되어 재시작 후에도 링크가 유지됨
+
+# PDF 전송: 버전(?v=PDF 내용 해시)이 붙은 URL은 내용이 바뀌지 않으므로 장기 캐시
+PDF_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+PDF_DELIVERY_STATS = {'full': 0, 'partial': 0, 'not_modified': 0, 'bytes_sent': 0}
+_pdf_delivery_lock = threading.Lock()   # gthread 요청 스레드가 동시에 갱신
+
+# 한글 폰트 강제 적용 스타일 (PDF 변환 시 깨짐 방지)
+KOREAN_FONT_FAMILY_STYLE = '''
+    <style>
+        body, html, * {
+            font-family: 'Noto Sans KR', 'Inter', -apple-system, BlinkMacSystemFont, system-ui, sans-serif !important;
+        }
+    </style>
+'''
+
+# HTML 생성 실패 시 순서대로 시도할 모델 (None: config.json 기본 모델)
+GENERATION_FALLBACK_MODELS = (None, 'fast', 'smart')
+
+# /api/convert가 작업 완료를 기다리는 최대 시간: HTML 생성 + PDF 렌더링
+# (넘기면 504와 작업 ID를 돌려주고 클라이언트는 /api/jobs/<id>로 이어서 조회)
+GENERATION_TIMEOUT = float(os.getenv('HTML_GENERATION_TIMEOUT', '150'))
+CONVERT_WAIT_TIMEOUT = GENERATION_TIMEOUT + RENDER_JOB_TIMEOUT
+
+# 작업 실행 시 스트리밍 생성으로 HTML 조각을 html 이벤트로 전달 (실시간 미리보기)
+HTML_STREAM_PREVIEW = os.getenv('HTML_STREAM_PREVIEW', 'true').lower() in ('1', 'true', 'yes')
+
+# 프롬프트에 넣는 첨부 자료 글자 예산 (파일당 / 전체)
+ATTACHMENT_FILE_CHARS = 4000
+ATTACHMENT_TOTAL_CHARS = 15000
+# 예산을 넘는 첨부 자료는 사용자 요청과 관련 높은 구간을 골라 담음 (BM25, false면 앞부분만)
+ATTACHMENT_RANKING = os.getenv('ATTACHMENT_RANKING', 'true').lower() in ('1', 'true', 'yes')
+# 첨부 파일을 읽는 최대 글자 수: 구간 선택 시 골라낼 범위(ATTACHMENT_SCAN_CHARS),
+# 아니면 파일당 예산보다 조금 더(앞뒤 공백 제거, 생략 표시 판단용)
+ATTACHMENT_READ_CHARS = (
+    int(os.getenv('ATTACHMENT_SCAN_CHARS', '60000')) if ATTACHMENT_RANKING else ATTACHMENT_FILE_CHARS + 1024
+)
 
 # 허용되는 파일 형식
 ALLOWED_EXTENSIONS = {
@@ -165,23 +229,6 @@ def is_allowed_file(filename):
     """허용된 파일 형식인지 확인"""
     return Path(filename).suffix.lower() in ALLOWED_EXTENSIONS
 
-def cleanup_temp_files():
-    """임시 파일 정리"""
-    try:
-        current_time = datetime.now()
-        for file_hash, info in list(PDF_CACHE.items()):
-            if current_time - info["created"] > PDF_CACHE_DURATION:
-                try:
-                    pdf_path = info.get("path")
-                    if pdf_path and os.path.exists(pdf_path):
-                        os.unlink(pdf_path)
-                except Exception as cleanup_err:
-                    logger.warning(f"PDF 캐시 파일 삭제 실패({file_hash}): {cleanup_err}")
-                finally:
-                    PDF_CACHE.pop(file_hash, None)
-    except Exception as e:
-        logger.warning(f"임시 파일 정리 실패: {e}")
-
 def generate_content_hash(prompt: str, files_content: List[object]) -> str:
     """프롬프트와 파일 내용으로 해시 생성"""
     hasher = hashlib.md5()
@@ -195,6 +242,10 @@ def generate_content_hash(prompt: str, files_content: List[object]) -> str:
             hasher.update(str(content).encode('utf-8', errors='ignore'))
     return hasher.hexdigest()
 
+def pdf_file_url(content_hash: str, artifact: dict) -> str:
+    """PDF 다운로드 URL (내용 해시 버전을 붙여 브라우저가 영구 캐시할 수 있게 함)"""
+    return f'/api/file/{content_hash}.pdf?v={artifact["sha256"][:16]}'
+
 class WebHTMLDesigner:
     """웹용 HTML 디자이너 래퍼 클래스"""
     
@@ -204,19 +255,10 @@ class WebHTMLDesigner:
         self.designer = HTMLDesigner(str(config_path))
         
         # wkhtmltopdf 경로 설정
-        self.wkhtmltopdf_path = os.getenv('WKHTMLTOPDF_PATH', 'wkhtmltopdf')
+        self.wkhtmltopdf_path = WKHTMLTOPDF_PATH
         
         # PDF 설정
-        self.pdf_options = {
-            'page-size': 'A4',
-            'margin-top': '0mm',
-            'margin-right': '0mm',
-            'margin-bottom': '0mm',
-            'margin-left': '0mm',
-            'encoding': "UTF-8",
-            'no-outline': None,
-            'enable-local-file-access': None
-        }
+        self.pdf_options = PDFKIT_OPTIONS
     
     def _ensure_korean_fonts(self, html_content: str) -> str:
         """
@@ -231,21 +273,21 @@ class WebHTMLDesigner:
         )
         
         injections = []
-
-        if not has_korean_font:
+        font_bundle = get_font_bundle()
+        bundled_defaults = None
+
+        if not has_korean_font and font_bundle.available:
+            logger.info("⚠️ HTML에 한글 폰트가 없어서 로컬 번들 폰트를 추가합니다")
+            bundled_defaults = {'Noto Sans KR': [300, 400, 500, 700], 'Inter': [400, 500, 600, 700]}
+            injections.append(KOREAN_FONT_FAMILY_STYLE)
+        elif not has_korean_font:
             logger.info("⚠️ HTML에 한글 폰트가 없어서 추가합니다")
             font_link = '''
     <!-- 한글 폰트 (PDF 변환 시 깨짐 방지) -->
     <link rel="preconnect" href="https://fonts.googleapis.com">
     <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=Noto+Sans+KR:wght@300;400;500;700&family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
-    <style>
-        body, html, * {
-            font-family: 'Noto Sans KR', 'Inter', -apple-system, BlinkMacSystemFont, system-ui, sans-serif !important;
-        }
-    </style>
-'''
-            injections.append(font_link)
+    <link href="https://fonts.googleapis.com/css2?family=Noto+Sans+KR:wght@300;400;500;700&family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">'''
+            injections.append(font_link + KOREAN_FONT_FAMILY_STYLE)
         else:
             logger.info("✅ HTML에 한글 폰트가 이미 포함되어 있습니다")
 
@@ -294,7 +336,7 @@ class WebHTMLDesigner:
             injections.append(layout_guard)
 
         if not injections:
-            return html_content
+            return font_bundle.localize(html_content, bundled_defaults)
 
         injection_block = ''.join(injections)
 
@@ -310,7 +352,8 @@ class WebHTMLDesigner:
                 html_body = f'<body>{html_content}</body>'
             html_content = f'<!DOCTYPE html><html lang="ko"><head>{injection_block}</head>{html_body}</html>'
 
-        return html_content
+        # 모델이 출력한 Google Fonts 링크를 로컬 번들로 치환 (네트워크 왕복 제거)
+        return font_bundle.localize(html_content, bundled_defaults)
 
     def _fallback_text_extraction(self, saved_files: List[Path]) -> List[Tuple[str, str]]:
         """markitdown이 없을 때 텍스트 기반 파일만 추출"""
@@ -321,32 +364,28 @@ class WebHTMLDesigner:
                 if file_path.suffix.lower() not in text_extensions:
                     continue
                 with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read().strip()
+                    content = f.read(ATTACHMENT_READ_CHARS).strip()
                 if content:
                     processed.append((file_path.name, content))
             except Exception as err:
                 logger.debug(f"텍스트 추출 실패({file_path.name}): {err}")
         return processed
 
-    def _preprocess_uploaded_files(self, saved_files: List[Path]) -> List[Tuple[str, str]]:
-        """업로드된 파일을 Markdown으로 변환하여 텍스트 컨텍스트 확보"""
+    def _preprocess_uploaded_files(self, saved_files: List[Path],
+                                   hashes: Optional[Dict[Path, str]] = None) -> List[Tuple[str, str]]:
+        """업로드된 파일을 Markdown으로 변환하여 텍스트 컨텍스트 확보 (hashes: 업로드 중 계산한 SHA-256)"""
         if not saved_files:
             return []
 
         try:
-            from file_preprocessor import FilePreprocessor, MarkItDownUnavailableError
+            from file_preprocessor import MarkItDownUnavailableError, get_file_preprocessor
         except ImportError as exc:
             logger.warning(f"파일 전처리 모듈을 불러오지 못했습니다: {exc}")
             return self._fallback_text_extraction(saved_files)
 
-        output_dir = TEMP_DIR / f"preprocessed_{uuid.uuid4().hex}"
-        processed: List[Tuple[str, str]] = []
-
+        # 프로세스 공유 전처리기 (MarkItDown 한 번만 생성, 결과는 디스크를 거치지 않고 메모리로)
         try:
-            preprocessor = FilePreprocessor(
-                input_dir=str(saved_files[0].parent),
-                output_dir=str(output_dir)
-            )
+            preprocessor = get_file_preprocessor()
         except MarkItDownUnavailableError as exc:
             logger.warning(f"markitdown이 없어 첨부 파일 전처리를 건너뜁니다: {exc}")
             return self._fallback_text_extraction(saved_files)
@@ -354,23 +393,18 @@ class WebHTMLDesigner:
             logger.warning(f"파일 전처리기 초기화 실패: {exc}")
             return self._fallback_text_extraction(saved_files)
 
-        try:
-            for file_path in saved_files:
-                try:
-                    result = preprocessor.convert_file_to_markdown(file_path)
-                    if not result or not result.get('success'):
-                        continue
-                    output_file = result.get('output_file')
-                    if not output_file or not os.path.exists(output_file):
-                        continue
-                    with open(output_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read().strip()
-                    if content:
-                        processed.append((file_path.name, content))
-                except Exception as err:
-                    logger.warning(f"파일 전처리 실패({file_path.name}): {err}")
-        finally:
-            shutil.rmtree(output_dir, ignore_errors=True)
+        # 첨부 파일들을 변환 프로세스 풀에서 동시에 변환 (끝난 순서로 받고 프롬프트에는 업로드 순서로)
+        # PDF/텍스트는 프롬프트에 들어갈 만큼만 읽고 멈춤
+        converted: Dict[Path, str] = {}
+        for file_path, content, err in preprocessor.convert_files(
+                saved_files, hashes=hashes, max_chars=ATTACHMENT_READ_CHARS):
+            if err is not None:
+                logger.warning(f"파일 전처리 실패({file_path.name}): {err}")
+            elif content and content.strip():
+                converted[file_path] = content.strip()
+        processed: List[Tuple[str, str]] = [
+            (file_path.name, converted[file_path]) for file_path in saved_files if file_path in converted
+        ]
 
         if not processed:
             return self._fallback_text_extraction(saved_files)
@@ -384,17 +418,25 @@ class WebHTMLDesigner:
             return effective_prompt or "첨부된 자료를 바탕으로 A4 규격의 전문적인 유인물을 만들어주세요."
 
         sections = []
-        total_budget = 15000
+        total_budget = ATTACHMENT_TOTAL_CHARS
         used_budget = 0
 
         for filename, content in attachments:
             cleaned = (content or '').strip()
             if not cleaned or used_budget >= total_budget:
                 continue
-            allowance = min(4000, total_budget - used_budget)
-            snippet = cleaned[:allowance].rstrip()
-            if len(cleaned) > allowance:
-                snippet += "\n...(이하 생략)..."
+            allowance = min(ATTACHMENT_FILE_CHARS, total_budget - used_budget)
+            excerpt = None
+            excerpt_note = "\n...(요청과 관련된 부분만 발췌)..."
+            if len(cleaned) > allowance and ATTACHMENT_RANKING and effective_prompt:
+                # 앞부분 대신 요청과 관련 높은 구간을 문서 순서로 발췌 (끝 표시 길이는 예산에서 미리 뺌)
+                excerpt = select_relevant(cleaned, effective_prompt, allowance - len(excerpt_note))
+            if excerpt is not None:
+                snippet = excerpt + excerpt_note
+            else:
+                snippet = cleaned[:allowance].rstrip()
+                if len(cleaned) > allowance:
+                    snippet += "\n...(이하 생략)..."
             used_budget += len(snippet)
             sections.append(f"[첨부: {filename}]\n{snippet}")
 
@@ -431,102 +473,163 @@ class WebHTMLDesigner:
                 ', '.join(sorted(set(warnings)))
             )
     
-    def generate_html_from_files(self, prompt: str, uploaded_files: list) -> Dict[str, Any]:
-        """파일들로부터 HTML 생성"""
-        try:
-            # 임시 input 디렉토리 생성
-            temp_input_dir = TEMP_DIR / f"input_{uuid.uuid4().hex}"
-            temp_input_dir.mkdir(exist_ok=True)
-            
-            # 업로드된 파일들을 임시 디렉토리에 저장
-            saved_files = []
-            for file_data in uploaded_files:
-                filename = secure_filename(file_data['filename'])
-                file_path = temp_input_dir / filename
-                
-                with open(file_path, 'wb') as f:
-                    f.write(file_data['content'])
-                
-                saved_files.append(file_path)
-                logger.info(f"임시 파일 저장: {file_path}")
-            
-            # 첨부 파일 전처리
-            preprocessed_texts = self._preprocess_uploaded_files(saved_files)
-            effective_prompt = self._compose_prompt_with_attachments(prompt, preprocessed_texts)
-
-            # config 파일 임시 수정 (input_directory 경로 변경)
-            original_config = copy.deepcopy(self.designer.config)
-            self.designer.config.setdefault('file_processing', {})
-            self.designer.config['file_processing']['input_directory'] = str(temp_input_dir)
-
-            # 프롬프트 임시 변경
-            self.designer.config.setdefault('prompts', {})
-            self.designer.config['prompts']['user_prompt'] = effective_prompt
-            self.designer.config.setdefault('ai_settings', {})
-            
-            # HTML 생성 (Google 실패 시 모델 자동 폴백)
+    def _prepare_attachments(self, prompt: str, uploaded_files: list,
+                             progress: ProgressCallback) -> Tuple[GenerationOptions, List[Tuple[str, str]]]:
+        """첨부 파일 전처리 → 요청 단위 생성 옵션 (공유 designer.config는 건드리지 않음)"""
+        # 업로드 단계에서 요청 단위 디렉토리(input_*)에 스트리밍 저장된 파일 사용
+        saved_files = [Path(file_data['path']) for file_data in uploaded_files]
+        hashes = {
+            Path(file_data['path']): file_data['sha256'] for file_data in uploaded_files if file_data.get('sha256')
+        }
+
+        # 첨부 파일 전처리 (같은 내용의 파일은 변환 캐시에서 바로)
+        progress('preprocess', '첨부 파일을 분석하고 있습니다')
+        preprocessed_texts = self._preprocess_uploaded_files(saved_files, hashes)
+        effective_prompt = self._compose_prompt_with_attachments(prompt, preprocessed_texts)
+        options = GenerationOptions(user_request=effective_prompt, input_files=tuple(saved_files))
+        return options, preprocessed_texts
+
+    def _generate_once(self, options: GenerationOptions, preview: Optional[PreviewCallback]):
+        """미리보기 콜백이 있으면 스트리밍 생성, 없으면 전체 응답 대기"""
+        if preview and HTML_STREAM_PREVIEW:
+            return self.designer.stream_html(options=options, on_html=preview)
+        return self.designer.generate_html(options=options)
+
+    async def _agenerate_once(self, options: GenerationOptions, preview: Optional[PreviewCallback]):
+        if preview and HTML_STREAM_PREVIEW:
+            return await self.designer.astream_html(options=options, on_html=preview)
+        return await self.designer.agenerate_html(options=options)
+
+    def _generate_with_fallback(self, options: GenerationOptions, preview: Optional[PreviewCallback] = None):
+        """HTML 생성 (Google 실패 시 빠른 모델 → 스마트 모델 순으로 폴백)"""
+        for attempt, model in enumerate(GENERATION_FALLBACK_MODELS):
             try:
-                html_content, metadata = self.designer.generate_html()
+                if attempt and preview:
+                    preview('', reset=True)
+                return self._generate_once(dataclasses.replace(options, model=model or options.model), preview)
             except Exception as gen_err:
-                logger.warning(f"1차 생성 실패, 모델 폴백 시도: {gen_err}")
-                # 우선 빠른 모델로 폴백
-                self.designer.config['ai_settings']['model'] = 'fast'
-                try:
-                    html_content, metadata = self.designer.generate_html()
-                except Exception as gen_err2:
-                    logger.warning(f"2차 생성 실패, 스마트 모델 폴백 시도: {gen_err2}")
-                    self.designer.config['ai_settings']['model'] = 'smart'
-                    html_content, metadata = self.designer.generate_html()
-            
-            # config 복원
-            self.designer.config = original_config
-            
-            # 임시 파일 정리
-            for file_path in saved_files:
-                try:
-                    os.unlink(file_path)
-                except:
-                    pass
-            shutil.rmtree(temp_input_dir, ignore_errors=True)
-
-            metadata = metadata or {}
-            if not isinstance(metadata, dict):
-                metadata = {'raw_metadata': metadata}
-
-            attachment_summary = [
-                {
-                    'filename': name,
-                    'characters': len(text)
-                }
-                for name, text in preprocessed_texts
-            ]
-
-            metadata['preprocessed_files'] = attachment_summary
-            metadata['effective_prompt'] = effective_prompt
+                if attempt + 1 == len(GENERATION_FALLBACK_MODELS):
+                    raise
+                logger.warning(f"{attempt + 1}차 생성 실패, '{GENERATION_FALLBACK_MODELS[attempt + 1]}' 모델 폴백 시도: {gen_err}")
+
+    async def _agenerate_with_fallback(self, options: GenerationOptions, preview: Optional[PreviewCallback] = None):
+        """_generate_with_fallback의 비동기 버전"""
+        for attempt, model in enumerate(GENERATION_FALLBACK_MODELS):
+            try:
+                if attempt and preview:
+                    preview('', reset=True)
+                return await self._agenerate_once(dataclasses.replace(options, model=model or options.model), preview)
+            except Exception as gen_err:
+                if attempt + 1 == len(GENERATION_FALLBACK_MODELS):
+                    raise
+                logger.warning(f"{attempt + 1}차 생성 실패, '{GENERATION_FALLBACK_MODELS[attempt + 1]}' 모델 폴백 시도: {gen_err}")
+
+    @staticmethod
+    def _files_result(html_content: str, metadata, preprocessed_texts: List[Tuple[str, str]],
+                      effective_prompt: str) -> Dict[str, Any]:
+        metadata = metadata or {}
+        if not isinstance(metadata, dict):
+            metadata = {'raw_metadata': metadata}
+
+        attachment_summary = [
+            {
+                'filename': name,
+                'characters': len(text)
+            }
+            for name, text in preprocessed_texts
+        ]
+
+        metadata['preprocessed_files'] = attachment_summary
+        metadata['effective_prompt'] = effective_prompt
 
+        return {
+            'success': True,
+            'html': html_content,
+            'metadata': metadata,
+            'preprocessed_files': attachment_summary,
+            'effective_prompt': effective_prompt
+        }
+
+    def generate_html_from_files(self, prompt: str, uploaded_files: list,
+                                 progress: Optional[ProgressCallback] = None,
+                                 preview: Optional[PreviewCallback] = None) -> Dict[str, Any]:
+        """파일들로부터 HTML 생성 (progress: 단계 진행 콜백, preview: HTML 조각 콜백, /api/jobs 이벤트용)"""
+        progress = progress or (lambda stage, message: None)
+        try:
+            options, preprocessed_texts = self._prepare_attachments(prompt, uploaded_files, progress)
+            progress('generate', 'AI가 HTML을 생성하고 있습니다')
+            html_content, metadata = self._generate_with_fallback(options, preview)
+            return self._files_result(html_content, metadata, preprocessed_texts, options.user_request)
+        except Exception as e:
+            logger.error(f"HTML 생성 실패: {e}")
             return {
-                'success': True,
-                'html': html_content,
-                'metadata': metadata,
-                'preprocessed_files': attachment_summary,
-                'effective_prompt': effective_prompt
+                'success': False,
+                'error': str(e)
             }
-            
+
+    async def agenerate_html_from_files(self, prompt: str, uploaded_files: list,
+                                        progress: Optional[ProgressCallback] = None,
+                                        preview: Optional[PreviewCallback] = None) -> Dict[str, Any]:
+        """generate_html_from_files의 비동기 버전 (전처리는 스레드, AI 호출은 이벤트 루프에서 대기)"""
+        progress = progress or (lambda stage, message: None)
+        try:
+            options, preprocessed_texts = await asyncio.to_thread(
+                self._prepare_attachments, prompt, uploaded_files, progress)
+            progress('generate', 'AI가 HTML을 생성하고 있습니다')
+            html_content, metadata = await self._agenerate_with_fallback(options, preview)
+            return self._files_result(html_content, metadata, preprocessed_texts, options.user_request)
         except Exception as e:
             logger.error(f"HTML 생성 실패: {e}")
             return {
                 'success': False,
                 'error': str(e)
             }
+
+    @staticmethod
+    def _prompt_only_options(prompt: str) -> GenerationOptions:
+        # 파일 없이 생성: 기존 config의 입력 디렉토리를 건드리지 않고 프롬프트만 사용
+        return GenerationOptions(
+            user_request=prompt or "첨부된 자료 없이도 A4 규격의 전문적인 유인물을 만들어주세요."
+        )
+
+    @staticmethod
+    def _prompt_only_result(html: str, meta, effective_prompt: str) -> Dict[str, Any]:
+        if not isinstance(meta, dict):
+            meta = {'raw_metadata': meta}
+        meta.setdefault('effective_prompt', effective_prompt)
+        return {
+            'success': True,
+            'html': html,
+            'metadata': meta,
+            'effective_prompt': effective_prompt
+        }
+
+    def generate_html_from_prompt(self, prompt: str,
+                                  progress: Optional[ProgressCallback] = None,
+                                  preview: Optional[PreviewCallback] = None) -> Dict[str, Any]:
+        """첨부 파일 없이 프롬프트만으로 HTML 생성"""
+        progress = progress or (lambda stage, message: None)
+        progress('generate', 'AI가 HTML을 생성하고 있습니다')
+        options = self._prompt_only_options(prompt)
+        html, meta = self._generate_once(options, preview)
+        return self._prompt_only_result(html, meta, options.user_request)
+
+    async def agenerate_html_from_prompt(self, prompt: str,
+                                         progress: Optional[ProgressCallback] = None,
+                                         preview: Optional[PreviewCallback] = None) -> Dict[str, Any]:
+        """generate_html_from_prompt의 비동기 버전"""
+        progress = progress or (lambda stage, message: None)
+        progress('generate', 'AI가 HTML을 생성하고 있습니다')
+        options = self._prompt_only_options(prompt)
+        html, meta = await self._agenerate_once(options, preview)
+        return self._prompt_only_result(html, meta, options.user_request)
     
     def html_to_pdf(self, html_content: str) -> Optional[str]:
         """
         HTML을 PDF로 변환
-        우선순위: Chrome (Selenium) > weasyprint > pdfkit
+        우선순위: Chrome (CDP) > Chrome (Selenium) > weasyprint > pdfkit
         Chrome을 사용하면 브라우저에서 보이는 그대로 정확하게 PDF 변환
         """
-        global PDF_BACKEND
-
         try:
             # PDF 파일 경로 생성
             pdf_filename = f"output_{uuid.uuid4().hex}.pdf"
@@ -539,152 +642,57 @@ class WebHTMLDesigner:
                 logger.warning("PDF 변환 라이브러리가 없어 HTML만 반환됩니다")
                 return None
 
-            # 1순위: Chrome (Selenium) 사용 - 가장 정확한 변환
-            try:
-                from selenium import webdriver
-                from selenium.webdriver.chrome.service import Service
-                from selenium.webdriver.chrome.options import Options
-                import base64
-
-                logger.info("🔄 Chrome 엔진으로 PDF 변환 시도...")
-
-                # 임시 HTML 파일 생성 (Chrome이 로드할 수 있도록)
-                temp_html_file = TEMP_DIR / f"temp_{uuid.uuid4().hex}.html"
-                with open(temp_html_file, 'w', encoding='utf-8') as f:
-                    f.write(prepared_html)
-                
-                # Chrome 옵션 설정
-                chrome_options = Options()
-                chrome_options.add_argument('--headless')  # 백그라운드 실행
-                chrome_options.add_argument('--disable-gpu')
-                chrome_options.add_argument('--no-sandbox')
-                chrome_options.add_argument('--disable-dev-shm-usage')
-                chrome_options.add_argument('--disable-software-rasterizer')
-                
-                # Render/클라우드 환경에서 Chromium 바이너리 경로 설정
-                chrome_binary = None
-                if os.path.exists('/usr/bin/chromium-browser'):
-                    chrome_binary = '/usr/bin/chromium-browser'
-                elif os.path.exists('/usr/bin/chromium'):
-                    chrome_binary = '/usr/bin/chromium'
-                elif os.path.exists('/usr/bin/google-chrome'):
-                    chrome_binary = '/usr/bin/google-chrome'
-                
-                if chrome_binary:
-                    chrome_options.binary_location = chrome_binary
-                    logger.info(f"Chrome 바이너리 경로 설정: {chrome_binary}")
-                
-                # Chrome 드라이버 실행
-                driver = webdriver.Chrome(options=chrome_options)
-                
-                try:
-                    # HTML 파일 열기 (절대 경로 사용)
-                    html_path = temp_html_file.resolve()
-                    driver.get(f"file:///{html_path}")
-                    
-                    # 페이지 로딩 대기 (이미지, 폰트 등)
-                    driver.implicitly_wait(3)
-                    
-                    # 웹폰트 로딩 완료 대기 (한글 깨짐 방지)
-                    import time
-                    time.sleep(2)  # 추가 2초 대기로 폰트 완전 로딩 보장
-                    
-                    # JavaScript로 폰트 로딩 확인
-                    try:
-                        driver.execute_script("""
-                            return document.fonts.ready;
-                        """)
-                        logger.info("✅ 웹폰트 로딩 완료")
-                    except:
-                        logger.warning("⚠️ 폰트 로딩 확인 실패 (계속 진행)")
-                        pass
-                    
-                    # Chrome의 인쇄 기능을 사용하여 PDF 생성
-                    # Chrome 브라우저 "여백: 기본" 설정과 동일
-                    print_options = {
-                        'landscape': False,
-                        'displayHeaderFooter': False,
-                        'printBackground': True,
-                        'preferCSSPageSize': True,
-                        'paperWidth': 8.27,
-                        'paperHeight': 11.69,
-                        'marginTop': 0,
-                        'marginBottom': 0,
-                        'marginLeft': 0,
-                        'marginRight': 0,
-                        'scale': 1.0
-                    }
-                    
-                    # Chrome DevTools Protocol을 사용하여 PDF 생성
-                    result = driver.execute_cdp_cmd('Page.printToPDF', print_options)
-                    
-                    # Base64로 인코딩된 PDF 데이터를 파일로 저장
-                    pdf_data = base64.b64decode(result['data'])
-                    with open(pdf_path, 'wb') as f:
-                        f.write(pdf_data)
-                    
-                    logger.info(f"✅ PDF 생성 완료 (Chrome): {pdf_path}")
-                    return str(pdf_path)
-                    
-                finally:
-                    driver.quit()
-                    # 임시 HTML 파일 삭제
-                    try:
-                        os.unlink(temp_html_file)
-                    except:
-                        pass
-                    
-            except ImportError:
-                logger.warning("⚠️ Selenium이 설치되지 않았습니다. 대체 방법으로 시도합니다.")
-            except Exception as chrome_err:
-                logger.warning(f"⚠️ Chrome 변환 실패: {chrome_err}. 대체 방법으로 시도합니다.")
-                import traceback
-                logger.debug(f"Chrome 오류 상세: {traceback.format_exc()}")
-            
-            # 2순위: WeasyPrint 사용
-            if PDF_BACKEND == 'weasyprint':
-                from weasyprint import HTML as WeasyHTML
-                WeasyHTML(string=prepared_html, base_url='.').write_pdf(str(pdf_path))
-                logger.info(f"✅ PDF 생성 완료 (WeasyPrint): {pdf_path}")
+            # 주입이 끝난 최종 HTML + 인쇄 옵션이 같으면 렌더링을 건너뜀
+            render_cache = get_render_cache(TEMP_DIR / "render_cache")
+            cache_key = render_cache.key_for(prepared_html, {
+                'chrome': CHROME_PRINT_OPTIONS,
+                'pdfkit': self.pdf_options,
+                'backends': PDF_BACKENDS_AVAILABLE,
+            })
+            if render_cache.fetch(cache_key, pdf_path):
+                logger.info(f"♻️ 렌더링 캐시 적중: {cache_key[:12]} → {pdf_path}")
                 return str(pdf_path)
 
-            # 3순위: pdfkit 사용
-            elif PDF_BACKEND == 'pdfkit':
-                import pdfkit
-                config = pdfkit.configuration(wkhtmltopdf=self.wkhtmltopdf_path)
-                pdfkit.from_string(
-                    prepared_html,
-                    str(pdf_path),
-                    options=self.pdf_options,
-                    configuration=config
-                )
-                logger.info(f"✅ PDF 생성 완료 (pdfkit): {pdf_path}")
-                return str(pdf_path)
-            else:
-                logger.warning("PDF 변환 라이브러리가 설치되지 않았습니다")
+            if not self._render_pdf(prepared_html, pdf_path):
                 return None
-            
+
+            render_cache.store(cache_key, pdf_path)
+            return str(pdf_path)
+
+        except RenderQueueFull:
+            raise
         except Exception as e:
             logger.error(f"❌ PDF 변환 실패: {e}")
             import traceback
             logger.error(f"상세 오류: {traceback.format_exc()}")
             return None
 
+    def _render_pdf(self, prepared_html: str, pdf_path: Path) -> bool:
+        """렌더링 서비스(별도 프로세스)에 맡기거나, 비활성화된 경우 현재 프로세스에서 렌더링"""
+        render_client = get_render_client()
+        if render_client.enabled:
+            try:
+                backend = render_client.render(prepared_html, pdf_path)
+                logger.info(f"✅ PDF 생성 완료 (렌더링 서비스, {backend}): {pdf_path}")
+                return True
+            except RenderServiceUnavailable as e:
+                logger.warning(f"⚠️ {e}. 현재 프로세스에서 직접 렌더링합니다.")
+        return render_with_backends(prepared_html, pdf_path) is not None
+
 # 전역 디자이너 인스턴스
 designer = None
 
+_designer_lock = threading.Lock()
+
 def get_designer():
-    """디자이너 인스턴스 가져오기 (lazy loading)"""
+    """디자이너 인스턴스 가져오기 (lazy loading, 작업 스레드 여러 개가 동시에 호출)"""
     global designer
     if designer is None:
-        designer = WebHTMLDesigner()
+        with _designer_lock:
+            if designer is None:
+                designer = WebHTMLDesigner()
     return designer
 
-@app.before_request
-def before_request():
-    """요청 전 처리"""
-    cleanup_temp_files()
-
 @app.route('/', methods=['GET', 'HEAD'])
 def root_index():
     """루트 경로: 프런트엔드 index.html 서빙 또는 상태 JSON"""
@@ -750,6 +758,33 @@ def health_check():
         'status': 'ready' if AI_AVAILABLE else 'limited'
     })
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """렌더링 파이프라인 지표"""
+    with _pdf_delivery_lock:
+        pdf_delivery = dict(PDF_DELIVERY_STATS)
+    return jsonify({
+        'timestamp': datetime.now().isoformat(),
+        'pdf_backends': PDF_BACKENDS_AVAILABLE,
+        'cdp': get_cdp_stats(),
+        'chrome_pool': get_chrome_pool_stats(),
+        'page_readiness': get_readiness_stats(),
+        'font_subsets': get_font_subset_stats(),
+        'render_cache': get_render_cache_stats(),
+        'render_service': get_render_service_stats(),
+        'watchdog': get_watchdog_stats(),
+        'weasy_pool': get_weasy_pool_stats(),
+        'pdf_delivery': pdf_delivery,
+        'artifact_store': get_artifact_store_stats(),
+        'janitor': get_janitor_stats(),
+        'uploads': get_upload_stats(),
+        'prompt_files': get_prompt_file_cache_stats(),
+        'preprocessor': get_preprocessor_stats(),
+        'conversion_cache': get_conversion_cache_stats(),
+        'attachment_ranking': get_chunk_ranker_stats(),
+        'convert_jobs': get_job_stats()
+    })
+
 # 정적 파일 서빙 (프런트 자산)
 @app.route('/<path:path>')
 def static_assets(path):
@@ -766,10 +801,241 @@ def static_assets(path):
         return send_from_directory(str(FRONT_DIR), 'index.html')
     abort(404)
 
+def _ai_unavailable_response():
+    logger.error("AI 모듈이 로드되지 않았습니다")
+    return jsonify({
+        'error': 'AI 서비스를 사용할 수 없습니다. 서버 관리자에게 문의하세요.',
+        'code': 'AI_UNAVAILABLE',
+        'detail': 'AI API 모듈이 로드되지 않았습니다. API 키를 확인하세요.'
+    }), 503
+
+def _read_convert_request():
+    """
+    변환 요청의 프롬프트와 첨부 파일 검증
+
+    Returns:
+        (prompt, uploaded_files, 오류 응답). 검증에 실패하면 오류 응답이 채워짐
+    """
+    # 파일 본문은 multipart 파싱 중에 요청 단위 디렉토리로 스트리밍 저장되고
+    # 파일별 SHA-256과 전체 크기 상한(20MB)도 그때 계산/검사됨
+    try:
+        files = request.files.getlist('files')
+    except UploadTooLarge as e:
+        return '', [], (jsonify({
+            'error': '전체 파일 크기가 20MB를 초과합니다.',
+            'code': 'FILES_TOO_LARGE',
+            'max_size': '20MB',
+            'current_size': f'{e.received / 1024 / 1024:.2f}MB 이상'
+        }), 400)
+
+    # 프롬프트 가져오기 (파일만으로도 허용)
+    prompt = request.form.get('prompt', '').strip()
+    logger.info(f"📎 요청에서 받은 파일 수: {len(files)}")
+
+    # 파일 검증 및 경로 목록 수집 (본문을 메모리에 올리지 않음)
+    session = request.upload_session
+    uploaded_files = []
+    total_size = 0
+
+    for file in files:
+        if file.filename == '' or session is None:
+            continue
+        logger.info(f"📄 파일 처리 중: {file.filename}")
+
+        if not is_allowed_file(file.filename):
+            return prompt, [], (jsonify({
+                'error': f'허용되지 않는 파일 형식입니다: {file.filename}',
+                'code': 'INVALID_FILE_TYPE'
+            }), 400)
+
+        file_data = session.describe(file.stream, file.filename)
+        total_size += file_data['size']
+        uploaded_files.append(file_data)
+        logger.info(f"✅ 파일 추가됨: {file.filename} ({file_data['size'] / 1024:.2f} KB)")
+
+    logger.info(f"📊 총 {len(uploaded_files)}개 파일 준비 완료 (총 {total_size / 1024 / 1024:.2f} MB)")
+
+    if not prompt and not uploaded_files:
+        return prompt, [], (jsonify({
+            'error': '프롬프트 또는 파일 중 하나는 반드시 제공해야 합니다.',
+            'code': 'MISSING_INPUT'
+        }), 400)
+
+    # 파일이 하나도 없어도 진행 (텍스트 프롬프트만으로 생성)
+    return prompt, uploaded_files, None
+
+@app.teardown_request
+def discard_unclaimed_uploads(exc):
+    """변환 작업에 넘기지 않은 업로드 디렉토리 삭제 (검증 실패, 진행 중 작업에 합류 등)"""
+    session = getattr(request, 'upload_session', None)
+    if session is not None:
+        session.discard()
+
+def _json_with_retry_after(payload: Dict[str, Any], status_code: int):
+    """run_conversion 결과를 응답으로 변환 (대기열 포화 시 Retry-After 포함)"""
+    response = jsonify(payload)
+    if payload.get('code') in ('RENDER_QUEUE_FULL', 'JOB_QUEUE_FULL'):
+        response.headers['Retry-After'] = '30'
+    return response, status_code
+
+def _conversion_key(prompt: str, uploaded_files: List[Dict[str, Any]]) -> str:
+    """PDF 캐시와 동시 요청 중복 제거에 같이 쓰는 키 (업로드 중 계산한 파일별 SHA-256 사용)"""
+    file_hash_inputs = [f['sha256'] for f in uploaded_files] if uploaded_files else []
+    return generate_content_hash(prompt, file_hash_inputs)
+
+def run_conversion(prompt: str, uploaded_files: List[Dict[str, Any]], content_hash: str,
+                   progress: Optional[ProgressCallback] = None,
+                   preview: Optional[PreviewCallback] = None) -> Tuple[Dict[str, Any], int]:
+    """
+    프롬프트/첨부 파일 → HTML 생성 → PDF 렌더링 (작업 관리자가 스레드에서 실행)
+
+    preview가 있으면(HTML_STREAM_PREVIEW) 스트리밍으로 생성하면서 HTML 조각을 넘깁니다.
+    끝나면 성공/실패와 관계없이 업로드 디렉토리를 삭제합니다.
+
+    Returns:
+        (응답 본문, HTTP 상태 코드)
+    """
+    progress = progress or (lambda stage, message: None)
+    try:
+        early = _cached_or_rejected(content_hash)
+        if early:
+            return early
+
+        # HTML 생성 (파일 유무에 따라 분기)
+        # 요청 단위 옵션으로 생성하므로 작업 관리자 스레드 수(CONVERT_JOB_WORKERS)만큼 동시에 실행됨
+        web_designer = get_designer()
+        if uploaded_files:
+            result = web_designer.generate_html_from_files(prompt, uploaded_files, progress=progress, preview=preview)
+        else:
+            result = web_designer.generate_html_from_prompt(prompt, progress=progress, preview=preview)
+        return _render_and_store(web_designer, result, content_hash, progress)
+    finally:
+        release_uploads(uploaded_files)
+
+async def run_conversion_async(prompt: str, uploaded_files: List[Dict[str, Any]], content_hash: str,
+                               progress: Optional[ProgressCallback] = None,
+                               preview: Optional[PreviewCallback] = None) -> Tuple[Dict[str, Any], int]:
+    """
+    run_conversion의 비동기 버전 (CONVERT_JOB_MODE=async, 작업 관리자의 이벤트 루프에서 실행)
+
+    AI 호출은 AI.async_chat으로 기다리고, 디스크/SQLite 접근과 PDF 렌더링(렌더링 서비스 또는
+    브라우저 풀 대기)은 asyncio.to_thread로 넘겨 루프를 막지 않습니다.
+    """
+    progress = progress or (lambda stage, message: None)
+    try:
+        early = await asyncio.to_thread(_cached_or_rejected, content_hash)
+        if early:
+            return early
+
+        web_designer = await asyncio.to_thread(get_designer)
+        if uploaded_files:
+            result = await web_designer.agenerate_html_from_files(prompt, uploaded_files, progress=progress,
+                                                                  preview=preview)
+        else:
+            result = await web_designer.agenerate_html_from_prompt(prompt, progress=progress, preview=preview)
+        return await asyncio.to_thread(_render_and_store, web_designer, result, content_hash, progress)
+    finally:
+        await asyncio.to_thread(release_uploads, uploaded_files)
+
+def _cached_or_rejected(content_hash: str) -> Optional[Tuple[Dict[str, Any], int]]:
+    """저장된 결과가 있으면 그 응답, 렌더링 대기열이 포화면 503 응답, 아니면 None"""
+    # 캐시 체크
+    artifact = get_artifact_store().get(content_hash)
+    if artifact:
+        logger.info(f"캐시된 결과 반환: {content_hash}")
+        return {
+            'success': True,
+            'pdf_url': pdf_file_url(content_hash, artifact),
+            'cached': True,
+            'effective_prompt': artifact.get('effective_prompt')
+        }, 200
+
+    # 렌더링 대기열이 가득 차 있으면 AI 호출 전에 거절 (백프레셔)
+    render_client = get_render_client()
+    if render_client.enabled and render_client.is_saturated():
+        logger.warning("⚠️ 렌더링 대기열이 가득 차 요청을 거절합니다")
+        return {
+            'error': '현재 PDF 변환 요청이 많습니다. 잠시 후 다시 시도해주세요.',
+            'code': 'RENDER_QUEUE_FULL'
+        }, 503
+    return None
+
+def _render_and_store(web_designer: 'WebHTMLDesigner', result: Dict[str, Any], content_hash: str,
+                      progress: ProgressCallback) -> Tuple[Dict[str, Any], int]:
+    """생성된 HTML을 PDF로 렌더링해 결과 저장소에 보관하고 응답 본문 구성"""
+    if not result['success']:
+        return {
+            'error': f'HTML 생성 실패: {result["error"]}',
+            'code': 'HTML_GENERATION_FAILED'
+        }, 500
+
+    # PDF 변환 (wkhtmltopdf가 있는 경우에만)
+    progress('render', 'PDF로 변환하고 있습니다')
+    pdf_path = None
+    try:
+        pdf_path = web_designer.html_to_pdf(result['html'])
+    except RenderQueueFull as e:
+        logger.warning(f"PDF 변환 보류 (HTML은 정상 생성됨): {e}")
+    except Exception as e:
+        logger.warning(f"PDF 변환 실패 (HTML은 정상 생성됨): {e}")
+
+    if not pdf_path:
+        # PDF 변환이 실패한 경우 HTML만 반환
+        return {
+            'success': True,
+            'html': result['html'],
+            'pdf_available': False,
+            'metadata': result['metadata'],
+            'message': 'HTML 생성 완료 (PDF 변환 불가능)',
+            'effective_prompt': result.get('effective_prompt')
+        }, 200
+
+    # 결과 저장소에 보관 (내용 주소 디렉토리로 옮긴 뒤 임시 PDF 삭제)
+    artifact = get_artifact_store().put(content_hash, Path(pdf_path), result.get('effective_prompt'))
+    try:
+        os.unlink(pdf_path)
+    except OSError:
+        pass
+
+    return {
+        'success': True,
+        'pdf_url': pdf_file_url(content_hash, artifact),
+        'html': result['html'],  # HTML도 함께 반환
+        'metadata': result['metadata'],
+        'cached': False,
+        'effective_prompt': result.get('effective_prompt')
+    }, 200
+
+def _submit_conversion(prompt: str, uploaded_files: List[Dict[str, Any]]):
+    """
+    변환 작업 등록 (같은 키의 작업이 진행 중이면 합류)
+
+    Returns:
+        (작업, 합류 여부). 대기열이 가득 차면 (None, False)
+    """
+    content_hash = _conversion_key(prompt, uploaded_files)
+    try:
+        manager = get_job_manager()
+        runner = run_conversion_async if manager.mode == 'async' else run_conversion
+        job, coalesced = manager.submit(runner, prompt, uploaded_files, content_hash, key=content_hash)
+    except JobQueueFull as e:
+        logger.warning(f"⚠️ {e}")
+        return None, False
+    if not coalesced and request.upload_session is not None:
+        # 업로드 디렉토리는 새 작업이 소유 (합류한 요청의 사본은 요청 종료 시 삭제)
+        request.upload_session.claim()
+    return job, coalesced
+
+def _job_queue_full_response():
+    return _json_with_retry_after({
+        'error': '현재 변환 요청이 많습니다. 잠시 후 다시 시도해주세요.',
+        'code': 'JOB_QUEUE_FULL'
+    }, 503)
+
 @app.route('/api/convert', methods=['POST', 'OPTIONS'])
 @limiter.limit("10 per minute")  # Rate limit 완화
 def convert_files():
-    """파일들을 HTML로 변환 후 PDF 생성"""
+    """파일들을 HTML로 변환 후 PDF 생성 (동기 호환 엔드포인트, 새 클라이언트는 /api/jobs 사용)"""
     try:
         if request.method == 'OPTIONS':
             # Preflight 응답
@@ -777,160 +1043,129 @@ def convert_files():
         
         # AI 모듈 사용 가능 여부 확인
         if not AI_AVAILABLE:
-            logger.error("AI 모듈이 로드되지 않았습니다")
+            return _ai_unavailable_response()
+
+        prompt, uploaded_files, error_response = _read_convert_request()
+        if error_response:
+            return error_response
+
+        # 작업 관리자를 거쳐 실행하므로 같은 내용의 요청이 진행 중이면 그 결과를 같이 받음
+        job, coalesced = _submit_conversion(prompt, uploaded_files)
+        if job is None:
+            return _job_queue_full_response()
+        job_id = job.id
+        job = get_job_manager().wait(job_id, timeout=CONVERT_WAIT_TIMEOUT)
+        if job is None:
+            return jsonify({'error': '작업을 찾을 수 없습니다.', 'code': 'JOB_NOT_FOUND', 'job_id': job_id}), 404
+        if not job.is_finished:
+            logger.warning(f"⏱️ /api/convert 대기 시간 초과 ({CONVERT_WAIT_TIMEOUT:.0f}초), 작업은 계속 진행: {job_id[:8]}")
             return jsonify({
-                'error': 'AI 서비스를 사용할 수 없습니다. 서버 관리자에게 문의하세요.',
-                'code': 'AI_UNAVAILABLE',
-                'detail': 'AI API 모듈이 로드되지 않았습니다. API 키를 확인하세요.'
-            }), 503
-        
-        # 프롬프트 가져오기 (파일만으로도 허용)
-        prompt = request.form.get('prompt', '').strip()
-        
-        # 파일들 가져오기 (선택사항)
-        files = request.files.getlist('files')
-        logger.info(f"📎 요청에서 받은 파일 수: {len(files)}")
-        
-        # 파일 검증 및 데이터 수집
-        uploaded_files = []
-        total_size = 0
+                'error': '변환이 오래 걸리고 있습니다. 작업 상태 주소로 결과를 확인해주세요.',
+                'code': 'CONVERSION_TIMEOUT',
+                'job_id': job_id,
+                'status': job.status,
+                'status_url': f'/api/jobs/{job_id}',
+                'events_url': f'/api/jobs/{job_id}/events'
+            }), 504
+        payload = dict(job.result or {})
+        if coalesced:
+            payload['coalesced'] = True
+        return _json_with_retry_after(payload, job.status_code or 500)
         
-        for file in files:
-            if file.filename == '':
-                continue
-            logger.info(f"📄 파일 처리 중: {file.filename}")
-                
-            if not is_allowed_file(file.filename):
-                return jsonify({
-                    'error': f'허용되지 않는 파일 형식입니다: {file.filename}',
-                    'code': 'INVALID_FILE_TYPE'
-                }), 400
-            
-            file_content = file.read()
-            file_size = len(file_content)
-            total_size += file_size
-            
-            if total_size > 20 * 1024 * 1024:  # 20MB
-                return jsonify({
-                    'error': '전체 파일 크기가 20MB를 초과합니다.',
-                    'code': 'FILES_TOO_LARGE',
-                    'max_size': '20MB',
-                    'current_size': f'{total_size / 1024 / 1024:.2f}MB'
-                }), 400
-            
-            uploaded_files.append({
-                'filename': file.filename,
-                'content': file_content,
-                'size': file_size
-            })
-            logger.info(f"✅ 파일 추가됨: {file.filename} ({file_size / 1024:.2f} KB)")
-        
-        logger.info(f"📊 총 {len(uploaded_files)}개 파일 준비 완료 (총 {total_size / 1024 / 1024:.2f} MB)")
+    except Exception as e:
+        logger.error(f"변환 처리 실패: {e}")
+        return jsonify({
+            'error': '변환 처리 중 오류가 발생했습니다.',
+            'code': 'CONVERSION_ERROR'
+        }), 500
 
-        if not prompt and not uploaded_files:
-            return jsonify({
-                'error': '프롬프트 또는 파일 중 하나는 반드시 제공해야 합니다.',
-                'code': 'MISSING_INPUT'
-            }), 400
+@app.route('/api/jobs', methods=['POST', 'OPTIONS'])
+@limiter.limit("10 per minute")
+def create_convert_job():
+    """변환 작업을 백그라운드에 등록하고 작업 ID를 즉시 반환 (202)"""
+    try:
+        if request.method == 'OPTIONS':
+            return ("", 204)
 
-        # 파일이 하나도 없어도 진행 (텍스트 프롬프트만으로 생성)
-        
-        # 캐시 체크
-        file_hash_inputs = [f['content'] for f in uploaded_files] if uploaded_files else []
-        content_hash = generate_content_hash(prompt, file_hash_inputs)
-
-        if content_hash in PDF_CACHE:
-            cache_info = PDF_CACHE[content_hash]
-            if datetime.now() - cache_info["created"] < PDF_CACHE_DURATION:
-                if os.path.exists(cache_info["path"]):
-                    logger.info(f"캐시된 결과 반환: {content_hash}")
-                    return jsonify({
-                        'success': True,
-                        'pdf_url': f'/api/file/{content_hash}.pdf',
-                        'cached': True,
-                        'effective_prompt': cache_info.get('effective_prompt')
-                    })
-                else:
-                    PDF_CACHE.pop(content_hash, None)
-        
-        # HTML 생성 (파일 유무에 따라 분기)
-        web_designer = get_designer()
-        if uploaded_files:
-            result = web_designer.generate_html_from_files(prompt, uploaded_files)
-        else:
-            # 파일 없이 생성: 기존 config의 입력 디렉토리를 건드리지 않고 프롬프트만 사용
-            original_config = copy.deepcopy(web_designer.designer.config)
-            try:
-                effective_prompt = (prompt or "첨부된 자료 없이도 A4 규격의 전문적인 유인물을 만들어주세요.")
-                web_designer.designer.config.setdefault('prompts', {})
-                web_designer.designer.config['prompts']['user_prompt'] = effective_prompt
-                html, meta = web_designer.designer.generate_html()
-                if not isinstance(meta, dict):
-                    meta = {'raw_metadata': meta}
-                meta.setdefault('effective_prompt', effective_prompt)
-                result = {
-                    'success': True,
-                    'html': html,
-                    'metadata': meta,
-                    'effective_prompt': effective_prompt
-                }
-            finally:
-                web_designer.designer.config = original_config
-        
-        if not result['success']:
-            return jsonify({
-                'error': f'HTML 생성 실패: {result["error"]}',
-                'code': 'HTML_GENERATION_FAILED'
-            }), 500
-        
-        # PDF 변환 (wkhtmltopdf가 있는 경우에만)
-        pdf_path = None
-        try:
-            pdf_path = web_designer.html_to_pdf(result['html'])
-        except Exception as e:
-            logger.warning(f"PDF 변환 실패 (HTML은 정상 생성됨): {e}")
-        
-        if not pdf_path:
-            # PDF 변환이 실패한 경우 HTML만 반환
-            return jsonify({
-                'success': True,
-                'html': result['html'],
-                'pdf_available': False,
-                'metadata': result['metadata'],
-                'message': 'HTML 생성 완료 (PDF 변환 불가능)',
-                'effective_prompt': result.get('effective_prompt')
-            })
+        if not AI_AVAILABLE:
+            return _ai_unavailable_response()
 
-        # 캐시에 저장
-        PDF_CACHE[content_hash] = {
-            'path': pdf_path,
-            'created': datetime.now(),
-            'effective_prompt': result.get('effective_prompt')
-        }
+        prompt, uploaded_files, error_response = _read_convert_request()
+        if error_response:
+            return error_response
 
-        return jsonify({
+        job, coalesced = _submit_conversion(prompt, uploaded_files)
+        if job is None:
+            return _job_queue_full_response()
+
+        response = jsonify({
             'success': True,
-            'pdf_url': f'/api/file/{content_hash}.pdf',
-            'html': result['html'],  # HTML도 함께 반환
-            'metadata': result['metadata'],
-            'cached': False,
-            'effective_prompt': result.get('effective_prompt')
+            'job_id': job.id,
+            'status': job.status,
+            'coalesced': coalesced,
+            'status_url': f'/api/jobs/{job.id}',
+            'events_url': f'/api/jobs/{job.id}/events'
         })
-        
+        response.headers['Location'] = f'/api/jobs/{job.id}'
+        return response, 202
+
     except Exception as e:
-        logger.error(f"변환 처리 실패: {e}")
+        logger.error(f"변환 작업 등록 실패: {e}")
         return jsonify({
             'error': '변환 처리 중 오류가 발생했습니다.',
             'code': 'CONVERSION_ERROR'
         }), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@limiter.limit("120 per minute")  # 이벤트 스트림을 못 쓰는 클라이언트의 폴링 허용
+def get_convert_job(job_id):
+    """변환 작업 상태 (완료 시 result에 /api/convert와 같은 응답 본문)"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.', 'code': 'JOB_NOT_FOUND'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+@limiter.limit("30 per minute")
+def stream_convert_job_events(job_id):
+    """변환 작업 진행 이벤트 (Server-Sent Events, Last-Event-ID로 이어받기 지원)"""
+    manager = get_job_manager()
+    if manager.get(job_id) is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.', 'code': 'JOB_NOT_FOUND'}), 404
+
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID') or request.args.get('after', 0))
+    except ValueError:
+        last_event_id = 0
+
+    def event_stream():
+        after = last_event_id
+        while True:
+            events, finished = manager.wait_for_events(job_id, after, timeout=15)
+            if not events and not finished:
+                # 프록시가 유휴 연결을 끊지 않도록 주석 줄 전송
+                yield ': keep-alive\n\n'
+                continue
+            for event in events:
+                after = event['id']
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            if finished:
+                return
+
+    return Response(
+        stream_with_context(event_stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/file/<file_id>.pdf', methods=['GET'])
 def get_pdf_file(file_id):
     """PDF 파일 다운로드/미리보기"""
     try:
-        # 캐시에 파일이 없는 경우
-        if file_id not in PDF_CACHE:
-            logger.warning(f"⚠️ PDF 파일이 캐시에 없습니다: {file_id} (서버 재시작으로 인한 캐시 소실 가능)")
+        # 저장소에 없거나 보관 기간이 지난 경우
+        artifact = get_artifact_store().get(file_id)
+        if artifact is None:
+            logger.warning(f"⚠️ PDF 파일이 저장소에 없습니다: {file_id} (보관 기간 만료 또는 용량 정리)")
             # HTML 에러 페이지 반환 (브라우저에서 보기 좋게)
             return '''
             <!DOCTYPE html>
@@ -958,7 +1193,7 @@ def get_pdf_file(file_id):
                 <div class="container">
                     <h1>⏱️</h1>
                     <h2>파일이 만료되었습니다</h2>
-                    <p>서버가 재시작되어 임시 파일이 삭제되었습니다.<br>
+                    <p>보관 기간이 지나 파일이 삭제되었습니다.<br>
                        메인 페이지로 돌아가서 다시 생성해주세요.</p>
                     <a href="/" class="btn">메인으로 돌아가기</a>
                 </div>
@@ -966,12 +1201,12 @@ def get_pdf_file(file_id):
             </html>
             ''', 404
         
-        pdf_path = PDF_CACHE[file_id]['path']
+        pdf_path = artifact['path']
         
-        # 파일이 실제로 존재하지 않는 경우
+        # 조회 직후 정리로 파일이 삭제된 경우
         if not os.path.exists(pdf_path):
             logger.warning(f"⚠️ PDF 파일이 디스크에 없습니다: {pdf_path}")
-            del PDF_CACHE[file_id]
+            get_artifact_store().remove(file_id)
             return '''
             <!DOCTYPE html>
             <html lang="ko">
@@ -1008,16 +1243,41 @@ def get_pdf_file(file_id):
         
         # download 쿼리 파라미터로 다운로드/미리보기 구분
         is_download = request.args.get('download', 'false').lower() == 'true'
-        
-        logger.info(f"📥 PDF 파일 전송: {pdf_path} (download={is_download})")
-        
-        return send_file(
+
+        etag = artifact['sha256']
+
+        # 같은 file_id라도 캐시 만료 후 재생성되면 내용이 바뀌므로 버전(?v=)이 일치할 때만 장기 캐시
+        versioned = request.args.get('v') == etag[:16]
+
+        # conditional=True: If-None-Match → 304, Range/If-Range → 206 (PDF 뷰어의 부분 요청)
+        # 경로로 넘기면 gunicorn의 wsgi.file_wrapper를 통해 sendfile(제로 카피)로 전송
+        response = send_file(
             pdf_path,
             as_attachment=is_download,  # download=true일 때만 다운로드
             download_name=f'html_material_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf' if is_download else None,
-            mimetype='application/pdf'
+            mimetype='application/pdf',
+            etag=etag,
+            conditional=True,
+            max_age=PDF_IMMUTABLE_MAX_AGE if versioned else 0  # 0: 매번 ETag로 재검증 (no-cache)
         )
-        
+        response.headers['Accept-Ranges'] = 'bytes'
+        if versioned:
+            response.cache_control.immutable = True
+
+        with _pdf_delivery_lock:
+            if response.status_code == 304:
+                PDF_DELIVERY_STATS['not_modified'] += 1
+            elif response.status_code == 206:
+                PDF_DELIVERY_STATS['partial'] += 1
+                PDF_DELIVERY_STATS['bytes_sent'] += response.content_length or 0
+            else:
+                PDF_DELIVERY_STATS['full'] += 1
+                PDF_DELIVERY_STATS['bytes_sent'] += response.content_length or 0
+        logger.info(
+            f"📥 PDF 파일 전송: {pdf_path} (download={is_download}, status={response.status_code})"
+        )
+        return response
+
     except Exception as e:
         logger.error(f"PDF 파일 전송 실패: {e}")
         import traceback
@@ -1074,4 +1334,5 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
+    start_background_services()
     app.run(host='0.0.0.0', port=port, debug=debug)
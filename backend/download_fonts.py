@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+PDF 렌더링용 오프라인 폰트 번들 생성 스크립트
+fonts/fonts.json에 정의된 폰트를 내려받아 KS X 1001 한글 + 라틴 문자로
+서브셋한 WOFF2 파일을 fonts/ 디렉토리에 생성합니다.
+
+필요 패키지: pip install requests "fonttools[woff]"
+"""
+
+import io
+import json
+import sys
+from pathlib import Path
+
+import requests
+
+FONT_DIR = Path(__file__).parent / "fonts"
+MANIFEST_PATH = FONT_DIR / "fonts.json"
+
+
+def bundle_unicodes():
+    """번들에 포함할 코드포인트 (라틴/문장부호/기호 + KS X 1001 한글 2,350자 + 호환 자모)"""
+    codepoints = set(range(0x20, 0x7F))          # Basic Latin
+    codepoints.update(range(0xA0, 0x100))        # Latin-1 Supplement
+    codepoints.update(range(0x2000, 0x2070))     # General Punctuation
+    codepoints.update(range(0x2190, 0x2200))     # Arrows
+    codepoints.update(range(0x2460, 0x2500))     # Enclosed Alphanumerics (①②③)
+    codepoints.update(range(0x25A0, 0x2600))     # Geometric Shapes (■●◆)
+    codepoints.update(range(0x3000, 0x3040))     # CJK Symbols and Punctuation
+    codepoints.update(range(0x3131, 0x3190))     # Hangul Compatibility Jamo
+
+    # KS X 1001 완성형 한글: EUC-KR 0xB0A1 ~ 0xC8FE
+    for lead in range(0xB0, 0xC9):
+        for trail in range(0xA1, 0xFF):
+            try:
+                codepoints.add(ord(bytes([lead, trail]).decode('euc-kr')))
+            except UnicodeDecodeError:
+                continue
+    return codepoints
+
+
+def build_font(source_bytes: bytes, weight: int, output_path: Path, unicodes) -> None:
+    """가변 폰트는 weight로 인스턴스화한 뒤 서브셋해서 WOFF2로 저장"""
+    from fontTools.ttLib import TTFont
+    from fontTools import subset
+
+    font = TTFont(io.BytesIO(source_bytes))
+    if 'fvar' in font:
+        from fontTools.varLib import instancer
+        axes = {axis.axisTag: axis for axis in font['fvar'].axes}
+        location = {}
+        for tag, axis in axes.items():
+            if tag == 'wght':
+                location[tag] = max(axis.minValue, min(axis.maxValue, weight))
+            else:
+                location[tag] = axis.defaultValue
+        font = instancer.instantiateVariableFont(font, location)
+
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    options.name_IDs = ['*']
+    options.notdef_outline = True
+    subsetter = subset.Subsetter(options=options)
+    subsetter.populate(unicodes=unicodes)
+    subsetter.subset(font)
+    font.flavor = 'woff2'
+    font.save(str(output_path))
+
+
+def download_fonts(force: bool = False) -> bool:
+    """매니페스트의 모든 폰트 생성. 하나라도 실패하면 False"""
+    try:
+        import fontTools  # noqa: F401
+    except ImportError:
+        print("❌ fonttools가 설치되어 있지 않습니다: pip install \"fonttools[woff]\"")
+        return False
+
+    with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    unicodes = bundle_unicodes()
+    downloads = {}
+    success = True
+
+    for family, spec in manifest.get('families', {}).items():
+        for weight, entry in spec.get('weights', {}).items():
+            output_path = FONT_DIR / entry['file']
+            if output_path.exists() and not force:
+                print(f"✅ 이미 존재합니다: {output_path.name}")
+                continue
+
+            source_url = entry['source']
+            try:
+                if source_url not in downloads:
+                    print(f"📥 다운로드 중: {source_url}")
+                    response = requests.get(source_url, timeout=120)
+                    response.raise_for_status()
+                    downloads[source_url] = response.content
+
+                print(f"✂️ 서브셋 생성: {family} {weight} → {output_path.name}")
+                build_font(downloads[source_url], int(weight), output_path, unicodes)
+                print(f"📁 파일 크기: {output_path.stat().st_size:,} 바이트")
+            except Exception as e:
+                print(f"❌ {family} {weight} 생성 실패: {e}")
+                success = False
+
+    return success
+
+
+if __name__ == "__main__":
+    ok = download_fonts(force='--force' in sys.argv)
+    sys.exit(0 if ok else 1)
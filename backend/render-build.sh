@@ -103,6 +103,12 @@ else
     echo "⚠️ wkhtmltopdf 바이너리를 찾을 수 없습니다. (Chrome 변환이 우선 사용됩니다)"
 fi
 
+# 오프라인 PDF 폰트 번들 생성 (fonts/*.woff2가 없을 때만)
+echo "🔤 PDF 폰트 번들 확인 중..."
+if [ -f "download_fonts.py" ]; then
+    python3 download_fonts.py || echo "⚠️ 폰트 번들 생성 실패 (Google Fonts 링크 사용)"
+fi
+
 # 환경 변수 확인
 echo "🔍 환경 변수 확인..."
 if [ -z "$GOOGLE_API_KEY" ] && [ -z "$OPENAI_API_KEY" ] && [ -z "$ANTHROPIC_API_KEY" ]; then
@@ -124,12 +130,17 @@ import os
 
 # 워커 설정
 workers = 1  # 메모리 제한으로 1개만 사용
-worker_class = 'sync'
+# 변환 작업은 /api/jobs 백그라운드 실행기에서 돌고, 진행 이벤트(SSE) 스트림이 연결을 오래 유지하므로
+# 스레드 워커로 여러 요청을 동시에 처리 (작업 상태는 워커 메모리에 있으므로 workers는 1 유지)
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
 worker_connections = 1000
-timeout = 300  # 5분 (AI API 응답 대기)
+timeout = 300  # 5분 (동기 호환 엔드포인트 /api/convert의 AI API 응답 대기)
 keepalive = 5
-max_requests = 100
-max_requests_jitter = 10
+sendfile = True  # /api/file PDF 전송을 os.sendfile로 (wsgi.file_wrapper, 제로 카피)
+# 주기적 워커 재시작 안 함: 작업 상태(/api/jobs)와 렌더링 서비스·Chrome/MarkItDown 풀이 워커 수명에 묶여 있어
+# 재시작마다 진행 중인 작업이 사라짐 (상태 폴링·SSE 재연결도 요청 수에 포함되므로 몇 분마다 재시작됐음)
+max_requests = 0
 
 # 로깅
 accesslog = '-'
@@ -149,6 +160,12 @@ reload = False
 
 # 메모리 관리
 worker_tmp_dir = '/dev/shm'  # tmpfs 사용
+
+# 워커가 앱을 불러온 뒤 백그라운드 스레드(고아 브라우저 reaper, 임시 파일 janitor) 시작
+# (app.py import 시점에 시작하지 않으므로 spawn 변환 프로세스에는 생기지 않음)
+def post_worker_init(worker):
+    from app import start_background_services
+    start_background_services()
 EOF
 
 echo "✅ gunicorn_config.py 생성 완료"
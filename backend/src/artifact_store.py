@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+변환 결과(PDF) 영구 저장소
+
+기존 PDF_CACHE(app.py 모듈 전역 dict)는 배포, 워커 재시작(max_requests), 크래시 때마다 비워져
+이미 내려준 /api/file/<id>.pdf 링크가 "파일이 만료되었습니다"가 되고 사용자는 다시 생성해야 했습니다.
+- PDF 내용(SHA-256) 주소 기반 디렉토리: objects/ab/<sha256>.pdf (같은 PDF는 한 번만 저장)
+- SQLite 인덱스(WAL): 변환 키(프롬프트+첨부파일 해시) → PDF 해시, 경로, 크기, 생성/최근 접근 시각, 실제 프롬프트
+- 키별 메타데이터 사이드카(meta/<key>.json): 인덱스가 손상/삭제되면 시작 시 디스크에서 재구성
+- 생성 후 ARTIFACT_MAX_AGE_HOURS가 지나면 만료, 전체 용량이 상한을 넘으면 오래 사용하지 않은 것부터 삭제
+
+여러 gunicorn 워커와 렌더링 프로세스가 같은 디렉토리를 동시에 사용해도 안전합니다
+(SQLite BEGIN IMMEDIATE + 원자적 파일 교체).
+"""
+
+import os
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_DIR = Path(os.getenv(
+    'PDF_ARTIFACT_DIR', str(Path(tempfile.gettempdir()) / "html_designer" / "artifacts")
+))
+ARTIFACT_MAX_MB = int(os.getenv('PDF_ARTIFACT_MAX_MB', '1024'))
+ARTIFACT_MAX_AGE_HOURS = float(os.getenv('PDF_ARTIFACT_MAX_AGE_HOURS', '24'))
+ORPHAN_GRACE_SECONDS = 3600           # 인덱스에 없는 객체 파일을 지우기 전 유예 (다른 워커가 등록 중일 수 있음)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    key TEXT PRIMARY KEY,            -- 변환 키 (generate_content_hash)
+    sha256 TEXT NOT NULL,            -- PDF 내용 해시 (ETag, 객체 파일 이름)
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    effective_prompt TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_sha256 ON artifacts(sha256);
+CREATE INDEX IF NOT EXISTS idx_artifacts_last_access ON artifacts(last_access);
+"""
+
+
+def file_sha256(file_path) -> str:
+    """파일 내용의 SHA-256"""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+class ArtifactStore:
+    """변환 키 → PDF 객체 인덱스 (여러 프로세스에서 동시에 사용)"""
+
+    def __init__(
+        self,
+        root_dir: Path = ARTIFACT_DIR,
+        max_bytes: int = ARTIFACT_MAX_MB * 1024 * 1024,
+        max_age: float = ARTIFACT_MAX_AGE_HOURS * 3600,
+    ):
+        self.root_dir = Path(root_dir)
+        self.objects_dir = self.root_dir / "objects"
+        self.meta_dir = self.root_dir / "meta"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.meta_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root_dir / "artifacts.db"
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._local = threading.local()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'stores': 0,
+            'evictions': 0,
+            'rebuilt': 0,
+        }
+        self._stats_lock = threading.Lock()
+        self._open()
+
+    # ------------------------------------------------------------------
+    # SQLite
+    # ------------------------------------------------------------------
+    def _open(self) -> None:
+        try:
+            self._connect().executescript(_SCHEMA)
+        except sqlite3.DatabaseError as e:
+            # 인덱스 파일이 손상되었으면 새로 만들고 사이드카로 재구성
+            logger.warning(f"⚠️ 결과 저장소 인덱스 손상, 다시 만듭니다: {e}")
+            self._local.conn = None
+            for suffix in ('', '-wal', '-shm'):
+                try:
+                    os.unlink(f"{self.db_path}{suffix}")
+                except OSError:
+                    pass
+            self._connect().executescript(_SCHEMA)
+        self.rebuild()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    class _Tx:
+        def __init__(self, conn: sqlite3.Connection):
+            self.conn = conn
+
+        def __enter__(self) -> sqlite3.Connection:
+            self.conn.execute('BEGIN IMMEDIATE')
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb):
+            self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+            return False
+
+    def _transaction(self) -> '_Tx':
+        return self._Tx(self._connect())
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    # ------------------------------------------------------------------
+    # 경로
+    # ------------------------------------------------------------------
+    def _object_path(self, sha256: str) -> Path:
+        return self.objects_dir / sha256[:2] / f"{sha256}.pdf"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.meta_dir / f"{key}.json"
+
+    # ------------------------------------------------------------------
+    # 조회 / 저장
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        변환 키의 결과 조회 (만료되었거나 파일이 없으면 None)
+
+        Returns:
+            {'key', 'sha256', 'path', 'size', 'created', 'last_access', 'effective_prompt'}
+        """
+        now = time.time()
+        row = self._connect().execute("SELECT * FROM artifacts WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count('misses')
+            return None
+
+        record = dict(row)
+        if now - record['created'] > self.max_age or not os.path.exists(record['path']):
+            self._count('expired')
+            self.remove(key)
+            return None
+
+        self._connect().execute("UPDATE artifacts SET last_access = ? WHERE key = ?", (now, key))
+        record['last_access'] = now
+        self._count('hits')
+        return record
+
+    def put(self, key: str, pdf_path: Path, effective_prompt: Optional[str] = None) -> Dict[str, Any]:
+        """
+        PDF를 내용 주소 디렉토리에 넣고 변환 키를 등록
+
+        원본 pdf_path는 그대로 두므로(하드링크 또는 복사) 호출한 쪽에서 정리합니다.
+        """
+        pdf_path = Path(pdf_path)
+        sha256 = file_sha256(pdf_path)
+        target = self._object_path(sha256)
+        now = time.time()
+
+        # 객체 파일 생성과 인덱스 등록을 한 트랜잭션으로 묶어, 다른 프로세스의 정리가
+        # 아직 참조되지 않은 새 객체를 지우지 못하게 함
+        with self._transaction() as conn:
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                try:
+                    try:
+                        os.link(pdf_path, tmp_path)
+                    except OSError:
+                        shutil.copyfile(pdf_path, tmp_path)
+                    os.replace(tmp_path, target)
+                finally:
+                    if tmp_path.exists():
+                        tmp_path.unlink()
+
+            record = {
+                'key': key,
+                'sha256': sha256,
+                'path': str(target),
+                'size': target.stat().st_size,
+                'created': now,
+                'last_access': now,
+                'effective_prompt': effective_prompt,
+            }
+            previous = conn.execute("SELECT sha256 FROM artifacts WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (key, sha256, path, size, created, last_access, effective_prompt) "
+                "VALUES (:key, :sha256, :path, :size, :created, :last_access, :effective_prompt)",
+                record,
+            )
+            if previous is not None and previous['sha256'] != sha256:
+                self._delete_unreferenced(conn, [previous['sha256']])
+        self._write_meta(record)
+        self._count('stores')
+        self.evict()
+        return record
+
+    def remove(self, key: str) -> None:
+        """변환 키 삭제 (다른 키가 같은 PDF를 참조하지 않으면 객체 파일도 삭제)"""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT sha256 FROM artifacts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+            self._delete_unreferenced(conn, [row['sha256']])
+        self._delete_meta(key)
+
+    def _write_meta(self, record: Dict[str, Any]) -> None:
+        meta_path = self._meta_path(record['key'])
+        tmp_path = meta_path.with_name(f".{meta_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({k: v for k, v in record.items() if k != 'path'}, f, ensure_ascii=False)
+            os.replace(tmp_path, meta_path)
+        except OSError as e:
+            logger.debug(f"결과 메타데이터 저장 실패({record['key'][:12]}): {e}")
+
+    def _delete_meta(self, key: str) -> None:
+        try:
+            self._meta_path(key).unlink()
+        except OSError:
+            pass
+
+    def _delete_unreferenced(self, conn: sqlite3.Connection, hashes: List[str]) -> None:
+        """참조하는 키가 없는 객체 파일 삭제 (트랜잭션 안에서 호출)"""
+        for sha256 in set(hashes):
+            in_use = conn.execute("SELECT 1 FROM artifacts WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone()
+            if in_use is None:
+                try:
+                    self._object_path(sha256).unlink()
+                except OSError:
+                    pass
+
+    # ------------------------------------------------------------------
+    # 정리 / 재구성
+    # ------------------------------------------------------------------
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """만료된 키와, 용량 상한(기본 self.max_bytes)을 넘는 만큼 오래 사용하지 않은 키 삭제. 삭제한 키 수 반환"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        removed_keys: List[str] = []
+        with self._transaction() as conn:
+            cutoff = time.time() - self.max_age
+            expired = conn.execute("SELECT key, sha256 FROM artifacts WHERE created < ?", (cutoff,)).fetchall()
+            conn.execute("DELETE FROM artifacts WHERE created < ?", (cutoff,))
+            hashes = [row['sha256'] for row in expired]
+            removed_keys.extend(row['key'] for row in expired)
+
+            # 같은 PDF를 여러 키가 공유하므로 용량은 객체 기준으로 계산
+            total = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT sha256, MAX(size) AS size FROM artifacts GROUP BY sha256)"
+            ).fetchone()[0]
+            if total > max_bytes:
+                for row in conn.execute(
+                    "SELECT key, sha256, size FROM artifacts ORDER BY last_access ASC"
+                ).fetchall():
+                    if total <= max_bytes:
+                        break
+                    conn.execute("DELETE FROM artifacts WHERE key = ?", (row['key'],))
+                    removed_keys.append(row['key'])
+                    hashes.append(row['sha256'])
+                    shared = conn.execute(
+                        "SELECT 1 FROM artifacts WHERE sha256 = ? LIMIT 1", (row['sha256'],)
+                    ).fetchone()
+                    if shared is None:
+                        total -= row['size']
+
+            self._delete_unreferenced(conn, hashes)
+
+        for key in removed_keys:
+            self._delete_meta(key)
+        if removed_keys:
+            self._count('evictions', len(removed_keys))
+            logger.info(f"🧹 결과 저장소 정리: {len(removed_keys)}개 삭제")
+        return len(removed_keys)
+
+    def trim(self, target_bytes: int) -> int:
+        """디스크 부족 시 비상 정리: 전체 용량을 target_bytes 이하로 줄이고 해제한 바이트 수 반환"""
+        before = self.get_stats()['store_bytes']
+        self.evict(max_bytes=target_bytes)
+        return max(0, before - self.get_stats()['store_bytes'])
+
+    def rebuild(self) -> None:
+        """
+        디스크와 인덱스 동기화 (시작 시)
+
+        - 인덱스에 없지만 사이드카와 객체 파일이 남아 있는 키 복원 (인덱스 유실/손상 대비)
+        - 객체 파일이 사라진 키 삭제
+        - 어느 키도 참조하지 않는 오래된 객체/임시 파일 삭제
+        """
+        restored = 0
+        now = time.time()
+        with self._transaction() as conn:
+            known = {row['key'] for row in conn.execute("SELECT key FROM artifacts")}
+            for meta_path in self.meta_dir.glob('*.json'):
+                key = meta_path.stem
+                if key in known:
+                    continue
+                try:
+                    with open(meta_path, 'r', encoding='utf-8') as f:
+                        meta = json.load(f)
+                    target = self._object_path(meta['sha256'])
+                    if not target.exists() or now - meta['created'] > self.max_age:
+                        meta_path.unlink()
+                        continue
+                    conn.execute(
+                        "INSERT OR IGNORE INTO artifacts "
+                        "(key, sha256, path, size, created, last_access, effective_prompt) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (key, meta['sha256'], str(target), target.stat().st_size, meta['created'],
+                         meta.get('last_access', meta['created']), meta.get('effective_prompt')),
+                    )
+                    restored += 1
+                except (OSError, ValueError, KeyError) as e:
+                    logger.debug(f"결과 메타데이터 복원 실패({key[:12]}): {e}")
+
+            missing = [row['key'] for row in conn.execute("SELECT key, path FROM artifacts")
+                       if not os.path.exists(row['path'])]
+            for key in missing:
+                conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+
+            referenced = {row['sha256'] for row in conn.execute("SELECT DISTINCT sha256 FROM artifacts")}
+            for path in self.objects_dir.glob('*/*'):
+                try:
+                    if now - path.stat().st_mtime < ORPHAN_GRACE_SECONDS:
+                        continue
+                    if path.suffix == '.tmp' or path.stem not in referenced:
+                        path.unlink()
+                except OSError:
+                    continue
+
+        for key in missing:
+            self._delete_meta(key)
+        if restored:
+            self._count('rebuilt', restored)
+            logger.info(f"♻️ 결과 저장소 인덱스 복원: {restored}개")
+        self.evict()
+
+    def get_stats(self) -> Dict[str, Any]:
+        row = self._connect().execute(
+            "SELECT COUNT(*) AS entries, COUNT(DISTINCT sha256) AS objects FROM artifacts"
+        ).fetchone()
+        total = self._connect().execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT sha256, MAX(size) AS size FROM artifacts GROUP BY sha256)"
+        ).fetchone()[0]
+        with self._stats_lock:
+            lookups = self._stats['hits'] + self._stats['misses'] + self._stats['expired']
+            stats = dict(self._stats)
+        stats.update({
+            'entries': row['entries'],
+            'objects': row['objects'],
+            'store_bytes': total,
+            'max_bytes': self.max_bytes,
+            'max_age_hours': self.max_age / 3600,
+            'hit_rate': round(stats['hits'] / lookups, 3) if lookups else 0.0,
+        })
+        return stats
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """프로세스 전역 결과 저장소 (lazy loading, 처음 열 때 디스크에서 인덱스 재구성)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ArtifactStore()
+    return _store
+
+
+def get_artifact_store_stats() -> Dict[str, Any]:
+    """결과 저장소 지표 (저장소가 아직 열리지 않았으면 기본값)"""
+    if _store is None:
+        return {'hits': 0, 'misses': 0, 'entries': 0}
+    return _store.get_stats()
@@ -8,12 +8,18 @@ config.json 설정을 읽어서 AI API 모듈을 활용해
 """
 
 import os
+import re
 import sys
 import json
+import time
+import asyncio
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Tuple, Callable, Hashable
 from datetime import datetime
+from dataclasses import dataclass
 
 # AI API 모듈 부트스트랩
 sys.path.insert(0, str(Path(__file__).parent.parent / "ai_api_module_v3"))
@@ -25,6 +31,286 @@ except ImportError:
     sys.exit(1)
 
 
+@dataclass(frozen=True)
+class GenerationOptions:
+    """
+    generate_html 요청 단위 옵션 (불변)
+
+    공유 config를 바꾸지 않고 요청마다 넘기므로 한 HTMLDesigner로 여러 생성을 동시에 실행할 수 있습니다.
+    None인 항목은 config.json 값을 사용합니다.
+
+    Attributes:
+        user_request: 사용자 요청 (None이면 prompts.user_prompt)
+        model: 모델 이름/별칭 (None이면 ai_settings.model)
+        temperature: None이면 ai_settings.temperature
+        input_files: 첨부할 파일 경로들. None이면 file_processing.input_directory를 탐색
+    """
+    user_request: Optional[str] = None
+    model: Optional[str] = None
+    temperature: Optional[float] = None
+    input_files: Optional[Sequence[Path]] = None
+
+
+class PromptFileCache:
+    """
+    참조/라이브러리 파일 캐시 (프로세스 전역, 모든 HTMLDesigner 인스턴스가 공유)
+
+    예전에는 generate_html마다 후보 경로를 resolve()하고 guideline.md 등을 디스크에서 다시 읽었습니다.
+    - 파일 내용: 해석된 경로 → (mtime_ns, 크기, 내용). stat 한 번으로 검증하고 바뀐 경우에만 다시 읽음
+    - 경로 해석: (기준 디렉토리, 설정 경로) → 해석된 경로. 파일이 사라지면 다시 탐색
+    - library 목록: 디렉토리 mtime이 바뀐 경우에만 다시 glob
+    - 고정 prompt prefix: 같은 내용 문자열로 구성되면 다시 조립하지 않음
+      (파일이 그대로면 같은 str 객체를 돌려주므로 키 해시/비교 비용이 사실상 없음)
+    """
+
+    PREFIX_CACHE_SIZE = 8
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files: Dict[Path, Tuple[int, int, str]] = {}
+        self._paths: Dict[Hashable, Path] = {}
+        self._listings: Dict[Path, Tuple[int, List[Path]]] = {}
+        self._prefixes: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._stats = {
+            'file_hits': 0,
+            'file_loads': 0,
+            'prefix_hits': 0,
+            'prefix_builds': 0,
+        }
+
+    def read_text(self, path: Path) -> Tuple[Optional[str], bool]:
+        """파일 내용과 이번에 디스크에서 읽었는지 여부. 파일이 없으면 (None, False)"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._files.pop(path, None)
+            return None, False
+
+        with self._lock:
+            entry = self._files.get(path)
+            if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self._stats['file_hits'] += 1
+                return entry[2], False
+
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        with self._lock:
+            self._files[path] = (st.st_mtime_ns, st.st_size, content)
+            self._stats['file_loads'] += 1
+        return content, True
+
+    def resolve(self, key: Hashable, finder: Callable[[], Optional[Path]]) -> Optional[Path]:
+        """기억한 경로가 아직 있으면 그대로, 없으면 finder로 다시 탐색"""
+        with self._lock:
+            path = self._paths.get(key)
+        if path is not None and path.exists():
+            return path
+        path = finder()
+        with self._lock:
+            if path is None:
+                self._paths.pop(key, None)
+            else:
+                self._paths[key] = path
+        return path
+
+    def list_dir(self, directory: Path, pattern: str) -> List[Path]:
+        """디렉토리 mtime이 그대로면 지난 glob 결과 재사용 (이름순 정렬)"""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            return []
+        key = directory / pattern
+        with self._lock:
+            entry = self._listings.get(key)
+            if entry and entry[0] == mtime_ns:
+                return list(entry[1])
+        listing = sorted(directory.glob(pattern))
+        with self._lock:
+            self._listings[key] = (mtime_ns, listing)
+        return list(listing)
+
+    def static_prefix(self, key: Hashable, builder: Callable[[], str]) -> str:
+        """같은 구성의 고정 prompt prefix는 한 번만 조립"""
+        with self._lock:
+            prefix = self._prefixes.get(key)
+            if prefix is not None:
+                self._prefixes.move_to_end(key)
+                self._stats['prefix_hits'] += 1
+                return prefix
+        prefix = builder()
+        with self._lock:
+            self._prefixes[key] = prefix
+            self._prefixes.move_to_end(key)
+            while len(self._prefixes) > self.PREFIX_CACHE_SIZE:
+                self._prefixes.popitem(last=False)
+            self._stats['prefix_builds'] += 1
+        return prefix
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached_files'] = len(self._files)
+            stats['cached_bytes'] = sum(entry[1] for entry in self._files.values())
+            stats['cached_prefixes'] = len(self._prefixes)
+        return stats
+
+
+_prompt_files = PromptFileCache()
+
+
+def get_prompt_file_cache_stats() -> Dict[str, Any]:
+    return _prompt_files.get_stats()
+
+
+# 스트리밍 미리보기 전달 단위: 이만큼 쌓이거나 이 시간이 지나면 콜백 호출
+STREAM_PREVIEW_MIN_CHARS = 512
+STREAM_PREVIEW_INTERVAL = 0.2
+
+
+class HtmlFenceExtractor:
+    """
+    스트리밍 응답에서 ```html 코드블록 본문을 점진적으로 추출하는 상태 기계
+
+    search(여는 펜스 탐색) → header(펜스 줄 나머지 건너뜀) → body(본문 전달) → closed
+    펜스 표식이 청크 경계에 걸쳐도 되도록 표식이 될 수 있는 꼬리만 보류합니다.
+    여는 펜스 없이 줄 첫머리에 <!DOCTYPE html / <html 이 나오면 raw 상태로 그대로 전달합니다
+    (설명 문장 속 '<html>'은 무시). body/raw 모두 줄 첫머리의 ``` 에서 닫고, 끝에 붙은 ``` 는 버립니다.
+    """
+
+    OPEN = "```html"
+    CLOSE = "\n```"
+    FENCE = "```"
+    RAW_MARKERS = ("<!doctype html", "<html")
+    _RAW_START = re.compile(r'\n[ \t]*(<!doctype html|<html)')
+
+    def __init__(self):
+        self.state = "search"
+        self._pending = ""
+        self._line_start = True     # search 상태에서 보류 중인 텍스트가 줄 첫머리(공백만 앞섬)에서 시작하는지
+        self._parts: List[str] = []
+
+    @property
+    def closed(self) -> bool:
+        return self.state == "closed"
+
+    @property
+    def html(self) -> str:
+        return "".join(self._parts)
+
+    @staticmethod
+    def _partial_suffix(text: str, marker: str) -> int:
+        """text 끝부분 중 marker의 앞부분과 일치하는 가장 긴 길이"""
+        for size in range(min(len(text), len(marker) - 1), 0, -1):
+            if marker.startswith(text[-size:]):
+                return size
+        return 0
+
+    def _find_raw_start(self, lowered: str) -> int:
+        """줄 첫머리에 있는 <!doctype html / <html 위치 (없으면 -1)"""
+        match = self._RAW_START.search(("\n" if self._line_start else " ") + lowered)
+        return match.start(1) - 1 if match else -1
+
+    def _discard(self, text: str) -> None:
+        """search 상태에서 버린 텍스트 뒤가 줄 첫머리인지 기록"""
+        if "\n" in text:
+            self._line_start = not text.rsplit("\n", 1)[1].strip(" \t")
+        elif text:
+            self._line_start = self._line_start and not text.strip(" \t")
+
+    def feed(self, text: str) -> str:
+        """응답 조각을 넣고 이번에 확정된 HTML 조각 반환"""
+        out = []
+        buf = self._pending + text
+        self._pending = ""
+        while buf:
+            if self.state == "search":
+                lowered = buf.lower()
+                fence = lowered.find(self.OPEN)
+                raw = self._find_raw_start(lowered)
+                if fence >= 0:
+                    self.state, buf = "header", buf[fence + len(self.OPEN):]
+                elif raw >= 0:
+                    self.state, buf = "raw", buf[raw:]
+                else:
+                    keep = max(len(self.OPEN), *(len(m) for m in self.RAW_MARKERS)) - 1
+                    self._discard(buf[:-keep])
+                    self._pending, buf = buf[-keep:], ""
+            elif self.state == "header":
+                newline = buf.find("\n")
+                if newline < 0:
+                    self._pending, buf = buf, ""
+                else:
+                    self.state, buf = "body", buf[newline + 1:]
+            elif self.state in ("body", "raw"):
+                end = buf.find(self.CLOSE)
+                if end >= 0:
+                    out.append(buf[:end].rstrip("\r"))
+                    self.state, buf = "closed", ""
+                else:
+                    # 닫는 펜스의 앞부분이나 (줄바꿈 없이 붙은) 백틱은 다음 조각을 볼 때까지 보류
+                    hold = max(self._partial_suffix(buf, self.CLOSE), len(buf) - len(buf.rstrip("`")))
+                    if buf[:len(buf) - hold].endswith("\r"):
+                        hold += 1   # CRLF 줄바꿈의 \r도 펜스 앞이면 버림
+                    out.append(buf[:len(buf) - hold])
+                    self._pending, buf = buf[len(buf) - hold:], ""
+            else:
+                buf = ""
+        chunk = "".join(out)
+        if chunk:
+            self._parts.append(chunk)
+        return chunk
+
+    def finish(self) -> str:
+        """응답이 끝났을 때 보류 중이던 본문 꼬리 반환 (닫는 펜스 없이 끝난 경우, 끝에 붙은 ``` 는 제외)"""
+        chunk = self._pending if self.state in ("body", "raw") else ""
+        self._pending = ""
+        if chunk.rstrip().endswith(self.FENCE):
+            chunk = chunk.rstrip()[:-len(self.FENCE)]
+        if chunk:
+            self._parts.append(chunk)
+        return chunk
+
+
+class _PreviewBuffer:
+    """HTML 조각을 모아 STREAM_PREVIEW_MIN_CHARS / STREAM_PREVIEW_INTERVAL 단위로 콜백에 전달"""
+
+    def __init__(self, callback: Optional[Callable[[str], None]]):
+        self._callback = callback
+        self._parts: List[str] = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+    def push(self, chunk: str) -> None:
+        if not self._callback or not chunk:
+            return
+        self._parts.append(chunk)
+        self._size += len(chunk)
+        if self._size >= STREAM_PREVIEW_MIN_CHARS or time.monotonic() - self._last_flush >= STREAM_PREVIEW_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._callback and self._parts:
+            self._callback("".join(self._parts))
+        self._parts, self._size = [], 0
+        self._last_flush = time.monotonic()
+
+
+_stream_loop: Optional[asyncio.AbstractEventLoop] = None
+_stream_loop_lock = threading.Lock()
+
+
+def _get_stream_loop() -> asyncio.AbstractEventLoop:
+    """동기 stream_html용 이벤트 루프 스레드 (provider 비동기 클라이언트가 루프 하나에서만 쓰이도록 공유)"""
+    global _stream_loop
+    with _stream_loop_lock:
+        if _stream_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='html-stream-loop', daemon=True).start()
+            _stream_loop = loop
+        return _stream_loop
+
+
 class HTMLDesigner:
     """AI 기반 HTML 교재 디자이너"""
     
@@ -132,7 +418,7 @@ class HTMLDesigner:
             sys.exit(1)
     
     def _load_reference_files(self) -> Dict[str, str]:
-        """참조 파일들 로드"""
+        """참조 파일들 로드 (PromptFileCache: 바뀐 파일만 디스크에서 다시 읽음)"""
         references = {}
         ai_settings = self.config.get("ai_settings", {})
         reference_files = ai_settings.get("reference", [])
@@ -142,49 +428,54 @@ class HTMLDesigner:
         
         for ref_path in reference_files:
             try:
-                # 상대 경로를 config 파일 위치 기준으로 해결
-                if not Path(ref_path).is_absolute():
-                    file_path = config_dir / ref_path
-                else:
-                    file_path = Path(ref_path)
-                
-                # 파일 절대 경로로 변환
-                file_path = file_path.resolve()
-                
-                self.logger.info(f"🔍 참조 파일 경로 확인: {file_path}")
+                file_path = _prompt_files.resolve(
+                    ("reference", config_dir, ref_path),
+                    lambda: self._find_reference_path(config_dir, ref_path)
+                )
+                if file_path is None:
+                    continue
                 
-                if file_path.exists():
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    references[file_path.name] = content
-                    self.logger.info(f"✅ 참조 파일 로드 성공: {ref_path}")
-                    self.logger.info(f"📄 파일 크기: {len(content):,} 문자")
-                else:
+                content, loaded = _prompt_files.read_text(file_path)
+                if content is None:
                     self.logger.warning(f"⚠️ 참조 파일 없음: {file_path}")
-                    # 대안 경로들도 시도
-                    alternative_paths = [
-                        Path.cwd() / ref_path,
-                        Path(__file__).parent / ref_path,
-                        Path(__file__).parent.parent / ref_path
-                    ]
-                    
-                    for alt_path in alternative_paths:
-                        if alt_path.exists():
-                            self.logger.info(f"🔄 대안 경로에서 발견: {alt_path}")
-                            with open(alt_path, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                            references[alt_path.name] = content
-                            self.logger.info(f"✅ 대안 경로에서 로드 성공: {alt_path}")
-                            break
+                    continue
+                references[file_path.name] = content
+                if loaded:
+                    self.logger.info(f"✅ 참조 파일 로드 성공: {file_path} ({len(content):,} 문자)")
                             
             except Exception as e:
                 self.logger.error(f"❌ 참조 파일 로드 실패 {ref_path}: {e}")
         
-        self.logger.info(f"📚 총 {len(references)}개 참조 파일 로드됨")
-        for filename in references.keys():
-            self.logger.info(f"  - {filename}")
-        
+        self.logger.debug(f"📚 참조 파일 {len(references)}개: {', '.join(references)}")
         return references
+
+    def _find_reference_path(self, config_dir: Path, ref_path: str) -> Optional[Path]:
+        """참조 파일 경로 탐색: config 파일 기준, 없으면 대안 경로들"""
+        # 상대 경로를 config 파일 위치 기준으로 해결
+        if not Path(ref_path).is_absolute():
+            file_path = config_dir / ref_path
+        else:
+            file_path = Path(ref_path)
+        
+        # 파일 절대 경로로 변환
+        file_path = file_path.resolve()
+        self.logger.info(f"🔍 참조 파일 경로 확인: {file_path}")
+        if file_path.exists():
+            return file_path
+        
+        self.logger.warning(f"⚠️ 참조 파일 없음: {file_path}")
+        # 대안 경로들도 시도
+        alternative_paths = [
+            Path.cwd() / ref_path,
+            Path(__file__).parent / ref_path,
+            Path(__file__).parent.parent / ref_path
+        ]
+        
+        for alt_path in alternative_paths:
+            if alt_path.exists():
+                self.logger.info(f"🔄 대안 경로에서 발견: {alt_path}")
+                return alt_path.resolve()
+        return None
     
     def _load_library_files(self) -> Dict[str, str]:
         """library 폴더의 파일들 로드 (fonts.md 등)"""
@@ -193,42 +484,47 @@ class HTMLDesigner:
         # config 파일 위치를 기준으로 상대 경로 해결
         config_dir = self.config_path.parent if self.config_path.is_absolute() else Path.cwd()
         
-        # library 폴더 경로 찾기
-        library_candidates = [
-            config_dir / "library",
-            Path(__file__).parent / "library",
-            Path.cwd() / "src/library",
-            config_dir.parent / "src/library"
-        ]
-        
-        library_dir = None
-        for candidate in library_candidates:
-            if candidate.exists():
-                library_dir = candidate
-                break
+        library_dir = _prompt_files.resolve(
+            ("library", config_dir),
+            lambda: self._find_library_dir(config_dir)
+        )
         
         if not library_dir:
             self.logger.info("📂 library 디렉토리를 찾을 수 없어 라이브러리 파일 로드를 건너뜁니다")
             return library_files
         
-        self.logger.info(f"📂 library 디렉토리 발견: {library_dir}")
-        
         # .md 파일들 찾기 (특히 fonts.md)
-        library_files_list = list(library_dir.glob("*.md"))
-        
-        for lib_file in library_files_list:
+        # 이름순 정렬: 프롬프트 고정 부분(prefix)이 매 요청 같은 바이트여야 provider prompt cache가 적중
+        for lib_file in _prompt_files.list_dir(library_dir, "*.md"):
             try:
-                with open(lib_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                content, loaded = _prompt_files.read_text(lib_file)
+                if content is None:
+                    continue
                 
                 library_files[lib_file.name] = content
-                self.logger.info(f"📖 라이브러리 파일 로드: {lib_file.name} ({len(content):,} 문자)")
+                if loaded:
+                    self.logger.info(f"📖 라이브러리 파일 로드: {lib_file.name} ({len(content):,} 문자)")
                 
             except Exception as e:
                 self.logger.warning(f"⚠️ 라이브러리 파일 로드 실패 {lib_file.name}: {e}")
         
-        self.logger.info(f"📚 총 {len(library_files)}개 라이브러리 파일 로드됨")
+        self.logger.debug(f"📚 라이브러리 파일 {len(library_files)}개: {', '.join(library_files)}")
         return library_files
+
+    def _find_library_dir(self, config_dir: Path) -> Optional[Path]:
+        """library 폴더 경로 찾기"""
+        library_candidates = [
+            config_dir / "library",
+            Path(__file__).parent / "library",
+            Path.cwd() / "src/library",
+            config_dir.parent / "src/library"
+        ]
+        
+        for candidate in library_candidates:
+            if candidate.exists():
+                self.logger.info(f"📂 library 디렉토리 발견: {candidate}")
+                return candidate.resolve()
+        return None
     
     def _find_input_files(self) -> List[Path]:
         """input 폴더의 파일들 직접 찾기 (AI가 직접 처리할 수 있는 파일들)"""
@@ -269,7 +565,13 @@ class HTMLDesigner:
             return input_files
         
         self.logger.info(f"📂 input 디렉토리 발견: {input_dir}")
-        
+        return self._filter_input_files(input_dir.rglob('*'))
+
+    def _filter_input_files(self, candidates) -> List[Path]:
+        """지원 형식/크기/개수 제한을 통과한 첨부 파일만 선택"""
+        input_files = []
+        file_config = self.config.get("file_processing", {})
+
         # 지원하는 파일 확장자들 (config에서 가져오기)
         supported_extensions = set(file_config.get("supported_file_types", [
             ".pdf", ".docx", ".doc", ".xlsx", ".xls", ".pptx", ".ppt",
@@ -282,8 +584,8 @@ class HTMLDesigner:
         max_file_size_mb = file_config.get("max_file_size_mb", 10)
         max_files = file_config.get("max_files_per_request", 20)
         
-        # 파일들 찾기 (재귀적으로 검색)
-        for file_path in input_dir.rglob('*'):
+        for file_path in candidates:
+            file_path = Path(file_path)
             if len(input_files) >= max_files:
                 self.logger.warning(f"⚠️ 최대 파일 개수({max_files}개)에 도달하여 추가 파일을 건너뜁니다")
                 break
@@ -302,7 +604,18 @@ class HTMLDesigner:
         return input_files
     
     def _build_prompt(self, user_request: str, references: Dict[str, str], library_files: Dict[str, str]) -> str:
-        """AI 프롬프트 구성 (파일 직접 전달 방식)"""
+        """AI 프롬프트 구성 (파일 직접 전달 방식, 고정 부분 + 요청 부분을 한 문자열로)"""
+        static_prefix, request_suffix = self._build_prompt_parts(user_request, references, library_files)
+        return f"{static_prefix}\n\n{request_suffix}"
+
+    def _build_prompt_parts(self, user_request: str, references: Dict[str, str],
+                            library_files: Dict[str, str]) -> tuple[str, str]:
+        """
+        AI 프롬프트를 (고정 prefix, 요청별 suffix)로 구성
+
+        시스템/프리셋 프롬프트, 참조 자료(guideline.md, basic_structure.html), 디자인 라이브러리,
+        규칙은 요청마다 같으므로 앞에 두고(provider prompt cache 대상), 사용자 요청만 뒤에 붙입니다.
+        """
         prompts = self.config.get("prompts", {})
         
         # 시스템 프롬프트
@@ -311,6 +624,17 @@ class HTMLDesigner:
         # 프리셋 프롬프트  
         preset_prompt = prompts.get("preset_prompt", "")
         
+        # 파일이 그대로면 PromptFileCache가 같은 내용 문자열을 돌려주므로 조립 결과 재사용
+        key = (system_prompt, preset_prompt, tuple(references.items()), tuple(library_files.items()))
+        static_prefix = _prompt_files.static_prefix(
+            key,
+            lambda: self._assemble_static_prefix(system_prompt, preset_prompt, references, library_files)
+        )
+        return static_prefix, f"사용자 요청: {user_request}"
+
+    def _assemble_static_prefix(self, system_prompt: str, preset_prompt: str,
+                                references: Dict[str, str], library_files: Dict[str, str]) -> str:
+        """고정 prefix 조립: 시스템/프리셋 프롬프트, 참조 자료, 디자인 라이브러리, 첨부 안내, 규칙"""
         # 참조 파일 내용 추가 (래퍼로 감싸기)
         reference_content = ""
         if references:
@@ -349,14 +673,12 @@ class HTMLDesigner:
         file_instruction += "💡 첨부된 파일의 내용을 적극 활용하여 HTML 교재를 제작하세요.\n"
         file_instruction += "💡 문서, 이미지, 기타 파일들의 정보를 활용해주세요.\n"
         
-        # 최종 프롬프트 조합
-        full_prompt = f"""
+        # 고정 부분 조합 (사용자 요청은 넣지 않음)
+        static_prefix = f"""
 {system_prompt}
 
 {preset_prompt}
 
-사용자 요청: {user_request}
-
 {reference_content}
 
 {library_content}
@@ -385,7 +707,7 @@ class HTMLDesigner:
 ```
         """.strip()
         
-        return full_prompt
+        return static_prefix
     
     def _get_max_tokens_for_model(self, model: str) -> int:
         """모델별 최대 토큰 수 반환"""
@@ -418,17 +740,15 @@ class HTMLDesigner:
         # 기본값 (안전한 크기)
         return 16384
 
-    def generate_html(self, user_request: Optional[str] = None) -> tuple[str, Dict[str, Any]]:
-        """
-        HTML 교재 생성 (파일 직접 전달 방식)
-        
-        Args:
-            user_request: 사용자 요청. None이면 config에서 가져옴
-            
-        Returns:
-            tuple: (생성된 HTML 코드, 응답 메타데이터)
-        """
+    def _prepare_generation(self, user_request: Optional[str],
+                            options: Optional[GenerationOptions]) -> Dict[str, Any]:
+        """요청 결정, 참조/라이브러리/첨부 파일 로드, 프롬프트 구성 (동기/비동기 생성 공통)"""
+        options = options or GenerationOptions()
+        ai_settings = self.config.get("ai_settings", {})
+
         # 사용자 요청 결정
+        if user_request is None:
+            user_request = options.user_request
         if user_request is None:
             user_request = self.config.get("prompts", {}).get("user_prompt", "")
             
@@ -443,77 +763,181 @@ class HTMLDesigner:
         # library 파일 로드
         library_files = self._load_library_files()
         
-        # input 폴더의 파일들 찾기
-        input_files = self._find_input_files()
+        # 첨부 파일: 요청에 지정된 경로, 없으면 input 폴더 탐색
+        if options.input_files is not None:
+            if self.config.get("file_processing", {}).get("enable_direct_file_attachment", True):
+                input_files = self._filter_input_files(options.input_files)
+            else:
+                input_files = []
+        else:
+            input_files = self._find_input_files()
         
-        # 프롬프트 구성 (파일 직접 전달 방식)
-        prompt = self._build_prompt(user_request, references, library_files)
+        # 프롬프트 구성: 고정 prefix는 system으로 보내 provider prompt cache 적용
+        # (ai_settings.prompt_cache가 false면 예전처럼 한 메시지로)
+        static_prefix, request_suffix = self._build_prompt_parts(user_request, references, library_files)
+        prompt_cache = ai_settings.get("prompt_cache", True)
         
         # 모델 및 최대 토큰 설정
-        model = self.config.get("ai_settings", {}).get("model", "smart")
+        model = options.model or ai_settings.get("model", "smart")
+        temperature = options.temperature if options.temperature is not None else ai_settings.get("temperature", 1.0)
         max_tokens = self._get_max_tokens_for_model(model)
         
         self.logger.info(f"🤖 사용 모델: {model}")
         self.logger.info(f"🔢 최대 토큰: {max_tokens:,}")
         self.logger.info(f"📁 첨부할 파일 수: {len(input_files)}")
+
+        return {
+            "user_request": user_request,
+            "input_files": input_files,
+            "chat_args": {
+                "system": static_prefix if prompt_cache else None,
+                "cache_system": prompt_cache,
+                "model": model,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                # 파일 경로를 문자열 리스트로 변환 (파일들을 직접 첨부)
+                "files": [str(file_path) for file_path in input_files] if input_files else None,
+            },
+            "prompt": request_suffix if prompt_cache else f"{static_prefix}\n\n{request_suffix}",
+        }
+
+    def _generation_metadata(self, plan: Dict[str, Any], response_text: str, model: str, cost: float,
+                             tokens_used: int, cached_tokens: int) -> Dict[str, Any]:
+        """생성 결과 메타데이터 (일반/스트리밍 생성 공통)"""
+        input_files = plan["input_files"]
+        metadata = {
+            "model": model,
+            "cost": cost,
+            "tokens_used": tokens_used,
+            "cached_tokens": cached_tokens,
+            "timestamp": datetime.now().isoformat(),
+            "user_request": plan["user_request"],
+            "attached_files": len(input_files),
+            "file_list": [f.name for f in input_files] if input_files else [],
+            "success": True,
+            "raw_response": response_text[:500] + "..." if len(response_text) > 500 else response_text
+        }
         
-        try:
-            # 파일 경로를 문자열 리스트로 변환
-            file_paths = [str(file_path) for file_path in input_files] if input_files else None
+        self.logger.info(f"✅ HTML 생성 완료")
+        self.logger.info(f"💰 비용: ${cost:.6f}")
+        self.logger.info(f"🔢 토큰: {tokens_used} (캐시 적중 {cached_tokens})")
+        self.logger.info(f"📁 첨부된 파일: {metadata['attached_files']}개")
+        return metadata
+
+    def _finish_generation(self, plan: Dict[str, Any], response) -> tuple[str, Dict[str, Any]]:
+        """AI 응답에서 HTML 추출 및 메타데이터 수집 (동기/비동기 생성 공통)"""
+        # HTML 코드 추출 (응답 전문은 서버 로그에 남기지 않고 길이만 기록)
+        html_content = self._extract_html_from_response(response.text)
+        self.logger.debug(f"🤖 AI 응답 {len(response.text or ''):,}자 → 추출된 HTML {len(html_content):,}자")
+
+        metadata = self._generation_metadata(plan, response.text, response.model, response.cost,
+                                             getattr(response.usage, 'total_tokens', 0),
+                                             getattr(response.usage, 'cached_tokens', 0))
+        
+        return html_content, metadata
+
+    def generate_html(self, user_request: Optional[str] = None,
+                      options: Optional[GenerationOptions] = None) -> tuple[str, Dict[str, Any]]:
+        """
+        HTML 교재 생성 (파일 직접 전달 방식)
+        
+        Args:
+            user_request: 사용자 요청. None이면 config에서 가져옴
+            options: 요청 단위 옵션 (self.config는 읽기만 함)
             
+        Returns:
+            tuple: (생성된 HTML 코드, 응답 메타데이터)
+        """
+        plan = self._prepare_generation(user_request, options)
+        try:
             # AI로 HTML 생성 (파일 직접 첨부)
-            response = self.ai.chat(
-                prompt,
-                model=model,
-                temperature=self.config.get("ai_settings", {}).get("temperature", 1.0),
-                max_tokens=max_tokens,
-                files=file_paths  # 파일들을 직접 첨부
-            )
-            
-            # AI 응답 출력 (디버깅 및 확인용)
-            print("\n" + "="*60)
-            print("🤖 AI 원본 응답:")
-            print("="*60)
-            print(response.text)
-            print("="*60)
-            
-            # HTML 코드 추출
-            html_content = self._extract_html_from_response(response.text)
-            
-            # 추출된 HTML 미리보기
-            print(f"\n📄 추출된 HTML 미리보기 (처음 200자):")
-            print(html_content[:200] + "..." if len(html_content) > 200 else html_content)
-            
-            # 메타데이터 수집
-            metadata = {
-                "model": response.model,
-                "cost": response.cost,
-                "tokens_used": getattr(response.usage, 'total_tokens', 0),
-                "timestamp": datetime.now().isoformat(),
-                "user_request": user_request,
-                "attached_files": len(input_files),
-                "file_list": [f.name for f in input_files] if input_files else [],
-                "success": True,
-                "raw_response": response.text[:500] + "..." if len(response.text) > 500 else response.text
-            }
-            
-            self.logger.info(f"✅ HTML 생성 완료")
-            self.logger.info(f"💰 비용: ${response.cost:.6f}")
-            self.logger.info(f"🔢 토큰: {metadata['tokens_used']}")
-            self.logger.info(f"📁 첨부된 파일: {metadata['attached_files']}개")
-            
+            response = self.ai.chat(plan["prompt"], **plan["chat_args"])
+            return self._finish_generation(plan, response)
+        except Exception as e:
+            self.logger.error(f"❌ HTML 생성 실패: {e}")
+            raise Exception(f"HTML 생성 실패: {e}") from e
+
+    async def agenerate_html(self, user_request: Optional[str] = None,
+                             options: Optional[GenerationOptions] = None) -> tuple[str, Dict[str, Any]]:
+        """
+        generate_html의 비동기 버전 (AI.async_chat 사용)
+
+        파일 로드/프롬프트 구성은 스레드에서, AI 호출은 이벤트 루프에서 기다리므로
+        하나의 루프에서 많은 생성을 동시에 진행할 수 있습니다.
+        """
+        plan = await asyncio.to_thread(self._prepare_generation, user_request, options)
+        try:
+            response = await self.ai.async_chat(plan["prompt"], **plan["chat_args"])
+            return self._finish_generation(plan, response)
+        except Exception as e:
+            self.logger.error(f"❌ HTML 생성 실패: {e}")
+            raise Exception(f"HTML 생성 실패: {e}") from e
+    
+    async def astream_html(self, user_request: Optional[str] = None,
+                           options: Optional[GenerationOptions] = None,
+                           on_html: Optional[Callable[[str], None]] = None) -> tuple[str, Dict[str, Any]]:
+        """
+        스트리밍 HTML 생성 (AI.stream_chat 사용)
+
+        응답이 도착하는 대로 HtmlFenceExtractor로 ```html 본문을 뽑아 on_html(조각)으로 넘기므로
+        전체 응답을 기다리지 않고 미리보기를 그릴 수 있습니다. 반환값은 generate_html과 같습니다.
+        예산 검사와 사용량 기록은 AI.stream_chat이 하고, 비용/토큰은 스트림 끝에 provider가 알려준 값입니다.
+        """
+        plan = await asyncio.to_thread(self._prepare_generation, user_request, options)
+        extractor = HtmlFenceExtractor()
+        preview = _PreviewBuffer(on_html)
+        chunks: List[str] = []
+        started = time.monotonic()
+        first_html = None
+        completed: List[Any] = []
+        try:
+            async for chunk in self.ai.stream_chat(plan["prompt"], on_complete=completed.append,
+                                                   **plan["chat_args"]):
+                chunks.append(chunk)
+                html_chunk = extractor.feed(chunk)
+                if html_chunk and first_html is None:
+                    first_html = time.monotonic() - started
+                    self.logger.info(f"⚡ 첫 HTML 조각 수신: {first_html:.1f}초")
+                preview.push(html_chunk)
+            preview.push(extractor.finish())
+            preview.flush()
+
+            # provider 스트림은 예외 대신 "Error: ..." 조각으로 끝남
+            if chunks and chunks[-1].startswith("Error: ") and not extractor.closed:
+                raise RuntimeError(chunks[-1][len("Error: "):])
+
+            response_text = "".join(chunks)
+            if extractor.closed:
+                html_content = extractor.html.strip()
+            else:
+                html_content = self._extract_html_from_response(response_text)
+
+            response = completed[-1] if completed else None
+            model = response.model if response is not None and response.model else plan["chat_args"]["model"]
+            cost = response.cost if response is not None else 0.0
+            tokens_used = response.usage.total_tokens if response is not None else 0
+            cached_tokens = response.usage.cached_tokens if response is not None else 0
+            metadata = self._generation_metadata(plan, response_text, model, cost, tokens_used, cached_tokens)
+            metadata["streamed"] = True
+            metadata["first_html_seconds"] = round(first_html, 3) if first_html is not None else None
             return html_content, metadata
-            
         except Exception as e:
             self.logger.error(f"❌ HTML 생성 실패: {e}")
-            metadata = {
-                "error": str(e),
-                "timestamp": datetime.now().isoformat(),
-                "user_request": user_request,
-                "attached_files": len(input_files),
-                "success": False
-            }
             raise Exception(f"HTML 생성 실패: {e}") from e
+
+    def stream_html(self, user_request: Optional[str] = None,
+                    options: Optional[GenerationOptions] = None,
+                    on_html: Optional[Callable[[str], None]] = None) -> tuple[str, Dict[str, Any]]:
+        """
+        astream_html의 동기 버전 (공유 스트리밍 루프에서 실행하고 끝날 때까지 대기)
+
+        루프에서는 네트워크 대기만 하고, 첨부 파일 추출·예산 조회 같은 블로킹 작업은 스레드에서 실행하므로
+        한 작업의 준비가 다른 작업의 스트림을 멈추지 않습니다. on_html은 루프 스레드에서 호출되니 가볍게 유지합니다.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self.astream_html(user_request, options, on_html), _get_stream_loop()
+        )
+        return future.result()
     
     def _extract_html_from_response(self, response_text: str) -> str:
         """AI 응답에서 HTML 코드 추출"""
@@ -625,20 +1049,22 @@ class HTMLDesigner:
             self.logger.error(f"❌ 파일 저장 실패: {e}")
             raise
     
-    def generate_and_save(self, user_request: Optional[str] = None, filename: Optional[str] = None) -> Dict[str, Any]:
+    def generate_and_save(self, user_request: Optional[str] = None, filename: Optional[str] = None,
+                          options: Optional[GenerationOptions] = None) -> Dict[str, Any]:
         """
         HTML 생성 및 저장 통합 기능
         
         Args:
             user_request: 사용자 요청
             filename: 저장할 파일명
+            options: 요청 단위 옵션 (모델, temperature 등)
             
         Returns:
             실행 결과 딕셔너리
         """
         try:
             # HTML 생성
-            html_content, metadata = self.generate_html(user_request)
+            html_content, metadata = self.generate_html(user_request, options=options)
             
             # 파일 저장
             output_path = self.save_html(html_content, filename)
@@ -740,13 +1166,10 @@ def cli_mode():
         designer = HTMLDesigner(args.config)
         
         # 설정 오버라이드
-        if args.model:
-            designer.config["ai_settings"]["model"] = args.model
-        if args.temperature is not None:
-            designer.config["ai_settings"]["temperature"] = args.temperature
+        options = GenerationOptions(model=args.model, temperature=args.temperature)
         
         # HTML 생성
-        result = designer.generate_and_save(args.request, args.output)
+        result = designer.generate_and_save(args.request, args.output, options=options)
         
         if result.get("success", False):
             print(f"✅ 완료: {result['output_path']}")
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DevTools 프로토콜(CDP) 직접 연결 PDF 렌더러
+
+Selenium/chromedriver 없이 Headless Chrome/Chromium과 로컬 웹소켓으로 통신합니다.
+- 브라우저 프로세스는 워커당 하나를 오래 유지합니다
+- 렌더링마다 독립된 브라우저 컨텍스트(쿠키/스토리지 분리)와 탭을 만들고 닫습니다
+- 임시 HTML 파일 대신 Page.setDocumentContent로 문서를 주입합니다
+- Page.printToPDF(transferMode=ReturnAsStream) 결과를 IO.read로 청크 단위로 받아
+  디스크에 바로 기록하므로 PDF 전체를 메모리에 올리지 않습니다
+"""
+
+import json
+import time
+import atexit
+import base64
+import shutil
+import logging
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+try:
+    import websocket  # websocket-client
+    _WEBSOCKET_IMPORT_ERROR = None
+except ImportError as e:
+    websocket = None  # type: ignore[assignment]
+    _WEBSOCKET_IMPORT_ERROR = e
+
+from chrome_pool import find_chrome_binary
+from render_watchdog import BROWSER_MARKER_FLAG, RenderWatchdog, kill_process_tree
+from page_readiness import (
+    DEFAULT_DEADLINE_SECONDS,
+    DEFAULT_NETWORK_IDLE_MS,
+    SIGNALS,
+    ReadinessResult,
+    record_readiness,
+)
+
+logger = logging.getLogger(__name__)
+
+BROWSER_START_TIMEOUT = 15.0      # DevToolsActivePort 파일 대기 시간 (초)
+COMMAND_TIMEOUT = 60.0            # 단일 CDP 명령 응답 대기 시간 (초)
+STREAM_CHUNK_SIZE = 1024 * 1024   # IO.read 청크 크기 (바이트)
+
+# 문서 로드 → 웹폰트 → 이미지 decode 순으로 기다리고, 데드라인이 먼저 오면 'deadline' 반환
+_READINESS_EXPRESSION = """
+(async () => {
+    const times = {};
+    const started = performance.now();
+    const mark = (name) => { times[name] = (performance.now() - started) / 1000; };
+    const ready = (async () => {
+        if (document.readyState !== 'complete') {
+            await new Promise((resolve) => window.addEventListener('load', resolve, {once: true}));
+        }
+        mark('dom');
+        if (document.fonts) { await document.fonts.ready; }
+        mark('fonts');
+        await Promise.all(Array.from(document.images, (img) => img.decode().catch(() => null)));
+        mark('images');
+        return true;
+    })();
+    const deadline = new Promise((resolve) => setTimeout(() => resolve(false), %d));
+    const ok = await Promise.race([ready, deadline]);
+    return {ok, times};
+})()
+"""
+
+
+class CDPUnavailableError(RuntimeError):
+    """websocket-client 또는 Chrome 바이너리가 없어 CDP 렌더링을 할 수 없는 경우"""
+
+
+class CDPError(RuntimeError):
+    """CDP 명령이 오류를 반환한 경우"""
+
+
+def is_cdp_available() -> bool:
+    """CDP 백엔드 사용 가능 여부"""
+    return websocket is not None and find_chrome_binary() is not None
+
+
+class _CDPConnection:
+    """단일 웹소켓 위의 CDP 명령/이벤트 처리"""
+
+    def __init__(self, ws_url: str, timeout: float = COMMAND_TIMEOUT):
+        self.ws = websocket.create_connection(ws_url, timeout=timeout, suppress_origin=True)
+        self._next_id = 1
+        self.events: List[Dict[str, Any]] = []
+
+    def send(self, method: str, params: Optional[Dict[str, Any]] = None,
+             timeout: float = COMMAND_TIMEOUT) -> Dict[str, Any]:
+        message_id = self._next_id
+        self._next_id += 1
+        self.ws.send(json.dumps({'id': message_id, 'method': method, 'params': params or {}}))
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"CDP 응답 시간 초과: {method}")
+            self.ws.settimeout(remaining)
+            message = json.loads(self.ws.recv())
+            if message.get('id') == message_id:
+                if 'error' in message:
+                    raise CDPError(f"{method} 실패: {message['error'].get('message')}")
+                return message.get('result', {})
+            if 'method' in message:
+                self.events.append(message)
+
+    def pump(self, timeout: float) -> None:
+        """timeout 동안 도착한 이벤트를 버퍼에 수집"""
+        self.ws.settimeout(max(timeout, 0.001))
+        try:
+            message = json.loads(self.ws.recv())
+        except websocket.WebSocketTimeoutException:
+            return
+        if 'method' in message:
+            self.events.append(message)
+
+    def close(self) -> None:
+        try:
+            self.ws.close()
+        except Exception:
+            pass
+
+
+class CDPBrowser:
+    """워커 프로세스당 하나 유지하는 Headless Chrome 프로세스"""
+
+    def __init__(self):
+        if websocket is None:
+            raise CDPUnavailableError(f"websocket-client가 설치되어 있지 않습니다: {_WEBSOCKET_IMPORT_ERROR}")
+        self.binary = find_chrome_binary()
+        if not self.binary:
+            raise CDPUnavailableError("Chrome/Chromium 바이너리를 찾을 수 없습니다")
+
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._profile_dir: Optional[Path] = None
+        self._port: Optional[int] = None
+        self._browser_path: Optional[str] = None
+
+        self._metrics: Dict[str, float] = {
+            'browser_starts': 0,
+            'renders': 0,
+            'render_failures': 0,
+            'bytes_streamed': 0,
+            'render_seconds_total': 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # 브라우저 프로세스 관리
+    # ------------------------------------------------------------------
+    def _start(self) -> None:
+        self._profile_dir = Path(tempfile.mkdtemp(prefix='cdp_profile_'))
+        args = [
+            self.binary,
+            '--headless=new',
+            '--remote-debugging-port=0',
+            f'--user-data-dir={self._profile_dir}',
+            '--disable-gpu',
+            '--no-sandbox',
+            '--disable-dev-shm-usage',
+            '--disable-software-rasterizer',
+            '--disable-extensions',
+            '--no-first-run',
+            BROWSER_MARKER_FLAG,   # 고아 정리(render_watchdog) 대상 표식
+            'about:blank',
+        ]
+        started = time.monotonic()
+        self._process = subprocess.Popen(
+            args,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,  # 프로세스 그룹 단위로 정리할 수 있도록
+        )
+
+        port_file = self._profile_dir / 'DevToolsActivePort'
+        deadline = started + BROWSER_START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise CDPUnavailableError(f"Chrome 프로세스가 바로 종료되었습니다 (code={self._process.returncode})")
+            if port_file.exists():
+                lines = port_file.read_text().splitlines()
+                if len(lines) >= 2:
+                    self._port = int(lines[0])
+                    self._browser_path = lines[1]
+                    break
+            time.sleep(0.05)
+        else:
+            self._stop()
+            raise TimeoutError("Chrome DevTools 포트를 얻지 못했습니다")
+
+        self._metrics['browser_starts'] += 1
+        logger.info(
+            f"🚀 CDP Chrome 시작 (pid={self._process.pid}, port={self._port}, "
+            f"{time.monotonic() - started:.2f}초)"
+        )
+
+    def _stop(self) -> None:
+        if self._process is not None:
+            try:
+                self._process.terminate()
+                self._process.wait(timeout=5)
+            except Exception:
+                try:
+                    self._process.kill()
+                except Exception:
+                    pass
+        self._process = None
+        if self._profile_dir is not None:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+
+    def _kill(self) -> None:
+        """워치독용: 멈춘 브라우저를 프로세스 그룹째 강제 종료 (락 없이 호출, 다음 렌더링에서 재시작)"""
+        process = self._process
+        if process is not None:
+            kill_process_tree(process.pid)
+
+    def _ensure_running(self) -> None:
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                if self._process is not None:
+                    logger.warning("⚠️ CDP Chrome 프로세스가 종료되어 재시작합니다")
+                self._stop()
+                self._start()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid if self._process is not None else None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._stop()
+
+    # ------------------------------------------------------------------
+    # 렌더링
+    # ------------------------------------------------------------------
+    def render_pdf(
+        self,
+        html: str,
+        pdf_path: Path,
+        print_options: Dict[str, Any],
+        deadline: float = DEFAULT_DEADLINE_SECONDS,
+        network_idle_ms: int = DEFAULT_NETWORK_IDLE_MS,
+        watchdog: Optional[RenderWatchdog] = None,
+    ) -> int:
+        """
+        HTML을 PDF로 렌더링해 pdf_path에 스트리밍 저장
+
+        load / fonts / print 단계가 워치독 데드라인을 넘기면 브라우저를 종료하고 StageTimeout 발생
+
+        Returns:
+            기록한 PDF 바이트 수
+        """
+        watchdog = watchdog or RenderWatchdog()
+        self._ensure_running()
+        started = time.monotonic()
+        browser = _CDPConnection(f"ws://127.0.0.1:{self._port}{self._browser_path}")
+        context_id = None
+        target_id = None
+        page = None
+
+        try:
+            with watchdog.stage('load', self._kill):
+                context_id = browser.send('Target.createBrowserContext', {'disposeOnDetach': True})['browserContextId']
+                target_id = browser.send('Target.createTarget', {
+                    'url': 'about:blank',
+                    'browserContextId': context_id,
+                })['targetId']
+                page = _CDPConnection(f"ws://127.0.0.1:{self._port}/devtools/page/{target_id}")
+
+                page.send('Page.enable')
+                page.send('Network.enable')
+                frame_id = page.send('Page.getFrameTree')['frameTree']['frame']['id']
+                page.send('Page.setDocumentContent', {'frameId': frame_id, 'html': html})
+
+            with watchdog.stage('fonts', self._kill) as limit:
+                # 준비 대기 자체의 (소프트) 데드라인은 하드 데드라인보다 앞서도록 조정
+                self._wait_until_ready(page, min(deadline, limit * 0.8), network_idle_ms)
+
+            with watchdog.stage('print', self._kill):
+                options = dict(print_options)
+                options['transferMode'] = 'ReturnAsStream'
+                stream = page.send('Page.printToPDF', options)['stream']
+                written = self._stream_to_file(page, stream, pdf_path)
+
+            self._metrics['renders'] += 1
+            self._metrics['bytes_streamed'] += written
+            self._metrics['render_seconds_total'] += time.monotonic() - started
+            return written
+        except Exception:
+            self._metrics['render_failures'] += 1
+            raise
+        finally:
+            if page is not None:
+                page.close()
+            for method, params in (
+                ('Target.closeTarget', {'targetId': target_id} if target_id else None),
+                ('Target.disposeBrowserContext', {'browserContextId': context_id} if context_id else None),
+            ):
+                if params is None:
+                    continue
+                try:
+                    browser.send(method, params, timeout=5)
+                except Exception as err:
+                    logger.debug(f"CDP 정리 실패({method}): {err}")
+            browser.close()
+
+    def _wait_until_ready(self, page: _CDPConnection, deadline: float, network_idle_ms: int) -> ReadinessResult:
+        """문서/폰트/이미지 프로미스와 Network 이벤트 기반 유휴 상태 대기"""
+        started = time.monotonic()
+        hard_deadline = started + deadline
+
+        evaluation = page.send('Runtime.evaluate', {
+            'expression': _READINESS_EXPRESSION % int(deadline * 1000),
+            'awaitPromise': True,
+            'returnByValue': True,
+        }, timeout=deadline + 5)
+        value = evaluation.get('result', {}).get('value') or {}
+        signal_times: Dict[str, float] = dict(value.get('times') or {})
+
+        # Runtime.evaluate 대기 중 쌓인 이벤트까지 포함해 진행 중 요청 추적
+        inflight = set()
+        last_activity = time.monotonic()
+        consumed = 0
+        idle_seconds = network_idle_ms / 1000.0
+        while True:
+            for event in page.events[consumed:]:
+                method = event.get('method', '')
+                request_id = event.get('params', {}).get('requestId')
+                if method == 'Network.requestWillBeSent' and request_id:
+                    inflight.add(request_id)
+                    last_activity = time.monotonic()
+                elif method in ('Network.loadingFinished', 'Network.loadingFailed') and request_id:
+                    inflight.discard(request_id)
+                    last_activity = time.monotonic()
+            consumed = len(page.events)
+
+            now = time.monotonic()
+            if not inflight and now - last_activity >= idle_seconds:
+                signal_times['network'] = now - started
+                break
+            if now >= hard_deadline:
+                break
+            page.pump(min(0.05, hard_deadline - now))
+
+        ready = bool(value.get('ok')) and len(signal_times) == len(SIGNALS)
+        result = ReadinessResult(
+            ready=ready,
+            ended_by=max(signal_times, key=signal_times.get) if ready else 'deadline',
+            elapsed=time.monotonic() - started,
+            signal_times=signal_times,
+            pending=set(SIGNALS) - set(signal_times),
+            inflight_requests=len(inflight),
+        )
+        record_readiness(result)
+        if not ready:
+            logger.warning(
+                f"⚠️ 페이지 준비 데드라인 도달 ({deadline:.1f}초, 미충족: {', '.join(sorted(result.pending))})"
+            )
+        return result
+
+    def _stream_to_file(self, page: _CDPConnection, stream: str, pdf_path: Path) -> int:
+        """IO.read로 PDF 스트림을 청크 단위로 읽어 파일에 기록"""
+        written = 0
+        try:
+            with open(pdf_path, 'wb') as f:
+                while True:
+                    chunk = page.send('IO.read', {'handle': stream, 'size': STREAM_CHUNK_SIZE})
+                    data = chunk.get('data', '')
+                    if data:
+                        payload = base64.b64decode(data) if chunk.get('base64Encoded') else data.encode('latin-1')
+                        f.write(payload)
+                        written += len(payload)
+                    if chunk.get('eof'):
+                        break
+        finally:
+            try:
+                page.send('IO.close', {'handle': stream}, timeout=5)
+            except Exception:
+                pass
+        return written
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._metrics)
+        stats['pid'] = self.pid
+        stats['running'] = self._process is not None and self._process.poll() is None
+        return stats
+
+
+_browser: Optional[CDPBrowser] = None
+_browser_lock = threading.Lock()
+
+
+def get_cdp_browser() -> CDPBrowser:
+    """프로세스 전역 CDP 브라우저 (lazy loading)"""
+    global _browser
+    if _browser is None:
+        with _browser_lock:
+            if _browser is None:
+                _browser = CDPBrowser()
+                atexit.register(_browser.shutdown)
+    return _browser
+
+
+def get_cdp_stats() -> Optional[Dict[str, Any]]:
+    """브라우저가 생성된 경우에만 지표 반환"""
+    return _browser.get_stats() if _browser is not None else None
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless Chrome 세션 풀
+
+PDF 변환마다 webdriver.Chrome을 새로 띄우면 브라우저 콜드 스타트가
+지연 시간의 대부분을 차지하고 메모리 사용량이 크게 출렁입니다.
+이 모듈은 오래 유지되는 Chrome 세션을 제한된 개수만큼 보관하고,
+렌더링마다 대여(lease)했다가 초기화 후 반납받습니다.
+
+- 반납 시 새 빈 탭으로 교체하고 쿠키/스토리지를 비웁니다
+- 대여 전 헬스 체크로 죽은 세션을 걸러냅니다
+- N회 렌더링 또는 메모리 상한 초과 시 세션을 재생성합니다
+- 풀 크기, 재생성 정책, 대여 대기 시간은 환경 변수로 조정합니다
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    _SELENIUM_IMPORT_ERROR = None
+except ImportError as e:
+    webdriver = None  # type: ignore[assignment]
+    Options = None  # type: ignore[assignment]
+    _SELENIUM_IMPORT_ERROR = e
+
+try:
+    import psutil  # type: ignore
+except ImportError:
+    psutil = None  # type: ignore[assignment]
+
+from render_watchdog import BROWSER_MARKER_FLAG
+
+logger = logging.getLogger(__name__)
+
+# Render/클라우드 환경에서 확인할 Chromium 바이너리 경로 (우선순위 순서)
+CHROME_BINARY_CANDIDATES = [
+    '/usr/bin/chromium-browser',
+    '/usr/bin/chromium',
+    '/usr/bin/google-chrome',
+]
+
+# 반납 시 비울 스토리지 종류 (HTTP 캐시는 폰트 재사용을 위해 유지)
+_STORAGE_TYPES_TO_CLEAR = (
+    'cookies,local_storage,session_storage,indexeddb,websql,'
+    'cache_storage,service_workers'
+)
+
+
+class ChromePoolUnavailableError(RuntimeError):
+    """Selenium이 설치되어 있지 않아 풀을 사용할 수 없는 경우"""
+
+
+class ChromePoolTimeout(RuntimeError):
+    """대여 대기 시간 안에 사용 가능한 세션을 얻지 못한 경우"""
+
+
+def find_chrome_binary() -> Optional[str]:
+    """설치된 Chrome/Chromium 바이너리 경로 탐색"""
+    env_binary = os.getenv('CHROME_BINARY')
+    if env_binary and os.path.exists(env_binary):
+        return env_binary
+    for candidate in CHROME_BINARY_CANDIDATES:
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass
+class ChromePoolConfig:
+    """풀 크기 및 재생성 정책"""
+    size: int = 1                   # 동시에 유지할 최대 세션 수
+    max_renders: int = 50           # 세션당 최대 렌더링 횟수 (초과 시 재생성)
+    max_memory_mb: float = 600.0    # 세션 프로세스 트리 메모리 상한 (0이면 비활성)
+    lease_timeout: float = 30.0     # 대여 대기 최대 시간 (초)
+    max_idle_seconds: float = 600.0  # 유휴 세션 최대 보관 시간 (0이면 무제한)
+
+    @classmethod
+    def from_env(cls) -> 'ChromePoolConfig':
+        """환경 변수에서 설정 로드"""
+        return cls(
+            size=max(1, _env_int('CHROME_POOL_SIZE', cls.size)),
+            max_renders=max(1, _env_int('CHROME_POOL_MAX_RENDERS', cls.max_renders)),
+            max_memory_mb=_env_float('CHROME_POOL_MAX_MEMORY_MB', cls.max_memory_mb),
+            lease_timeout=_env_float('CHROME_POOL_LEASE_TIMEOUT', cls.lease_timeout),
+            max_idle_seconds=_env_float('CHROME_POOL_MAX_IDLE_SECONDS', cls.max_idle_seconds),
+        )
+
+
+class ChromeSession:
+    """풀에서 관리하는 단일 Chrome 세션"""
+
+    def __init__(self, driver, session_id: int):
+        self.driver = driver
+        self.session_id = session_id
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self.render_count = 0
+        self.broken = False
+
+    @property
+    def service_pid(self) -> Optional[int]:
+        """chromedriver 프로세스 PID (Chrome 프로세스들의 부모)"""
+        try:
+            return self.driver.service.process.pid
+        except Exception:
+            return None
+
+    def mark_broken(self) -> None:
+        """렌더링 중 오류가 나서 재사용하면 안 되는 세션으로 표시"""
+        self.broken = True
+
+    def is_healthy(self) -> bool:
+        """브라우저가 응답하는지 확인"""
+        try:
+            return self.driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    def memory_mb(self) -> Optional[float]:
+        """chromedriver와 모든 Chrome 자식 프로세스의 RSS 합계 (MB)"""
+        pid = self.service_pid
+        if psutil is None or pid is None:
+            return None
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+            total = 0
+            for proc in processes:
+                try:
+                    total += proc.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            return total / (1024 * 1024)
+        except Exception:
+            return None
+
+    def reset(self) -> None:
+        """다음 작업을 위해 새 빈 탭으로 교체하고 스토리지를 비움"""
+        driver = self.driver
+        old_handles = list(driver.window_handles)
+        driver.switch_to.new_window('tab')
+        fresh_handle = driver.current_window_handle
+        for handle in old_handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(fresh_handle)
+
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        for origin in ('file://', 'null'):
+            try:
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {
+                    'origin': origin,
+                    'storageTypes': _STORAGE_TYPES_TO_CLEAR,
+                })
+            except Exception as err:
+                logger.debug(f"스토리지 초기화 건너뜀({origin}): {err}")
+
+    def quit(self) -> None:
+        """브라우저 종료 (오류 무시)"""
+        try:
+            self.driver.quit()
+        except Exception as err:
+            logger.debug(f"Chrome 세션 종료 실패(#{self.session_id}): {err}")
+
+
+class ChromePool:
+    """제한된 크기의 장수명 Headless Chrome 세션 풀"""
+
+    def __init__(self, config: Optional[ChromePoolConfig] = None):
+        if webdriver is None:
+            raise ChromePoolUnavailableError(
+                f"Selenium이 설치되어 있지 않습니다: {_SELENIUM_IMPORT_ERROR}"
+            )
+
+        self.config = config or ChromePoolConfig.from_env()
+        self._condition = threading.Condition()
+        self._idle: List[ChromeSession] = []
+        self._total = 0          # 현재 살아 있는 세션 수 (대여 중 + 유휴)
+        self._next_id = 1
+        self._closed = False
+
+        self._metrics: Dict[str, float] = {
+            'sessions_created': 0,
+            'sessions_recycled': 0,
+            'session_start_failures': 0,
+            'health_check_failures': 0,
+            'reset_failures': 0,
+            'leases': 0,
+            'lease_timeouts': 0,
+            'lease_wait_seconds_total': 0.0,
+            'lease_wait_seconds_max': 0.0,
+            'session_start_seconds_total': 0.0,
+        }
+
+        logger.info(
+            "🧰 Chrome 풀 구성: size=%s, max_renders=%s, max_memory_mb=%s, lease_timeout=%ss",
+            self.config.size, self.config.max_renders,
+            self.config.max_memory_mb, self.config.lease_timeout
+        )
+
+    # ------------------------------------------------------------------
+    # 세션 생성/폐기
+    # ------------------------------------------------------------------
+    def _build_options(self):
+        """Headless Chrome 옵션 구성"""
+        chrome_options = Options()
+        chrome_options.add_argument('--headless')  # 백그라운드 실행
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-software-rasterizer')
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--no-first-run')
+        chrome_options.add_argument(BROWSER_MARKER_FLAG)  # 고아 정리(render_watchdog) 대상 표식
+
+        # 페이지 준비 대기(page_readiness)가 CDP Network 이벤트를 읽을 수 있도록 성능 로그 활성화
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        chrome_options.add_experimental_option('perfLoggingPrefs', {
+            'enableNetwork': True,
+            'enablePage': False,
+        })
+
+        chrome_binary = find_chrome_binary()
+        if chrome_binary:
+            chrome_options.binary_location = chrome_binary
+            logger.info(f"Chrome 바이너리 경로 설정: {chrome_binary}")
+        return chrome_options
+
+    def _start_session(self) -> ChromeSession:
+        """새 Chrome 세션 시작 (락 밖에서 호출)"""
+        started = time.monotonic()
+        driver = webdriver.Chrome(options=self._build_options())
+        elapsed = time.monotonic() - started
+
+        with self._condition:
+            session = ChromeSession(driver, self._next_id)
+            self._next_id += 1
+            self._metrics['sessions_created'] += 1
+            self._metrics['session_start_seconds_total'] += elapsed
+
+        logger.info(f"🚀 Chrome 세션 #{session.session_id} 시작 ({elapsed:.2f}초)")
+        return session
+
+    def _discard(self, session: ChromeSession, reason: str) -> None:
+        """세션 폐기 후 빈 자리를 대기자에게 알림"""
+        logger.info(f"♻️ Chrome 세션 #{session.session_id} 재생성 대상: {reason}")
+        session.quit()
+        with self._condition:
+            self._total -= 1
+            self._metrics['sessions_recycled'] += 1
+            self._condition.notify()
+
+    def _recycle_reason(self, session: ChromeSession) -> Optional[str]:
+        """재생성이 필요한 이유 반환 (필요 없으면 None)"""
+        if session.broken:
+            return "렌더링 오류"
+        if session.render_count >= self.config.max_renders:
+            return f"렌더링 {session.render_count}회 도달"
+        if self.config.max_memory_mb > 0:
+            memory = session.memory_mb()
+            if memory is not None and memory > self.config.max_memory_mb:
+                return f"메모리 {memory:.0f}MB > {self.config.max_memory_mb:.0f}MB"
+        return None
+
+    # ------------------------------------------------------------------
+    # 대여/반납
+    # ------------------------------------------------------------------
+    def _acquire(self) -> ChromeSession:
+        deadline = time.monotonic() + self.config.lease_timeout
+        wait_started = time.monotonic()
+
+        while True:
+            candidate: Optional[ChromeSession] = None
+            should_start = False
+
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise ChromePoolUnavailableError("Chrome 풀이 종료되었습니다")
+                    if self._idle:
+                        candidate = self._idle.pop()
+                        break
+                    if self._total < self.config.size:
+                        self._total += 1  # 자리 예약 후 락 밖에서 시작
+                        should_start = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._metrics['lease_timeouts'] += 1
+                        raise ChromePoolTimeout(
+                            f"{self.config.lease_timeout:.0f}초 안에 Chrome 세션을 대여하지 못했습니다"
+                        )
+                    self._condition.wait(remaining)
+
+            if should_start:
+                try:
+                    candidate = self._start_session()
+                except Exception:
+                    with self._condition:
+                        self._total -= 1
+                        self._metrics['session_start_failures'] += 1
+                        self._condition.notify()
+                    raise
+            else:
+                idle_for = time.monotonic() - candidate.last_used_at
+                if self.config.max_idle_seconds > 0 and idle_for > self.config.max_idle_seconds:
+                    self._discard(candidate, f"{idle_for:.0f}초 유휴")
+                    continue
+                if not candidate.is_healthy():
+                    with self._condition:
+                        self._metrics['health_check_failures'] += 1
+                    self._discard(candidate, "헬스 체크 실패")
+                    continue
+
+            waited = time.monotonic() - wait_started
+            with self._condition:
+                self._metrics['leases'] += 1
+                self._metrics['lease_wait_seconds_total'] += waited
+                self._metrics['lease_wait_seconds_max'] = max(
+                    self._metrics['lease_wait_seconds_max'], waited
+                )
+            return candidate
+
+    def _release(self, session: ChromeSession) -> None:
+        session.render_count += 1
+        session.last_used_at = time.monotonic()
+
+        reason = self._recycle_reason(session)
+        if reason is None:
+            try:
+                session.reset()
+            except Exception as err:
+                with self._condition:
+                    self._metrics['reset_failures'] += 1
+                reason = f"탭 초기화 실패: {err}"
+
+        if reason is not None or self._closed:
+            self._discard(session, reason or "풀 종료")
+            return
+
+        with self._condition:
+            self._idle.append(session)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self):
+        """
+        Chrome 세션 대여
+
+        블록 안에서 예외가 발생하면 세션을 폐기하고 다시 던집니다.
+        """
+        session = self._acquire()
+        try:
+            yield session
+        except BaseException:
+            session.mark_broken()
+            raise
+        finally:
+            self._release(session)
+
+    # ------------------------------------------------------------------
+    # 상태/종료
+    # ------------------------------------------------------------------
+    def get_stats(self) -> Dict[str, Any]:
+        """풀 상태 및 누적 지표"""
+        with self._condition:
+            stats: Dict[str, Any] = dict(self._metrics)
+            stats.update({
+                'size': self.config.size,
+                'max_renders': self.config.max_renders,
+                'max_memory_mb': self.config.max_memory_mb,
+                'lease_timeout': self.config.lease_timeout,
+                'sessions_alive': self._total,
+                'sessions_idle': len(self._idle),
+                'sessions_in_use': self._total - len(self._idle),
+            })
+        leases = stats['leases']
+        stats['lease_wait_seconds_avg'] = (
+            stats['lease_wait_seconds_total'] / leases if leases else 0.0
+        )
+        return stats
+
+    def shutdown(self) -> None:
+        """유휴 세션 전부 종료 (대여 중인 세션은 반납 시 종료)"""
+        with self._condition:
+            self._closed = True
+            idle_sessions = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle_sessions)
+            self._condition.notify_all()
+        for session in idle_sessions:
+            session.quit()
+        if idle_sessions:
+            logger.info(f"🛑 Chrome 풀 종료: 세션 {len(idle_sessions)}개 정리")
+
+
+_pool: Optional[ChromePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_chrome_pool() -> ChromePool:
+    """프로세스 전역 Chrome 풀 (lazy loading)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ChromePool()
+                atexit.register(_pool.shutdown)
+    return _pool
+
+
+def get_chrome_pool_stats() -> Optional[Dict[str, Any]]:
+    """풀이 생성된 경우에만 지표 반환"""
+    return _pool.get_stats() if _pool is not None else None
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+긴 첨부 자료에서 사용자 요청과 관련된 부분만 골라 프롬프트 예산에 담기
+
+예전에는 예산을 넘는 첨부 파일을 앞에서부터 잘라(cleaned[:allowance]) 모델이 늘 문서의 첫 몇 쪽만
+보았습니다. 이 모듈은 네트워크 호출 없이 다음을 수행합니다.
+- 추출된 Markdown을 제목(#)과 빈 줄 기준으로 구간(chunk)으로 나눔
+- 사용자 요청을 질의로 BM25 점수 계산 (한글은 어절 + 음절 바이그램으로 토큰화해 조사가 붙어도 일치)
+- 점수가 높은 구간부터 예산에 맞게 고르고, 남는 예산은 고른 구간의 이웃 → 문서 앞쪽 순으로 채움
+- 프롬프트에는 원래 문서 순서로 배치
+
+질의와 겹치는 단어가 없으면 None을 돌려주고 호출 측은 기존처럼 앞부분을 사용합니다.
+"""
+
+import re
+import math
+import time
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHUNK_MAX_CHARS = 800          # 구간 하나의 최대 길이 (예산 4,000자 기준 약 5개)
+BM25_K1 = 1.5
+BM25_B = 0.75
+GAP_MARKER = "\n...(중략)...\n"
+# 구간 하나가 발췌에 더하는 최대 부가 길이: 앞의 (중략) 표시와 문단 구분("\n\n") 두 개
+_CHUNK_OVERHEAD = len(GAP_MARKER.strip()) + 4
+
+_TOKEN = re.compile(r'[가-힣]+|[0-9a-zA-Z]+')
+_HEADING = re.compile(r'^#{1,6}\s')
+
+_stats_lock = threading.Lock()
+_stats = {
+    'ranked': 0,              # 관련 구간을 골라 담은 첨부 파일 수
+    'no_match': 0,            # 질의와 겹치는 단어가 없어 앞부분을 쓴 경우
+    'chunks_considered': 0,
+    'chunks_selected': 0,
+    'chunks_filled': 0,       # 점수와 무관하게 남는 예산을 채운 구간 수
+    'seconds': 0.0,
+}
+
+
+@dataclass
+class Chunk:
+    """문서 구간 (index: 문서 내 순서)"""
+    index: int
+    text: str
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    검색용 토큰 (소문자 영숫자 단어, 한글 어절과 음절 바이그램)
+
+    '분수를', '분수의'처럼 조사가 붙은 어절도 바이그램 '분수'로 질의와 일치합니다.
+    """
+    tokens: List[str] = []
+    for word in _TOKEN.findall(text.lower()):
+        tokens.append(word)
+        if len(word) > 2 and '가' <= word[0] <= '힣':
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def _split_long(block: str, max_chars: int) -> List[str]:
+    """한 문단이 max_chars를 넘으면 줄/문장 경계 우선으로 나눔"""
+    pieces: List[str] = []
+    while len(block) > max_chars:
+        cut = block.rfind('\n', 0, max_chars)
+        if cut < max_chars // 2:
+            cut = block.rfind('. ', 0, max_chars)
+            cut = cut + 1 if cut >= max_chars // 2 else max_chars
+        pieces.append(block[:cut].strip())
+        block = block[cut:].strip()
+    if block:
+        pieces.append(block)
+    return pieces
+
+
+def split_sections(markdown: str, max_chars: int = CHUNK_MAX_CHARS) -> List[Chunk]:
+    """제목과 빈 줄 기준으로 문단을 모아 max_chars 이하 구간으로 분할 (제목에서 새 구간 시작)"""
+    chunks: List[Chunk] = []
+    current: List[str] = []
+    size = 0
+
+    def flush():
+        nonlocal current, size
+        if current:
+            chunks.append(Chunk(len(chunks), "\n\n".join(current)))
+        current, size = [], 0
+
+    for block in re.split(r'\n\s*\n', markdown):
+        block = block.strip()
+        if not block:
+            continue
+        if _HEADING.match(block):
+            flush()
+        for piece in _split_long(block, max_chars):
+            if current and size + len(piece) + 2 > max_chars:
+                flush()
+            current.append(piece)
+            size += len(piece) + 2
+    flush()
+    return chunks
+
+
+class BM25:
+    """Okapi BM25 (문서 = 구간)"""
+
+    def __init__(self, documents: List[List[str]], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(tokens) for tokens in documents]
+        self.lengths = [len(tokens) for tokens in documents]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        doc_freq: Counter = Counter()
+        for freqs in self.term_freqs:
+            doc_freq.update(freqs.keys())
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()
+        }
+
+    def scores(self, query: List[str]) -> List[float]:
+        terms = [term for term in set(query) if term in self.idf]
+        results: List[float] = []
+        for freqs, length in zip(self.term_freqs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            score = 0.0
+            for term in terms:
+                tf = freqs.get(term, 0)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+def select_relevant(markdown: str, query: str, budget: int) -> Optional[str]:
+    """
+    query와 관련 높은 구간을 budget 글자 안에 담아 문서 순서로 반환
+
+    관련 구간을 먼저 담고 남는 예산은 그 이웃과 앞쪽 구간으로 채웁니다.
+    건너뛴 부분은 '(중략)' 표시로 이어 붙입니다 (표시 길이도 예산에 포함).
+
+    Returns:
+        발췌 텍스트. 질의 토큰이 문서와 하나도 겹치지 않거나 담을 구간이 없으면 None
+    """
+    started = time.monotonic()
+    chunks = split_sections(markdown)
+    query_tokens = tokenize(query)
+    scores = BM25([tokenize(chunk.text) for chunk in chunks]).scores(query_tokens) if chunks else []
+
+    if not any(score > 0 for score in scores):
+        with _stats_lock:
+            _stats['no_match'] += 1
+        return None
+
+    selected: List[Chunk] = []
+    used = 0
+
+    def take(index: int) -> bool:
+        nonlocal used
+        cost = len(chunks[index].text) + _CHUNK_OVERHEAD
+        if used + cost > budget:
+            return False
+        selected.append(chunks[index])
+        used += cost
+        return True
+
+    # 점수 순(동점이면 앞쪽 구간)으로 예산에 들어가는 구간 선택
+    hits = set()
+    for index in sorted(range(len(chunks)), key=lambda i: (-scores[i], i)):
+        if scores[index] <= 0:
+            break
+        if take(index):
+            hits.add(index)
+    if not hits:
+        return None
+
+    # 남는 예산은 고른 구간의 바로 앞뒤 구간 → 나머지 구간을 문서 순서로 채움 (짧은 일치 하나만 보내지 않도록)
+    rest = [i for i in range(len(chunks)) if i not in hits]
+    rest.sort(key=lambda i: (0 if (i - 1 in hits or i + 1 in hits) else 1, i))
+    filled = sum(1 for index in rest if take(index))
+
+    selected.sort(key=lambda chunk: chunk.index)
+    parts: List[str] = []
+    previous = -1
+    for chunk in selected:
+        if chunk.index != previous + 1:
+            parts.append(GAP_MARKER.strip())
+        parts.append(chunk.text)
+        previous = chunk.index
+    excerpt = "\n\n".join(parts)
+
+    with _stats_lock:
+        _stats['ranked'] += 1
+        _stats['chunks_considered'] += len(chunks)
+        _stats['chunks_selected'] += len(hits)
+        _stats['chunks_filled'] += filled
+        _stats['seconds'] += time.monotonic() - started
+    logger.debug(f"첨부 자료 발췌: 구간 {len(selected)}/{len(chunks)}개, {len(excerpt)}자")
+    return excerpt
+
+
+def get_chunk_ranker_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['seconds'] = round(stats['seconds'], 3)
+    return stats
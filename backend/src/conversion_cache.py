@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+첨부 파일 Markdown 변환 캐시 (파일 내용 주소 기반)
+
+같은 교과서 단원 PDF를 프롬프트만 바꿔 일주일에 여러 번 올려도 MarkItDown이 매번 처음부터
+다시 파싱했습니다. 이 캐시는 변환 결과를 다음을 키로 보관합니다.
+- 파일 바이트의 SHA-256 (업로드는 스트리밍 중에 계산한 값을 그대로 사용)
+- 변환기 버전 (markitdown 패키지 버전 + CACHE_FORMAT). 버전이 바뀌면 자연히 적중하지 않음
+  앞부분만 읽은 결과는 호출 측이 넘긴 별도 변환기 이름(예: lazy-pypdf/60000)으로 구분
+
+Markdown은 gzip으로 압축해 objects/ab/<key>.md.gz에 저장하고, SQLite 인덱스(WAL)에
+크기/최근 접근 시각/적중 횟수를 기록합니다. 전체 압축 용량이나 항목 수가 상한을 넘으면
+오래 사용하지 않은 항목부터 삭제합니다 (LRU). 여러 gunicorn 워커가 같은 디렉토리를 써도 안전합니다.
+"""
+
+import os
+import gzip
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.getenv(
+    'PREPROCESS_CACHE_DIR', str(Path(tempfile.gettempdir()) / "html_designer" / "markdown_cache")
+))
+CACHE_MAX_MB = int(os.getenv('PREPROCESS_CACHE_MB', '256'))        # 0이면 캐시 사용 안 함
+CACHE_MAX_ENTRIES = int(os.getenv('PREPROCESS_CACHE_MAX_ENTRIES', '5000'))
+CACHE_FORMAT = 1                      # 저장 형식/후처리가 바뀌면 올려서 기존 항목 무효화
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversions (
+    key TEXT PRIMARY KEY,            -- SHA-256(변환기 버전 + 파일 SHA-256)
+    file_sha256 TEXT NOT NULL,
+    converter TEXT NOT NULL,
+    size INTEGER NOT NULL,           -- 압축된 Markdown 크기
+    markdown_size INTEGER NOT NULL,  -- 원래 Markdown 길이 (문자)
+    source_size INTEGER NOT NULL,    -- 원본 파일 크기
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_conversions_last_access ON conversions(last_access);
+"""
+
+
+def converter_version() -> str:
+    """캐시 키에 넣을 변환기 버전"""
+    try:
+        from importlib.metadata import version
+        markitdown_version = version('markitdown')
+    except Exception:
+        markitdown_version = 'unknown'
+    return f"markitdown-{markitdown_version}/v{CACHE_FORMAT}"
+
+
+class ConversionCache:
+    """파일 SHA-256 + 변환기 버전 → 압축 Markdown (여러 프로세스에서 동시에 사용)"""
+
+    def __init__(
+        self,
+        root_dir: Path = CACHE_DIR,
+        max_bytes: int = CACHE_MAX_MB * 1024 * 1024,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        converter: Optional[str] = None,
+    ):
+        self.root_dir = Path(root_dir)
+        self.objects_dir = self.root_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root_dir / "conversions.db"
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.converter = converter or converter_version()
+        self._local = threading.local()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'bytes_saved': 0,        # 적중으로 다시 파싱하지 않은 원본 파일 바이트
+            'markdown_served': 0,    # 적중으로 돌려준 Markdown 문자 수
+        }
+        self._stats_lock = threading.Lock()
+        self._open()
+
+    # ------------------------------------------------------------------
+    # SQLite
+    # ------------------------------------------------------------------
+    def _open(self) -> None:
+        try:
+            self._connect().executescript(_SCHEMA)
+        except sqlite3.DatabaseError as e:
+            # 캐시이므로 인덱스가 손상되면 객체 파일까지 비우고 새로 시작
+            logger.warning(f"⚠️ 변환 캐시 인덱스 손상, 비우고 다시 만듭니다: {e}")
+            self._local.conn = None
+            for suffix in ('', '-wal', '-shm'):
+                try:
+                    os.unlink(f"{self.db_path}{suffix}")
+                except OSError:
+                    pass
+            for path in self.objects_dir.glob('*/*'):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    class _Tx:
+        def __init__(self, conn: sqlite3.Connection):
+            self.conn = conn
+
+        def __enter__(self) -> sqlite3.Connection:
+            self.conn.execute('BEGIN IMMEDIATE')
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb):
+            self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+            return False
+
+    def _transaction(self) -> '_Tx':
+        return self._Tx(self._connect())
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    # ------------------------------------------------------------------
+    # 조회 / 저장
+    # ------------------------------------------------------------------
+    def key_for(self, file_sha256: str, converter: Optional[str] = None) -> str:
+        converter = converter or self.converter
+        return hashlib.sha256(f"{converter}\0{file_sha256}".encode('utf-8')).hexdigest()
+
+    def _object_path(self, key: str) -> Path:
+        return self.objects_dir / key[:2] / f"{key}.md.gz"
+
+    def get(self, file_sha256: str, converter: Optional[str] = None) -> Optional[str]:
+        """
+        캐시된 Markdown (없거나 파일이 사라졌으면 None). converter가 없으면 MarkItDown 변환 결과
+
+        인덱스 오류(잠금 시간 초과, 디스크 부족 등)도 캐시 미스로 처리합니다.
+        """
+        key = self.key_for(file_sha256, converter)
+        try:
+            row = self._connect().execute(
+                "SELECT source_size, markdown_size FROM conversions WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 변환 캐시 조회 실패({key[:12]}): {e}")
+            row = None
+        if row is None:
+            self._count('misses')
+            return None
+
+        try:
+            with gzip.open(self._object_path(key), 'rt', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, EOFError) as e:
+            logger.debug(f"변환 캐시 객체 읽기 실패({key[:12]}): {e}")
+            self._remove(key)
+            self._count('misses')
+            return None
+
+        try:
+            self._connect().execute(
+                "UPDATE conversions SET last_access = ?, hits = hits + 1 WHERE key = ?", (time.time(), key)
+            )
+        except sqlite3.Error as e:
+            # 접근 시각을 못 남겨도 읽은 내용은 유효
+            logger.debug(f"변환 캐시 접근 기록 실패({key[:12]}): {e}")
+        with self._stats_lock:
+            self._stats['hits'] += 1
+            self._stats['bytes_saved'] += row['source_size']
+            self._stats['markdown_served'] += row['markdown_size']
+        return text
+
+    def put(self, file_sha256: str, text: str, source_size: int, converter: Optional[str] = None) -> None:
+        """변환 결과 등록 (실패해도 변환 결과에는 영향 없음)"""
+        converter = converter or self.converter
+        key = self.key_for(file_sha256, converter)
+        target = self._object_path(key)
+        now = time.time()
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                    f.write(text)
+                with self._transaction() as conn:
+                    os.replace(tmp_path, target)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO conversions "
+                        "(key, file_sha256, converter, size, markdown_size, source_size, created, last_access, hits) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                        (key, file_sha256, converter, target.stat().st_size, len(text),
+                         source_size, now, now),
+                    )
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"⚠️ 변환 캐시 저장 실패({key[:12]}): {e}")
+            return
+        self._count('stores')
+        try:
+            self.evict()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 변환 캐시 정리 실패: {e}")
+
+    def _remove(self, key: str) -> None:
+        try:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM conversions WHERE key = ?", (key,))
+                try:
+                    self._object_path(key).unlink()
+                except OSError:
+                    pass
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 변환 캐시 항목 삭제 실패({key[:12]}): {e}")
+
+    # ------------------------------------------------------------------
+    # 정리
+    # ------------------------------------------------------------------
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """용량/개수 상한을 넘는 만큼 오래 사용하지 않은 항목 삭제. 삭제한 항목 수 반환"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        removed: List[str] = []
+        with self._transaction() as conn:
+            total, entries = conn.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM conversions"
+            ).fetchone()
+            if total <= max_bytes and entries <= self.max_entries:
+                return 0
+            for row in conn.execute("SELECT key, size FROM conversions ORDER BY last_access ASC").fetchall():
+                if total <= max_bytes and entries <= self.max_entries:
+                    break
+                conn.execute("DELETE FROM conversions WHERE key = ?", (row['key'],))
+                total -= row['size']
+                entries -= 1
+                removed.append(row['key'])
+            for key in removed:
+                try:
+                    self._object_path(key).unlink()
+                except OSError:
+                    pass
+        if removed:
+            self._count('evictions', len(removed))
+            logger.info(f"🧹 변환 캐시 정리: {len(removed)}개 삭제")
+        return len(removed)
+
+    def trim(self, target_bytes: int) -> int:
+        """디스크 부족 시 비상 정리: 캐시 용량을 target_bytes 이하로 줄이고 해제한 바이트 수 반환"""
+        before = self.get_stats()['cache_bytes']
+        self.evict(max_bytes=target_bytes)
+        return max(0, before - self.get_stats()['cache_bytes'])
+
+    def get_stats(self) -> Dict[str, Any]:
+        row = self._connect().execute(
+            "SELECT COUNT(*) AS entries, COALESCE(SUM(size), 0) AS size, "
+            "COALESCE(SUM(markdown_size), 0) AS markdown_size FROM conversions"
+        ).fetchone()
+        with self._stats_lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            stats = dict(self._stats)
+        stats.update({
+            'converter': self.converter,
+            'entries': row['entries'],
+            'cache_bytes': row['size'],
+            'markdown_chars': row['markdown_size'],
+            'max_bytes': self.max_bytes,
+            'max_entries': self.max_entries,
+            'hit_rate': round(stats['hits'] / lookups, 3) if lookups else 0.0,
+        })
+        return stats
+
+
+_cache: Optional[ConversionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_conversion_cache() -> Optional[ConversionCache]:
+    """프로세스 전역 변환 캐시 (PREPROCESS_CACHE_MB=0이거나 디렉토리를 쓸 수 없으면 None)"""
+    global _cache
+    if CACHE_MAX_MB <= 0:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = ConversionCache()
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning(f"⚠️ 변환 캐시 사용 불가: {e}")
+                    return None
+    return _cache
+
+
+def get_conversion_cache_stats() -> Dict[str, Any]:
+    """변환 캐시 지표 (캐시가 아직 열리지 않았으면 기본값)"""
+    if _cache is None:
+        return {'enabled': CACHE_MAX_MB > 0, 'hits': 0, 'misses': 0, 'entries': 0}
+    return _cache.get_stats()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+비동기 변환 작업 관리
+
+/api/convert는 AI 호출과 PDF 렌더링이 끝날 때까지 HTTP 연결을 붙잡고 있어 gunicorn timeout을
+300초로 늘려야 했고, 느린 요청 하나가 워커를 독점했습니다.
+- POST /api/jobs: 작업을 백그라운드 실행기(스레드 풀)에 넣고 작업 ID를 즉시 반환
+- 실행 중 단계(preprocess → generate → render)를 이벤트로 기록
+- 스트리밍 생성 중에는 HTML 조각을 html 이벤트로 기록 (실시간 미리보기, 작업이 끝나면 결과의 html로 대체해 삭제)
+- GET /api/jobs/<id>: 현재 상태 스냅샷, /api/jobs/<id>/events: Server-Sent Events 스트림
+- 같은 키(프롬프트+첨부파일 해시)의 작업이 실행 중이면 새로 실행하지 않고 그 작업에 합류
+  (더블 클릭, 같은 학습지를 동시에 올리는 수업 등). 동기 엔드포인트도 같은 경로를 사용
+- 끝난 작업은 JOB_TTL_SECONDS 후, 또는 JOB_MAX_FINISHED개를 넘으면 오래된 것부터 메모리에서 제거
+  (결과에 전체 HTML이 들어 있으므로 보관 개수도 제한)
+
+실행 방식 (CONVERT_JOB_MODE):
+- thread (기본): 작업마다 실행 스레드 하나 (동시 실행 = CONVERT_JOB_WORKERS)
+- async: 전용 이벤트 루프 스레드 하나에서 코루틴으로 실행. 대기 시간 대부분이 LLM 응답/브라우저
+  I/O이므로 스레드를 점유하지 않고 CONVERT_JOB_ASYNC_CONCURRENCY개까지 동시에 진행
+
+작업 상태는 프로세스 메모리에만 있으므로 단일 gunicorn 워커(스레드 여러 개) 구성을 전제로 합니다.
+"""
+
+import os
+import time
+import asyncio
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv('CONVERT_JOB_WORKERS', '2'))
+JOB_MAX_PENDING = int(os.getenv('CONVERT_JOB_MAX_PENDING', '32'))
+JOB_TTL_SECONDS = float(os.getenv('CONVERT_JOB_TTL', '3600'))
+JOB_MAX_FINISHED = int(os.getenv('CONVERT_JOB_MAX_FINISHED', '200'))
+JOB_MODE = os.getenv('CONVERT_JOB_MODE', 'thread').strip().lower()   # thread | async
+JOB_ASYNC_CONCURRENCY = int(os.getenv('CONVERT_JOB_ASYNC_CONCURRENCY', '64'))
+
+# 단계별 진행률 (프런트엔드 표시용 대략값)
+STAGE_PROGRESS = {
+    'queued': 0,
+    'preprocess': 10,
+    'generate': 30,
+    'render': 80,
+    'done': 100,
+}
+
+# 진행 상황 콜백: progress(stage, message)
+ProgressCallback = Callable[[str, str], None]
+
+# HTML 미리보기 콜백: preview(조각, reset). reset=True면 지금까지 받은 조각을 버림 (폴백 모델로 재시도)
+PreviewCallback = Callable[..., None]
+
+
+class JobQueueFull(Exception):
+    """대기 중인 변환 작업이 상한에 도달함"""
+
+
+class ConvertJob:
+    """변환 작업 하나의 상태와 이벤트 기록"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = 'queued'      # queued | running | done | failed
+        self.stage = 'queued'
+        self.created = time.time()
+        self.updated = self.created
+        self.finished: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.status_code: Optional[int] = None
+        self.events: List[Dict[str, Any]] = []
+        self.last_event_id = 0      # 이벤트 ID는 삭제된 이벤트가 있어도 계속 증가 (Last-Event-ID 이어받기)
+        self.key: Optional[str] = None
+        self.subscribers = 1        # 이 작업에 합류한 요청 수 (자신 포함)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ('done', 'failed')
+
+    def add_event(self, event_type: str, stage: str, message: str, data: Optional[Dict[str, Any]] = None) -> None:
+        self.updated = time.time()
+        self.last_event_id += 1
+        event = {
+            'id': self.last_event_id,
+            'type': event_type,
+            'stage': stage,
+            'progress': STAGE_PROGRESS.get(stage, 0),
+            'message': message,
+            'timestamp': self.updated,
+        }
+        if data is not None:
+            event['data'] = data
+        self.events.append(event)
+
+    def drop_preview_events(self) -> int:
+        """미리보기 html 이벤트 삭제 (끝난 작업은 결과에 전체 HTML이 있으므로 조각을 보관하지 않음)"""
+        kept = [event for event in self.events if event['type'] != 'html']
+        dropped = len(self.events) - len(kept)
+        self.events = kept
+        return dropped
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': STAGE_PROGRESS.get(self.stage, 0),
+            'created': self.created,
+            'updated': self.updated,
+            'result': self.result,
+            'status_code': self.status_code,
+            'subscribers': self.subscribers,
+        }
+
+
+class ConvertJobManager:
+    """스레드 풀에서 변환 작업을 실행하고 이벤트를 구독자에게 전달"""
+
+    def __init__(self, workers: int = JOB_WORKERS, max_pending: int = JOB_MAX_PENDING,
+                 mode: str = JOB_MODE, async_concurrency: int = JOB_ASYNC_CONCURRENCY):
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.mode = 'async' if mode == 'async' else 'thread'
+        self.async_concurrency = max(1, async_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='convert-job')
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._jobs: Dict[str, ConvertJob] = {}
+        self._inflight: Dict[str, ConvertJob] = {}   # 중복 제거 키 → 실행 중인 작업
+        self._cond = threading.Condition()
+        self._stats = {
+            'submitted': 0,
+            'coalesced': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'rejected': 0,
+            'expired': 0,
+            'preview_chunks': 0,
+        }
+
+    def submit(self, runner: Callable[..., Any], *args,
+               key: Optional[str] = None) -> Tuple[ConvertJob, bool]:
+        """
+        runner(*args, progress=콜백)을 백그라운드에서 실행
+
+        runner는 (응답 본문, HTTP 상태 코드)를 반환합니다. 400 이상이면 실패로 기록합니다.
+        코루틴 함수이면 이벤트 루프 스레드에서, 아니면 스레드 풀에서 실행합니다.
+        key가 같은 작업이 아직 끝나지 않았으면 새로 실행하지 않고 그 작업을 반환합니다.
+
+        Returns:
+            (작업, 기존 작업에 합류했는지 여부)
+        """
+        with self._cond:
+            self._purge_expired()
+            running = self._inflight.get(key) if key else None
+            if running is not None and not running.is_finished:
+                running.subscribers += 1
+                self._stats['coalesced'] += 1
+                logger.info(f"🔗 동일 변환 작업에 합류: {running.id[:8]} (요청 {running.subscribers}개)")
+                return running, True
+
+            pending = sum(1 for job in self._jobs.values() if not job.is_finished)
+            if pending >= self.max_pending:
+                self._stats['rejected'] += 1
+                raise JobQueueFull(f"대기 중인 변환 작업이 {pending}개로 상한에 도달했습니다")
+            job = ConvertJob()
+            job.key = key
+            job.add_event('stage', 'queued', '작업이 대기열에 등록되었습니다')
+            self._jobs[job.id] = job
+            if key:
+                self._inflight[key] = job
+            self._stats['submitted'] += 1
+
+        if asyncio.iscoroutinefunction(runner):
+            asyncio.run_coroutine_threadsafe(self._arun(job, runner, args), self._ensure_loop())
+        else:
+            self._executor.submit(self._run, job, runner, args)
+        logger.info(f"🗂️ 변환 작업 등록: {job.id[:8]} (대기 {pending + 1}개)")
+        return job, False
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """async 작업용 이벤트 루프 스레드 (처음 필요할 때 시작)"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='convert-job-loop', daemon=True).start()
+                self._loop = loop
+                logger.info(f"🔁 변환 작업 이벤트 루프 시작 (동시 실행 {self.async_concurrency}개)")
+            return self._loop
+
+    def _progress_callback(self, job: ConvertJob) -> ProgressCallback:
+        def progress(stage: str, message: str) -> None:
+            with self._cond:
+                job.stage = stage
+                job.add_event('stage', stage, message)
+                self._cond.notify_all()
+        return progress
+
+    def _preview_callback(self, job: ConvertJob) -> PreviewCallback:
+        def preview(chunk: str, reset: bool = False) -> None:
+            with self._cond:
+                job.add_event('html', job.stage, '', {'chunk': chunk, 'reset': reset})
+                self._stats['preview_chunks'] += 1
+                self._cond.notify_all()
+        return preview
+
+    def _mark_running(self, job: ConvertJob) -> None:
+        with self._cond:
+            job.status = 'running'
+            self._cond.notify_all()
+
+    def _failure(self, job: ConvertJob, error: Exception) -> Tuple[Dict[str, Any], int]:
+        logger.error(f"❌ 변환 작업 실패: {job.id[:8]} ({error})")
+        return {
+            'error': '변환 처리 중 오류가 발생했습니다.',
+            'code': 'CONVERSION_ERROR'
+        }, 500
+
+    def _run(self, job: ConvertJob, runner: Callable[..., Tuple[Dict[str, Any], int]], args: tuple) -> None:
+        self._mark_running(job)
+        started = time.monotonic()
+        try:
+            payload, status_code = runner(*args, progress=self._progress_callback(job),
+                                          preview=self._preview_callback(job))
+        except Exception as e:
+            payload, status_code = self._failure(job, e)
+        self._finish(job, payload, status_code, started)
+
+    async def _arun(self, job: ConvertJob, runner: Callable[..., Awaitable[Tuple[Dict[str, Any], int]]],
+                    args: tuple) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.async_concurrency)
+        async with self._semaphore:
+            self._mark_running(job)
+            started = time.monotonic()
+            try:
+                payload, status_code = await runner(*args, progress=self._progress_callback(job),
+                                                    preview=self._preview_callback(job))
+            except Exception as e:
+                payload, status_code = self._failure(job, e)
+            self._finish(job, payload, status_code, started)
+
+    def _finish(self, job: ConvertJob, payload: Dict[str, Any], status_code: int, started: float) -> None:
+        with self._cond:
+            job.result = payload
+            job.status_code = status_code
+            job.finished = time.time()
+            if job.key and self._inflight.get(job.key) is job:
+                del self._inflight[job.key]
+            job.drop_preview_events()
+            if status_code < 400:
+                job.status = 'done'
+                job.stage = 'done'
+                job.add_event('done', 'done', '변환이 완료되었습니다', payload)
+                self._stats['succeeded'] += 1
+            else:
+                job.status = 'failed'
+                job.add_event('failed', job.stage, payload.get('error', '변환에 실패했습니다'), payload)
+                self._stats['failed'] += 1
+            self._cond.notify_all()
+        logger.info(f"🗂️ 변환 작업 종료: {job.id[:8]} ({job.status}, {time.monotonic() - started:.1f}초)")
+
+    def get(self, job_id: str) -> Optional[ConvertJob]:
+        with self._cond:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[ConvertJob]:
+        """작업이 끝날 때까지 대기 (동기 엔드포인트용). 시간 초과 시 끝나지 않은 작업을 그대로 반환"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._purge_expired()
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job.is_finished:
+                    return job
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return job
+                self._cond.wait(remaining)
+
+    def wait_for_events(self, job_id: str, after: int, timeout: float) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        after 이후의 이벤트가 생길 때까지 최대 timeout초 대기
+
+        Returns:
+            (새 이벤트 목록, 작업 종료 여부)
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._purge_expired()
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return [], True
+                finished = job.is_finished
+                events = [event for event in job.events if event['id'] > after]
+                if events or finished:
+                    return events, finished
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return [], False
+                self._cond.wait(remaining)
+
+    def _purge_expired(self) -> None:
+        """끝난 지 JOB_TTL_SECONDS가 지났거나 JOB_MAX_FINISHED개를 넘는 오래된 끝난 작업 제거 (락 보유 상태에서 호출)"""
+        now = time.time()
+        finished = sorted((job for job in self._jobs.values() if job.finished is not None),
+                          key=lambda job: job.finished)
+        overflow = max(0, len(finished) - JOB_MAX_FINISHED)
+        expired = [job.id for index, job in enumerate(finished)
+                   if index < overflow or now - job.finished > JOB_TTL_SECONDS]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self._stats['expired'] += len(expired)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            statuses: Dict[str, int] = {}
+            for job in self._jobs.values():
+                statuses[job.status] = statuses.get(job.status, 0) + 1
+            stats = dict(self._stats)
+            stats.update({
+                'mode': self.mode,
+                'async_concurrency': self.async_concurrency,
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'max_finished': JOB_MAX_FINISHED,
+                'inflight_keys': len(self._inflight),
+                'jobs': statuses,
+            })
+            return stats
+
+
+_manager: Optional[ConvertJobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> ConvertJobManager:
+    """프로세스 전역 작업 관리자 (lazy loading)"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ConvertJobManager()
+    return _manager
+
+
+def get_job_stats() -> Dict[str, Any]:
+    """작업 관리자 지표 (아직 생성되지 않았으면 기본값)"""
+    if _manager is None:
+        return {'submitted': 0, 'coalesced': 0, 'mode': JOB_MODE, 'workers': JOB_WORKERS, 'jobs': {}}
+    return _manager.get_stats()
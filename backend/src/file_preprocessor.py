@@ -9,14 +9,29 @@ markitdown 패키지를 사용하여 다음 파일들을 처리합니다:
 - HTML, CSV, JSON, XML
 - ZIP 파일, EPub
 - YouTube URL 등
+
+웹 서버는 get_file_preprocessor()로 프로세스당 하나의 전처리기(MarkItDown 하나)를 재사용하고
+to_markdown()으로 Markdown 텍스트를 메모리에서 바로 받습니다.
+디렉토리 탐색과 .md 파일 저장은 입력/출력 디렉토리를 지정한 경우(CLI)에만 합니다.
+
+PDF/PPTX/이미지 OCR 변환은 CPU 연산 위주라 여러 파일을 차례로 변환하면 파일 수만큼 느려집니다.
+convert_files()는 spawn 프로세스 풀(워커마다 MarkItDown 하나를 미리 생성)에서 동시에 변환하고
+끝난 순서대로 결과를 돌려주며, 파일별 제한 시간을 넘기면 풀을 재시작합니다.
+변환 캐시(conversion_cache.py)가 있으면 같은 파일(SHA-256)은 다시 파싱하지 않습니다.
+프롬프트에 앞부분만 들어가는 경우(max_chars) PDF/텍스트는 페이지 단위로 읽다가 예산이 차면 멈춥니다.
 """
 
 import os
 import sys
 import json
+import time
+import queue
+import itertools
 import logging
+import threading
+import multiprocessing
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Iterator, Sequence, Tuple
 from datetime import datetime
 import shutil
 
@@ -27,6 +42,35 @@ except ImportError as e:
     MarkItDown = None  # type: ignore[assignment]
     _MARKITDOWN_IMPORT_ERROR = e
 
+from artifact_store import file_sha256
+from conversion_cache import ConversionCache, get_conversion_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+
+# 변환 프로세스 수: auto면 사용 가능한 코어 수(최대 4, 워커마다 MarkItDown 메모리), 0이면 현재 프로세스에서 차례로 변환
+_workers_env = os.getenv('PREPROCESS_WORKERS', 'auto').strip().lower()
+POOL_WORKERS = min(_available_cores(), 4) if _workers_env == 'auto' else int(_workers_env)
+FILE_TIMEOUT = float(os.getenv('PREPROCESS_FILE_TIMEOUT', '120'))
+MAX_TASKS_PER_CHILD = int(os.getenv('PREPROCESS_MAX_TASKS_PER_CHILD', '100'))
+
+# 글자 예산이 주어지면 MarkItDown 대신 앞에서부터 읽다가 멈추는 형식
+# (MarkItDown도 PDF는 평문으로 뽑으므로 품질 차이 없음, DOCX/PPTX는 표·제목 구조 때문에 MarkItDown 유지)
+LAZY_EXTRACT_SUFFIXES = {'.pdf', '.txt', '.md'}
+# 부분 추출 결과의 변환 캐시 키 (글자 예산마다 결과가 다르므로 예산을 포함)
+PARTIAL_CONVERTER = "lazy-pypdf/{max_chars}"
+_AI_MODULE_DIR = Path(__file__).parent.parent / "ai_api_module_v3"
+
+# 변환 결과: (원본 경로, Markdown 텍스트 또는 None, 실패 원인 또는 None)
+ConversionResult = Tuple[Path, Optional[str], Optional[BaseException]]
+
 
 class MarkItDownUnavailableError(RuntimeError):
     """markitdown 패키지가 준비되지 않은 경우 발생하는 예외"""
@@ -40,24 +84,262 @@ class MarkItDownUnavailableError(RuntimeError):
         self.original_error = original_error
 
 
+# ----------------------------------------------------------------------
+# 풀 워커 프로세스 (spawn으로 시작되므로 모듈 전역은 워커마다 따로 존재)
+# ----------------------------------------------------------------------
+_WORKER_MARKITDOWN = None
+_WORKER_STARTED = None
+
+
+def _init_worker(started=None) -> None:
+    """워커 시작 시 MarkItDown을 한 번만 생성 (변환기 등록, 선택 의존성 import 비용)"""
+    global _WORKER_MARKITDOWN, _WORKER_STARTED
+    _WORKER_MARKITDOWN = MarkItDown()
+    _WORKER_STARTED = started
+
+
+def _convert_job(task_id: int, source: str) -> str:
+    """워커에서 파일 하나를 Markdown으로 변환 (시작하면 task_id를 부모에게 알림)"""
+    if _WORKER_STARTED is not None:
+        _WORKER_STARTED.put(task_id)
+    result = _WORKER_MARKITDOWN.convert(source)
+    return (result.text_content if result else None) or ""
+
+
+class MarkdownConversionPool:
+    """spawn 프로세스 풀에서 MarkItDown 변환 (필요할 때 생성, 제한 시간 초과 시 재시작)"""
+
+    def __init__(self, workers: int = POOL_WORKERS, max_tasks_per_child: int = MAX_TASKS_PER_CHILD):
+        self.workers = max(1, workers)
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self._lock = threading.Lock()
+        self._pool = None
+        self._generation = 0
+        # 워커가 작업을 집으면 task_id를 보내는 Manager 큐 (종료된 워커가 잠금을 쥐고 죽어도 다른 워커에 영향 없음)
+        self._manager = None
+        self._started_queue = None
+        self._started_at: Dict[int, Optional[float]] = {}   # 진행 중인 task_id -> 시작 시각 (대기 중이면 None)
+        self._task_ids = itertools.count()
+        self._stats = {
+            'files': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'restarts': 0,
+        }
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # gunicorn 작업 스레드 상태를 물려받지 않도록 fork 대신 spawn
+                context = multiprocessing.get_context('spawn')
+                if self._manager is None:
+                    self._manager = context.Manager()
+                    self._started_queue = self._manager.Queue()
+                self._pool = context.Pool(
+                    processes=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self._started_queue,),
+                    maxtasksperchild=self.max_tasks_per_child,
+                )
+                self._generation += 1
+                logger.info(f"🧩 Markdown 변환 프로세스 풀 시작: 워커 {self.workers}개")
+            return self._pool, self._generation
+
+    def warm_up(self) -> None:
+        """워커 프로세스를 미리 띄움 (첫 변환에서 기동 비용을 내지 않도록)"""
+        self._get_pool()
+
+    def convert_many(self, sources: Sequence[Path], timeout: float = FILE_TIMEOUT) -> Iterator[ConversionResult]:
+        """
+        파일들을 동시에 변환하고 끝난 순서대로 결과 반환
+
+        제한 시간은 워커가 파일을 집은 시각부터 잽니다 (다른 요청의 파일 뒤에서 기다리는 시간은 제외).
+        시간을 넘긴 파일은 TimeoutError로 돌려주고 (멈춘 워커를 끝내려고) 풀을 재시작하며,
+        남은 파일은 새 풀에 다시 넣습니다.
+        """
+        sources = [Path(source) for source in sources]
+        done: queue.Queue = queue.Queue()
+        pending: Dict[int, int] = {}   # task_id -> sources 인덱스
+        generation = 0
+
+        def submit(indices) -> int:
+            pool, current = self._get_pool()
+            for index in sorted(indices):
+                task_id = next(self._task_ids)
+                pending[task_id] = index
+                with self._lock:
+                    self._started_at[task_id] = None
+                pool.apply_async(
+                    _convert_job, (task_id, str(sources[index])),
+                    callback=lambda text, t=task_id: done.put((t, text, None)),
+                    error_callback=lambda err, t=task_id: done.put((t, None, err)),
+                )
+            return current
+
+        def resubmit() -> int:
+            indices = list(pending.values())
+            self._forget(pending)
+            pending.clear()
+            return submit(indices)
+
+        try:
+            if sources:
+                generation = submit(range(len(sources)))
+            while pending:
+                if self._generation != generation:
+                    # 다른 요청의 시간 초과로 풀이 재시작됨 → 남은 파일을 새 풀에 다시 넣음
+                    generation = resubmit()
+                started = self._started_times(pending)
+                deadlines = [at + timeout for at in started.values()]
+                wait = (min(deadlines) - time.monotonic()) if deadlines else 1.0
+                try:
+                    task_id, text, error = done.get(timeout=min(max(wait, 0.0), 1.0))
+                except queue.Empty:
+                    now = time.monotonic()
+                    expired = [t for t, at in started.items() if at + timeout <= now]
+                    if not expired:
+                        continue
+                    self._forget(expired)
+                    for task_id in expired:
+                        index = pending.pop(task_id)
+                        self._count('timeouts')
+                        yield sources[index], None, TimeoutError(
+                            f"Markdown 변환 시간 초과 ({timeout:.0f}초): {sources[index].name}")
+                    self.restart(generation)
+                    continue
+                if task_id not in pending:
+                    continue
+                index = pending.pop(task_id)
+                self._forget([task_id])
+                self._count('files' if error is None else 'failures')
+                yield sources[index], text, error
+        finally:
+            self._forget(pending)
+
+    def _started_times(self, task_ids) -> Dict[int, float]:
+        """워커가 보낸 시작 알림을 모두 받아 기록하고, task_ids 중 시작된 작업의 시작 시각 반환"""
+        started_queue = self._started_queue
+        received = []
+        while started_queue is not None:
+            try:
+                received.append(started_queue.get_nowait())
+            except queue.Empty:
+                break
+            except (EOFError, OSError):
+                break   # Manager 종료 (shutdown)
+        now = time.monotonic()
+        with self._lock:
+            for task_id in received:
+                if task_id in self._started_at and self._started_at[task_id] is None:
+                    self._started_at[task_id] = now
+            started = {t: self._started_at.get(t) for t in task_ids}
+        return {t: at for t, at in started.items() if at is not None}
+
+    def _forget(self, task_ids) -> None:
+        with self._lock:
+            for task_id in list(task_ids):
+                self._started_at.pop(task_id, None)
+
+    def restart(self, generation: Optional[int] = None) -> None:
+        """실행 중인 변환을 모두 중단. 다음 변환 때 새 풀 생성 (generation이 다르면 이미 재시작된 것)"""
+        with self._lock:
+            if self._pool is None or (generation is not None and generation != self._generation):
+                return
+            pool, self._pool = self._pool, None
+            self._generation += 1
+            self._stats['restarts'] += 1
+        pool.terminate()
+        logger.warning("♻️ Markdown 변환 프로세스 풀 재시작")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+            manager, self._manager, self._started_queue = self._manager, None, None
+            self._started_at.clear()
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if manager is not None:
+            manager.shutdown()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'workers': self.workers,
+                'running': self._pool is not None,
+                'file_timeout': FILE_TIMEOUT,
+            })
+            return stats
+
+
 class FilePreprocessor:
     """파일 전처리기 - 다양한 형식을 Markdown으로 변환"""
     
-    def __init__(self, input_dir: str = "worktable/input", output_dir: str = "worktable/output"):
+    def __init__(self, input_dir: Optional[str] = None, output_dir: Optional[str] = None,
+                 pool: Optional[MarkdownConversionPool] = None, cache: Optional[ConversionCache] = None):
         """
         전처리기 초기화
 
         Args:
-            input_dir: 입력 파일 디렉토리
-            output_dir: 출력 디렉토리
+            input_dir: 입력 파일 디렉토리 (디렉토리 일괄 처리용, None이면 탐색하지 않음)
+            output_dir: Markdown 파일을 저장할 디렉토리 (None이면 메모리 변환만 사용)
+            pool: 여러 파일 변환에 쓸 프로세스 풀 (None이면 현재 프로세스에서 차례로 변환)
+            cache: 파일 내용 해시 기반 변환 캐시 (None이면 매번 변환)
         """
         if MarkItDown is None:
             raise MarkItDownUnavailableError(_MARKITDOWN_IMPORT_ERROR)
 
+        self.logger = logger
+        self.pool = pool
+        self.cache = cache
+        self.markitdown = MarkItDown()
+        self.input_dir: Optional[Path] = None
+        self.output_dir: Optional[Path] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'conversions': 0,
+            'empty': 0,
+            'failures': 0,
+            'seconds': 0.0,
+            'partial_reads': 0,       # 글자 예산까지만 읽은 파일
+            'partial_truncated': 0,   # 그중 예산을 넘어 뒷부분을 읽지 않은 파일
+        }
+        
+        # 지원하는 파일 확장자
+        self.supported_extensions = {
+            # 문서
+            '.pdf', '.docx', '.doc', '.xlsx', '.xls', '.pptx', '.ppt',
+            # 텍스트
+            '.txt', '.md', '.csv', '.json', '.xml', '.html', '.htm',
+            # 이미지
+            '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp',
+            # 오디오
+            '.mp3', '.wav', '.m4a', '.flac', '.ogg',
+            # 비디오
+            '.mp4', '.avi', '.mkv', '.mov', '.wmv',
+            # 압축
+            '.zip', '.epub',
+            # 노트북
+            '.ipynb',
+            # 이메일
+            '.msg'
+        }
+
+        if input_dir is not None:
+            self._resolve_input_dir(input_dir)
+        if output_dir is not None:
+            self._resolve_output_dir(output_dir)
+
+    def _resolve_input_dir(self, input_dir: str) -> None:
+        """입력 디렉토리 경로 해결 (상대 경로면 여러 후보 중 존재하는 것, 없으면 생성)"""
         # 스크립트 위치 기준으로 경로 해결
         script_dir = Path(__file__).parent
         
-        # 입력 디렉토리 경로 해결
         if Path(input_dir).is_absolute():
             self.input_dir = Path(input_dir)
         else:
@@ -81,59 +363,179 @@ class FilePreprocessor:
                 self.input_dir = script_dir / input_dir
                 print(f"📂 입력 디렉토리 생성: {self.input_dir}")
                 self.input_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 출력 디렉토리 경로 해결  
+
+    def _resolve_output_dir(self, output_dir: str) -> None:
+        """출력 디렉토리 경로 해결 및 생성"""
         if Path(output_dir).is_absolute():
             self.output_dir = Path(output_dir)
         else:
             # 입력 디렉토리와 같은 부모 디렉토리 사용
-            self.output_dir = self.input_dir.parent / output_dir
+            base_dir = self.input_dir.parent if self.input_dir is not None else Path.cwd()
+            self.output_dir = base_dir / output_dir
         
         print(f"📤 출력 디렉토리: {self.output_dir}")
-        
-        self.markitdown = MarkItDown()
-        
-        # 로깅 설정
-        self._setup_logging()
-        
-        # 디렉토리 생성
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 지원하는 파일 확장자
-        self.supported_extensions = {
-            # 문서
-            '.pdf', '.docx', '.doc', '.xlsx', '.xls', '.pptx', '.ppt',
-            # 텍스트
-            '.txt', '.md', '.csv', '.json', '.xml', '.html', '.htm',
-            # 이미지
-            '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp',
-            # 오디오
-            '.mp3', '.wav', '.m4a', '.flac', '.ogg',
-            # 비디오
-            '.mp4', '.avi', '.mkv', '.mov', '.wmv',
-            # 압축
-            '.zip', '.epub',
-            # 노트북
-            '.ipynb',
-            # 이메일
-            '.msg'
-        }
-    
-    def _setup_logging(self):
-        """로깅 설정"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler(),
-                logging.FileHandler('file_preprocessor.log', encoding='utf-8')
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
+
+    def _require_output_dir(self) -> Path:
+        if self.output_dir is None:
+            raise ValueError("출력 디렉토리 없이 생성된 전처리기입니다. to_markdown()을 사용하세요.")
+        return self.output_dir
+
+    def to_markdown(self, source: Union[str, Path], sha256: Optional[str] = None) -> str:
+        """
+        파일/URL을 Markdown 텍스트로 변환 (디스크에 쓰지 않음)
+
+        여러 스레드에서 동시에 호출할 수 있습니다 (MarkItDown.convert는 호출마다 독립적으로 변환).
+
+        Args:
+            source: 파일 경로 또는 URL
+            sha256: 파일 내용 해시를 이미 알고 있으면 전달 (변환 캐시 키, 없으면 계산)
+
+        Returns:
+            변환된 Markdown. 내용이 없으면 빈 문자열
+        """
+        cached, digest = self._lookup(source, sha256)
+        if cached is not None:
+            return cached
+        text = self._convert(source)
+        self._remember(source, digest, text)
+        return text
+
+    def _lookup(self, source: Union[str, Path], sha256: Optional[str],
+                converter: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """변환 캐시 조회 → (캐시된 Markdown 또는 None, 파일 해시). URL이거나 캐시가 없으면 (None, None)"""
+        if self.cache is None or not os.path.isfile(source):
+            return None, None
+        try:
+            digest = sha256 or file_sha256(source)
+        except OSError:
+            return None, None
+        text = self.cache.get(digest, converter)
+        if text is not None:
+            self.logger.info(f"♻️ 변환 캐시 적중: {Path(source).name}")
+        return text, digest
+
+    def _remember(self, source: Union[str, Path], digest: Optional[str], text: str,
+                  converter: Optional[str] = None) -> None:
+        # 빈 결과(스캔 PDF, 일시적 실패 등)는 저장하지 않음 → 다음 요청에서 다시 변환
+        if self.cache is not None and digest is not None and text:
+            try:
+                self.cache.put(digest, text, os.path.getsize(source), converter)
+            except OSError:
+                pass
+
+    def _convert(self, source: Union[str, Path]) -> str:
+        """현재 프로세스의 MarkItDown으로 변환"""
+        started = time.monotonic()
+        try:
+            result = self.markitdown.convert(str(source))
+        except Exception:
+            with self._stats_lock:
+                self._stats['failures'] += 1
+            raise
+        text = (result.text_content if result else None) or ""
+        with self._stats_lock:
+            self._stats['conversions'] += 1
+            self._stats['seconds'] += time.monotonic() - started
+            if not text:
+                self._stats['empty'] += 1
+        return text
+
+    def read_partial(self, file_path: Path, max_chars: int) -> Optional[str]:
+        """
+        앞에서부터 max_chars까지만 읽기 (PDF는 페이지 단위로 필요한 만큼만 파싱)
+
+        Returns:
+            추출한 텍스트. 지원하지 않는 형식이거나 파서가 없거나 텍스트가 비어 있으면
+            (스캔 PDF 등) None → 호출 측에서 MarkItDown으로 전체 변환
+        """
+        if file_path.suffix.lower() not in LAZY_EXTRACT_SUFFIXES:
+            return None
+        try:
+            if str(_AI_MODULE_DIR) not in sys.path:
+                sys.path.insert(0, str(_AI_MODULE_DIR))
+            from ai_api_module.utils.document_utils import iter_document_text, take_text
+            chunks = iter_document_text(file_path)
+            if chunks is None:
+                return None
+            text, truncated = take_text(chunks, max_chars)
+        except Exception as e:
+            self.logger.debug(f"부분 추출 불가({file_path.name}), 전체 변환으로 대체: {e}")
+            return None
+        if not text.strip():
+            return None
+        with self._stats_lock:
+            self._stats['partial_reads'] += 1
+            self._stats['partial_truncated'] += 1 if truncated else 0
+        return text
+
+    def convert_files(self, file_paths: Sequence[Path], timeout: float = FILE_TIMEOUT,
+                      hashes: Optional[Dict[Path, str]] = None,
+                      max_chars: Optional[int] = None) -> Iterator[ConversionResult]:
+        """
+        여러 파일을 Markdown으로 변환하고 끝난 순서대로 (경로, 텍스트, 실패 원인) 반환
+
+        변환 캐시에 있는 파일은 바로 돌려주고, max_chars가 있으면 PDF/텍스트는 그만큼만 읽고,
+        나머지는 프로세스 풀이 있으면 (한 개여도) 풀에서 변환합니다 (timeout은 파일별 제한 시간).
+        웹 서버 프로세스에서 CPU 위주 파싱을 돌리면 GIL을 잡아 다른 요청 스레드가 멈추고, 멈춘 파일을
+        끊을 방법도 없기 때문입니다. 풀이 없을 때(CLI --jobs 1)만 현재 프로세스에서 차례로 변환합니다.
+
+        Args:
+            hashes: 경로 → 이미 계산한 파일 SHA-256 (업로드 스트리밍 중 계산한 값)
+            max_chars: 파일당 필요한 최대 글자 수 (부분 추출 결과는 예산별 키로 변환 캐시에 저장)
+        """
+        hashes = hashes or {}
+        digests: Dict[Path, Optional[str]] = {}
+        misses: List[Path] = []
+        for file_path in (Path(file_path) for file_path in file_paths):
+            cached, digests[file_path] = self._lookup(file_path, hashes.get(file_path))
+            if cached is None and max_chars is not None and file_path.suffix.lower() in LAZY_EXTRACT_SUFFIXES:
+                partial_converter = PARTIAL_CONVERTER.format(max_chars=max_chars)
+                cached, _ = self._lookup(file_path, digests[file_path], partial_converter)
+                if cached is None:
+                    cached = self.read_partial(file_path, max_chars)
+                    if cached is not None:
+                        self._remember(file_path, digests[file_path], cached, partial_converter)
+            if cached is not None:
+                yield file_path, cached, None
+            else:
+                misses.append(file_path)
+
+        if self.pool is None:
+            for file_path in misses:
+                try:
+                    text = self._convert(file_path)
+                except Exception as e:
+                    yield file_path, None, e
+                    continue
+                self._remember(file_path, digests[file_path], text)
+                yield file_path, text, None
+            return
+
+        started = time.monotonic()
+        for file_path, text, error in self.pool.convert_many(misses, timeout):
+            with self._stats_lock:
+                if error is None:
+                    self._stats['conversions'] += 1
+                    self._stats['empty'] += 0 if text else 1
+                else:
+                    self._stats['failures'] += 1
+            if error is None:
+                self._remember(file_path, digests[file_path], text)
+            yield file_path, text, error
+        with self._stats_lock:
+            self._stats['seconds'] += time.monotonic() - started
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['seconds'] = round(stats['seconds'], 3)
+        stats['pool'] = self.pool.get_stats() if self.pool is not None else None
+        return stats
     
     def scan_input_directory(self) -> List[Path]:
         """입력 디렉토리에서 지원하는 파일들 스캔"""
-        if not self.input_dir.exists():
+        if self.input_dir is None or not self.input_dir.exists():
             self.logger.warning(f"입력 디렉토리가 존재하지 않습니다: {self.input_dir}")
             return []
         
@@ -156,18 +558,34 @@ class FilePreprocessor:
             변환 결과 정보 딕셔너리
         """
         try:
+            self._require_output_dir()
             self.logger.info(f"🔄 변환 시작: {file_path.name}")
             
             # markitdown으로 변환
-            result = self.markitdown.convert(str(file_path))
-            
-            if not result or not result.text_content:
-                self.logger.warning(f"⚠️ 변환 결과가 비어있음: {file_path.name}")
-                return None
-            
+            text_content = self.to_markdown(file_path)
+        except Exception as e:
+            return self._failure_info(file_path, e)
+        return self._save_markdown(file_path, text_content)
+
+    def _failure_info(self, file_path: Path, error: BaseException) -> Dict[str, Any]:
+        self.logger.error(f"❌ 변환 실패 {file_path.name}: {error}")
+        return {
+            'original_file': str(file_path),
+            'error': str(error),
+            'success': False,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def _save_markdown(self, file_path: Path, text_content: str) -> Optional[Dict[str, Any]]:
+        """변환된 Markdown을 출력 디렉토리에 메타데이터와 함께 저장하고 결과 정보 반환"""
+        if not text_content:
+            self.logger.warning(f"⚠️ 변환 결과가 비어있음: {file_path.name}")
+            return None
+
+        try:
             # 출력 파일명 생성
             output_filename = file_path.stem + '.md'
-            output_path = self.output_dir / output_filename
+            output_path = self._require_output_dir() / output_filename
             
             # 중복 파일명 처리
             counter = 1
@@ -191,14 +609,14 @@ file_type: {file_path.suffix}
 
 """
                 f.write(metadata)
-                f.write(result.text_content)
+                f.write(text_content)
             
             # 변환 결과 정보
             convert_info = {
                 'original_file': str(file_path),
                 'output_file': str(output_path),
                 'file_size': file_path.stat().st_size,
-                'markdown_size': len(result.text_content),
+                'markdown_size': len(text_content),
                 'success': True,
                 'timestamp': datetime.now().isoformat()
             }
@@ -207,13 +625,7 @@ file_type: {file_path.suffix}
             return convert_info
             
         except Exception as e:
-            self.logger.error(f"❌ 변환 실패 {file_path.name}: {e}")
-            return {
-                'original_file': str(file_path),
-                'error': str(e),
-                'success': False,
-                'timestamp': datetime.now().isoformat()
-            }
+            return self._failure_info(file_path, e)
     
     def convert_url_to_markdown(self, url: str) -> Optional[Dict[str, Any]]:
         """
@@ -226,12 +638,13 @@ file_type: {file_path.suffix}
             변환 결과 정보 딕셔너리
         """
         try:
+            output_dir = self._require_output_dir()
             self.logger.info(f"🌐 URL 변환 시작: {url}")
             
             # markitdown으로 URL 변환
-            result = self.markitdown.convert(url)
+            text_content = self.to_markdown(url)
             
-            if not result or not result.text_content:
+            if not text_content:
                 self.logger.warning(f"⚠️ URL 변환 결과가 비어있음: {url}")
                 return None
             
@@ -239,7 +652,7 @@ file_type: {file_path.suffix}
             safe_filename = url.replace('://', '_').replace('/', '_').replace('?', '_').replace('&', '_')
             safe_filename = ''.join(c for c in safe_filename if c.isalnum() or c in '_-')[:50]
             output_filename = f"url_{safe_filename}.md"
-            output_path = self.output_dir / output_filename
+            output_path = output_dir / output_filename
             
             # Markdown 파일 저장
             with open(output_path, 'w', encoding='utf-8') as f:
@@ -253,12 +666,12 @@ content_type: web_content
 
 """
                 f.write(metadata)
-                f.write(result.text_content)
+                f.write(text_content)
             
             convert_info = {
                 'source_url': url,
                 'output_file': str(output_path),
-                'markdown_size': len(result.text_content),
+                'markdown_size': len(text_content),
                 'success': True,
                 'timestamp': datetime.now().isoformat()
             }
@@ -275,9 +688,12 @@ content_type: web_content
                 'timestamp': datetime.now().isoformat()
             }
     
-    def process_all_files(self) -> Dict[str, Any]:
+    def process_all_files(self, timeout: float = FILE_TIMEOUT) -> Dict[str, Any]:
         """
-        입력 디렉토리의 모든 파일을 처리
+        입력 디렉토리의 모든 파일을 처리 (프로세스 풀이 있으면 동시에 변환)
+
+        Args:
+            timeout: 파일별 변환 제한 시간(초, 프로세스 풀 사용 시)
         
         Returns:
             전체 처리 결과 요약
@@ -297,17 +713,20 @@ content_type: web_content
                 'results': []
             }
         
-        print(f"📋 처리할 파일: {len(files)}개")
+        print(f"📋 처리할 파일: {len(files)}개 (동시 변환 {self.pool.workers if self.pool else 1}개)")
         
-        # 파일별 변환 진행
+        # 파일별 변환 진행 (끝난 순서대로 저장)
         results = []
         success_count = 0
         failed_count = 0
         
-        for i, file_path in enumerate(files, 1):
+        for i, (file_path, text_content, error) in enumerate(self.convert_files(files, timeout), 1):
             print(f"\n🔄 [{i}/{len(files)}] {file_path.name}")
             
-            result = self.convert_file_to_markdown(file_path)
+            if error is not None:
+                result = self._failure_info(file_path, error)
+            else:
+                result = self._save_markdown(file_path, text_content)
             if result:
                 results.append(result)
                 if result.get('success', False):
@@ -328,7 +747,7 @@ content_type: web_content
             'results': results
         }
         
-        summary_path = self.output_dir / 'conversion_summary.json'
+        summary_path = self._require_output_dir() / 'conversion_summary.json'
         with open(summary_path, 'w', encoding='utf-8') as f:
             json.dump(summary, f, ensure_ascii=False, indent=2)
         
@@ -380,6 +799,54 @@ content_type: web_content
                 print(f"  • {ext}")
 
 
+_service: Optional[FilePreprocessor] = None
+_service_lock = threading.Lock()
+
+
+def get_file_preprocessor() -> FilePreprocessor:
+    """
+    웹 서버용 공유 전처리기 (처음 호출할 때 MarkItDown을 한 번만 생성)
+
+    PREPROCESS_WORKERS가 0보다 크면 요청의 첨부 파일들을 프로세스 풀에서 동시에 변환하고,
+    PREPROCESS_CACHE_MB가 0보다 크면 이미 변환한 파일은 변환 캐시에서 바로 가져옵니다.
+
+    Raises:
+        MarkItDownUnavailableError: markitdown 패키지가 없는 경우
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                pool = MarkdownConversionPool() if POOL_WORKERS > 0 else None
+                cache = get_conversion_cache()
+                _service = FilePreprocessor(pool=pool, cache=cache)
+                logger.info(
+                    f"📝 파일 전처리기 준비 완료 (MarkItDown 재사용, 변환 프로세스 {POOL_WORKERS}개, "
+                    f"변환 캐시 {'사용' if cache is not None else '사용 안 함'})"
+                )
+    return _service
+
+
+def get_preprocessor_stats() -> Dict[str, Any]:
+    if _service is None:
+        return {'available': MarkItDown is not None, 'initialized': False}
+    stats = _service.get_stats()
+    stats.update({'available': True, 'initialized': True})
+    return stats
+
+
+def _setup_cli_logging():
+    """CLI 실행 시 로깅 설정 (콘솔 + file_preprocessor.log)"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler('file_preprocessor.log', encoding='utf-8')
+        ]
+    )
+
+
 def main():
     """메인 실행 함수"""
     import argparse
@@ -390,11 +857,18 @@ def main():
     parser.add_argument("--url", help="변환할 URL (YouTube, 웹페이지 등)")
     parser.add_argument("--list-formats", action="store_true", help="지원하는 파일 형식 목록 표시")
     parser.add_argument("--file", help="특정 파일만 변환")
+    parser.add_argument("-j", "--jobs", type=int, default=POOL_WORKERS,
+                        help=f"동시에 변환할 프로세스 수 (기본: {POOL_WORKERS}, 1 이하면 차례로 변환)")
+    parser.add_argument("--timeout", type=float, default=FILE_TIMEOUT,
+                        help=f"파일별 변환 제한 시간(초, 프로세스 풀 사용 시, 기본: {FILE_TIMEOUT:.0f})")
+    parser.add_argument("--no-cache", action="store_true", help="변환 캐시를 쓰지 않고 항상 다시 변환")
     
     args = parser.parse_args()
+    _setup_cli_logging()
     
     try:
-        preprocessor = FilePreprocessor(args.input, args.output)
+        cache = None if args.no_cache else get_conversion_cache()
+        preprocessor = FilePreprocessor(args.input, args.output, cache=cache)
     except MarkItDownUnavailableError as exc:
         print(f"❌ {exc}")
         if exc.original_error:
@@ -429,7 +903,13 @@ def main():
         return
     
     # 전체 디렉토리 처리
-    preprocessor.process_all_files()
+    if args.jobs > 1:
+        preprocessor.pool = MarkdownConversionPool(workers=args.jobs)
+    try:
+        preprocessor.process_all_files(timeout=args.timeout)
+    finally:
+        if preprocessor.pool is not None:
+            preprocessor.pool.shutdown()
 
 
 if __name__ == "__main__":
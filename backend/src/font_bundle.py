@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF 렌더링용 로컬 폰트 번들
+
+fonts.googleapis.com을 거치지 않고 번들된 WOFF2(Noto Sans KR, Pretendard, Inter)를 사용합니다.
+- 모델이 출력한 Google Fonts/Pretendard CDN 링크를 로컬 @font-face로 치환
+- 'server' 모드: 127.0.0.1의 경량 폰트 서버 URL을 사용 (장기 캐시 헤더로
+  풀링된 브라우저가 렌더링 간 폰트를 재사용)
+- 'inline' 모드: WOFF2를 data: URL로 직접 포함 (네트워크 없이 자체 완결)
+- 문서에 쓰인 글자만 남긴 서브셋으로 교체 (font_subset.py, PDF_FONT_SUBSET)
+
+번들 파일은 backend/download_fonts.py로 생성합니다.
+"""
+
+import os
+import re
+import json
+import base64
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from html import unescape
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs, urlencode
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from font_subset import SUBSET_ENABLED, document_codepoints, get_font_subset_cache
+
+logger = logging.getLogger(__name__)
+
+FONT_DIR = Path(os.getenv('PDF_FONT_DIR', str(Path(__file__).parent.parent / "fonts")))
+FONT_MODE = os.getenv('PDF_FONT_MODE', 'server').lower()  # server | inline
+
+# 로컬 폰트 요청에 붙이는 캐시 헤더 (파일명이 불변이므로 immutable)
+FONT_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_GOOGLE_FONTS_LINK = re.compile(
+    r'<link\b[^>]*href=["\'](https?://fonts\.googleapis\.com/css2?\?[^"\']+)["\'][^>]*>\s*',
+    re.IGNORECASE,
+)
+_GOOGLE_FONTS_IMPORT = re.compile(
+    r'@import\s+url\(\s*["\']?(https?://fonts\.googleapis\.com/css2?\?[^"\')]+)["\']?\s*\)\s*;?\s*',
+    re.IGNORECASE,
+)
+_PRETENDARD_CDN_LINK = re.compile(
+    r'<link\b[^>]*href=["\']https?://cdn\.jsdelivr\.net/gh/orioncactus/pretendard[^"\']*["\'][^>]*>\s*',
+    re.IGNORECASE,
+)
+_FONT_PRECONNECT = re.compile(
+    r'<link\b[^>]*rel=["\']preconnect["\'][^>]*href=["\']https?://fonts\.(?:googleapis|gstatic)\.com/?["\'][^>]*>\s*',
+    re.IGNORECASE,
+)
+
+
+def _parse_google_fonts_url(url: str) -> List[Tuple[str, List[int]]]:
+    """Google Fonts CSS URL에서 (패밀리, 굵기 목록) 추출 (css, css2 모두 지원)"""
+    query = parse_qs(urlparse(unescape(url)).query)
+    families: List[Tuple[str, List[int]]] = []
+    for raw in query.get('family', []):
+        # css v1은 'A|B' 형태로 여러 패밀리를 한 번에 지정
+        for part in raw.split('|'):
+            name, _, spec = part.partition(':')
+            weights: List[int] = []
+            if '@' in spec:
+                # css2: wght@300;400 또는 ital,wght@0,400;1,700
+                axes, _, values = spec.partition('@')
+                wght_index = axes.split(',').index('wght') if 'wght' in axes.split(',') else None
+                for value in values.split(';'):
+                    fields = value.split(',')
+                    if wght_index is not None and wght_index < len(fields):
+                        weights.extend(_parse_weight(fields[wght_index]))
+            elif spec:
+                # css v1: 400,700 또는 400italic
+                for value in spec.split(','):
+                    weights.extend(_parse_weight(re.sub(r'[^0-9.]', '', value)))
+            families.append((name.strip(), weights or [400]))
+    return families
+
+
+def _parse_weight(value: str) -> List[int]:
+    """'400' 또는 가변 범위 '100..900' 해석"""
+    try:
+        if '..' in value:
+            low, high = (int(float(v)) for v in value.split('..'))
+            return [w for w in range(100, 1000, 100) if low <= w <= high]
+        return [int(float(value))]
+    except ValueError:
+        return []
+
+
+class FontBundle:
+    """fonts.json 매니페스트로 정의된 로컬 폰트 묶음"""
+
+    def __init__(self, font_dir: Path = FONT_DIR):
+        self.font_dir = Path(font_dir)
+        # {패밀리: {굵기: 파일 경로}} - 실제로 존재하는 파일만 포함
+        self.families: Dict[str, Dict[int, Path]] = {}
+        self._aliases: Dict[str, str] = {}       # 소문자 별칭 → 패밀리
+        self._alias_names: Dict[str, str] = {}   # 소문자 별칭 → 원래 표기
+        self._inline_cache: Dict[Path, str] = {}
+        self._load_manifest()
+
+    def _load_manifest(self) -> None:
+        manifest_path = self.font_dir / "fonts.json"
+        if not manifest_path.exists():
+            logger.info(f"📂 폰트 매니페스트가 없어 로컬 폰트를 사용하지 않습니다: {manifest_path}")
+            return
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ 폰트 매니페스트 로드 실패: {e}")
+            return
+
+        for family, spec in manifest.get('families', {}).items():
+            weights: Dict[int, Path] = {}
+            for weight, entry in spec.get('weights', {}).items():
+                file_path = self.font_dir / entry['file']
+                if file_path.exists():
+                    weights[int(weight)] = file_path
+            if not weights:
+                continue
+            self.families[family] = weights
+            self._aliases[family.lower()] = family
+            for alias in spec.get('aliases', []):
+                self._aliases[alias.lower()] = family
+                self._alias_names[alias.lower()] = alias
+
+        if self.families:
+            logger.info(
+                "🔤 로컬 폰트 번들: " + ", ".join(
+                    f"{name}({'/'.join(str(w) for w in sorted(weights))})"
+                    for name, weights in self.families.items()
+                )
+            )
+        else:
+            logger.info("📂 번들 폰트 파일이 없습니다 (download_fonts.py로 생성)")
+
+    @property
+    def available(self) -> bool:
+        return bool(self.families)
+
+    def resolve_family(self, name: str) -> Optional[str]:
+        """별칭을 포함해 번들 패밀리 이름으로 변환"""
+        return self._aliases.get(name.strip().strip('"\'').lower())
+
+    def alias_map(self) -> Dict[str, List[str]]:
+        """{패밀리: [별칭 원래 표기]} - 번들 전체를 별칭까지 선언할 때 사용 (font_face_css의 aliases)"""
+        aliases: Dict[str, List[str]] = {}
+        for alias, name in self._alias_names.items():
+            aliases.setdefault(self._aliases[alias], []).append(name)
+        return aliases
+
+    def _nearest_weight(self, family: str, weight: int) -> int:
+        return min(self.families[family], key=lambda w: (abs(w - weight), w))
+
+    def _font_url(self, path: Path, base_url: Optional[str]) -> str:
+        if base_url:
+            return f"{base_url.rstrip('/')}/{path.relative_to(self.font_dir).as_posix()}"
+        if path.parent != self.font_dir:
+            # 문서별 서브셋은 재사용 가능성이 낮으므로 data: URL을 메모리에 두지 않음
+            return f"data:font/woff2;base64,{base64.b64encode(path.read_bytes()).decode('ascii')}"
+        if path not in self._inline_cache:
+            encoded = base64.b64encode(path.read_bytes()).decode('ascii')
+            self._inline_cache[path] = f"data:font/woff2;base64,{encoded}"
+        return self._inline_cache[path]
+
+    def font_face_css(
+        self,
+        requested: Optional[Dict[str, List[int]]] = None,
+        base_url: Optional[str] = None,
+        aliases: Optional[Dict[str, List[str]]] = None,
+        codepoints: Optional[FrozenSet[int]] = None,
+    ) -> str:
+        """
+        @font-face 규칙 생성
+
+        Args:
+            requested: {패밀리: [굵기]}. None이면 번들 전체
+            base_url: 로컬 폰트 서버 URL. None이면 data: URL로 인라인
+            aliases: {패밀리: [별칭]}. 문서가 별칭(예: Pretendard Variable)으로 참조할 때 같이 선언
+            codepoints: 문서에 쓰인 코드포인트. 지정하면 해당 글자만 남긴 서브셋 폰트 사용
+        """
+        if requested is None:
+            requested = {family: list(weights) for family, weights in self.families.items()}
+
+        rules = []
+        for family, weights in requested.items():
+            if family not in self.families:
+                continue
+            names = [family] + list((aliases or {}).get(family, []))
+            for weight in sorted({self._nearest_weight(family, w) for w in weights}):
+                path = self.families[family][weight]
+                if codepoints is not None:
+                    path = get_font_subset_cache(self.font_dir).get(path, weight, codepoints)
+                url = self._font_url(path, base_url)
+                for name in names:
+                    rules.append(
+                        "@font-face {"
+                        f" font-family: '{name}'; font-style: normal; font-weight: {weight};"
+                        " font-display: block;"
+                        f" src: url('{url}') format('woff2'); }}"
+                    )
+        return "\n".join(rules)
+
+    def rewrite_remote_fonts(self, html_content: str) -> Tuple[str, Dict[str, List[int]]]:
+        """
+        원격 폰트 링크를 제거하고 번들로 대체할 패밀리/굵기를 반환
+
+        번들에 없는 패밀리는 Google Fonts 링크에 그대로 남겨둡니다.
+        """
+        requested: Dict[str, List[int]] = {}
+
+        def collect(family: str, weights: List[int]) -> None:
+            requested.setdefault(family, [])
+            requested[family].extend(weights)
+
+        def replace_google(match: re.Match, template: str) -> str:
+            remaining = []
+            for name, weights in _parse_google_fonts_url(match.group(1)):
+                family = self.resolve_family(name)
+                if family:
+                    collect(family, weights)
+                else:
+                    remaining.append((name, weights))
+            if not remaining:
+                return ''
+            query = [('family', f"{name}:wght@{';'.join(str(w) for w in sorted(set(weights)))}")
+                     for name, weights in remaining]
+            query.append(('display', 'swap'))
+            return template.format(url=f"https://fonts.googleapis.com/css2?{urlencode(query)}")
+
+        html_content = _GOOGLE_FONTS_LINK.sub(
+            lambda m: replace_google(m, '<link href="{url}" rel="stylesheet">\n'), html_content
+        )
+        html_content = _GOOGLE_FONTS_IMPORT.sub(
+            lambda m: replace_google(m, "@import url('{url}');\n"), html_content
+        )
+
+        if 'Pretendard' in self.families and _PRETENDARD_CDN_LINK.search(html_content):
+            html_content = _PRETENDARD_CDN_LINK.sub('', html_content)
+            collect('Pretendard', list(self.families['Pretendard']))
+
+        # 남은 Google Fonts 링크가 없으면 preconnect도 불필요 (preconnect 자체도 같은 호스트를 담고 있음)
+        if not _GOOGLE_FONTS_LINK.search(html_content) and not _GOOGLE_FONTS_IMPORT.search(html_content):
+            html_content = _FONT_PRECONNECT.sub('', html_content)
+
+        return html_content, requested
+
+    def localize(self, html_content: str, default_families: Optional[Dict[str, List[int]]] = None) -> str:
+        """
+        HTML의 원격 폰트를 로컬 번들로 치환하고 <style id="local-fonts">를 삽입
+
+        Args:
+            default_families: 원격 링크와 무관하게 항상 포함할 패밀리/굵기
+        """
+        if not self.available or 'id="local-fonts"' in html_content:
+            return html_content
+
+        html_content, requested = self.rewrite_remote_fonts(html_content)
+        for family, weights in (default_families or {}).items():
+            requested.setdefault(family, []).extend(weights)
+
+        # 링크 없이 font-family로만 지정된 번들 폰트도 로컬 파일로 연결
+        lowered = html_content.lower()
+        aliases: Dict[str, List[str]] = {}
+        for alias, family in self._aliases.items():
+            if alias not in lowered:
+                continue
+            if family not in requested:
+                requested[family] = list(self.families[family])
+            if alias != family.lower():
+                aliases.setdefault(family, []).append(self._alias_names[alias])
+        if not requested:
+            return html_content
+
+        base_url = get_font_server_url() if FONT_MODE == 'server' else None
+        codepoints = document_codepoints(html_content) if SUBSET_ENABLED else None
+        css = self.font_face_css(requested, base_url=base_url, aliases=aliases, codepoints=codepoints)
+        if not css:
+            return html_content
+
+        style_block = f'\n    <style id="local-fonts">\n{css}\n    </style>\n'
+        if '<head>' in html_content:
+            return html_content.replace('<head>', f'<head>{style_block}', 1)
+        if '</head>' in html_content:
+            return html_content.replace('</head>', f'{style_block}</head>', 1)
+        return style_block + html_content
+
+
+class _FontRequestHandler(SimpleHTTPRequestHandler):
+    """번들 디렉토리의 WOFF2만 장기 캐시 헤더와 함께 제공"""
+
+    extensions_map = {'.woff2': 'font/woff2', '': 'application/octet-stream'}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=str(FONT_DIR), **kwargs)
+
+    def send_head(self):
+        if not self.path.split('?', 1)[0].endswith('.woff2'):
+            self.send_error(404)
+            return None
+        etag = self._etag()
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', FONT_CACHE_CONTROL)
+            self.end_headers()
+            return None
+        return super().send_head()
+
+    def _etag(self) -> Optional[str]:
+        path = Path(self.translate_path(self.path))
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        digest = hashlib.md5(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()
+        return f'"{digest}"'
+
+    def end_headers(self):
+        if self.command in ('GET', 'HEAD'):
+            etag = self._etag()
+            if etag:
+                self.send_header('ETag', etag)
+            self.send_header('Cache-Control', FONT_CACHE_CONTROL)
+            self.send_header('Access-Control-Allow-Origin', '*')
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        logger.debug("font-server: " + format % args)
+
+
+_bundle: Optional[FontBundle] = None
+_server: Optional[ThreadingHTTPServer] = None
+_lock = threading.Lock()
+
+
+def get_font_bundle() -> FontBundle:
+    """프로세스 전역 폰트 번들 (lazy loading)"""
+    global _bundle
+    if _bundle is None:
+        with _lock:
+            if _bundle is None:
+                _bundle = FontBundle()
+    return _bundle
+
+
+def get_font_server_url() -> str:
+    """
+    로컬 폰트 서버 URL
+
+    렌더링 중인 워커가 직접 응답할 수 없으므로(Flask 동기 워커) Flask 라우트 대신
+    별도 데몬 스레드의 HTTP 서버를 127.0.0.1 임의 포트에 띄웁니다.
+    """
+    global _server
+    if _server is None:
+        with _lock:
+            if _server is None:
+                server = ThreadingHTTPServer(('127.0.0.1', 0), _FontRequestHandler)
+                server.daemon_threads = True
+                threading.Thread(target=server.serve_forever, name='font-server', daemon=True).start()
+                _server = server
+                logger.info(f"🔤 로컬 폰트 서버 시작: http://127.0.0.1:{server.server_address[1]}/")
+    return f"http://127.0.0.1:{_server.server_address[1]}"
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+문서별 폰트 서브셋 생성 및 캐시
+
+교재 한 편에 실제로 쓰이는 한글 음절은 수백 자 수준이므로, 번들 폰트(KS X 1001 2,350자)
+전체를 PDF에 넣는 대신 문서에 등장한 코드포인트만 남긴 서브셋을 만들어 사용합니다.
+- 코드포인트 집합은 폰트 cmap과 교집합한 뒤 정규화해 해시 키로 사용
+- 키 = 해시(원본 폰트 + 굵기 + 코드포인트 집합) → 같은 글자 구성의 문서는 서브셋 재사용
+- 캐시 디렉토리 용량 상한을 넘으면 오래 사용하지 않은 서브셋부터 삭제 (LRU)
+
+fontTools가 없으면 서브셋을 건너뛰고 번들 폰트를 그대로 사용합니다.
+"""
+
+import os
+import re
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from html import unescape
+from collections import OrderedDict
+from typing import Dict, Any, FrozenSet, Iterable, Optional
+
+try:
+    from fontTools.ttLib import TTFont
+    from fontTools import subset as ft_subset
+    FONTTOOLS_AVAILABLE = True
+except ImportError:
+    FONTTOOLS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+# fontTools.subset은 INFO 레벨에서 글리프 목록 전체를 출력하므로 경고만 남김
+logging.getLogger('fontTools.subset').setLevel(logging.WARNING)
+
+SUBSET_ENABLED = os.getenv('PDF_FONT_SUBSET', 'true').lower() in ('1', 'true', 'yes')
+SUBSET_CACHE_MAX_MB = int(os.getenv('PDF_FONT_SUBSET_CACHE_MB', '64'))
+
+# 본문 텍스트 외에 CSS(list-style, counter, ::before 등)가 만들어낼 수 있는 문자
+_ALWAYS_INCLUDED = frozenset(range(0x20, 0x7F)) | frozenset(
+    ord(c) for c in '\u00a0\u00b7\u2013\u2014\u2018\u2019\u201c\u201d\u2022\u2026\u25cb\u25cf\u25e6\u25aa\u25a0'
+)
+
+_SCRIPT_BLOCK = re.compile(r'<script\b[^>]*>.*?</script>', re.IGNORECASE | re.DOTALL)
+_STYLE_BLOCK = re.compile(r'<style\b[^>]*>(.*?)</style>', re.IGNORECASE | re.DOTALL)
+_CSS_CONTENT = re.compile(r'content\s*:\s*(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+_CSS_ESCAPE = re.compile(r'\\([0-9a-fA-F]{1,6})\s?')
+_TAG = re.compile(r'<[^>]+>')
+
+
+def document_codepoints(html_content: str) -> FrozenSet[int]:
+    """HTML에서 렌더링될 수 있는 문자의 코드포인트 집합 (태그/스크립트 제외)"""
+    without_scripts = _SCRIPT_BLOCK.sub(' ', html_content)
+
+    # CSS 본문은 버리되 content: "..."로 생성되는 문자는 포함
+    generated = []
+    for css in _STYLE_BLOCK.findall(without_scripts):
+        for _, value in _CSS_CONTENT.findall(css):
+            generated.append(_CSS_ESCAPE.sub(lambda m: chr(int(m.group(1), 16)), value))
+    text = _TAG.sub(' ', _STYLE_BLOCK.sub(' ', without_scripts))
+
+    codepoints = {ord(c) for c in unescape(text) if ord(c) >= 0x20}
+    codepoints.update(ord(c) for value in generated for c in value if ord(c) >= 0x20)
+    return frozenset(codepoints) | _ALWAYS_INCLUDED
+
+
+class FontSubsetCache:
+    """(원본 폰트, 굵기, 코드포인트 집합) 단위 WOFF2 서브셋 캐시"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = SUBSET_CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._cmaps: Dict[Path, FrozenSet[int]] = {}
+        # 경로 → 크기, 최근 사용 순 (앞쪽이 가장 오래됨)
+        self._entries: "OrderedDict[Path, int]" = OrderedDict()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'errors': 0,
+            'evictions': 0,
+            'source_bytes': 0,
+            'subset_bytes': 0,
+        }
+        self._load_existing()
+
+    def _load_existing(self) -> None:
+        """재시작 후에도 디스크의 서브셋을 재사용 (mtime 순으로 LRU 초기화)"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            files = sorted(self.cache_dir.glob('*.woff2'), key=lambda p: p.stat().st_mtime)
+        except OSError as e:
+            logger.warning(f"⚠️ 폰트 서브셋 캐시 디렉토리 사용 불가: {e}")
+            return
+        for path in files:
+            self._entries[path] = path.stat().st_size
+
+    def _font_cmap(self, source: Path) -> FrozenSet[int]:
+        if source not in self._cmaps:
+            font = TTFont(str(source), lazy=True)
+            self._cmaps[source] = frozenset(font.getBestCmap() or {})
+            font.close()
+        return self._cmaps[source]
+
+    def _cache_key(self, source: Path, weight: int, codepoints: Iterable[int]) -> str:
+        stat = source.stat()
+        digest = hashlib.sha256()
+        digest.update(f"{source.name}:{stat.st_size}:{stat.st_mtime_ns}:{weight}\n".encode())
+        digest.update(','.join(f"{cp:x}" for cp in sorted(codepoints)).encode())
+        return digest.hexdigest()[:24]
+
+    def get(self, source: Path, weight: int, codepoints: FrozenSet[int]) -> Path:
+        """서브셋 파일 경로 반환 (캐시에 없으면 생성). 실패 시 원본 경로"""
+        if not FONTTOOLS_AVAILABLE:
+            return source
+        try:
+            used = codepoints & self._font_cmap(source)
+            key = self._cache_key(source, weight, used)
+            target = self.cache_dir / f"{source.stem}-{key}.woff2"
+
+            with self._lock:
+                if target in self._entries and target.exists():
+                    self._entries.move_to_end(target)
+                    self._stats['hits'] += 1
+                    return target
+
+            self._build(source, used, target)
+            size = target.stat().st_size
+            with self._lock:
+                self._entries[target] = size
+                self._entries.move_to_end(target)
+                self._stats['misses'] += 1
+                self._stats['source_bytes'] += source.stat().st_size
+                self._stats['subset_bytes'] += size
+                self._evict()
+            logger.info(
+                f"✂️ 폰트 서브셋 생성: {source.name} ({len(used)}자, "
+                f"{source.stat().st_size / 1024:.0f} KB → {size / 1024:.0f} KB)"
+            )
+            return target
+        except Exception as e:
+            with self._lock:
+                self._stats['errors'] += 1
+            logger.warning(f"⚠️ 폰트 서브셋 생성 실패, 번들 폰트 사용: {source.name} ({e})")
+            return source
+
+    def _build(self, source: Path, codepoints: FrozenSet[int], target: Path) -> None:
+        font = TTFont(str(source))
+        options = ft_subset.Options()
+        options.flavor = 'woff2'
+        options.layout_features = ['*']
+        options.name_IDs = ['*']
+        options.notdef_outline = True
+        options.hinting = False  # PDF 출력에는 힌팅이 필요 없음
+        subsetter = ft_subset.Subsetter(options=options)
+        subsetter.populate(unicodes=codepoints)
+        subsetter.subset(font)
+        font.flavor = 'woff2'
+
+        # 동시 렌더링이 같은 키를 만들 수 있으므로 임시 파일에 쓴 뒤 원자적으로 교체
+        fd, tmp_name = tempfile.mkstemp(suffix='.woff2.tmp', dir=str(self.cache_dir))
+        os.close(fd)
+        try:
+            font.save(tmp_name)
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, target)
+        finally:
+            font.close()
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+
+    def _evict(self) -> None:
+        """용량 상한 초과 시 가장 오래 사용하지 않은 서브셋부터 삭제 (락 보유 상태에서 호출)"""
+        total = sum(self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            path, size = self._entries.popitem(last=False)
+            total -= size
+            self._stats['evictions'] += 1
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            stats = dict(self._stats)
+            stats.update({
+                'enabled': SUBSET_ENABLED and FONTTOOLS_AVAILABLE,
+                'entries': len(self._entries),
+                'cache_bytes': sum(self._entries.values()),
+                'max_bytes': self.max_bytes,
+                'hit_rate': round(self._stats['hits'] / lookups, 3) if lookups else 0.0,
+            })
+            return stats
+
+
+_cache: Optional[FontSubsetCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_font_subset_cache(font_dir: Path) -> FontSubsetCache:
+    """프로세스 전역 서브셋 캐시 (폰트 서버가 같이 제공하도록 번들 디렉토리 하위에 저장)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FontSubsetCache(Path(font_dir) / 'subsets')
+    return _cache
+
+
+def get_font_subset_stats() -> Dict[str, Any]:
+    """서브셋 캐시 지표 (캐시가 아직 생성되지 않았으면 기본값)"""
+    if _cache is None:
+        return {'enabled': SUBSET_ENABLED and FONTTOOLS_AVAILABLE, 'hits': 0, 'misses': 0, 'entries': 0}
+    return _cache.get_stats()
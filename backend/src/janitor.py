@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+백그라운드 정리(janitor) 스레드
+
+예전에는 @app.before_request가 정적 파일/헬스 체크를 포함한 모든 요청에서 캐시 전체를 돌며
+정리했고, 요청이 중간에 죽으면 TEMP_DIR의 input_* / preprocessed_* / temp_*.html은 영영 남았습니다.
+JANITOR_INTERVAL_SECONDS마다 요청 경로 밖에서 다음을 수행합니다.
+- 결과 저장소(artifact_store) 만료/용량 정리
+- TEMP_DIR의 오래된 임시 디렉토리·파일 (JANITOR_TEMP_MAX_AGE_SECONDS 이상 지난 것)
+- 브라우저가 종료된 뒤 남은 Chrome 프로필 디렉토리 (cdp_profile_*, .org.chromium.Chromium.*)
+- 디스크 사용률이 상한(high-water mark)을 넘으면 렌더링 캐시/변환 캐시/결과 저장소를 비상 축소
+
+여러 프로세스가 같은 TEMP_DIR을 쓰면 파일 잠금으로 한 번에 한 프로세스만 정리합니다.
+"""
+
+import os
+import time
+import shutil
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from collections import Counter
+from typing import Dict, Any, Iterable, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows 로컬 개발 환경
+    fcntl = None
+
+try:
+    import psutil
+except ImportError:  # psutil이 없으면 프로필 사용 여부를 나이로만 판단
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+JANITOR_INTERVAL_SECONDS = float(os.getenv('JANITOR_INTERVAL', '300'))
+JANITOR_TEMP_MAX_AGE_SECONDS = float(os.getenv('JANITOR_TEMP_MAX_AGE', '3600'))
+DISK_HIGH_WATER = float(os.getenv('JANITOR_DISK_HIGH_WATER', '0.90'))   # 사용률 (0~1)
+DISK_LOW_WATER = float(os.getenv('JANITOR_DISK_LOW_WATER', '0.80'))     # 비상 정리 목표 사용률
+
+# TEMP_DIR 아래 요청 단위 임시 항목 (요청이 정상 종료되면 스스로 지움)
+TEMP_PATTERNS = (
+    'input_*',             # 업로드 파일 (upload_stream, 변환 작업 종료 시 삭제)
+    'preprocessed_*',      # MarkItDown 변환 결과
+    'temp_*.html',         # Selenium 렌더링용 HTML
+    'output_*.pdf',        # 결과 저장소로 옮기기 전 PDF
+    '*.part*_*.pdf',       # WeasyPrint 페이지 묶음 렌더링 중간 결과
+)
+# 시스템 임시 디렉토리의 Chrome 프로필
+PROFILE_PATTERNS = ('cdp_profile_*', '.org.chromium.Chromium.*', '.com.google.Chrome.*')
+
+
+class Janitor:
+    """주기적 정리 작업 한 묶음 (sweep)과 누적 지표"""
+
+    def __init__(self, temp_dir: Path, max_age: float = JANITOR_TEMP_MAX_AGE_SECONDS):
+        self.temp_dir = Path(temp_dir)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._stats: Counter = Counter()
+        self._last: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------
+    # 개별 정리 작업
+    # ------------------------------------------------------------------
+    def _remove(self, path: Path) -> int:
+        """파일/디렉토리 삭제 후 해제한 바이트 수 반환"""
+        size = _path_size(path)
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink()
+        return size
+
+    def sweep_temp(self, now: float) -> Dict[str, int]:
+        """TEMP_DIR의 오래된 요청 단위 임시 항목 삭제"""
+        removed = freed = 0
+        for pattern in TEMP_PATTERNS:
+            for path in self.temp_dir.glob(pattern):
+                try:
+                    if now - path.stat().st_mtime < self.max_age:
+                        continue
+                    freed += self._remove(path)
+                    removed += 1
+                except OSError as e:
+                    logger.debug(f"임시 항목 삭제 실패({path.name}): {e}")
+        return {'removed': removed, 'bytes': freed}
+
+    def sweep_profiles(self, now: float) -> Dict[str, int]:
+        """실행 중인 브라우저가 쓰지 않는 오래된 Chrome 프로필 디렉토리 삭제"""
+        in_use = _profiles_in_use()
+        removed = freed = 0
+        base = Path(tempfile.gettempdir())
+        for pattern in PROFILE_PATTERNS:
+            for path in base.glob(pattern):
+                try:
+                    if not path.is_dir() or now - path.stat().st_mtime < self.max_age:
+                        continue
+                    if str(path) in in_use:
+                        continue
+                    freed += self._remove(path)
+                    removed += 1
+                except OSError as e:
+                    logger.debug(f"브라우저 프로필 삭제 실패({path.name}): {e}")
+        return {'removed': removed, 'bytes': freed}
+
+    def sweep_artifacts(self) -> int:
+        from artifact_store import get_artifact_store
+        return get_artifact_store().evict()
+
+    def check_disk(self) -> Dict[str, Any]:
+        """디스크 사용률이 high-water mark를 넘으면 캐시를 low-water mark까지 비상 축소"""
+        usage = shutil.disk_usage(self.temp_dir)
+        ratio = usage.used / usage.total if usage.total else 0.0
+        result: Dict[str, Any] = {'used_ratio': round(ratio, 4), 'emergency': False, 'freed': 0}
+        need = int(usage.used - DISK_LOW_WATER * usage.total)
+        if ratio < DISK_HIGH_WATER or need <= 0:
+            return result
+
+        logger.warning(
+            f"🚨 디스크 사용률 {ratio:.0%} (상한 {DISK_HIGH_WATER:.0%}) → 캐시 {need / 1024 / 1024:.0f} MB 비상 정리"
+        )
+        from artifact_store import get_artifact_store
+        from conversion_cache import get_conversion_cache
+        from render_cache import get_render_cache
+
+        freed = 0
+        # 다시 만들면 되는 렌더링 캐시/첨부 변환 캐시부터, 그다음 사용자 링크가 걸린 결과 저장소
+        render_cache = get_render_cache(self.temp_dir / "render_cache")
+        cache_bytes = render_cache.get_stats()['cache_bytes']
+        freed += render_cache.trim(max(0, cache_bytes - need))
+        conversion_cache = get_conversion_cache() if freed < need else None
+        if conversion_cache is not None:
+            cache_bytes = conversion_cache.get_stats()['cache_bytes']
+            freed += conversion_cache.trim(max(0, cache_bytes - (need - freed)))
+        if freed < need:
+            store = get_artifact_store()
+            store_bytes = store.get_stats()['store_bytes']
+            freed += store.trim(max(0, store_bytes - (need - freed)))
+        result.update({'emergency': True, 'freed': freed})
+        return result
+
+    # ------------------------------------------------------------------
+    # 전체 실행
+    # ------------------------------------------------------------------
+    def sweep(self) -> Dict[str, Any]:
+        """정리 작업 전체를 한 번 실행 (각 작업의 실패는 다른 작업에 영향 없음)"""
+        started = time.monotonic()
+        now = time.time()
+        summary: Dict[str, Any] = {}
+        for name, task in (
+            ('artifacts', self.sweep_artifacts),
+            ('temp', lambda: self.sweep_temp(now)),
+            ('profiles', lambda: self.sweep_profiles(now)),
+            ('disk', self.check_disk),
+        ):
+            try:
+                summary[name] = task()
+            except Exception as e:
+                summary[name] = {'error': str(e)}
+                logger.warning(f"⚠️ 정리 작업 실패({name}): {e}")
+
+        with self._lock:
+            self._stats['runs'] += 1
+            if isinstance(summary.get('artifacts'), int):
+                self._stats['artifacts_evicted'] += summary['artifacts']
+            for name in ('temp', 'profiles'):
+                part = summary.get(name) or {}
+                self._stats[f'{name}_removed'] += part.get('removed', 0)
+                self._stats['bytes_freed'] += part.get('bytes', 0)
+            disk = summary.get('disk') or {}
+            if disk.get('emergency'):
+                self._stats['emergency_evictions'] += 1
+                self._stats['bytes_freed'] += disk.get('freed', 0)
+            self._last = {
+                'time': now,
+                'duration': round(time.monotonic() - started, 3),
+                'disk_used_ratio': disk.get('used_ratio'),
+            }
+
+        removed = sum((summary.get(name) or {}).get('removed', 0) for name in ('temp', 'profiles'))
+        if removed:
+            logger.info(f"🧹 정리 완료: 임시 항목/프로필 {removed}개 삭제")
+        return summary
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                'interval': JANITOR_INTERVAL_SECONDS,
+                'temp_max_age': self.max_age,
+                'disk_high_water': DISK_HIGH_WATER,
+                'runs': self._stats['runs'],
+                'artifacts_evicted': self._stats['artifacts_evicted'],
+                'temp_removed': self._stats['temp_removed'],
+                'profiles_removed': self._stats['profiles_removed'],
+                'emergency_evictions': self._stats['emergency_evictions'],
+                'bytes_freed': self._stats['bytes_freed'],
+            }
+            stats.update({f'last_{key}': value for key, value in self._last.items()})
+            return stats
+
+
+def _path_size(path: Path) -> int:
+    try:
+        if path.is_dir() and not path.is_symlink():
+            return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _profiles_in_use() -> Set[str]:
+    """실행 중인 Chrome의 --user-data-dir 경로"""
+    in_use: Set[str] = set()
+    if psutil is None:
+        return in_use
+    for proc in psutil.process_iter(['cmdline']):
+        try:
+            for arg in proc.info['cmdline'] or ():
+                if arg.startswith('--user-data-dir='):
+                    in_use.add(arg.split('=', 1)[1])
+        except psutil.Error:
+            continue
+    return in_use
+
+
+def _try_lock(lock_path: Path) -> Optional[Iterable]:
+    """다른 프로세스가 정리 중이면 None (잠금 파일 핸들을 반환하므로 닫으면 해제)"""
+    if fcntl is None:
+        return open(os.devnull, 'w')
+    handle = open(lock_path, 'w')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+_janitor: Optional[Janitor] = None
+_janitor_lock = threading.Lock()
+
+
+def start_janitor(temp_dir: Path, interval: float = JANITOR_INTERVAL_SECONDS) -> None:
+    """주기적으로 sweep을 실행하는 데몬 스레드 시작 (프로세스당 한 번)"""
+    global _janitor
+    with _janitor_lock:
+        if _janitor is not None or interval <= 0:
+            return
+        _janitor = Janitor(temp_dir)
+    janitor = _janitor
+    lock_path = Path(temp_dir) / "janitor.lock"
+
+    def loop():
+        # 시작 직후 한 번(이전 프로세스가 남긴 임시 파일), 이후 interval마다
+        delay = min(interval, 30.0)
+        while True:
+            time.sleep(delay)
+            delay = interval
+            handle = _try_lock(lock_path)
+            if handle is None:
+                continue
+            try:
+                janitor.sweep()
+            except Exception as e:
+                logger.debug(f"정리 스레드 오류: {e}")
+            finally:
+                handle.close()
+
+    threading.Thread(target=loop, name='janitor', daemon=True).start()
+    logger.info(f"🧹 정리 스레드 시작 (주기 {interval:.0f}초)")
+
+
+def get_janitor_stats() -> Dict[str, Any]:
+    """정리 스레드 지표 (시작되지 않았으면 기본값)"""
+    if _janitor is None:
+        return {'interval': JANITOR_INTERVAL_SECONDS, 'runs': 0}
+    return _janitor.get_stats()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF 렌더링 전 페이지 준비 상태 대기
+
+고정 sleep 대신 실제 신호를 기다립니다.
+- document.readyState === 'complete'
+- document.fonts.ready 프로미스 해결
+- 모든 <img>의 decode() 프로미스 해결
+- CDP Network 이벤트 기준 네트워크 유휴 (진행 중 요청 0개가 일정 시간 유지)
+
+모든 신호가 충족되거나 하드 데드라인에 도달하면 대기를 끝내고,
+어떤 신호가 대기를 끝냈는지 기록해 튜닝에 활용합니다.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Any, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE_SECONDS = float(os.getenv('PDF_READY_DEADLINE', '10'))
+DEFAULT_NETWORK_IDLE_MS = int(os.getenv('PDF_NETWORK_IDLE_MS', '500'))
+POLL_INTERVAL_SECONDS = 0.05
+
+# 대기 순서상 신호 이름 (결과/지표 키로 사용)
+SIGNALS = ('dom', 'fonts', 'images', 'network')
+
+# 페이지에 설치하는 감시 스크립트: 각 신호가 충족되면 window.__pdfReadiness에 표시
+_INSTALL_SCRIPT = """
+(function () {
+    if (window.__pdfReadiness) { return; }
+    var state = window.__pdfReadiness = {dom: false, fonts: false, images: false};
+    var whenLoaded = document.readyState === 'complete'
+        ? Promise.resolve()
+        : new Promise(function (resolve) {
+            window.addEventListener('load', resolve, {once: true});
+        });
+    whenLoaded.then(function () {
+        state.dom = true;
+        var fontsReady = (document.fonts && document.fonts.ready) || Promise.resolve();
+        fontsReady.then(function () { state.fonts = true; },
+                        function () { state.fonts = true; });
+        var decodes = Array.prototype.map.call(document.images, function (img) {
+            return img.decode ? img.decode().catch(function () { return null; }) : null;
+        });
+        Promise.all(decodes).then(function () { state.images = true; });
+    });
+})();
+"""
+
+_POLL_SCRIPT = "return window.__pdfReadiness || null;"
+
+
+@dataclass
+class ReadinessResult:
+    """페이지 준비 대기 결과"""
+    ready: bool
+    ended_by: str                     # 마지막으로 충족된 신호 또는 'deadline'
+    elapsed: float
+    signal_times: Dict[str, float] = field(default_factory=dict)  # 신호별 충족 시각(대기 시작 기준)
+    pending: Set[str] = field(default_factory=set)                # 데드라인 시점 미충족 신호
+    inflight_requests: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'ready': self.ready,
+            'ended_by': self.ended_by,
+            'elapsed': round(self.elapsed, 3),
+            'signal_times': {k: round(v, 3) for k, v in self.signal_times.items()},
+            'pending': sorted(self.pending),
+            'inflight_requests': self.inflight_requests,
+        }
+
+
+class NetworkIdleTracker:
+    """Chrome 성능 로그의 CDP Network 이벤트로 진행 중 요청 추적"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.inflight: Set[str] = set()
+        self.available = True
+        self.last_activity = time.monotonic()
+
+    def drain(self) -> None:
+        """이전 페이지에서 쌓인 로그 비우기 (네비게이션 직전에 호출)"""
+        try:
+            self.driver.get_log('performance')
+        except Exception as err:
+            self.available = False
+            logger.debug(f"성능 로그 사용 불가, 네트워크 유휴 신호 생략: {err}")
+
+    def poll(self) -> None:
+        if not self.available:
+            return
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception:
+            self.available = False
+            return
+
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = message.get('method', '')
+            if not method.startswith('Network.'):
+                continue
+            request_id = message.get('params', {}).get('requestId')
+            if not request_id:
+                continue
+            if method == 'Network.requestWillBeSent':
+                self.inflight.add(request_id)
+                self.last_activity = time.monotonic()
+            elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+                self.inflight.discard(request_id)
+                self.last_activity = time.monotonic()
+
+    def is_idle(self, idle_seconds: float) -> bool:
+        if not self.available:
+            return True
+        return not self.inflight and time.monotonic() - self.last_activity >= idle_seconds
+
+
+class PageReadinessWaiter:
+    """신호 기반 페이지 준비 대기기"""
+
+    def __init__(
+        self,
+        driver,
+        deadline: float = DEFAULT_DEADLINE_SECONDS,
+        network_idle_ms: int = DEFAULT_NETWORK_IDLE_MS,
+    ):
+        self.driver = driver
+        self.deadline = deadline
+        self.network_idle_seconds = network_idle_ms / 1000.0
+        self.network = NetworkIdleTracker(driver)
+
+    def before_navigation(self) -> None:
+        """driver.get() 직전에 호출해 이전 작업의 네트워크 이벤트를 버림"""
+        self.network.drain()
+        self.network.last_activity = time.monotonic()
+
+    def wait(self) -> ReadinessResult:
+        """모든 신호가 충족되거나 데드라인에 도달할 때까지 대기"""
+        started = time.monotonic()
+        hard_deadline = started + self.deadline
+        signal_times: Dict[str, float] = {}
+
+        try:
+            self.driver.execute_script(_INSTALL_SCRIPT)
+        except Exception as err:
+            logger.warning(f"⚠️ 준비 상태 감시 스크립트 설치 실패: {err}")
+
+        while True:
+            now = time.monotonic()
+
+            try:
+                state = self.driver.execute_script(_POLL_SCRIPT) or {}
+            except Exception:
+                state = {}
+            for name in ('dom', 'fonts', 'images'):
+                if state.get(name) and name not in signal_times:
+                    signal_times[name] = now - started
+
+            self.network.poll()
+            if 'network' not in signal_times and self.network.is_idle(self.network_idle_seconds):
+                signal_times['network'] = now - started
+
+            if len(signal_times) == len(SIGNALS):
+                ended_by = max(signal_times, key=signal_times.get)
+                result = ReadinessResult(
+                    ready=True,
+                    ended_by=ended_by,
+                    elapsed=now - started,
+                    signal_times=signal_times,
+                )
+                break
+
+            if now >= hard_deadline:
+                result = ReadinessResult(
+                    ready=False,
+                    ended_by='deadline',
+                    elapsed=now - started,
+                    signal_times=signal_times,
+                    pending=set(SIGNALS) - set(signal_times),
+                    inflight_requests=len(self.network.inflight),
+                )
+                break
+
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+        record_readiness(result)
+        if result.ready:
+            logger.info(
+                f"✅ 페이지 준비 완료 ({result.elapsed:.2f}초, 마지막 신호: {result.ended_by})"
+            )
+        else:
+            logger.warning(
+                f"⚠️ 페이지 준비 데드라인 도달 ({self.deadline:.1f}초, 미충족: "
+                f"{', '.join(sorted(result.pending))}, 진행 중 요청 {result.inflight_requests}개)"
+            )
+        return result
+
+
+# ----------------------------------------------------------------------
+# 누적 지표
+# ----------------------------------------------------------------------
+_stats_lock = threading.Lock()
+_ended_by_counts: Counter = Counter()
+_wait_seconds_total = 0.0
+_wait_seconds_max = 0.0
+
+
+def record_readiness(result: ReadinessResult) -> None:
+    """대기 결과를 누적 지표에 반영 (다른 렌더링 백엔드에서도 사용)"""
+    global _wait_seconds_total, _wait_seconds_max
+    with _stats_lock:
+        _ended_by_counts[result.ended_by] += 1
+        _wait_seconds_total += result.elapsed
+        _wait_seconds_max = max(_wait_seconds_max, result.elapsed)
+
+
+def get_readiness_stats() -> Dict[str, Any]:
+    """어떤 신호가 대기를 끝냈는지에 대한 누적 통계"""
+    with _stats_lock:
+        waits = sum(_ended_by_counts.values())
+        return {
+            'waits': waits,
+            'ended_by': dict(_ended_by_counts),
+            'wait_seconds_total': round(_wait_seconds_total, 3),
+            'wait_seconds_max': round(_wait_seconds_max, 3),
+            'wait_seconds_avg': round(_wait_seconds_total / waits, 3) if waits else 0.0,
+            'deadline_seconds': DEFAULT_DEADLINE_SECONDS,
+            'network_idle_ms': DEFAULT_NETWORK_IDLE_MS,
+        }
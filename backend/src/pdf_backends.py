@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF 렌더링 백엔드
+
+Flask 앱(인라인 렌더링)과 렌더링 서비스 워커(render_service.py)가 같이 사용합니다.
+우선순위: Chrome (CDP 직접 연결) > Chrome (Selenium) > weasyprint > pdfkit
+모든 백엔드 호출은 render_watchdog의 단계별 데드라인과 전체 예산 안에서 실행됩니다.
+"""
+
+import os
+import uuid
+import base64
+import logging
+import tempfile
+import traceback
+from pathlib import Path
+from typing import Optional
+
+from chrome_pool import get_chrome_pool
+from page_readiness import PageReadinessWaiter
+from cdp_renderer import is_cdp_available, get_cdp_browser
+from render_watchdog import (
+    TOTAL_BUDGET_SECONDS, RenderWatchdog, kill_process_tree, kill_child_processes,
+)
+from weasy_pool import get_weasy_pool
+
+logger = logging.getLogger(__name__)
+
+PDF_BACKEND = None
+PDF_BACKENDS_AVAILABLE = []
+
+# Chrome (Selenium) 체크
+try:
+    from selenium import webdriver  # noqa: F401
+    PDF_BACKENDS_AVAILABLE.append('chrome')
+except ImportError:
+    pass
+
+# WeasyPrint 체크
+try:
+    from weasyprint import HTML as WeasyHTML
+    PDF_BACKEND = 'weasyprint'
+    PDF_BACKENDS_AVAILABLE.append('weasyprint')
+except ImportError:
+    pass
+
+# pdfkit 체크
+try:
+    import pdfkit
+    if not PDF_BACKEND:
+        PDF_BACKEND = 'pdfkit'
+    PDF_BACKENDS_AVAILABLE.append('pdfkit')
+except ImportError:
+    pass
+
+# Selenium 없이 DevTools 웹소켓으로 직접 렌더링 (websocket-client + Chrome 바이너리 필요)
+if is_cdp_available():
+    PDF_BACKENDS_AVAILABLE.insert(0, 'cdp')
+
+# Chrome 인쇄 옵션 (Chrome 브라우저 "여백: 기본" 설정과 동일)
+CHROME_PRINT_OPTIONS = {
+    'landscape': False,
+    'displayHeaderFooter': False,
+    'printBackground': True,
+    'preferCSSPageSize': True,
+    'paperWidth': 8.27,
+    'paperHeight': 11.69,
+    'marginTop': 0,
+    'marginBottom': 0,
+    'marginLeft': 0,
+    'marginRight': 0,
+    'scale': 1.0
+}
+
+# wkhtmltopdf(pdfkit) 옵션
+PDFKIT_OPTIONS = {
+    'page-size': 'A4',
+    'margin-top': '0mm',
+    'margin-right': '0mm',
+    'margin-bottom': '0mm',
+    'margin-left': '0mm',
+    'encoding': "UTF-8",
+    'no-outline': None,
+    'enable-local-file-access': None
+}
+
+WKHTMLTOPDF_PATH = os.getenv('WKHTMLTOPDF_PATH', 'wkhtmltopdf')
+
+TEMP_DIR = Path(tempfile.gettempdir()) / "html_designer"
+
+
+def render_chrome(prepared_html: str, pdf_path: Path, watchdog: Optional[RenderWatchdog] = None) -> None:
+    """풀에서 대여한 Chrome 세션으로 PDF 생성 (단계별 데드라인 초과 시 세션 강제 종료)"""
+    watchdog = watchdog or RenderWatchdog()
+
+    # 임시 HTML 파일 생성 (Chrome이 로드할 수 있도록)
+    TEMP_DIR.mkdir(exist_ok=True)
+    temp_html_file = TEMP_DIR / f"temp_{uuid.uuid4().hex}.html"
+    with open(temp_html_file, 'w', encoding='utf-8') as f:
+        f.write(prepared_html)
+
+    try:
+        with get_chrome_pool().lease() as session:
+            driver = session.driver
+
+            def kill_session():
+                session.mark_broken()
+                kill_process_tree(session.service_pid)
+
+            # HTML 파일 열기 (절대 경로 사용)
+            with watchdog.stage('load', kill_session):
+                waiter = PageReadinessWaiter(driver, deadline=watchdog.stage_limit('fonts') * 0.8)
+                waiter.before_navigation()
+                html_path = temp_html_file.resolve()
+                driver.get(f"file:///{html_path}")
+
+            # 고정 대기 대신 DOM/웹폰트/이미지/네트워크 신호로 준비 상태 확인 (한글 깨짐 방지)
+            with watchdog.stage('fonts', kill_session):
+                waiter.wait()
+
+            # Chrome DevTools Protocol을 사용하여 PDF 생성
+            with watchdog.stage('print', kill_session):
+                result = driver.execute_cdp_cmd('Page.printToPDF', dict(CHROME_PRINT_OPTIONS))
+
+            # Base64로 인코딩된 PDF 데이터를 파일로 저장
+            pdf_data = base64.b64decode(result['data'])
+            with open(pdf_path, 'wb') as f:
+                f.write(pdf_data)
+    finally:
+        # 임시 HTML 파일 삭제
+        try:
+            os.unlink(temp_html_file)
+        except OSError:
+            pass
+
+
+def render_with_backends(prepared_html: str, pdf_path: Path, budget: float = TOTAL_BUDGET_SECONDS) -> Optional[str]:
+    """
+    사용 가능한 백엔드를 우선순위대로 시도해 pdf_path에 PDF 생성
+
+    모든 시도는 하나의 워치독 예산(budget초) 안에서 진행되며, 예산이 남지 않으면
+    다음 백엔드로 넘어가지 않고 RenderBudgetExhausted를 발생시킵니다.
+
+    Returns:
+        성공한 백엔드 이름. 사용할 수 있는 백엔드가 없으면 None
+    """
+    watchdog = RenderWatchdog(budget)
+
+    # 1순위: Chrome (CDP 직접 연결) - Selenium/chromedriver 기동 비용 없음
+    if 'cdp' in PDF_BACKENDS_AVAILABLE:
+        watchdog.begin_backend('cdp')
+        try:
+            logger.info("🔄 Chrome(CDP) 엔진으로 PDF 변환 시도...")
+            size = get_cdp_browser().render_pdf(prepared_html, pdf_path, CHROME_PRINT_OPTIONS, watchdog=watchdog)
+            logger.info(f"✅ PDF 생성 완료 (CDP, {size / 1024:.1f} KB): {pdf_path}")
+            return 'cdp'
+        except Exception as cdp_err:
+            logger.warning(f"⚠️ CDP 변환 실패: {cdp_err}. 대체 방법으로 시도합니다.")
+            logger.debug(f"CDP 오류 상세: {traceback.format_exc()}")
+
+    # 2순위: Chrome (Selenium) 사용
+    if 'chrome' in PDF_BACKENDS_AVAILABLE:
+        watchdog.begin_backend('chrome')
+        try:
+            logger.info("🔄 Chrome 엔진으로 PDF 변환 시도...")
+            render_chrome(prepared_html, pdf_path, watchdog)
+            logger.info(f"✅ PDF 생성 완료 (Chrome): {pdf_path}")
+            return 'chrome'
+        except Exception as chrome_err:
+            logger.warning(f"⚠️ Chrome 변환 실패: {chrome_err}. 대체 방법으로 시도합니다.")
+            logger.debug(f"Chrome 오류 상세: {traceback.format_exc()}")
+    else:
+        logger.warning("⚠️ Selenium이 설치되지 않았습니다. 대체 방법으로 시도합니다.")
+
+    # 3순위: WeasyPrint 사용
+    if PDF_BACKEND == 'weasyprint':
+        watchdog.begin_backend('weasyprint')
+        pool = get_weasy_pool()
+        if pool is not None:
+            # 프로세스 풀: 데드라인을 넘기면 풀을 종료해 렌더링을 중단
+            with watchdog.stage('print', pool.restart) as limit:
+                pool.render(prepared_html, pdf_path, timeout=limit + 1)
+        else:
+            # 프로세스 내부 실행은 강제 중단 불가, 초과 시간만 기록
+            with watchdog.stage('print', None):
+                WeasyHTML(string=prepared_html, base_url='.').write_pdf(str(pdf_path))
+        logger.info(f"✅ PDF 생성 완료 (WeasyPrint): {pdf_path}")
+        return 'weasyprint'
+
+    # 4순위: pdfkit 사용
+    elif PDF_BACKEND == 'pdfkit':
+        watchdog.begin_backend('pdfkit')
+        config = pdfkit.configuration(wkhtmltopdf=WKHTMLTOPDF_PATH)
+        with watchdog.stage('print', lambda: kill_child_processes(('wkhtmltopdf',))):
+            pdfkit.from_string(
+                prepared_html,
+                str(pdf_path),
+                options=PDFKIT_OPTIONS,
+                configuration=config
+            )
+        logger.info(f"✅ PDF 생성 완료 (pdfkit): {pdf_path}")
+        return 'pdfkit'
+    else:
+        logger.warning("PDF 변환 라이브러리가 설치되지 않았습니다")
+        return None
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML → PDF 렌더링 결과 캐시 (내용 주소 기반)
+
+결과 저장소(artifact_store.py)는 프롬프트+첨부파일 해시로 요청 단위 결과를 보관하므로, 다른 프롬프트로
+같은 HTML이 나오거나 같은 HTML을 다시 변환하면 매번 Chrome 비용을 지불합니다.
+이 캐시는 html_to_pdf 아래 단계에서 다음을 키로 PDF를 보관합니다.
+- 폰트/레이아웃 가드 주입이 끝난 최종 HTML (정규화 후)
+- 인쇄 옵션
+
+PDF는 캐시 디렉토리에 한 번만 저장되고, 요청별 출력 파일은 하드링크(불가하면 복사)로
+만들어지므로 캐시 항목이 제거되어도 이미 내려준 파일에는 영향이 없습니다.
+"""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+RENDER_CACHE_DIR = os.getenv('PDF_RENDER_CACHE_DIR')
+RENDER_CACHE_MAX_MB = int(os.getenv('PDF_RENDER_CACHE_MB', '256'))
+RENDER_CACHE_MAX_ENTRIES = int(os.getenv('PDF_RENDER_CACHE_MAX_ENTRIES', '500'))
+
+# 로컬 폰트 서버는 프로세스마다 포트가 달라지므로 키 계산 시 출처를 고정값으로 치환
+_LOCAL_ORIGIN = re.compile(r'https?://(?:127\.0\.0\.1|localhost):\d+')
+
+
+def normalize_html(html_content: str) -> str:
+    """캐시 키용 HTML 정규화 (렌더링 결과에 영향 없는 차이 제거)"""
+    normalized = html_content.replace('\r\n', '\n').replace('\r', '\n')
+    normalized = _LOCAL_ORIGIN.sub('local-origin:', normalized)
+    return '\n'.join(line.rstrip() for line in normalized.strip().split('\n'))
+
+
+class RenderCache:
+    """정규화된 HTML + 인쇄 옵션 해시로 PDF를 보관하는 LRU 캐시"""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = RENDER_CACHE_MAX_MB * 1024 * 1024,
+        max_entries: int = RENDER_CACHE_MAX_ENTRIES,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # 키 → PDF 크기, 최근 사용 순 (앞쪽이 가장 오래됨)
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'bytes_served': 0,
+        }
+        self._load_existing()
+
+    def _load_existing(self) -> None:
+        """재시작 후에도 디스크에 남은 PDF를 재사용 (mtime 순으로 LRU 초기화)"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            files = sorted(self.cache_dir.glob('*.pdf'), key=lambda p: p.stat().st_mtime)
+        except OSError as e:
+            logger.warning(f"⚠️ 렌더링 캐시 디렉토리 사용 불가: {e}")
+            return
+        for path in files:
+            self._entries[path.stem] = path.stat().st_size
+        with self._lock:
+            self._evict()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pdf"
+
+    def key_for(self, html_content: str, print_options: Dict[str, Any]) -> str:
+        """최종 HTML과 인쇄 옵션으로 캐시 키 계산"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(print_options, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(normalize_html(html_content).encode('utf-8'))
+        return digest.hexdigest()
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        """캐시 적중 시 dest에 PDF를 만들고 True 반환"""
+        cached = self._path(key)
+        with self._lock:
+            if key not in self._entries or not cached.exists():
+                self._entries.pop(key, None)
+                self._stats['misses'] += 1
+                return False
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            self._stats['bytes_served'] += self._entries[key]
+
+        try:
+            _link_or_copy(cached, Path(dest))
+            return True
+        except OSError as e:
+            logger.warning(f"⚠️ 렌더링 캐시 파일 복원 실패({key[:12]}): {e}")
+            with self._lock:
+                self._entries.pop(key, None)
+            return False
+
+    def store(self, key: str, pdf_path: Path) -> None:
+        """렌더링된 PDF를 캐시에 등록 (실패해도 변환 결과에는 영향 없음)"""
+        cached = self._path(key)
+        try:
+            if not cached.exists():
+                tmp_path = cached.with_suffix('.pdf.tmp')
+                _link_or_copy(Path(pdf_path), tmp_path)
+                os.replace(tmp_path, cached)
+            size = cached.stat().st_size
+        except OSError as e:
+            logger.warning(f"⚠️ 렌더링 캐시 저장 실패({key[:12]}): {e}")
+            return
+
+        with self._lock:
+            self._entries[key] = size
+            self._entries.move_to_end(key)
+            self._stats['stores'] += 1
+            self._evict()
+
+    def trim(self, target_bytes: int) -> int:
+        """디스크 부족 시 비상 정리: 캐시 용량을 target_bytes 이하로 줄이고 해제한 바이트 수 반환"""
+        with self._lock:
+            before = sum(self._entries.values())
+            self._evict(max_bytes=target_bytes)
+            return before - sum(self._entries.values())
+
+    def _evict(self, max_bytes: Optional[int] = None) -> None:
+        """용량/개수 상한 초과 시 가장 오래 사용하지 않은 PDF부터 삭제 (락 보유 상태에서 호출)"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        total = sum(self._entries.values())
+        while self._entries and (total > max_bytes or len(self._entries) > self.max_entries):
+            key, size = self._entries.popitem(last=False)
+            total -= size
+            self._stats['evictions'] += 1
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            stats = dict(self._stats)
+            stats.update({
+                'entries': len(self._entries),
+                'cache_bytes': sum(self._entries.values()),
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries,
+                'hit_rate': round(self._stats['hits'] / lookups, 3) if lookups else 0.0,
+            })
+            return stats
+
+
+def _link_or_copy(source: Path, dest: Path) -> None:
+    """같은 파일시스템이면 하드링크(디스크에 한 번만 저장), 아니면 복사"""
+    if dest.exists():
+        dest.unlink()
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copyfile(source, dest)
+
+
+_cache: Optional[RenderCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_render_cache(cache_dir: Path) -> RenderCache:
+    """프로세스 전역 렌더링 캐시 (PDF_RENDER_CACHE_DIR이 있으면 우선 사용)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RenderCache(Path(RENDER_CACHE_DIR) if RENDER_CACHE_DIR else cache_dir)
+    return _cache
+
+
+def get_render_cache_stats() -> Dict[str, Any]:
+    """렌더링 캐시 지표 (캐시가 아직 생성되지 않았으면 기본값)"""
+    if _cache is None:
+        return {'hits': 0, 'misses': 0, 'entries': 0}
+    return _cache.get_stats()
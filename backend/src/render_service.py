@@ -0,0 +1,657 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+멀티 프로세스 PDF 렌더링 서비스
+
+Flask 요청 스레드에서 직접 렌더링하면 (gunicorn workers = 1) 느린 변환 하나가 다른 사용자를
+모두 막습니다. 이 모듈은 렌더링을 별도 프로세스 풀로 분리합니다.
+- 작업 큐: 로컬 SQLite (WAL) 파일. 외부 브로커 없음
+- 서비스(감독 프로세스): 워커 프로세스 N개 유지, 죽은 워커 재시작, 작업 시간 초과 시 워커 종료
+- 워커: 큐에서 작업을 가져와 pdf_backends의 백엔드(cdp/chrome/weasyprint/pdfkit)로 렌더링
+- Flask: 작업을 넣고 결과만 읽음 (RenderClient)
+
+단독 실행:
+    python src/render_service.py --workers 2
+
+환경 변수:
+    PDF_RENDER_SERVICE      embedded(기본, Flask가 서비스 프로세스를 띄움) | external | off
+    PDF_RENDER_WORKERS      워커 프로세스 수 (기본 2)
+    PDF_RENDER_JOB_TIMEOUT  작업당 렌더링 제한 시간(초, 기본 120)
+    PDF_RENDER_QUEUE_LIMIT  대기+진행 중 작업 상한 (초과 시 RenderQueueFull, 기본 16)
+    PDF_RENDER_QUEUE_DIR    큐 DB 디렉토리
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import signal
+import sqlite3
+import logging
+import argparse
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows 로컬 개발 환경
+    fcntl = None
+
+from render_watchdog import REAP_INTERVAL_SECONDS, reap_stray_browsers
+
+logger = logging.getLogger(__name__)
+
+RENDER_SERVICE_MODE = os.getenv('PDF_RENDER_SERVICE', 'embedded').lower()
+RENDER_WORKERS = int(os.getenv('PDF_RENDER_WORKERS', '2'))
+RENDER_JOB_TIMEOUT = float(os.getenv('PDF_RENDER_JOB_TIMEOUT', '120'))
+RENDER_QUEUE_LIMIT = int(os.getenv('PDF_RENDER_QUEUE_LIMIT', '16'))
+QUEUE_DIR = Path(os.getenv(
+    'PDF_RENDER_QUEUE_DIR', str(Path(tempfile.gettempdir()) / "html_designer" / "render_queue")
+))
+
+HEARTBEAT_SECONDS = 2.0
+WORKER_STALE_SECONDS = 10.0
+SERVICE_START_GRACE_SECONDS = 30.0   # 워커가 하나도 없을 때 대기열에서 기다리는 최대 시간
+TERMINATE_GRACE_SECONDS = 5.0
+FINISHED_JOB_RETENTION_SECONDS = 3600.0
+POLL_INTERVAL_SECONDS = 0.1          # 폴링 시작 간격. 빈 폴링마다 두 배로 늘림
+IDLE_POLL_MAX_SECONDS = 1.0          # 유휴 워커의 큐 확인 간격 상한 (작업을 가져오면 초기화)
+RESULT_POLL_MAX_SECONDS = 0.5        # 클라이언트의 결과 확인 간격 상한
+
+
+class RenderServiceError(Exception):
+    """렌더링 서비스 오류"""
+
+
+class RenderQueueFull(RenderServiceError):
+    """대기 중인 작업이 상한에 도달함 (백프레셔)"""
+
+
+class RenderServiceUnavailable(RenderServiceError):
+    """살아 있는 렌더링 워커가 없음"""
+
+
+class RenderJobFailed(RenderServiceError):
+    """워커가 작업을 실패로 보고하거나 시간 초과로 종료됨"""
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS render_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,            -- queued | running | done | failed | cancelled
+    html TEXT,
+    pdf_path TEXT NOT NULL,
+    backend TEXT,
+    size INTEGER,
+    error TEXT,
+    worker_id TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS idx_render_jobs_status ON render_jobs(status, created);
+CREATE TABLE IF NOT EXISTS render_workers (
+    worker_id TEXT PRIMARY KEY,
+    pid INTEGER,
+    started REAL,
+    last_seen REAL,
+    current_job TEXT,
+    jobs_done INTEGER DEFAULT 0,
+    jobs_failed INTEGER DEFAULT 0,
+    stats TEXT
+);
+"""
+
+
+class RenderQueue:
+    """SQLite 기반 렌더링 작업 큐 (여러 프로세스에서 동시에 사용)"""
+
+    def __init__(self, queue_dir: Path = QUEUE_DIR):
+        self.queue_dir = Path(queue_dir)
+        self.queue_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.queue_dir / "render_queue.db"
+        self._local = threading.local()
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    class _Tx:
+        def __init__(self, conn: sqlite3.Connection):
+            self.conn = conn
+
+        def __enter__(self) -> sqlite3.Connection:
+            self.conn.execute('BEGIN IMMEDIATE')
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb):
+            self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+            return False
+
+    def _transaction(self) -> '_Tx':
+        return self._Tx(self._connect())
+
+    # ------------------------------------------------------------------
+    # 클라이언트(Flask) 측
+    # ------------------------------------------------------------------
+    def enqueue(self, html: str, pdf_path: Path, limit: int = RENDER_QUEUE_LIMIT) -> str:
+        """작업 추가. 대기+진행 중 작업이 limit 이상이면 RenderQueueFull"""
+        job_id = uuid.uuid4().hex
+        with self._transaction() as conn:
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM render_jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+            if pending >= limit:
+                raise RenderQueueFull(f"렌더링 대기열이 가득 찼습니다 ({pending}/{limit})")
+            conn.execute(
+                "INSERT INTO render_jobs (id, status, html, pdf_path, created) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, html, str(pdf_path), time.time()),
+            )
+        return job_id
+
+    def pending_count(self) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM render_jobs WHERE status IN ('queued', 'running')"
+        ).fetchone()[0]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute(
+            "SELECT id, status, pdf_path, backend, size, error, worker_id, created, started, finished "
+            "FROM render_jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def cancel(self, job_id: str) -> bool:
+        """아직 시작되지 않은 작업 취소"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE render_jobs SET status = 'cancelled', html = NULL, finished = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+            return cursor.rowcount > 0
+
+    # ------------------------------------------------------------------
+    # 워커 측
+    # ------------------------------------------------------------------
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """가장 오래된 대기 작업을 원자적으로 가져옴"""
+        # 유휴 워커가 빈 큐 때문에 쓰기 잠금(BEGIN IMMEDIATE)을 잡지 않도록 먼저 읽기로만 확인
+        if self._connect().execute(
+            "SELECT 1 FROM render_jobs WHERE status = 'queued' LIMIT 1"
+        ).fetchone() is None:
+            return None
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id, html, pdf_path FROM render_jobs WHERE status = 'queued' "
+                "ORDER BY created LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE render_jobs SET status = 'running', worker_id = ?, started = ? WHERE id = ?",
+                (worker_id, time.time(), row['id']),
+            )
+            conn.execute(
+                "UPDATE render_workers SET current_job = ? WHERE worker_id = ?",
+                (row['id'], worker_id),
+            )
+            return dict(row)
+
+    def finish(self, job_id: str, worker_id: str, backend: str, size: int) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE render_jobs SET status = 'done', html = NULL, backend = ?, size = ?, finished = ? "
+                "WHERE id = ? AND status = 'running'",
+                (backend, size, time.time(), job_id),
+            )
+            conn.execute(
+                "UPDATE render_workers SET current_job = NULL, jobs_done = jobs_done + 1 WHERE worker_id = ?",
+                (worker_id,),
+            )
+
+    def fail(self, job_id: str, error: str, worker_id: Optional[str] = None) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE render_jobs SET status = 'failed', html = NULL, error = ?, finished = ? "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (error[:2000], time.time(), job_id),
+            )
+            if worker_id:
+                conn.execute(
+                    "UPDATE render_workers SET current_job = NULL, jobs_failed = jobs_failed + 1 "
+                    "WHERE worker_id = ?",
+                    (worker_id,),
+                )
+
+    def heartbeat(self, worker_id: str, pid: int, stats: Optional[Dict[str, Any]] = None) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO render_workers (worker_id, pid, started, last_seen, stats) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(worker_id) DO UPDATE SET pid = excluded.pid, last_seen = excluded.last_seen, "
+                "stats = excluded.stats",
+                (worker_id, pid, now, now, json.dumps(stats or {}, default=str)),
+            )
+
+    # ------------------------------------------------------------------
+    # 서비스(감독) 측
+    # ------------------------------------------------------------------
+    def running_jobs(self) -> List[Dict[str, Any]]:
+        rows = self._connect().execute(
+            "SELECT id, worker_id, started FROM render_jobs WHERE status = 'running'"
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def remove_worker(self, worker_id: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM render_workers WHERE worker_id = ?", (worker_id,))
+
+    def live_workers(self, stale_seconds: float = WORKER_STALE_SECONDS) -> List[Dict[str, Any]]:
+        rows = self._connect().execute(
+            "SELECT worker_id, pid, started, last_seen, current_job, jobs_done, jobs_failed, stats "
+            "FROM render_workers WHERE last_seen >= ?",
+            (time.time() - stale_seconds,),
+        ).fetchall()
+        workers = []
+        for row in rows:
+            worker = dict(row)
+            try:
+                worker['stats'] = json.loads(worker['stats'] or '{}')
+            except ValueError:
+                worker['stats'] = {}
+            workers.append(worker)
+        return workers
+
+    def purge(self, older_than: float = FINISHED_JOB_RETENTION_SECONDS) -> int:
+        """끝난 작업 기록 정리"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM render_jobs WHERE status IN ('done', 'failed', 'cancelled') AND finished < ?",
+                (time.time() - older_than,),
+            )
+            conn.execute(
+                "DELETE FROM render_workers WHERE last_seen < ?",
+                (time.time() - older_than,),
+            )
+            return cursor.rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        rows = self._connect().execute(
+            "SELECT status, COUNT(*) AS count FROM render_jobs GROUP BY status"
+        ).fetchall()
+        by_status = {row['status']: row['count'] for row in rows}
+        waits = self._connect().execute(
+            "SELECT AVG(started - created), AVG(finished - started) FROM render_jobs "
+            "WHERE status = 'done' AND finished >= ?",
+            (time.time() - FINISHED_JOB_RETENTION_SECONDS,),
+        ).fetchone()
+        return {
+            'jobs': by_status,
+            'queue_wait_avg': round(waits[0] or 0.0, 3),
+            'render_seconds_avg': round(waits[1] or 0.0, 3),
+        }
+
+
+# ----------------------------------------------------------------------
+# 워커 프로세스
+# ----------------------------------------------------------------------
+def _worker_stats() -> Dict[str, Any]:
+    from cdp_renderer import get_cdp_stats
+    from chrome_pool import get_chrome_pool_stats
+    from page_readiness import get_readiness_stats
+    from render_watchdog import get_watchdog_stats
+    from weasy_pool import get_weasy_pool_stats
+    return {
+        'cdp': get_cdp_stats(),
+        'chrome_pool': get_chrome_pool_stats(),
+        'page_readiness': get_readiness_stats(),
+        'watchdog': get_watchdog_stats(),
+        'weasy_pool': get_weasy_pool_stats(),
+    }
+
+
+def run_worker(queue_dir: Path, worker_id: str) -> None:
+    """큐에서 작업을 가져와 렌더링하는 워커 루프 (SIGTERM 시 atexit로 브라우저 정리)"""
+    from pdf_backends import PDF_BACKEND, PDF_BACKENDS_AVAILABLE, render_with_backends
+    from render_watchdog import start_reaper
+    from weasy_pool import get_weasy_pool
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    queue = RenderQueue(queue_dir)
+    pid = os.getpid()
+    logger.info(f"🧵 렌더링 워커 시작: {worker_id} (pid {pid})")
+
+    # 긴 렌더링 중에도 살아 있음을 알리도록 하트비트는 별도 스레드에서 전송
+    def heartbeat_loop():
+        while True:
+            try:
+                queue.heartbeat(worker_id, pid, _worker_stats())
+            except Exception as e:
+                logger.debug(f"하트비트 실패: {e}")
+            time.sleep(HEARTBEAT_SECONDS)
+
+    queue.heartbeat(worker_id, pid)
+    start_reaper()
+
+    # Chrome이 없어 WeasyPrint가 주 백엔드이면 첫 작업 전에 프로세스 풀을 미리 띄움
+    weasy_pool = get_weasy_pool()
+    if weasy_pool is not None and PDF_BACKEND == 'weasyprint' \
+            and not {'cdp', 'chrome'} & set(PDF_BACKENDS_AVAILABLE):
+        weasy_pool.warm_up()
+    threading.Thread(target=heartbeat_loop, name='render-heartbeat', daemon=True).start()
+
+    idle_interval = POLL_INTERVAL_SECONDS
+    while True:
+        job = queue.claim(worker_id)
+        if job is None:
+            time.sleep(idle_interval)
+            idle_interval = min(idle_interval * 2, IDLE_POLL_MAX_SECONDS)
+            continue
+        idle_interval = POLL_INTERVAL_SECONDS
+
+        pdf_path = Path(job['pdf_path'])
+        started = time.monotonic()
+        try:
+            backend = render_with_backends(job['html'], pdf_path)
+            if backend is None:
+                queue.fail(job['id'], "사용 가능한 PDF 백엔드가 없습니다", worker_id)
+                continue
+            queue.finish(job['id'], worker_id, backend, pdf_path.stat().st_size)
+            logger.info(
+                f"✅ 렌더링 작업 완료: {job['id'][:8]} ({backend}, {time.monotonic() - started:.2f}초)"
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ 렌더링 작업 실패: {job['id'][:8]} ({e})")
+            queue.fail(job['id'], str(e), worker_id)
+
+
+# ----------------------------------------------------------------------
+# 서비스(감독) 프로세스
+# ----------------------------------------------------------------------
+class RenderService:
+    """워커 프로세스를 유지하고 시간 초과 작업을 정리하는 감독 프로세스"""
+
+    def __init__(
+        self,
+        queue_dir: Path = QUEUE_DIR,
+        workers: int = RENDER_WORKERS,
+        job_timeout: float = RENDER_JOB_TIMEOUT,
+        parent_pid: Optional[int] = None,
+    ):
+        self.queue_dir = Path(queue_dir)
+        self.worker_count = max(1, workers)
+        self.job_timeout = job_timeout
+        self.parent_pid = parent_pid
+        self.queue = RenderQueue(self.queue_dir)
+        self._workers: Dict[str, subprocess.Popen] = {}
+        self._stopping = False
+        self._lock_file = None
+
+    def _acquire_lock(self) -> bool:
+        """큐 디렉토리당 서비스 프로세스 하나만 실행"""
+        if fcntl is None:
+            return True
+        self._lock_file = open(self.queue_dir / "render_service.lock", 'w')
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+        self._lock_file.write(str(os.getpid()))
+        self._lock_file.flush()
+        return True
+
+    def _spawn(self, index: int) -> None:
+        worker_id = f"w{index}-{uuid.uuid4().hex[:6]}"
+        self._workers[worker_id] = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__),
+             '--queue-dir', str(self.queue_dir), '--worker', worker_id],
+        )
+
+    def _stop_worker(self, worker_id: str, proc: subprocess.Popen) -> None:
+        if proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=TERMINATE_GRACE_SECONDS)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        self.queue.remove_worker(worker_id)
+
+    def _parent_alive(self) -> bool:
+        if self.parent_pid is None:
+            return True
+        try:
+            os.kill(self.parent_pid, 0)
+            return True
+        except OSError:
+            return False
+
+    def _supervise_once(self) -> None:
+        # 시간 초과 작업: 워커를 종료하고 작업을 실패 처리 (워커는 아래에서 재시작)
+        now = time.time()
+        for job in self.queue.running_jobs():
+            proc = self._workers.get(job['worker_id'])
+            if now - (job['started'] or now) > self.job_timeout:
+                logger.warning(
+                    f"⏱️ 렌더링 작업 시간 초과({self.job_timeout:.0f}초): {job['id'][:8]}, 워커 {job['worker_id']} 종료"
+                )
+                self.queue.fail(job['id'], f"렌더링 시간 초과 ({self.job_timeout:.0f}초)", job['worker_id'])
+                if proc is not None:
+                    self._stop_worker(job['worker_id'], proc)
+            elif proc is None or proc.poll() is not None:
+                self.queue.fail(job['id'], "렌더링 워커가 비정상 종료되었습니다", job['worker_id'])
+
+        # 죽은 워커 재시작
+        for worker_id, proc in list(self._workers.items()):
+            if proc.poll() is not None:
+                logger.warning(f"⚠️ 렌더링 워커 종료 감지: {worker_id} (exit {proc.returncode})")
+                self.queue.remove_worker(worker_id)
+                del self._workers[worker_id]
+        while len(self._workers) < self.worker_count:
+            self._spawn(len(self._workers))
+
+    def run(self) -> int:
+        if not self._acquire_lock():
+            logger.info("ℹ️ 렌더링 서비스가 이미 실행 중입니다")
+            return 0
+
+        def stop(signum, frame):
+            self._stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        logger.info(
+            f"🚀 렌더링 서비스 시작: 워커 {self.worker_count}개, 작업 제한 {self.job_timeout:.0f}초, "
+            f"큐 {self.queue.db_path}"
+        )
+
+        last_purge = 0.0
+        last_reap = time.monotonic()
+        try:
+            while not self._stopping and self._parent_alive():
+                self._supervise_once()
+                if time.monotonic() - last_purge > 60:
+                    self.queue.purge()
+                    last_purge = time.monotonic()
+                # 강제 종료된 워커가 남긴 브라우저 정리
+                if time.monotonic() - last_reap > REAP_INTERVAL_SECONDS:
+                    reap_stray_browsers()
+                    last_reap = time.monotonic()
+                time.sleep(0.5)
+        finally:
+            for worker_id, proc in list(self._workers.items()):
+                self._stop_worker(worker_id, proc)
+            logger.info("🛑 렌더링 서비스 종료")
+        return 0
+
+
+# ----------------------------------------------------------------------
+# Flask 측 클라이언트
+# ----------------------------------------------------------------------
+class RenderClient:
+    """Flask 앱에서 렌더링 작업을 넣고 결과를 기다리는 클라이언트"""
+
+    def __init__(
+        self,
+        mode: str = RENDER_SERVICE_MODE,
+        queue_dir: Path = QUEUE_DIR,
+        job_timeout: float = RENDER_JOB_TIMEOUT,
+        queue_limit: int = RENDER_QUEUE_LIMIT,
+    ):
+        self.mode = mode
+        self.queue_dir = Path(queue_dir)
+        self.job_timeout = job_timeout
+        self.queue_limit = queue_limit
+        self._queue: Optional[RenderQueue] = None
+        self._service: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ('embedded', 'external')
+
+    @property
+    def queue(self) -> RenderQueue:
+        if self._queue is None:
+            self._queue = RenderQueue(self.queue_dir)
+        return self._queue
+
+    def ensure_service(self) -> None:
+        """embedded 모드에서 살아 있는 워커가 없으면 서비스 프로세스 시작"""
+        if self.mode != 'embedded':
+            return
+        with self._lock:
+            if self._service is not None and self._service.poll() is None:
+                return
+            if self.queue.live_workers():
+                return  # 다른 gunicorn 워커가 띄운 서비스가 동작 중
+            self._service = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__),
+                 '--queue-dir', str(self.queue_dir),
+                 '--workers', str(RENDER_WORKERS),
+                 '--job-timeout', str(self.job_timeout),
+                 '--parent-pid', str(os.getpid())],
+            )
+            logger.info(f"🚀 렌더링 서비스 프로세스 시작 (pid {self._service.pid})")
+
+    def is_saturated(self) -> bool:
+        """새 작업을 받을 수 없는 상태인지 (요청 초기에 백프레셔 판단용)"""
+        return self.queue.pending_count() >= self.queue_limit
+
+    def render(self, prepared_html: str, pdf_path: Path) -> str:
+        """
+        작업을 넣고 완료될 때까지 대기
+
+        Returns:
+            렌더링에 사용된 백엔드 이름
+        Raises:
+            RenderQueueFull, RenderServiceUnavailable, RenderJobFailed
+        """
+        self.ensure_service()
+        job_id = self.queue.enqueue(prepared_html, pdf_path, self.queue_limit)
+        enqueued = time.monotonic()
+        interval = POLL_INTERVAL_SECONDS
+
+        while True:
+            job = self.queue.get(job_id)
+            status = job['status'] if job else 'failed'
+            if status == 'done':
+                return job['backend']
+            if status in ('failed', 'cancelled'):
+                raise RenderJobFailed((job or {}).get('error') or f"렌더링 작업 {status}")
+
+            waited = time.monotonic() - enqueued
+            if status == 'queued' and waited > SERVICE_START_GRACE_SECONDS and not self.queue.live_workers():
+                if self.queue.cancel(job_id):
+                    raise RenderServiceUnavailable("살아 있는 렌더링 워커가 없습니다")
+            if waited > self.job_timeout + SERVICE_START_GRACE_SECONDS + TERMINATE_GRACE_SECONDS:
+                # 감독 프로세스가 정리하지 못한 경우의 안전장치
+                self.queue.cancel(job_id)
+                self.queue.fail(job_id, "렌더링 결과 대기 시간 초과")
+                raise RenderJobFailed("렌더링 결과 대기 시간 초과")
+            time.sleep(interval)
+            interval = min(interval * 2, RESULT_POLL_MAX_SECONDS)
+
+    def shutdown(self) -> None:
+        if self._service is not None and self._service.poll() is None:
+            self._service.terminate()
+            try:
+                self._service.wait(timeout=TERMINATE_GRACE_SECONDS * 2)
+            except subprocess.TimeoutExpired:
+                self._service.kill()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {'mode': self.mode}
+        if not self.enabled:
+            return stats
+        stats.update(self.queue.get_stats())
+        stats.update({
+            'queue_limit': self.queue_limit,
+            'job_timeout': self.job_timeout,
+            'workers': self.queue.live_workers(),
+        })
+        return stats
+
+
+_client: Optional[RenderClient] = None
+_client_lock = threading.Lock()
+
+
+def get_render_client() -> RenderClient:
+    """프로세스 전역 렌더링 클라이언트 (lazy loading)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import atexit
+                _client = RenderClient()
+                atexit.register(_client.shutdown)
+    return _client
+
+
+def get_render_service_stats() -> Dict[str, Any]:
+    """렌더링 서비스 지표 (큐 상태 + 워커별 브라우저 지표)"""
+    return get_render_client().get_stats()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="PDF 렌더링 서비스")
+    parser.add_argument('--queue-dir', default=str(QUEUE_DIR), help="작업 큐 디렉토리")
+    parser.add_argument('--workers', type=int, default=RENDER_WORKERS, help="워커 프로세스 수")
+    parser.add_argument('--job-timeout', type=float, default=RENDER_JOB_TIMEOUT, help="작업당 제한 시간(초)")
+    parser.add_argument('--parent-pid', type=int, default=None, help="부모 프로세스가 끝나면 같이 종료")
+    parser.add_argument('--worker', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    if args.worker:
+        run_worker(Path(args.queue_dir), args.worker)
+        return 0
+    return RenderService(
+        queue_dir=Path(args.queue_dir),
+        workers=args.workers,
+        job_timeout=args.job_timeout,
+        parent_pid=args.parent_pid,
+    ).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF 렌더링 워치독
+
+Chrome이 driver.get이나 printToPDF에서 멈추면 gunicorn timeout(300초)이 워커 전체를 죽일 때까지
+요청이 묶이고, 남겨진 chromium 프로세스가 컨테이너에 쌓입니다.
+- 단계별(load / fonts / print) 하드 데드라인: 넘기면 브라우저 프로세스 그룹을 강제 종료해
+  막혀 있는 호출을 풀고 StageTimeout을 발생
+- 전체 시간 예산: 백엔드 폴백(cdp → chrome → weasyprint → pdfkit)이 예산 안에서만 진행
+- 주기적 정리: 이 앱이 띄웠다가 고아가 된 chromium/chromedriver/wkhtmltopdf 종료, 좀비 자식 회수
+  (같은 사용자의 다른 headless 브라우저는 건드리지 않도록 BROWSER_MARKER_FLAG 표식으로 구분)
+
+WeasyPrint는 프로세스 풀(weasy_pool.py)에서 실행되면 풀을 종료해 중단합니다. 풀을 끈 경우
+(PDF_WEASY_POOL_WORKERS=0) 현재 프로세스 안에서 실행되어 초과 시간은 기록만 하며,
+렌더링 서비스(render_service.py)의 작업 시간 제한이 최종 안전장치입니다.
+"""
+
+import os
+import signal
+import logging
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterable, List, Optional
+
+try:
+    import psutil
+except ImportError:  # psutil이 없으면 고아 프로세스 탐색 없이 좀비 회수만 수행
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+STAGE_DEADLINES = {
+    'load': float(os.getenv('PDF_STAGE_LOAD_TIMEOUT', '20')),
+    'fonts': float(os.getenv('PDF_STAGE_FONTS_TIMEOUT', '15')),
+    'print': float(os.getenv('PDF_STAGE_PRINT_TIMEOUT', '60')),
+}
+TOTAL_BUDGET_SECONDS = float(os.getenv('PDF_RENDER_BUDGET', '100'))
+MIN_BACKEND_BUDGET_SECONDS = 3.0   # 남은 예산이 이보다 적으면 다음 백엔드를 시도하지 않음
+REAP_INTERVAL_SECONDS = float(os.getenv('PDF_REAP_INTERVAL', '60'))
+
+# 정리 대상 프로세스 이름 (소문자 부분 일치)
+BROWSER_PROCESS_NAMES = ('chrome', 'chromium', 'chromedriver', 'headless_shell', 'wkhtmltopdf')
+
+# 이 앱이 띄우는 Chrome에 붙이는 표식 스위치 (Chrome은 모르는 스위치를 무시). 고아 정리는 표식이 있는 것만 대상
+BROWSER_MARKER_FLAG = '--html-designer-render'
+# wkhtmltopdf에는 표식을 붙일 수 없으므로 출력 경로가 앱 임시 디렉토리 아래인지로 판단
+APP_TEMP_DIR = str(Path(tempfile.gettempdir()) / "html_designer")
+
+
+class StageTimeout(Exception):
+    """렌더링 단계가 데드라인을 넘겨 브라우저를 강제 종료함"""
+
+    def __init__(self, stage: str, deadline: float):
+        super().__init__(f"렌더링 단계 '{stage}' 시간 초과 ({deadline:.1f}초)")
+        self.stage = stage
+        self.deadline = deadline
+
+
+class RenderBudgetExhausted(Exception):
+    """전체 렌더링 시간 예산을 모두 사용함"""
+
+
+# ----------------------------------------------------------------------
+# 누적 지표
+# ----------------------------------------------------------------------
+_stats_lock = threading.Lock()
+_stage_timeouts: Counter = Counter()    # "backend:stage" → 횟수
+_stage_overruns: Counter = Counter()    # 강제 종료할 수 없는 단계의 데드라인 초과
+_counters: Counter = Counter()
+
+
+def _count(counter: Counter, key: str, amount: int = 1) -> None:
+    with _stats_lock:
+        counter[key] += amount
+
+
+def get_watchdog_stats() -> Dict[str, Any]:
+    """단계별 시간 초과, 예산 소진, 프로세스 정리 횟수"""
+    with _stats_lock:
+        return {
+            'stage_deadlines': dict(STAGE_DEADLINES),
+            'total_budget': TOTAL_BUDGET_SECONDS,
+            'stage_timeouts': dict(_stage_timeouts),
+            'stage_overruns': dict(_stage_overruns),
+            'budget_exhausted': _counters['budget_exhausted'],
+            'processes_killed': _counters['processes_killed'],
+            'orphans_killed': _counters['orphans_killed'],
+            'zombies_reaped': _counters['zombies_reaped'],
+        }
+
+
+# ----------------------------------------------------------------------
+# 프로세스 정리
+# ----------------------------------------------------------------------
+def kill_process_tree(pid: Optional[int]) -> None:
+    """
+    pid와 모든 자손 프로세스를 SIGKILL
+
+    start_new_session으로 띄운 프로세스(CDP 브라우저)는 프로세스 그룹째 종료하고,
+    현재 프로세스와 같은 그룹인 경우(chromedriver)는 psutil로 자손을 찾아 종료합니다.
+    """
+    if not pid:
+        return
+    try:
+        pgid = os.getpgid(pid)
+        if pgid == pid and pgid != os.getpgrp():
+            os.killpg(pgid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+    targets = []
+    if psutil is not None:
+        try:
+            targets = psutil.Process(pid).children(recursive=True)
+        except psutil.Error:
+            targets = []
+    for proc in targets:
+        try:
+            proc.kill()
+        except psutil.Error:
+            pass
+    try:
+        os.kill(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    _count(_counters, 'processes_killed', 1 + len(targets))
+
+    try:
+        os.waitpid(pid, os.WNOHANG)
+    except ChildProcessError:
+        pass
+
+
+def kill_child_processes(names: Iterable[str]) -> None:
+    """현재 프로세스의 자손 중 이름이 일치하는 프로세스 종료 (pdfkit의 wkhtmltopdf 등)"""
+    if psutil is None:
+        return
+    names = tuple(names)
+    for proc in psutil.Process().children(recursive=True):
+        try:
+            if any(name in proc.name().lower() for name in names):
+                kill_process_tree(proc.pid)
+        except psutil.Error:
+            continue
+
+
+def _is_browser_process(name: str) -> bool:
+    name = (name or '').lower()
+    return any(candidate in name for candidate in BROWSER_PROCESS_NAMES)
+
+
+def _is_app_browser(proc, name: str, cmdline: List[str]) -> bool:
+    """이 앱이 띄운 렌더링 프로세스인지 (Chrome 표식, 표식 Chrome을 자식으로 둔 chromedriver, 앱 임시 디렉토리로 출력하는 wkhtmltopdf)"""
+    if BROWSER_MARKER_FLAG in cmdline:
+        return True
+    name = (name or '').lower()
+    if 'wkhtmltopdf' in name:
+        return any(arg.startswith(APP_TEMP_DIR) for arg in cmdline)
+    if 'chromedriver' in name:
+        for child in proc.children(recursive=True):
+            try:
+                if BROWSER_MARKER_FLAG in (child.cmdline() or ()):
+                    return True
+            except psutil.Error:
+                continue
+    return False
+
+
+def reap_stray_browsers() -> Dict[str, int]:
+    """
+    좀비 자식 회수 + 고아가 된 렌더링 브라우저 종료
+
+    고아 판단: 같은 사용자 소유, 부모가 init(PPID 1)으로 바뀌었고 이 앱이 띄운 것(_is_app_browser)인
+    chromium/chromedriver/wkhtmltopdf. (렌더링 서비스 워커가 강제 종료되면 그 워커가 띄운 브라우저가
+    이 상태가 됩니다. 같은 컨테이너의 다른 도구가 띄운 headless 브라우저는 종료하지 않음)
+    """
+    reaped = 0
+    killed = 0
+
+    # 컨테이너에서 PID 1로 실행 중이면 고아 프로세스의 좀비도 직접 회수해야 함
+    if os.getpid() == 1:
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            reaped += 1
+    elif psutil is not None:
+        for child in psutil.Process().children():
+            try:
+                if child.status() == psutil.STATUS_ZOMBIE and _is_browser_process(child.name()):
+                    os.waitpid(child.pid, os.WNOHANG)
+                    reaped += 1
+            except (psutil.Error, ChildProcessError):
+                continue
+
+    if psutil is not None:
+        uid = os.getuid() if hasattr(os, 'getuid') else None
+        for proc in psutil.process_iter(['pid', 'ppid', 'name', 'uids', 'cmdline']):
+            info = proc.info
+            try:
+                if info['ppid'] != 1 or info['pid'] == os.getpid():
+                    continue
+                if not _is_browser_process(info['name']):
+                    continue
+                if uid is not None and info['uids'] and info['uids'].real != uid:
+                    continue
+                if not _is_app_browser(proc, info['name'], info['cmdline'] or []):
+                    continue
+                proc.kill()
+                killed += 1
+            except psutil.Error:
+                continue
+
+    if reaped or killed:
+        _count(_counters, 'zombies_reaped', reaped)
+        _count(_counters, 'orphans_killed', killed)
+        logger.info(f"🧹 브라우저 프로세스 정리: 고아 {killed}개 종료, 좀비 {reaped}개 회수")
+    return {'reaped': reaped, 'killed': killed}
+
+
+_reaper_started = False
+_reaper_lock = threading.Lock()
+
+
+def start_reaper(interval: float = REAP_INTERVAL_SECONDS) -> None:
+    """주기적으로 reap_stray_browsers를 실행하는 데몬 스레드 시작 (프로세스당 한 번)"""
+    global _reaper_started
+    with _reaper_lock:
+        if _reaper_started or interval <= 0:
+            return
+        _reaper_started = True
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                reap_stray_browsers()
+            except Exception as e:
+                logger.debug(f"브라우저 프로세스 정리 실패: {e}")
+
+    threading.Thread(target=loop, name='browser-reaper', daemon=True).start()
+
+
+# ----------------------------------------------------------------------
+# 워치독
+# ----------------------------------------------------------------------
+class RenderWatchdog:
+    """한 번의 PDF 변환(백엔드 폴백 포함)에 대한 단계별 데드라인과 전체 예산"""
+
+    def __init__(self, budget: float = TOTAL_BUDGET_SECONDS, deadlines: Optional[Dict[str, float]] = None):
+        self.budget = budget
+        self.deadlines = dict(STAGE_DEADLINES, **(deadlines or {}))
+        self.started = time.monotonic()
+        self.backend = 'unknown'
+        self.stage_times: Dict[str, float] = {}
+
+    def remaining(self) -> float:
+        return max(0.0, self.budget - (time.monotonic() - self.started))
+
+    def begin_backend(self, backend: str) -> None:
+        """다음 백엔드를 시작할 예산이 있는지 확인"""
+        if self.remaining() < MIN_BACKEND_BUDGET_SECONDS:
+            _count(_counters, 'budget_exhausted')
+            raise RenderBudgetExhausted(
+                f"렌더링 시간 예산({self.budget:.0f}초) 소진으로 {backend} 백엔드부터 생략합니다"
+            )
+        self.backend = backend
+
+    def stage_limit(self, stage: str) -> float:
+        """단계 데드라인과 남은 전체 예산 중 작은 값"""
+        return max(0.1, min(self.deadlines.get(stage, self.budget), self.remaining()))
+
+    @contextmanager
+    def stage(self, stage: str, kill: Optional[Callable[[], None]]):
+        """
+        데드라인 안에 끝나지 않으면 kill()을 호출해 막힌 호출을 풀고 StageTimeout 발생
+
+        kill이 None이면(프로세스 내부 렌더링) 초과 사실만 기록합니다.
+        """
+        limit = self.stage_limit(stage)
+        fired = threading.Event()
+
+        def on_timeout():
+            fired.set()
+            logger.error(f"⏱️ {self.backend} '{stage}' 단계가 {limit:.1f}초를 넘겨 브라우저를 종료합니다")
+            try:
+                kill()
+            except Exception as e:
+                logger.warning(f"⚠️ 브라우저 강제 종료 실패: {e}")
+
+        timer = None
+        if kill is not None:
+            timer = threading.Timer(limit, on_timeout)
+            timer.daemon = True
+            timer.start()
+
+        started = time.monotonic()
+        try:
+            yield limit
+        except Exception as e:
+            if fired.is_set():
+                _count(_stage_timeouts, f"{self.backend}:{stage}")
+                raise StageTimeout(stage, limit) from e
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            self.stage_times[f"{self.backend}:{stage}"] = time.monotonic() - started
+
+        if fired.is_set():
+            # 호출이 끝난 직후 타이머가 발동한 경우: 브라우저는 이미 종료됨
+            _count(_stage_timeouts, f"{self.backend}:{stage}")
+            raise StageTimeout(stage, limit)
+        if kill is None and time.monotonic() - started > limit:
+            _count(_stage_overruns, f"{self.backend}:{stage}")
+            logger.warning(f"⚠️ {self.backend} '{stage}' 단계가 데드라인({limit:.1f}초)을 넘겼습니다")
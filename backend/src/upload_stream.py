@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+업로드 파일 스트리밍 저장
+
+예전에는 /api/convert가 업로드마다 file.read()로 전체 바이트(요청당 최대 20MB)를 메모리에 올려
+해시를 계산하고, generate_html_from_files가 같은 바이트를 다시 디스크에 썼습니다.
+- multipart 파서의 stream factory를 바꿔 파일 조각을 요청 단위 임시 디렉토리(TEMP_DIR/input_*)에
+  바로 기록
+- 기록하면서 파일별 SHA-256을 점진적으로 계산하고 요청 전체 크기 상한을 스트림 도중에 검사
+- 파이프라인에는 경로 목록({'filename', 'path', 'size', 'sha256'})만 넘김
+
+디렉토리 소유권: 변환 작업에 넘긴(claim) 디렉토리는 작업이 끝날 때 삭제하고,
+넘기지 않은 디렉토리(검증 실패, 진행 중 작업에 합류)는 요청 종료 시 삭제합니다.
+프로세스가 중간에 죽어 남은 디렉토리는 janitor가 정리합니다.
+"""
+
+import io
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_MAX_BYTES = 20 * 1024 * 1024  # 요청당 첨부 파일 합계 (app.config['MAX_CONTENT_LENGTH']와 동일)
+
+_stats_lock = threading.Lock()
+_stats = {
+    'requests': 0,
+    'files': 0,
+    'bytes': 0,
+    'rejected_too_large': 0,
+    'discarded_dirs': 0,
+}
+
+
+class UploadTooLarge(RequestEntityTooLarge):
+    """스트리밍 도중 요청 전체 업로드 크기 상한 초과"""
+
+    def __init__(self, received: int, limit: int):
+        super().__init__(f"업로드 크기 {received:,} 바이트가 상한 {limit:,} 바이트를 초과했습니다")
+        self.received = received
+        self.limit = limit
+
+
+class HashingFileWriter(io.RawIOBase):
+    """디스크에 기록하면서 SHA-256과 크기를 누적하는 파일 객체 (multipart 파서가 write/seek 호출)"""
+
+    def __init__(self, path: Path, session: 'UploadSession'):
+        super().__init__()
+        self.path = path
+        self.size = 0
+        self._session = session
+        self._hasher = hashlib.sha256()
+        self._file = open(path, 'w+b')
+
+    def writable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._session.account(len(data))
+        self._hasher.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    def readinto(self, buffer) -> int:
+        return self._file.readinto(buffer)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def flush(self) -> None:
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        super().close()
+
+    @property
+    def sha256(self) -> str:
+        return self._hasher.hexdigest()
+
+
+class UploadSession:
+    """요청 하나의 업로드 디렉토리와 기록 중인 파일들"""
+
+    def __init__(self, base_dir: Path, max_bytes: int = UPLOAD_MAX_BYTES):
+        self.base_dir = Path(base_dir)
+        self.max_bytes = max_bytes
+        self.received = 0
+        self.directory: Optional[Path] = None
+        self.claimed = False
+        self._writers: List[HashingFileWriter] = []
+        self._names: set = set()
+
+    def account(self, size: int) -> None:
+        self.received += size
+        if self.received > self.max_bytes:
+            with _stats_lock:
+                _stats['rejected_too_large'] += 1
+            logger.warning(f"⚠️ 업로드 크기 상한 초과로 수신 중단 ({self.received / 1024 / 1024:.1f} MB)")
+            raise UploadTooLarge(self.received, self.max_bytes)
+
+    def _unique_name(self, filename: str) -> str:
+        """secure_filename 결과가 겹치거나 비면(한글 파일명 등) 확장자를 살려 고유 이름 생성"""
+        suffix = Path(filename).suffix.lower()
+        safe = secure_filename(filename) or f"upload{suffix}"
+        if not safe.lower().endswith(suffix):
+            safe = f"{safe}{suffix}"
+        name, stem = safe, Path(safe).stem
+        counter = 1
+        while name.lower() in self._names:
+            name = f"{stem}_{counter}{Path(safe).suffix}"
+            counter += 1
+        self._names.add(name.lower())
+        return name
+
+    def open(self, filename: str) -> HashingFileWriter:
+        if self.directory is None:
+            self.directory = self.base_dir / f"input_{uuid.uuid4().hex}"
+            self.directory.mkdir(parents=True, exist_ok=True)
+        writer = HashingFileWriter(self.directory / self._unique_name(filename), self)
+        self._writers.append(writer)
+        return writer
+
+    def describe(self, writer: HashingFileWriter, filename: str) -> Dict[str, Any]:
+        """기록이 끝난 파일을 파이프라인용 항목으로 변환 (파일 핸들은 닫음)"""
+        writer.close()
+        return {
+            'filename': filename,
+            'path': writer.path,
+            'size': writer.size,
+            'sha256': writer.sha256,
+        }
+
+    def claim(self) -> None:
+        """업로드 디렉토리를 변환 작업에 넘김 (요청 종료 시 삭제하지 않음)"""
+        self.claimed = True
+        with _stats_lock:
+            _stats['requests'] += 1
+            _stats['files'] += len(self._writers)
+            _stats['bytes'] += self.received
+
+    def discard(self) -> None:
+        """작업에 넘기지 않은 업로드 디렉토리 삭제"""
+        for writer in self._writers:
+            writer.close()
+        if self.claimed or self.directory is None:
+            return
+        shutil.rmtree(self.directory, ignore_errors=True)
+        with _stats_lock:
+            _stats['discarded_dirs'] += 1
+
+
+class StreamingUploadRequest(Request):
+    """업로드 파일을 메모리/SpooledTemporaryFile 대신 요청 단위 디렉토리로 스트리밍하는 Request"""
+
+    upload_base_dir: Optional[Path] = None
+    upload_max_bytes: int = UPLOAD_MAX_BYTES
+
+    @property
+    def upload_session(self) -> Optional[UploadSession]:
+        return getattr(self, '_upload_session', None)
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.upload_base_dir is None or not filename:
+            # 빈 파일 입력(<input type=file> 미선택)은 디렉토리에 남기지 않음
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        session = self.upload_session
+        if session is None:
+            session = UploadSession(self.upload_base_dir, self.upload_max_bytes)
+            self._upload_session = session
+        return session.open(filename)
+
+
+def release_uploads(uploaded_files: List[Dict[str, Any]]) -> None:
+    """변환 작업이 끝난 뒤 업로드 디렉토리 삭제"""
+    for directory in {Path(f['path']).parent for f in uploaded_files if f.get('path')}:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def get_upload_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['max_bytes'] = UPLOAD_MAX_BYTES
+    return stats
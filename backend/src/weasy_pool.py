@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WeasyPrint 프로세스 풀
+
+Chrome을 쓸 수 없을 때의 폴백인 WeasyPrint는 CPU 연산 위주라 GIL을 잡고 있고,
+문서마다 폰트(FontConfiguration)와 @font-face CSS를 다시 파싱합니다.
+- 미리 띄운 spawn 프로세스 풀에서 렌더링 (워커마다 폰트 설정/폰트 CSS를 한 번만 준비해 재사용)
+- 강제 페이지 나눔이 있는 긴 문서는 페이지 묶음(chunk)으로 나눠 여러 워커에서 동시에
+  렌더링한 뒤 pypdf로 병합
+- 워치독이 데드라인 초과를 알리면 풀 전체를 종료하고 다음 렌더링 때 다시 띄움
+
+A4 레이아웃 가드는 문서 안의 <style>로 유지합니다. write_pdf(stylesheets=...)로 넘긴 CSS는
+사용자(user) 출처로 취급되어 문서 스타일보다 우선순위가 낮아지므로 가드 역할을 못 합니다.
+"""
+
+import os
+import re
+import time
+import uuid
+import logging
+import threading
+import multiprocessing
+from pathlib import Path
+from html.parser import HTMLParser
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    PYPDF_AVAILABLE = True
+except ImportError:  # pypdf가 없으면 페이지 분할 없이 문서 단위로만 렌더링
+    PYPDF_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+POOL_WORKERS = int(os.getenv('PDF_WEASY_POOL_WORKERS', '2'))   # 0이면 프로세스 내부 렌더링
+MAX_TASKS_PER_CHILD = int(os.getenv('PDF_WEASY_MAX_TASKS_PER_CHILD', '50'))
+CHUNK_MIN_PAGES = int(os.getenv('PDF_WEASY_CHUNK_MIN_PAGES', '8'))
+
+# 페이지 단위로 작성된 교재의 최상위 페이지 요소
+_PAGE_CLASSES = {'page', 'a4-page', 'page-section'}
+_VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr',
+}
+_FORCED_BREAK = re.compile(
+    r'(?:page-break-(?:before|after)\s*:\s*always|break-(?:before|after)\s*:\s*(?:page|always))',
+    re.IGNORECASE,
+)
+# 페이지 번호/전체 페이지 수, 첫 페이지 전용 스타일은 묶음마다 다시 적용되므로 분할 불가
+_CHUNK_UNSAFE = re.compile(r'counter\(\s*pages?\s*\)|@page\s*:first', re.IGNORECASE)
+_LOCAL_FONTS_BLOCK = re.compile(r'\s*<style id="local-fonts">.*?</style>\s*', re.DOTALL)
+
+
+# ----------------------------------------------------------------------
+# 풀 워커 프로세스 (spawn으로 시작되므로 모듈 전역은 워커마다 따로 존재)
+# ----------------------------------------------------------------------
+_FONT_CONFIG = None
+_FONTS_CSS = None
+
+
+def _init_worker() -> None:
+    """워커 시작 시 폰트 설정과 번들 @font-face CSS를 한 번만 준비"""
+    global _FONT_CONFIG, _FONTS_CSS
+    from weasyprint import CSS
+    try:
+        from weasyprint.text.fonts import FontConfiguration
+    except ImportError:  # WeasyPrint 53 이전
+        from weasyprint.fonts import FontConfiguration
+    from font_bundle import get_font_bundle
+
+    _FONT_CONFIG = FontConfiguration()
+    bundle = get_font_bundle()
+    if bundle.available:
+        # 폰트 서버는 부모 프로세스에 있으므로 워커는 번들 파일을 file:// URL로 직접 읽음
+        css = bundle.font_face_css(None, base_url=bundle.font_dir.as_uri(), aliases=bundle.alias_map())
+        if css:
+            _FONTS_CSS = CSS(string=css, font_config=_FONT_CONFIG)
+
+
+def _render_job(prepared_html: str, pdf_path: str) -> int:
+    """워커에서 PDF 한 개 렌더링 후 크기 반환"""
+    from weasyprint import HTML
+
+    stylesheets = []
+    if _FONTS_CSS is not None:
+        # 문서의 서브셋 @font-face 대신 미리 파싱한 번들 폰트 사용 (PDF 저장 시 WeasyPrint가 다시 서브셋)
+        prepared_html = _LOCAL_FONTS_BLOCK.sub('\n', prepared_html, count=1)
+        stylesheets.append(_FONTS_CSS)
+    HTML(string=prepared_html, base_url='.').write_pdf(
+        pdf_path, stylesheets=stylesheets, font_config=_FONT_CONFIG
+    )
+    return os.path.getsize(pdf_path)
+
+
+# ----------------------------------------------------------------------
+# 페이지 분할
+# ----------------------------------------------------------------------
+class _PageLocator(HTMLParser):
+    """같은 부모 아래 연속된 최상위 페이지 요소의 (시작, 끝) 오프셋 수집"""
+
+    def __init__(self, html_content: str):
+        super().__init__(convert_charrefs=False)
+        self._line_offsets = [0]
+        for line in html_content.splitlines(keepends=True):
+            self._line_offsets.append(self._line_offsets[-1] + len(line))
+        self._html = html_content
+        self._stack: List[Tuple[str, Optional[int], int]] = []   # (태그, 페이지 시작 오프셋, 부모 id)
+        self._open_page = False
+        self._element_ids = 0
+        self.pages: List[Tuple[int, int, int]] = []               # (시작, 끝, 부모 id)
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_offsets[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            return
+        self._element_ids += 1
+        parent_id = self._stack[-1][2] if self._stack else 0
+        classes = set((dict(attrs).get('class') or '').split())
+        if not self._open_page and classes & _PAGE_CLASSES:
+            self._open_page = True
+            self._stack.append((tag, self._offset(), parent_id))
+        else:
+            self._stack.append((tag, None, self._element_ids))
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        # 닫히지 않은 태그가 있어도 가장 가까운 같은 태그까지 정리
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                break
+        else:
+            return
+        for open_tag, page_start, parent_id in reversed(self._stack[index:]):
+            if page_start is not None:
+                start = self._offset()
+                end = self._html.find('>', start) + 1
+                if open_tag == tag and end > 0:
+                    self.pages.append((page_start, end, parent_id))
+                self._open_page = False
+        del self._stack[index:]
+
+
+def split_pages(html_content: str) -> Optional[Tuple[str, List[str], str]]:
+    """
+    (앞부분, 페이지 HTML 목록, 뒷부분)으로 분할. 분할이 안전하지 않으면 None
+
+    페이지 요소가 같은 부모 아래 공백만 사이에 두고 이어져 있어야 하며,
+    각 묶음 문서 = 앞부분 + 해당 페이지들 + 뒷부분 입니다.
+    """
+    locator = _PageLocator(html_content)
+    try:
+        locator.feed(html_content)
+        locator.close()
+    except Exception:
+        return None
+
+    pages = locator.pages
+    if len(pages) < 2 or len({parent for _, _, parent in pages}) != 1:
+        return None
+    for (_, prev_end, _), (next_start, _, _) in zip(pages, pages[1:]):
+        if html_content[prev_end:next_start].strip():
+            return None
+
+    prefix = html_content[:pages[0][0]]
+    suffix = html_content[pages[-1][1]:]
+    return prefix, [html_content[start:end] for start, end, _ in pages], suffix
+
+
+def _chunk_documents(html_content: str, chunk_count: int) -> Optional[List[str]]:
+    """강제 페이지 나눔이 있는 긴 문서를 chunk_count개 이하의 독립 문서로 분할"""
+    if chunk_count < 2 or not PYPDF_AVAILABLE:
+        return None
+    if not _FORCED_BREAK.search(html_content) or _CHUNK_UNSAFE.search(html_content):
+        return None
+    parts = split_pages(html_content)
+    if parts is None:
+        return None
+    prefix, pages, suffix = parts
+    if len(pages) < CHUNK_MIN_PAGES:
+        return None
+
+    size = -(-len(pages) // chunk_count)
+    return [prefix + '\n'.join(pages[i:i + size]) + suffix for i in range(0, len(pages), size)]
+
+
+def _merge_pdfs(parts: List[Path], pdf_path: Path) -> None:
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(str(part)))
+    with open(pdf_path, 'wb') as f:
+        writer.write(f)
+
+
+# ----------------------------------------------------------------------
+# 풀 관리 (렌더링 프로세스 쪽)
+# ----------------------------------------------------------------------
+class WeasyPrintPool:
+    """spawn 프로세스 풀에서 WeasyPrint 렌더링 (필요할 때 생성, 데드라인 초과 시 재시작)"""
+
+    def __init__(self, workers: int = POOL_WORKERS, max_tasks_per_child: int = MAX_TASKS_PER_CHILD):
+        self.workers = max(1, workers)
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self._lock = threading.Lock()
+        self._pool = None
+        self._stats = {
+            'renders': 0,
+            'chunked_renders': 0,
+            'chunks': 0,
+            'failures': 0,
+            'restarts': 0,
+        }
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # gunicorn/렌더링 워커의 스레드와 브라우저 상태를 물려받지 않도록 fork 대신 spawn
+                context = multiprocessing.get_context('spawn')
+                self._pool = context.Pool(
+                    processes=self.workers,
+                    initializer=_init_worker,
+                    maxtasksperchild=self.max_tasks_per_child,
+                )
+                logger.info(f"🧩 WeasyPrint 프로세스 풀 시작: 워커 {self.workers}개")
+            return self._pool
+
+    def warm_up(self) -> None:
+        """워커 프로세스를 미리 띄움 (첫 변환에서 기동 비용을 내지 않도록)"""
+        self._get_pool()
+
+    def render(self, prepared_html: str, pdf_path: Path, timeout: float) -> int:
+        """pdf_path에 PDF를 만들고 크기 반환. timeout초 안에 끝나지 않으면 TimeoutError"""
+        pool = self._get_pool()
+        pdf_path = Path(pdf_path)
+        documents = _chunk_documents(prepared_html, self.workers)
+
+        try:
+            if documents is None:
+                size = pool.apply_async(_render_job, (prepared_html, str(pdf_path))).get(timeout)
+                self._count('renders')
+                return size
+            return self._render_chunks(pool, documents, pdf_path, timeout)
+        except multiprocessing.TimeoutError:
+            self._count('failures')
+            raise TimeoutError(f"WeasyPrint 렌더링 시간 초과 ({timeout:.1f}초)")
+        except Exception:
+            self._count('failures')
+            raise
+
+    def _render_chunks(self, pool, documents: List[str], pdf_path: Path, timeout: float) -> int:
+        part_paths = [pdf_path.with_name(f"{pdf_path.stem}.part{i}_{uuid.uuid4().hex[:8]}.pdf")
+                      for i in range(len(documents))]
+        try:
+            results = [pool.apply_async(_render_job, (document, str(part)))
+                       for document, part in zip(documents, part_paths)]
+            deadline = time.monotonic() + timeout
+            for result in results:
+                result.get(max(0.1, deadline - time.monotonic()))
+
+            _merge_pdfs(part_paths, pdf_path)
+            with self._lock:
+                self._stats['renders'] += 1
+                self._stats['chunked_renders'] += 1
+                self._stats['chunks'] += len(documents)
+            logger.info(f"🧩 WeasyPrint 페이지 분할 렌더링: {len(documents)}개 묶음 병합")
+            return pdf_path.stat().st_size
+        finally:
+            for part in part_paths:
+                try:
+                    part.unlink()
+                except OSError:
+                    pass
+
+    def restart(self) -> None:
+        """실행 중인 렌더링을 모두 중단 (워치독 kill). 다음 렌더링 때 새 풀 생성"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            if pool is None:
+                return
+            self._stats['restarts'] += 1
+        pool.terminate()
+        logger.warning("♻️ WeasyPrint 프로세스 풀 재시작")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'enabled': True,
+                'workers': self.workers,
+                'running': self._pool is not None,
+                'chunking': PYPDF_AVAILABLE,
+            })
+            return stats
+
+
+_pool: Optional[WeasyPrintPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_weasy_pool() -> Optional[WeasyPrintPool]:
+    """프로세스 전역 WeasyPrint 풀 (PDF_WEASY_POOL_WORKERS=0이면 None → 프로세스 내부 렌더링)"""
+    global _pool
+    if POOL_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WeasyPrintPool()
+    return _pool
+
+
+def get_weasy_pool_stats() -> Dict[str, Any]:
+    """WeasyPrint 풀 지표 (풀이 아직 생성되지 않았으면 기본값)"""
+    if _pool is None:
+        return {'enabled': POOL_WORKERS > 0, 'workers': max(0, POOL_WORKERS), 'running': False, 'renders': 0}
+    return _pool.get_stats()
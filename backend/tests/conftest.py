@@ -0,0 +1,10 @@
+# tests/conftest.py
+"""
+백엔드 모듈 테스트 설정 (src/를 import 경로에 추가)
+"""
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
@@ -0,0 +1,112 @@
+# tests/test_artifact_store.py
+"""
+PDF 결과 저장소(ArtifactStore) 테스트
+"""
+import time
+import pytest
+from pathlib import Path
+from artifact_store import ArtifactStore, file_sha256
+
+
+def _pdf(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(b"%PDF-1.4\n" + content)
+    return path
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(tmp_path / "store", max_bytes=10 * 1024 * 1024, max_age=3600)
+
+
+class TestPutGet:
+    """등록과 조회"""
+
+    def test_put_then_get(self, store, tmp_path):
+        pdf = _pdf(tmp_path, "a.pdf", b"a" * 100)
+
+        record = store.put("key-a", pdf, effective_prompt="분수 학습지")
+        found = store.get("key-a")
+
+        assert found["sha256"] == file_sha256(pdf) == record["sha256"]
+        assert found["effective_prompt"] == "분수 학습지"
+        assert open(found["path"], "rb").read() == pdf.read_bytes()
+        assert pdf.exists()   # 원본은 호출한 쪽이 정리
+
+    def test_missing_key(self, store):
+        assert store.get("unknown") is None
+        assert store.get_stats()["misses"] == 1
+
+    def test_same_pdf_shared_between_keys(self, store, tmp_path):
+        pdf = _pdf(tmp_path, "a.pdf", b"a" * 100)
+
+        store.put("key-1", pdf)
+        store.put("key-2", pdf)
+        store.remove("key-1")
+
+        stats = store.get_stats()
+        assert (stats["entries"], stats["objects"]) == (1, 1)
+        assert store.get("key-2") is not None
+
+    def test_expired_entry_removed(self, tmp_path):
+        store = ArtifactStore(tmp_path / "store", max_age=0.05)
+        store.put("key-a", _pdf(tmp_path, "a.pdf", b"a"))
+
+        time.sleep(0.1)
+
+        assert store.get("key-a") is None
+        assert store.get_stats()["expired"] == 1
+
+
+class TestEvict:
+    """용량 상한 정리"""
+
+    def test_least_recently_used_evicted(self, store, tmp_path):
+        sizes = []
+        for name in ("old", "mid", "new"):
+            sizes.append(store.put(name, _pdf(tmp_path, f"{name}.pdf", name.encode() * 1000))["size"])
+            time.sleep(0.01)
+        store.get("old")   # 최근 사용으로 갱신
+
+        removed = store.evict(max_bytes=sizes[0] + sizes[2])
+
+        assert removed == 1
+        assert store.get("mid") is None
+        assert store.get("old") is not None and store.get("new") is not None
+
+    def test_object_deleted_with_last_key(self, store, tmp_path):
+        record = store.put("key-a", _pdf(tmp_path, "a.pdf", b"a" * 100))
+
+        store.evict(max_bytes=0)
+
+        assert store.get_stats()["entries"] == 0
+        assert not Path(record["path"]).exists()
+
+
+class TestRebuild:
+    """인덱스 유실 후 복원"""
+
+    def test_index_restored_from_sidecars(self, tmp_path):
+        root = tmp_path / "store"
+        store = ArtifactStore(root)
+        record = store.put("key-a", _pdf(tmp_path, "a.pdf", b"a" * 100), effective_prompt="요청")
+        store._connect().close()
+        for suffix in ("", "-wal", "-shm"):
+            (root / f"artifacts.db{suffix}").unlink(missing_ok=True)
+
+        reopened = ArtifactStore(root)
+        reopened.rebuild()
+
+        found = reopened.get("key-a")
+        assert found["sha256"] == record["sha256"]
+        assert found["effective_prompt"] == "요청"
+        assert reopened.get_stats()["rebuilt"] == 1
+
+    def test_key_with_missing_object_dropped(self, store, tmp_path):
+        record = store.put("key-a", _pdf(tmp_path, "a.pdf", b"a" * 100))
+        Path(record["path"]).unlink()
+
+        store.rebuild()
+
+        assert store.get_stats()["entries"] == 0
+        assert not store._meta_path("key-a").exists()
@@ -0,0 +1,91 @@
+# tests/test_chunk_ranker.py
+"""
+첨부 자료 관련 구간 발췌(BM25) 테스트
+"""
+from chunk_ranker import GAP_MARKER, BM25, select_relevant, split_sections, tokenize
+
+FILLER = "일반적인 안내 문장입니다. " * 30
+
+
+def _document(sections=10, **special):
+    """'## 단원 i' 제목의 구간들. special[i]가 있으면 그 단원 본문으로 사용"""
+    return "\n\n".join(
+        f"## 단원 {i}\n{special.get(f's{i}', FILLER)}" for i in range(sections)
+    )
+
+
+class TestTokenize:
+    """검색용 토큰"""
+
+    def test_particle_matches_stem(self):
+        tokens = tokenize("분수를 배웁니다")
+
+        assert "분수를" in tokens
+        assert "분수" in tokens
+
+    def test_latin_lowercased(self):
+        assert tokenize("BM25 Ranking") == ["bm25", "ranking"]
+
+
+class TestSplitSections:
+    """제목/빈 줄 기준 구간 분할"""
+
+    def test_heading_starts_new_chunk(self):
+        chunks = split_sections("## 가\n본문 하나\n\n## 나\n본문 둘")
+
+        assert [chunk.text for chunk in chunks] == ["## 가\n본문 하나", "## 나\n본문 둘"]
+        assert [chunk.index for chunk in chunks] == [0, 1]
+
+    def test_long_paragraph_split_under_limit(self):
+        chunks = split_sections("문장입니다. " * 200, max_chars=300)
+
+        assert len(chunks) > 1
+        assert all(len(chunk.text) <= 300 for chunk in chunks)
+
+
+class TestBM25:
+    """BM25 점수"""
+
+    def test_matching_document_scores_highest(self):
+        documents = [tokenize("사과 바나나"), tokenize("분수의 덧셈과 분수의 뺄셈"), tokenize("기차 여행")]
+
+        scores = BM25(documents).scores(tokenize("분수를 더하기"))
+
+        assert scores[1] > 0
+        assert scores[0] == scores[2] == 0
+
+
+class TestSelectRelevant:
+    """예산 안에서 관련 구간 발췌"""
+
+    def test_no_match_returns_none(self):
+        assert select_relevant(_document(), "광합성 실험", 4000) is None
+
+    def test_particle_match_and_document_order(self):
+        doc = _document(s2="분수를 통분하는 방법", s7="분수의 크기 비교")
+
+        excerpt = select_relevant(doc, "분수 학습지", 1500)
+
+        assert excerpt is not None
+        assert excerpt.index("## 단원 2") < excerpt.index("## 단원 7")
+        assert GAP_MARKER.strip() in excerpt
+
+    def test_fills_budget_around_hits(self):
+        doc = _document(sections=20, s12="분수를 배웁니다.")
+
+        excerpt = select_relevant(doc, "분수", 4000)
+
+        assert len(excerpt) > 3000
+        assert len(excerpt) <= 4000
+        assert "분수를 배웁니다." in excerpt
+        # 일치한 구간의 이웃부터 채우고 나머지는 문서 앞쪽부터
+        assert "## 단원 11\n" in excerpt and "## 단원 13\n" in excerpt
+        assert excerpt.startswith("## 단원 0\n")
+
+    def test_excerpt_within_budget(self):
+        doc = _document(sections=30, s5="분수", s15="분수", s25="분수")
+
+        for budget in (500, 1000, 2500):
+            excerpt = select_relevant(doc, "분수", budget)
+            assert excerpt is not None
+            assert len(excerpt) <= budget
@@ -0,0 +1,88 @@
+# tests/test_conversion_cache.py
+"""
+첨부 파일 Markdown 변환 캐시(ConversionCache) 테스트
+"""
+import sqlite3
+import time
+import pytest
+from conversion_cache import ConversionCache
+
+SHA = "a" * 64
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ConversionCache(tmp_path / "cache", converter="markitdown-test/v1")
+
+
+class TestGetPut:
+    """조회와 저장"""
+
+    def test_round_trip(self, cache):
+        cache.put(SHA, "# 분수\n통분하기", source_size=2048)
+
+        assert cache.get(SHA) == "# 분수\n통분하기"
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["bytes_saved"], stats["entries"]) == (1, 2048, 1)
+
+    def test_converter_version_separates_entries(self, cache, tmp_path):
+        cache.put(SHA, "old", source_size=10)
+
+        upgraded = ConversionCache(tmp_path / "cache", converter="markitdown-test/v2")
+
+        assert upgraded.get(SHA) is None
+        assert cache.get(SHA) == "old"
+
+    def test_partial_extraction_key(self, cache):
+        cache.put(SHA, "앞부분", source_size=10, converter="lazy-pypdf/4000")
+
+        assert cache.get(SHA) is None
+        assert cache.get(SHA, "lazy-pypdf/4000") == "앞부분"
+        assert cache.get(SHA, "lazy-pypdf/8000") is None
+
+    def test_missing_object_is_a_miss(self, cache):
+        cache.put(SHA, "text", source_size=10)
+        cache._object_path(cache.key_for(SHA)).unlink()
+
+        assert cache.get(SHA) is None
+        assert cache.get_stats()["entries"] == 0
+
+    def test_index_error_is_a_miss(self, cache, monkeypatch):
+        cache.put(SHA, "text", source_size=10)
+
+        class LockedConnection:
+            def execute(self, *args):
+                raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(cache, "_connect", lambda: LockedConnection())
+
+        assert cache.get(SHA) is None
+        cache._remove(cache.key_for(SHA))   # 예외 없이 무시
+
+
+class TestEvict:
+    """용량/개수 상한 정리"""
+
+    def test_entry_limit_evicts_least_recently_used(self, tmp_path):
+        cache = ConversionCache(tmp_path / "cache", max_entries=2, converter="markitdown-test/v1")
+        cache.put("1" * 64, "one", source_size=1)
+        time.sleep(0.01)
+        cache.put("2" * 64, "two", source_size=1)
+        time.sleep(0.01)
+        cache.get("1" * 64)
+
+        cache.put("3" * 64, "three", source_size=1)
+
+        assert cache.get("2" * 64) is None
+        assert cache.get("1" * 64) == "one"
+        assert cache.get("3" * 64) == "three"
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_trim_frees_bytes(self, cache):
+        for i in range(3):
+            cache.put(str(i) * 64, f"내용 {i} " * 200, source_size=1)
+
+        freed = cache.trim(0)
+
+        assert freed > 0
+        assert cache.get_stats()["entries"] == 0
@@ -0,0 +1,146 @@
+# tests/test_conversion_pool.py
+"""
+MarkItDown 변환 프로세스 풀(MarkdownConversionPool.convert_many) 테스트
+
+spawn 프로세스 대신 스레드로 동작하는 가짜 풀을 사용합니다.
+파일 이름으로 동작을 정함: hang(종료될 때까지 멈춤), broken(예외), slow(0.4초), 그 외 즉시 변환
+"""
+import queue
+import threading
+import time
+from pathlib import Path
+import pytest
+import file_preprocessor
+from file_preprocessor import MarkdownConversionPool
+
+
+class _FakePool:
+    """processes개의 스레드가 작업을 차례로 처리하는 multiprocessing.Pool 대역"""
+
+    def __init__(self, processes, initializer=None, initargs=(), maxtasksperchild=None):
+        self.started = initargs[0]
+        self.tasks = queue.Queue()
+        self.terminated = threading.Event()
+        for _ in range(processes):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def apply_async(self, func, args, callback, error_callback):
+        self.tasks.put((args, callback, error_callback))
+
+    def _work(self):
+        while not self.terminated.is_set():
+            try:
+                (task_id, source), callback, error_callback = self.tasks.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            self.started.put(task_id)
+            name = Path(source).name
+            if name.startswith("hang"):
+                self.terminated.wait()
+                return
+            if name.startswith("slow"):
+                time.sleep(0.4)
+            if self.terminated.is_set():
+                return
+            if name.startswith("broken"):
+                error_callback(ValueError(f"변환 실패: {name}"))
+            else:
+                callback(name.upper())
+
+    def terminate(self):
+        self.terminated.set()
+
+    def join(self):
+        pass
+
+
+class _FakeContext:
+    """multiprocessing.get_context('spawn') 대역 (만든 풀을 기록)"""
+
+    def __init__(self):
+        self.pools = []
+
+    def Manager(self):
+        manager = type("FakeManager", (), {})()
+        manager.Queue = queue.Queue
+        manager.shutdown = lambda: None
+        return manager
+
+    def Pool(self, **kwargs):
+        pool = _FakePool(**kwargs)
+        self.pools.append(pool)
+        return pool
+
+
+@pytest.fixture
+def context(monkeypatch):
+    context = _FakeContext()
+    monkeypatch.setattr(file_preprocessor.multiprocessing, 'get_context', lambda method: context)
+    return context
+
+
+def _convert(pool, names, timeout=5.0):
+    return [(source.name, text, error) for source, text, error in pool.convert_many([Path(n) for n in names], timeout)]
+
+
+class TestConvertMany:
+    """끝난 순서대로 결과 반환"""
+
+    def test_all_files_converted(self, context):
+        pool = MarkdownConversionPool(workers=2)
+
+        results = _convert(pool, ["a.pdf", "slow.pdf", "b.pdf"])
+
+        assert sorted(results) == [("a.pdf", "A.PDF", None), ("b.pdf", "B.PDF", None), ("slow.pdf", "SLOW.PDF", None)]
+        assert results[-1][0] == "slow.pdf"
+        assert pool.get_stats()['files'] == 3
+        pool.shutdown()
+
+    def test_failure_reported_per_file(self, context):
+        pool = MarkdownConversionPool(workers=1)
+
+        results = dict((name, (text, error)) for name, text, error in _convert(pool, ["broken.pdf", "a.pdf"]))
+
+        assert isinstance(results["broken.pdf"][1], ValueError)
+        assert results["a.pdf"] == ("A.PDF", None)
+        assert pool.get_stats()['failures'] == 1
+        pool.shutdown()
+
+
+class TestTimeout:
+    """작업별 제한 시간과 풀 재시작"""
+
+    def test_hung_file_times_out_and_rest_resubmitted(self, context):
+        pool = MarkdownConversionPool(workers=1)
+
+        results = _convert(pool, ["hang.pdf", "a.pdf"], timeout=0.3)
+
+        assert [name for name, _, _ in results] == ["hang.pdf", "a.pdf"]
+        assert isinstance(results[0][2], TimeoutError)
+        assert results[1] == ("a.pdf", "A.PDF", None)
+        assert len(context.pools) == 2 and context.pools[0].terminated.is_set()
+        stats = pool.get_stats()
+        assert (stats['timeouts'], stats['restarts']) == (1, 1)
+        pool.shutdown()
+
+    def test_queued_time_not_counted(self, context):
+        pool = MarkdownConversionPool(workers=1)
+
+        results = _convert(pool, ["slow-1.pdf", "slow-2.pdf"], timeout=0.6)
+
+        assert [error for _, _, error in results] == [None, None]
+        assert pool.get_stats()['timeouts'] == 0
+        pool.shutdown()
+
+    def test_restart_by_other_request_resubmits(self, context):
+        pool = MarkdownConversionPool(workers=1)
+        blocker = threading.Thread(target=lambda: _convert(pool, ["hang.pdf"], timeout=0.3))
+        blocker.start()
+        time.sleep(0.1)
+
+        results = _convert(pool, ["a.pdf"], timeout=5.0)   # hang.pdf 뒤에서 대기하다 재시작된 풀로 이동
+
+        blocker.join(5)
+        assert results == [("a.pdf", "A.PDF", None)]
+        assert pool.get_stats()['restarts'] == 1
+        pool.shutdown()
@@ -0,0 +1,140 @@
+# tests/test_convert_jobs.py
+"""
+비동기 변환 작업 관리(ConvertJobManager) 테스트
+"""
+import threading
+import time
+import pytest
+import convert_jobs
+from convert_jobs import ConvertJobManager, JobQueueFull
+
+
+def _blocking_runner(release):
+    def runner(prompt, progress, preview):
+        progress('generate', '생성 중')
+        release.wait(5)
+        return {'success': True, 'prompt': prompt}, 200
+    return runner
+
+
+@pytest.fixture
+def manager():
+    return ConvertJobManager(workers=2, max_pending=4)
+
+
+class TestSubmit:
+    """등록과 중복 합류"""
+
+    def test_same_key_coalesced_while_running(self, manager):
+        release = threading.Event()
+        runner = _blocking_runner(release)
+
+        first, first_coalesced = manager.submit(runner, "학습지", key="k")
+        second, second_coalesced = manager.submit(runner, "학습지", key="k")
+        release.set()
+        done = manager.wait(first.id, timeout=5)
+
+        assert (first_coalesced, second_coalesced) == (False, True)
+        assert second is first and done.subscribers == 2
+        assert done.status == 'done' and done.result == {'success': True, 'prompt': "학습지"}
+        assert manager.get_stats()['coalesced'] == 1
+
+    def test_new_job_after_previous_finished(self, manager):
+        release = threading.Event()
+        release.set()
+        first, _ = manager.submit(_blocking_runner(release), "a", key="k")
+        manager.wait(first.id, timeout=5)
+
+        second, coalesced = manager.submit(_blocking_runner(release), "a", key="k")
+
+        assert not coalesced and second is not first
+
+    def test_queue_limit(self):
+        manager = ConvertJobManager(workers=1, max_pending=1)
+        release = threading.Event()
+        job, _ = manager.submit(_blocking_runner(release), "a")
+
+        with pytest.raises(JobQueueFull):
+            manager.submit(_blocking_runner(release), "b")
+        release.set()
+        manager.wait(job.id, timeout=5)
+
+
+class TestWait:
+    """완료 대기와 실패 기록"""
+
+    def test_wait_timeout_returns_unfinished_job(self, manager):
+        release = threading.Event()
+        job, _ = manager.submit(_blocking_runner(release), "a")
+
+        waited = manager.wait(job.id, timeout=0.05)
+
+        assert waited is job and not waited.is_finished
+        release.set()
+        assert manager.wait(job.id, timeout=5).status == 'done'
+
+    def test_runner_exception_marks_failed(self, manager):
+        def runner(progress, preview):
+            raise RuntimeError("boom")
+
+        job, _ = manager.submit(runner)
+        done = manager.wait(job.id, timeout=5)
+
+        assert done.status == 'failed' and done.status_code == 500
+        assert [event['type'] for event in done.events][-1] == 'failed'
+
+    def test_preview_events_dropped_after_done(self, manager):
+        def runner(progress, preview):
+            preview('<html>')
+            preview('</html>')
+            return {'html': '<html></html>'}, 200
+
+        job, _ = manager.submit(runner)
+        manager.wait(job.id, timeout=5)
+        events, finished = manager.wait_for_events(job.id, after=0, timeout=1)
+
+        assert finished
+        assert 'html' not in [event['type'] for event in events]
+        assert events[-1]['id'] == job.last_event_id
+
+
+class TestPurge:
+    """끝난 작업의 TTL 정리"""
+
+    def test_finished_job_purged_after_ttl(self, manager, monkeypatch):
+        monkeypatch.setattr(convert_jobs, 'JOB_TTL_SECONDS', 1.0)
+        release = threading.Event()
+        release.set()
+        job, _ = manager.submit(_blocking_runner(release), "a")
+        manager.wait(job.id, timeout=5)
+        job.finished = time.time() - 10
+
+        manager.submit(_blocking_runner(release), "b")   # 등록 시 만료 작업 정리
+
+        assert manager.get(job.id) is None
+        assert manager.wait(job.id, timeout=0.1) is None
+
+    def test_expired_job_purged_on_read(self, manager, monkeypatch):
+        monkeypatch.setattr(convert_jobs, 'JOB_TTL_SECONDS', 1.0)
+        release = threading.Event()
+        release.set()
+        job, _ = manager.submit(_blocking_runner(release), "a")
+        manager.wait(job.id, timeout=5)
+        job.finished = time.time() - 10
+
+        assert manager.get(job.id) is None
+        assert manager.get_stats()['expired'] == 1
+
+    def test_finished_jobs_capped(self, manager, monkeypatch):
+        monkeypatch.setattr(convert_jobs, 'JOB_MAX_FINISHED', 2)
+        release = threading.Event()
+        release.set()
+        jobs = []
+        for prompt in ("a", "b", "c"):
+            job, _ = manager.submit(_blocking_runner(release), prompt)
+            manager.wait(job.id, timeout=5)
+            jobs.append(job)
+
+        assert manager.get(jobs[0].id) is None
+        assert manager.get(jobs[1].id) is jobs[1]
+        assert manager.get(jobs[2].id) is jobs[2]
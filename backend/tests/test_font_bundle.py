@@ -0,0 +1,102 @@
+# tests/test_font_bundle.py
+"""
+로컬 폰트 번들(FontBundle)의 원격 폰트 치환 테스트
+"""
+import json
+import pytest
+import font_bundle
+from font_bundle import FontBundle, _parse_google_fonts_url
+
+GOOGLE_CSS2 = "https://fonts.googleapis.com/css2?family=Noto+Sans+KR:wght@400;700&amp;display=swap"
+PRETENDARD_CDN = "https://cdn.jsdelivr.net/gh/orioncactus/pretendard@v1.3.9/dist/web/static/pretendard.css"
+
+
+def _page(head):
+    return f"<html><head>\n{head}\n</head><body><p>분수</p></body></html>"
+
+
+@pytest.fixture
+def bundle(tmp_path, monkeypatch):
+    """가짜 WOFF2 파일로 만든 번들 (inline 모드, 서브셋 없음)"""
+    monkeypatch.setattr(font_bundle, 'FONT_MODE', 'inline')
+    monkeypatch.setattr(font_bundle, 'SUBSET_ENABLED', False)
+    families = {
+        "Noto Sans KR": {"aliases": [], "weights": {"400": "NotoSansKR-400.woff2", "700": "NotoSansKR-700.woff2"}},
+        "Pretendard": {"aliases": ["Pretendard Variable"], "weights": {"400": "Pretendard-400.woff2"}},
+    }
+    manifest = {"version": 1, "families": {}}
+    for family, spec in families.items():
+        for name in spec["weights"].values():
+            (tmp_path / name).write_bytes(b"wOF2" + name.encode())
+        manifest["families"][family] = {
+            "aliases": spec["aliases"],
+            "weights": {weight: {"file": name} for weight, name in spec["weights"].items()},
+        }
+    (tmp_path / "fonts.json").write_text(json.dumps(manifest), encoding="utf-8")
+    return FontBundle(tmp_path)
+
+
+class TestParseGoogleFontsUrl:
+    """Google Fonts URL의 패밀리/굵기 해석"""
+
+    def test_css2_weights(self):
+        assert _parse_google_fonts_url(GOOGLE_CSS2) == [("Noto Sans KR", [400, 700])]
+
+    def test_css1_multiple_families(self):
+        url = "https://fonts.googleapis.com/css?family=Noto+Sans+KR:400,700|Inter"
+
+        assert _parse_google_fonts_url(url) == [("Noto Sans KR", [400, 700]), ("Inter", [400])]
+
+    def test_variable_range(self):
+        url = "https://fonts.googleapis.com/css2?family=Noto+Sans+KR:wght@300..500"
+
+        assert _parse_google_fonts_url(url) == [("Noto Sans KR", [300, 400, 500])]
+
+
+class TestLocalize:
+    """원격 폰트 링크를 로컬 @font-face로 치환"""
+
+    def test_google_link_and_preconnect_replaced(self, bundle):
+        html = _page(
+            '<link rel="preconnect" href="https://fonts.googleapis.com">\n'
+            f'<link href="{GOOGLE_CSS2}" rel="stylesheet">'
+        )
+
+        localized = bundle.localize(html)
+
+        assert "fonts.googleapis.com" not in localized
+        assert '<head>\n    <style id="local-fonts">' in localized
+        assert localized.count("font-family: 'Noto Sans KR'") == 2
+        assert "data:font/woff2;base64," in localized
+
+    def test_unbundled_family_left_on_google(self, bundle):
+        url = "https://fonts.googleapis.com/css2?family=Noto+Sans+KR:wght@400&family=Jua&display=swap"
+
+        localized = bundle.localize(_page(f"<style>@import url('{url}');</style>"))
+
+        assert "family=Jua%3Awght%40400" in localized
+        assert "Noto+Sans+KR" not in localized
+        assert "font-family: 'Noto Sans KR'" in localized
+
+    def test_pretendard_cdn_declared_with_alias(self, bundle):
+        html = _page(
+            f'<link rel="stylesheet" href="{PRETENDARD_CDN}">\n'
+            "<style>body { font-family: 'Pretendard Variable', sans-serif; }</style>"
+        )
+
+        localized = bundle.localize(html)
+
+        assert "cdn.jsdelivr.net" not in localized
+        assert "font-family: 'Pretendard'" in localized
+        assert "font-family: 'Pretendard Variable'" in localized
+
+    def test_already_localized_untouched(self, bundle):
+        html = _page(f'<link href="{GOOGLE_CSS2}" rel="stylesheet">')
+        localized = bundle.localize(html)
+
+        assert bundle.localize(localized) == localized
+
+    def test_no_bundle_keeps_html(self, tmp_path):
+        html = _page(f'<link href="{GOOGLE_CSS2}" rel="stylesheet">')
+
+        assert FontBundle(tmp_path / "missing").localize(html) == html
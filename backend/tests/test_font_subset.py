@@ -0,0 +1,86 @@
+# tests/test_font_subset.py
+"""
+문서별 폰트 서브셋 캐시(FontSubsetCache) 테스트
+"""
+import os
+import pytest
+import font_subset
+from font_subset import FontSubsetCache, document_codepoints
+
+# 가짜 폰트가 지원하는 글자: ASCII + 한글 몇 자
+CMAP = frozenset(range(0x20, 0x7F)) | frozenset(map(ord, "분수덧셈뺄"))
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "NotoSansKR-400.woff2"
+    path.write_bytes(b"wOF2" + b"\0" * 100)
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """실제 서브셋 생성 대신 코드포인트 목록을 파일로 기록"""
+    monkeypatch.setattr(font_subset, 'FONTTOOLS_AVAILABLE', True)
+    monkeypatch.setattr(FontSubsetCache, '_font_cmap', lambda self, path: CMAP)
+    monkeypatch.setattr(
+        FontSubsetCache, '_build',
+        lambda self, path, codepoints, target: target.write_text(",".join(map(str, sorted(codepoints))))
+    )
+    return FontSubsetCache(tmp_path / "subsets")
+
+
+class TestDocumentCodepoints:
+    """렌더링될 수 있는 글자 수집"""
+
+    def test_text_and_css_content_without_markup(self):
+        html = (
+            '<style>li::before { content: "\\2605"; } .x { color: red; }</style>'
+            '<script>const 변수 = "숨김";</script><p title="속성">분수&amp;덧셈</p>'
+        )
+
+        codepoints = document_codepoints(html)
+
+        assert {ord(c) for c in "분수덧셈&★"} <= codepoints
+        assert not {ord(c) for c in "변숨속"} & codepoints
+
+
+class TestCacheKey:
+    """(원본 폰트, 굵기, 실제 사용 글자) 단위 키"""
+
+    def test_glyphs_missing_from_font_share_subset(self, cache, source):
+        first = cache.get(source, 400, frozenset(map(ord, "분수")))
+        second = cache.get(source, 400, frozenset(map(ord, "분수漢字")))
+
+        assert first == second
+        stats = cache.get_stats()
+        assert (stats['misses'], stats['hits']) == (1, 1)
+
+    def test_different_text_or_weight_gets_new_subset(self, cache, source):
+        base = cache.get(source, 400, frozenset(map(ord, "분수")))
+
+        assert cache.get(source, 400, frozenset(map(ord, "덧셈"))) != base
+        assert cache.get(source, 700, frozenset(map(ord, "분수"))) != base
+
+    def test_changed_source_font_invalidates(self, cache, source):
+        before = cache.get(source, 400, frozenset(map(ord, "분수")))
+        source.write_bytes(b"wOF2" + b"\1" * 200)
+        os.utime(source, ns=(source.stat().st_atime_ns, source.stat().st_mtime_ns + 10**9))
+
+        assert cache.get(source, 400, frozenset(map(ord, "분수"))) != before
+
+    def test_subset_reused_after_restart(self, cache, source, tmp_path):
+        built = cache.get(source, 400, frozenset(map(ord, "분수")))
+
+        reopened = FontSubsetCache(tmp_path / "subsets")
+
+        assert reopened.get(source, 400, frozenset(map(ord, "분수"))) == built
+        assert reopened.get_stats()['hits'] == 1
+
+    def test_build_error_falls_back_to_source(self, cache, source, monkeypatch):
+        def broken(self, path, codepoints, target):
+            raise ValueError("bad font")
+        monkeypatch.setattr(FontSubsetCache, '_build', broken)
+
+        assert cache.get(source, 400, frozenset(map(ord, "분수"))) == source
+        assert cache.get_stats()['errors'] == 1
@@ -0,0 +1,101 @@
+# tests/test_generation_options.py
+"""
+요청 단위 생성 옵션(GenerationOptions) 격리 테스트
+"""
+import copy
+import json
+import logging
+import threading
+from types import SimpleNamespace
+import pytest
+from basic_html_designer import GenerationOptions, HTMLDesigner
+
+
+class _FakeAI:
+    """두 호출이 동시에 진행 중일 때까지 응답을 미루는 AI"""
+
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties, timeout=5)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def chat(self, prompt, **kwargs):
+        with self._lock:
+            self.calls.append((prompt, kwargs))
+        self.barrier.wait()
+        return SimpleNamespace(
+            text=f"```html\n<html>{prompt}</html>\n```",
+            model=kwargs["model"],
+            cost=0.0,
+            usage=SimpleNamespace(total_tokens=10, cached_tokens=0),
+        )
+
+
+@pytest.fixture
+def designer(tmp_path):
+    """AI 초기화/로그 파일 없이 config만 가진 디자이너"""
+    config = {
+        "ai_settings": {"model": "smart", "temperature": 0.7, "reference": []},
+        "prompts": {"system_prompt": "시스템", "preset_prompt": "프리셋", "user_prompt": "기본 요청"},
+        "file_processing": {"enable_direct_file_attachment": True, "input_directory": "input"},
+    }
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+    (tmp_path / "library").mkdir()
+    (tmp_path / "input").mkdir()
+
+    designer = HTMLDesigner.__new__(HTMLDesigner)
+    designer.config_path = config_path
+    designer.config = config
+    designer.logger = logging.getLogger("test_generation_options")
+    return designer
+
+
+def _attachment(tmp_path, name):
+    path = tmp_path / name
+    path.write_text(f"{name} 내용", encoding="utf-8")
+    return path
+
+
+class TestGenerationOptions:
+    """공유 config를 바꾸지 않고 요청마다 옵션 적용"""
+
+    def test_concurrent_calls_keep_their_options(self, designer, tmp_path):
+        designer.ai = _FakeAI(parties=2)
+        original = copy.deepcopy(designer.config)
+        requests = {
+            "분수": GenerationOptions(model="gpt-5", temperature=0.2, input_files=[_attachment(tmp_path, "a.txt")]),
+            "소수": GenerationOptions(model="claude-sonnet-4", temperature=0.9, input_files=[]),
+        }
+        results = {}
+
+        def run(user_request, options):
+            results[user_request] = designer.generate_html(user_request, options)
+
+        threads = [threading.Thread(target=run, args=item) for item in requests.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        calls = {prompt: kwargs for prompt, kwargs in designer.ai.calls}
+        fraction, decimal = calls["사용자 요청: 분수"], calls["사용자 요청: 소수"]
+        assert (fraction["model"], fraction["temperature"]) == ("gpt-5", 0.2)
+        assert (decimal["model"], decimal["temperature"]) == ("claude-sonnet-4", 0.9)
+        assert fraction["files"] == [str(tmp_path / "a.txt")] and decimal["files"] is None
+        assert results["분수"][1]["file_list"] == ["a.txt"]
+        assert results["소수"][0] == "<html>사용자 요청: 소수</html>"
+        assert designer.config == original
+
+    def test_config_defaults_when_unset(self, designer):
+        plan = designer._prepare_generation(None, GenerationOptions(user_request="요청", input_files=[]))
+
+        assert plan["user_request"] == "요청"
+        assert plan["chat_args"]["model"] == "smart"
+        assert plan["chat_args"]["temperature"] == 0.7
+
+    def test_options_are_immutable(self):
+        options = GenerationOptions(model="gpt-5")
+
+        with pytest.raises(AttributeError):
+            options.model = "claude-sonnet-4"
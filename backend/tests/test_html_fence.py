@@ -0,0 +1,72 @@
+# tests/test_html_fence.py
+"""
+스트리밍 응답의 ```html 본문 추출 테스트
+"""
+import pytest
+from basic_html_designer import HtmlFenceExtractor
+
+
+def _extract(chunks):
+    extractor = HtmlFenceExtractor()
+    streamed = "".join(extractor.feed(chunk) for chunk in chunks) + extractor.finish()
+    return extractor, streamed
+
+
+class TestFencedBody:
+    """```html 코드블록"""
+
+    def test_fence_split_across_chunks(self):
+        extractor, streamed = _extract(["설명입니다.\n``", "`ht", "ml\n<html>", "</html>\n`", "``\n끝"])
+
+        assert extractor.closed
+        assert streamed == "<html></html>"
+        assert extractor.html == streamed
+
+    def test_crlf_line_endings(self):
+        extractor, streamed = _extract(["```html\r\n<p>가</p>\r\n", "```\r\n"])
+
+        assert extractor.closed
+        assert streamed == "<p>가</p>"
+
+    def test_prose_mention_before_fence(self):
+        extractor, streamed = _extract([
+            "요청하신 학습지를 <html> 문서로 만들었습니다.\n",
+            "```html\n<!DOCTYPE html>\n<html></html>\n```",
+        ])
+
+        assert extractor.closed
+        assert streamed == "<!DOCTYPE html>\n<html></html>"
+
+    def test_unclosed_fence_flushed_on_finish(self):
+        extractor, streamed = _extract(["```html\n<html>", "</html>\n``"])
+
+        assert not extractor.closed
+        assert streamed == "<html></html>\n``"
+
+
+class TestRawHtml:
+    """펜스 없이 HTML로 시작하는 응답"""
+
+    def test_raw_closes_at_fence(self):
+        extractor, streamed = _extract(["<!DOCTYPE html>\n<html>", "</html>\n```\n다른 설명"])
+
+        assert extractor.closed
+        assert streamed == "<!DOCTYPE html>\n<html></html>"
+
+    def test_raw_marker_must_start_a_line(self):
+        extractor, streamed = _extract(["다음은 <ht", "ml> 예시입니다.\n  <!DOC", "TYPE html>\n<html></html>"])
+
+        assert streamed == "<!DOCTYPE html>\n<html></html>"
+
+    def test_trailing_fence_stripped(self):
+        extractor, streamed = _extract(["<html><body>가</body></html>", "```"])
+
+        assert streamed == "<html><body>가</body></html>"
+        assert extractor.html == streamed
+
+    @pytest.mark.parametrize("chunks", [["설명만 있고 HTML은 없습니다."], ["<p>조각</p>"]])
+    def test_no_html(self, chunks):
+        extractor, streamed = _extract(chunks)
+
+        assert streamed == ""
+        assert extractor.state == "search"
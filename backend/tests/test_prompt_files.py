@@ -0,0 +1,117 @@
+# tests/test_prompt_files.py
+"""
+참조/라이브러리 파일 캐시(PromptFileCache) 테스트
+"""
+import os
+import pytest
+from basic_html_designer import PromptFileCache
+
+
+def _touch_later(path, seconds=10):
+    """mtime을 앞으로 옮김 (같은 초 안의 수정도 구분되도록)"""
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 10**9))
+
+
+@pytest.fixture
+def cache():
+    return PromptFileCache()
+
+
+class TestReadText:
+    """stat(mtime/크기)로 검증하고 바뀐 파일만 다시 읽음"""
+
+    def test_unchanged_file_served_from_memory(self, cache, tmp_path):
+        path = tmp_path / "guideline.md"
+        path.write_text("# 가이드라인", encoding="utf-8")
+
+        first = cache.read_text(path)
+        second = cache.read_text(path)
+
+        assert first == ("# 가이드라인", True)
+        assert second == ("# 가이드라인", False)
+        assert second[0] is first[0]
+        assert cache.get_stats()["file_hits"] == 1
+
+    def test_changed_mtime_reloads(self, cache, tmp_path):
+        path = tmp_path / "guideline.md"
+        path.write_text("버전 1", encoding="utf-8")
+        cache.read_text(path)
+
+        path.write_text("버전 2", encoding="utf-8")   # 크기는 같음
+        _touch_later(path)
+
+        assert cache.read_text(path) == ("버전 2", True)
+
+    def test_changed_size_reloads_with_same_mtime(self, cache, tmp_path):
+        path = tmp_path / "guideline.md"
+        path.write_text("짧음", encoding="utf-8")
+        mtime_ns = path.stat().st_mtime_ns
+        cache.read_text(path)
+
+        path.write_text("조금 더 긴 내용", encoding="utf-8")
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+        assert cache.read_text(path) == ("조금 더 긴 내용", True)
+
+    def test_deleted_file_dropped(self, cache, tmp_path):
+        path = tmp_path / "guideline.md"
+        path.write_text("내용", encoding="utf-8")
+        cache.read_text(path)
+
+        path.unlink()
+
+        assert cache.read_text(path) == (None, False)
+        assert cache.get_stats()["cached_files"] == 0
+
+
+class TestResolveAndList:
+    """경로 해석과 디렉토리 목록 재사용"""
+
+    def test_resolve_searches_again_when_file_removed(self, cache, tmp_path):
+        first, second = tmp_path / "a.md", tmp_path / "b.md"
+        first.write_text("a", encoding="utf-8")
+        second.write_text("b", encoding="utf-8")
+        calls = []
+
+        def finder():
+            calls.append(1)
+            return first if first.exists() else second
+
+        assert cache.resolve("ref", finder) == first
+        assert cache.resolve("ref", finder) == first
+        first.unlink()
+
+        assert cache.resolve("ref", finder) == second
+        assert len(calls) == 2
+
+    def test_listing_refreshed_when_directory_changes(self, cache, tmp_path):
+        (tmp_path / "fonts.md").write_text("폰트", encoding="utf-8")
+        assert cache.list_dir(tmp_path, "*.md") == [tmp_path / "fonts.md"]
+
+        (tmp_path / "colors.md").write_text("색상", encoding="utf-8")
+        _touch_later(tmp_path)
+
+        assert cache.list_dir(tmp_path, "*.md") == [tmp_path / "colors.md", tmp_path / "fonts.md"]
+
+
+class TestStaticPrefix:
+    """고정 prompt prefix 재사용"""
+
+    def test_same_key_built_once(self, cache):
+        builds = []
+
+        def builder():
+            builds.append(1)
+            return "prefix"
+
+        assert cache.static_prefix(("system", "preset"), builder) == "prefix"
+        assert cache.static_prefix(("system", "preset"), builder) == "prefix"
+        assert len(builds) == 1
+
+    def test_least_recently_used_prefix_evicted(self, cache):
+        for i in range(PromptFileCache.PREFIX_CACHE_SIZE + 1):
+            cache.static_prefix(i, lambda: f"prefix {i}")
+
+        assert cache.static_prefix(0, lambda: "rebuilt") == "rebuilt"
+        assert cache.get_stats()["cached_prefixes"] == PromptFileCache.PREFIX_CACHE_SIZE
@@ -0,0 +1,86 @@
+# tests/test_render_cache.py
+"""
+HTML → PDF 렌더링 결과 캐시(RenderCache) 테스트
+"""
+import pytest
+from render_cache import RenderCache, normalize_html
+
+OPTIONS = {'format': 'A4', 'printBackground': True}
+HTML = '<html><head><style>@font-face { src: url("http://127.0.0.1:51234/fonts/a.woff2"); }</style></head><body>분수</body></html>'
+
+
+def _pdf(tmp_path, name, content=b"a" * 100):
+    path = tmp_path / name
+    path.write_bytes(b"%PDF-1.4\n" + content)
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RenderCache(tmp_path / "cache")
+
+
+class TestNormalize:
+    """캐시 키용 HTML 정규화"""
+
+    def test_line_endings_and_trailing_spaces_ignored(self):
+        assert normalize_html("  <p>가</p>   \r\n<p>나</p>\r") == normalize_html("<p>가</p>\n<p>나</p>")
+
+    def test_local_font_server_port_ignored(self, cache):
+        moved = HTML.replace("http://127.0.0.1:51234", "http://localhost:40001")
+
+        assert cache.key_for(HTML, OPTIONS) == cache.key_for(moved, OPTIONS)
+
+    def test_external_origin_kept(self):
+        assert "fonts.example.com:8080" in normalize_html('<link href="https://fonts.example.com:8080/a.css">')
+
+
+class TestKey:
+    """HTML과 인쇄 옵션으로 키 계산"""
+
+    def test_option_order_does_not_matter(self, cache):
+        reordered = {'printBackground': True, 'format': 'A4'}
+
+        assert cache.key_for(HTML, OPTIONS) == cache.key_for(HTML, reordered)
+
+    def test_options_and_content_change_key(self, cache):
+        key = cache.key_for(HTML, OPTIONS)
+
+        assert key != cache.key_for(HTML, {**OPTIONS, 'landscape': True})
+        assert key != cache.key_for(HTML.replace("분수", "소수"), OPTIONS)
+
+
+class TestFetchStore:
+    """저장 후 하드링크/복사로 복원"""
+
+    def test_round_trip(self, cache, tmp_path):
+        pdf = _pdf(tmp_path, "rendered.pdf")
+        key = cache.key_for(HTML, OPTIONS)
+        dest = tmp_path / "out.pdf"
+
+        assert not cache.fetch(key, dest)
+        cache.store(key, pdf)
+
+        assert cache.fetch(key, dest)
+        assert dest.read_bytes() == pdf.read_bytes()
+        stats = cache.get_stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+    def test_evicted_entry_keeps_delivered_file(self, tmp_path):
+        cache = RenderCache(tmp_path / "cache", max_entries=1)
+        cache.store("old", _pdf(tmp_path, "old.pdf"))
+        delivered = tmp_path / "delivered.pdf"
+        cache.fetch("old", delivered)
+
+        cache.store("new", _pdf(tmp_path, "new.pdf", b"b" * 100))
+
+        assert not cache.fetch("old", tmp_path / "again.pdf")
+        assert delivered.exists()
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_entries_reloaded_from_disk(self, cache, tmp_path):
+        cache.store("key-a", _pdf(tmp_path, "a.pdf"))
+
+        reopened = RenderCache(tmp_path / "cache")
+
+        assert reopened.fetch("key-a", tmp_path / "out.pdf")
@@ -0,0 +1,159 @@
+# tests/test_render_service.py
+"""
+렌더링 작업 큐(RenderQueue)와 감독 프로세스의 상태 전이 테스트
+"""
+import threading
+import time
+import pytest
+from render_service import (
+    RenderClient, RenderJobFailed, RenderQueue, RenderQueueFull, RenderService,
+)
+
+
+class _FakeProcess:
+    """subprocess.Popen 대신 사용하는 살아 있는 워커"""
+
+    def __init__(self):
+        self.returncode = None
+        self.terminated = False
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        self.terminated = True
+        self.returncode = -15
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return RenderQueue(tmp_path / "queue")
+
+
+class TestClaim:
+    """대기 → 진행 → 완료/실패"""
+
+    def test_oldest_job_claimed_once(self, queue, tmp_path):
+        first = queue.enqueue("<p>1</p>", tmp_path / "1.pdf")
+        second = queue.enqueue("<p>2</p>", tmp_path / "2.pdf")
+
+        claimed = [queue.claim("w0"), queue.claim("w1"), queue.claim("w2")]
+
+        assert [job['id'] for job in claimed[:2]] == [first, second]
+        assert claimed[0]['html'] == "<p>1</p>"
+        assert claimed[2] is None
+        assert queue.get(first)['status'] == 'running' and queue.get(first)['worker_id'] == 'w0'
+
+    def test_finish_records_result_and_drops_html(self, queue, tmp_path):
+        queue.heartbeat("w0", 1234)
+        job_id = queue.enqueue("<p>1</p>", tmp_path / "1.pdf")
+        queue.claim("w0")
+
+        queue.finish(job_id, "w0", "cdp", 2048)
+
+        job = queue.get(job_id)
+        assert (job['status'], job['backend'], job['size']) == ('done', 'cdp', 2048)
+        assert queue.live_workers()[0]['jobs_done'] == 1
+        assert queue.claim("w0") is None
+
+    def test_finished_job_not_failed_again(self, queue, tmp_path):
+        job_id = queue.enqueue("<p>1</p>", tmp_path / "1.pdf")
+        queue.claim("w0")
+        queue.finish(job_id, "w0", "cdp", 10)
+
+        queue.fail(job_id, "늦게 도착한 실패")
+
+        assert queue.get(job_id)['status'] == 'done'
+
+    def test_cancel_only_before_start(self, queue, tmp_path):
+        waiting = queue.enqueue("<p>1</p>", tmp_path / "1.pdf")
+        running = queue.enqueue("<p>2</p>", tmp_path / "2.pdf")
+        queue.cancel(waiting)
+        queue.claim("w0")
+
+        assert queue.get(waiting)['status'] == 'cancelled'
+        assert not queue.cancel(running)
+        assert queue.get(running)['status'] == 'running'
+
+    def test_queue_limit(self, queue, tmp_path):
+        queue.enqueue("<p>1</p>", tmp_path / "1.pdf", limit=2)
+        queue.enqueue("<p>2</p>", tmp_path / "2.pdf", limit=2)
+
+        with pytest.raises(RenderQueueFull):
+            queue.enqueue("<p>3</p>", tmp_path / "3.pdf", limit=2)
+        assert queue.pending_count() == 2
+
+
+class TestSupervise:
+    """감독 프로세스의 시간 초과/비정상 종료 처리"""
+
+    @pytest.fixture
+    def service(self, tmp_path, monkeypatch):
+        service = RenderService(tmp_path / "queue", workers=1, job_timeout=5)
+
+        def spawn(index):
+            service._workers[f"w{index}"] = _FakeProcess()
+        monkeypatch.setattr(service, '_spawn', spawn)
+        service._supervise_once()
+        return service
+
+    def test_timed_out_job_failed_and_worker_replaced(self, service, tmp_path):
+        job_id = service.queue.enqueue("<p>1</p>", tmp_path / "1.pdf")
+        service.queue.claim("w0")
+        worker = service._workers["w0"]
+        with service.queue._transaction() as conn:
+            conn.execute("UPDATE render_jobs SET started = ? WHERE id = ?", (time.time() - 60, job_id))
+
+        service._supervise_once()
+
+        job = service.queue.get(job_id)
+        assert job['status'] == 'failed' and "시간 초과" in job['error']
+        assert worker.terminated
+        assert service._workers["w0"] is not worker
+
+    def test_job_of_dead_worker_failed(self, service, tmp_path):
+        job_id = service.queue.enqueue("<p>1</p>", tmp_path / "1.pdf")
+        service.queue.claim("w0")
+        service._workers["w0"].returncode = 1
+
+        service._supervise_once()
+
+        assert service.queue.get(job_id)['status'] == 'failed'
+        assert service._workers["w0"].poll() is None
+
+
+class TestRenderClient:
+    """작업을 넣고 결과를 기다림"""
+
+    def _serve_one(self, queue, outcome):
+        def worker():
+            while True:
+                job = queue.claim("w0")
+                if job is not None:
+                    break
+                time.sleep(0.01)
+            if outcome == 'done':
+                queue.finish(job['id'], "w0", "weasyprint", 10)
+            else:
+                queue.fail(job['id'], "렌더링 실패", "w0")
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+
+    def test_render_returns_backend(self, tmp_path):
+        client = RenderClient(mode='external', queue_dir=tmp_path / "queue")
+        thread = self._serve_one(RenderQueue(tmp_path / "queue"), 'done')
+
+        assert client.render("<p>1</p>", tmp_path / "1.pdf") == "weasyprint"
+        thread.join(5)
+
+    def test_failed_job_raises(self, tmp_path):
+        client = RenderClient(mode='external', queue_dir=tmp_path / "queue")
+        thread = self._serve_one(RenderQueue(tmp_path / "queue"), 'failed')
+
+        with pytest.raises(RenderJobFailed, match="렌더링 실패"):
+            client.render("<p>1</p>", tmp_path / "1.pdf")
+        thread.join(5)
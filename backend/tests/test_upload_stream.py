@@ -0,0 +1,95 @@
+# tests/test_upload_stream.py
+"""
+업로드 스트리밍 저장(UploadSession / HashingFileWriter) 테스트
+"""
+import hashlib
+import io
+import pytest
+
+pytest.importorskip("flask")
+
+from werkzeug.test import EnvironBuilder
+from upload_stream import StreamingUploadRequest, UploadSession, UploadTooLarge, release_uploads
+
+
+class TestHashingFileWriter:
+    """기록하면서 해시/크기 누적"""
+
+    def test_hash_and_size_match_content(self, tmp_path):
+        session = UploadSession(tmp_path)
+        writer = session.open("자료.pdf")
+        chunks = [b"%PDF-1.4\n", b"a" * 70000, b"\x00\xff" * 10]
+        for chunk in chunks:
+            writer.write(chunk)
+
+        entry = session.describe(writer, "자료.pdf")
+
+        content = b"".join(chunks)
+        assert entry["sha256"] == hashlib.sha256(content).hexdigest()
+        assert entry["size"] == len(content)
+        assert entry["path"].read_bytes() == content
+        assert writer.closed
+
+    def test_request_limit_enforced_while_streaming(self, tmp_path):
+        session = UploadSession(tmp_path, max_bytes=100)
+        writer = session.open("a.txt")
+        writer.write(b"a" * 60)
+
+        with pytest.raises(UploadTooLarge):
+            session.open("b.txt").write(b"b" * 60)
+
+    def test_unique_names_keep_extension(self, tmp_path):
+        session = UploadSession(tmp_path)
+
+        names = [session.open(name).path.name for name in ("학습지.pdf", "교과서.pdf", "notes.txt", "notes.txt")]
+
+        assert len(set(names)) == 4
+        assert [name.rsplit(".", 1)[1] for name in names] == ["pdf", "pdf", "txt", "txt"]
+        session.discard()
+
+
+class TestOwnership:
+    """claim / discard에 따른 디렉토리 정리"""
+
+    def test_discard_removes_unclaimed_directory(self, tmp_path):
+        session = UploadSession(tmp_path)
+        session.open("a.txt").write(b"a")
+
+        session.discard()
+
+        assert not session.directory.exists()
+
+    def test_claimed_directory_kept_until_released(self, tmp_path):
+        session = UploadSession(tmp_path)
+        writer = session.open("a.txt")
+        writer.write(b"a")
+        entry = session.describe(writer, "a.txt")
+
+        session.claim()
+        session.discard()
+
+        assert entry["path"].exists()
+        release_uploads([entry])
+        assert not session.directory.exists()
+
+
+class TestStreamingUploadRequest:
+    """multipart 파일 조각이 요청 디렉토리로 바로 기록됨"""
+
+    def test_files_streamed_to_session_directory(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(StreamingUploadRequest, "upload_base_dir", tmp_path)
+        content = "분수의 덧셈\n".encode("utf-8") * 1000
+        builder = EnvironBuilder(method="POST", data={
+            "prompt": "학습지",
+            "files": (io.BytesIO(content), "단원.txt"),
+        })
+        request = StreamingUploadRequest(builder.get_environ())
+
+        upload = request.files["files"]
+        entry = request.upload_session.describe(upload.stream, upload.filename)
+
+        assert entry["path"].parent.parent == tmp_path
+        assert entry["sha256"] == hashlib.sha256(content).hexdigest()
+        assert request.form["prompt"] == "학습지"
+        request.upload_session.discard()
+        assert not entry["path"].exists()
@@ -0,0 +1,80 @@
+# tests/test_weasy_pool.py
+"""
+WeasyPrint 풀의 페이지 분할(split_pages / _chunk_documents) 테스트
+"""
+import pytest
+import weasy_pool
+from weasy_pool import split_pages, _chunk_documents
+
+HEAD = "<html><head><style>.page { page-break-after: always; }</style></head><body><main>"
+TAIL = "</main></body></html>"
+
+
+def _document(pages, separator="\n", head=HEAD):
+    body = separator.join(f'<div class="page"><h2>{i}쪽</h2><p>본문 {i}<br></p></div>' for i in range(pages))
+    return head + body + TAIL
+
+
+@pytest.fixture
+def chunkable(monkeypatch):
+    monkeypatch.setattr(weasy_pool, 'PYPDF_AVAILABLE', True)
+    monkeypatch.setattr(weasy_pool, 'CHUNK_MIN_PAGES', 4)
+
+
+class TestSplitPages:
+    """페이지 요소 기준 분할"""
+
+    def test_prefix_pages_suffix_rebuild_document(self):
+        html = _document(3)
+
+        prefix, pages, suffix = split_pages(html)
+
+        assert prefix == HEAD and suffix == TAIL
+        assert pages[1] == '<div class="page"><h2>1쪽</h2><p>본문 1<br></p></div>'
+        assert prefix + "\n".join(pages) + suffix == html
+
+    def test_nested_page_class_stays_inside_page(self):
+        html = HEAD + '<div class="page"><div class="page-section">가</div></div>\n<div class="page">나</div>' + TAIL
+
+        _, pages, _ = split_pages(html)
+
+        assert pages == ['<div class="page"><div class="page-section">가</div></div>', '<div class="page">나</div>']
+
+    def test_content_between_pages_is_unsafe(self):
+        assert split_pages(_document(3, separator="<p>사이 문단</p>")) is None
+
+    def test_pages_under_different_parents_are_unsafe(self):
+        html = HEAD + '<section><div class="page">가</div></section><section><div class="page">나</div></section>' + TAIL
+
+        assert split_pages(html) is None
+
+    def test_single_page_not_split(self):
+        assert split_pages(_document(1)) is None
+
+
+class TestChunkDocuments:
+    """긴 문서를 독립 문서 묶음으로 분할"""
+
+    def test_pages_spread_over_chunks(self, chunkable):
+        chunks = _chunk_documents(_document(10), 3)
+
+        assert len(chunks) == 3
+        assert all(chunk.startswith(HEAD) and chunk.endswith(TAIL) for chunk in chunks)
+        assert [chunk.count('class="page"') for chunk in chunks] == [4, 4, 2]
+        assert "0쪽" in chunks[0] and "9쪽" in chunks[2]
+
+    def test_short_document_not_chunked(self, chunkable):
+        assert _chunk_documents(_document(3), 3) is None
+
+    def test_requires_forced_page_break(self, chunkable):
+        assert _chunk_documents(_document(10, head="<html><body><main>"), 3) is None
+
+    def test_page_counter_is_unsafe(self, chunkable):
+        head = HEAD.replace("</style>", "@page { @bottom-center { content: counter(page) '/' counter(pages); } }</style>")
+
+        assert _chunk_documents(_document(10, head=head), 3) is None
+
+    def test_disabled_without_pypdf(self, chunkable, monkeypatch):
+        monkeypatch.setattr(weasy_pool, 'PYPDF_AVAILABLE', False)
+
+        assert _chunk_documents(_document(10), 3) is None
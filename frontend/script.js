@@ -26,6 +26,8 @@ document.addEventListener('DOMContentLoaded', async function () {
   const spinner    = document.getElementById('spinner');
   const statusEl   = document.getElementById('status');
   const loadingOverlay = document.getElementById('loadingOverlay');
+  const loadingStage = document.getElementById('loadingStage');
+  const livePreview = document.getElementById('livePreview');
   const yearEl     = document.getElementById('year');
   const resultModal = document.getElementById('resultModal');
   const modalPreviewBtn = document.getElementById('modalPreviewBtn');
@@ -287,8 +289,9 @@ document.addEventListener('DOMContentLoaded', async function () {
   });
 
   modalPdfBtn.addEventListener('click', () => {
-    // PDF 다운로드 (download=true 파라미터 추가)
-    const downloadUrl = currentResult.url + '?download=true';
+    // PDF 다운로드 (download=true 파라미터 추가, pdf_url에는 ?v= 버전이 붙어 있을 수 있음)
+    const separator = currentResult.url.includes('?') ? '&' : '?';
+    const downloadUrl = currentResult.url + separator + 'download=true';
     const a = document.createElement('a');
     a.href = downloadUrl;
     a.download = currentResult.filename;
@@ -425,22 +428,23 @@ document.addEventListener('DOMContentLoaded', async function () {
       const controller = new AbortController();
       const timeoutId = setTimeout(() => controller.abort(), 5 * 60 * 1000);
 
-      let res;
+      let j;
       try {
-        res = await fetch(`${API_BASE}/api/convert`, {
+        // 작업 등록 후 진행 이벤트로 결과 수신 (연결을 오래 붙잡지 않음)
+        const res = await fetch(`${API_BASE}/api/jobs`, {
           method: 'POST',
           body: fd,
           signal: controller.signal
         });
+        const job = await res.json().catch(() => ({}));
+        if (!res.ok) {
+          throw new Error(job.error || `서버 오류 (${res.status})`);
+        }
+        j = await waitForJob(job, controller.signal);
       } finally {
         clearTimeout(timeoutId);
       }
 
-      const j = await res.json().catch(() => ({}));
-
-      if (!res.ok) {
-        throw new Error(j.error || `서버 오류 (${res.status})`);
-      }
       if (j && j.pdf_url) {
         // PDF 생성 성공
         const pdfUrl = `${API_BASE}${j.pdf_url}`;
@@ -481,12 +485,92 @@ document.addEventListener('DOMContentLoaded', async function () {
     }
   }
 
+  // ====== Job progress ======
+  function showStage(message) {
+    if (loadingStage && message) loadingStage.textContent = message;
+  }
+
+  // 스트리밍 생성 중 받은 HTML 조각으로 미리보기 갱신 (iframe 재그리기는 0.5초에 한 번)
+  let previewHtml = '';
+  let previewTimer = null;
+  function resetPreview() {
+    previewHtml = '';
+    clearTimeout(previewTimer);
+    previewTimer = null;
+    if (livePreview) {
+      livePreview.srcdoc = '';
+      livePreview.classList.add('hidden');
+    }
+  }
+  function appendPreview(data) {
+    if (!livePreview || !data) return;
+    if (data.reset) previewHtml = '';
+    previewHtml += data.chunk || '';
+    if (previewTimer) return;
+    previewTimer = setTimeout(() => {
+      previewTimer = null;
+      livePreview.srcdoc = previewHtml;
+      livePreview.classList.toggle('hidden', !previewHtml);
+    }, 500);
+  }
+
+  // 작업 결과(result) 반환. 실패 시 서버 오류 메시지로 예외
+  function waitForJob(job, signal) {
+    if (!window.EventSource) return pollJob(job, signal);
+
+    return new Promise((resolve, reject) => {
+      const source = new EventSource(`${API_BASE}${job.events_url}`);
+      const close = () => source.close();
+      signal.addEventListener('abort', () => {
+        close();
+        reject(new DOMException('Aborted', 'AbortError'));
+      });
+
+      source.addEventListener('stage', (e) => {
+        showStage(JSON.parse(e.data).message);
+      });
+      source.addEventListener('html', (e) => {
+        appendPreview(JSON.parse(e.data).data);
+      });
+      source.addEventListener('done', (e) => {
+        close();
+        resolve(JSON.parse(e.data).data || {});
+      });
+      source.addEventListener('failed', (e) => {
+        close();
+        const data = JSON.parse(e.data).data || {};
+        reject(new Error(data.error || '변환에 실패했습니다.'));
+      });
+      source.onerror = () => {
+        // 스트림이 끊기면 상태 조회로 전환
+        close();
+        pollJob(job, signal).then(resolve, reject);
+      };
+    });
+  }
+
+  async function pollJob(job, signal) {
+    while (true) {
+      const res = await fetch(`${API_BASE}${job.status_url}`, { signal });
+      const state = await res.json().catch(() => ({}));
+      if (!res.ok) {
+        throw new Error(state.error || `서버 오류 (${res.status})`);
+      }
+      if (state.status === 'done') return state.result || {};
+      if (state.status === 'failed') {
+        throw new Error((state.result && state.result.error) || '변환에 실패했습니다.');
+      }
+      await new Promise((r) => setTimeout(r, 2000));
+    }
+  }
+
   function setLoading(isLoading){
     generateBtn.disabled = !!isLoading;
     // 버튼 텍스트만 변경 (애니메이션 제거)
     if (isLoading){
       generateBtn.dataset.prev = generateBtn.textContent;
       generateBtn.textContent = '생성하기';
+      showStage('잠시만 기다려주세요');
       loadingOverlay && loadingOverlay.classList.remove('hidden');
       dropzone.classList.add('pointer-events-none','opacity-60');
       promptEl.setAttribute('aria-busy','true');
@@ -495,6 +579,7 @@ document.addEventListener('DOMContentLoaded', async function () {
         generateBtn.textContent = generateBtn.dataset.prev; 
       }
       loadingOverlay && loadingOverlay.classList.add('hidden');
+      resetPreview();
       dropzone.classList.remove('pointer-events-none','opacity-60');
       promptEl.removeAttribute('aria-busy');
     }